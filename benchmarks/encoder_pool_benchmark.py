@@ -0,0 +1,96 @@
+"""Benchmark encoding one camera's frames in several ffmpeg processes at once.
+
+Compares a single FFMPEG_Writer with EncoderPool (VideoWriter's
+``"Encoder processes"``) for each process count given, timing everything
+from the first frame to the stitched file being closed.  libx264 already
+runs several threads per process, so the pool helps most where those
+threads do not fill the machine: small frames, slow presets and many
+cores.
+
+Usage::
+
+    python benchmarks/encoder_pool_benchmark.py --preset medium --processes 2 4
+
+Run it from the repository root with rataGUI installed (``pip install -e .``).
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from rataGUI.plugins.video_writer import EncoderPool, FFMPEG_Writer
+
+
+def run(args, frames, processes):
+    output_dict = {
+        "-vcodec": "libx264",
+        "-preset": args.preset,
+        "-crf": "23",
+        "-pix_fmt": "yuv420p",
+    }
+
+    def make_writer(path, buffer_size=args.buffer):
+        return FFMPEG_Writer(
+            path,
+            input_dict={"-framerate": "30"},
+            output_dict=dict(output_dict),
+            buffer_size=buffer_size,
+        )
+
+    with tempfile.TemporaryDirectory() as save_dir:
+        path = os.path.join(save_dir, "benchmark.mp4")
+        if processes == 1:
+            writer = make_writer(path)
+        else:
+            writer = EncoderPool(path, make_writer, processes, args.chunk, output_dict)
+        t0 = time.perf_counter()
+        for i in range(args.frames):
+            writer.write_frame(frames[i % len(frames)])
+        writer.close()  # Waits for every encoder (and the stitch)
+        return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--preset", default="medium")
+    parser.add_argument("--chunk", type=int, default=120, help="frames per chunk")
+    parser.add_argument("--buffer", type=int, default=120, help="single writer queue")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        nargs="+",
+        default=[2, 4],
+        help="encoder process counts to compare with a single process",
+    )
+    args = parser.parse_args()
+
+    logging.getLogger("rataGUI").setLevel(logging.WARNING)
+    # Moving noise, so every frame costs the encoder real work
+    rng = np.random.default_rng(0)
+    shape = (args.height, args.width, 3)
+    base = rng.integers(0, 255, shape, dtype=np.uint8)
+    frames = [np.roll(base, 8 * i, axis=1) for i in range(30)]
+    print(
+        f"{args.frames} frames of {args.width}x{args.height} RGB, "
+        f"libx264 {args.preset}, {os.cpu_count()} CPUs"
+    )
+
+    baseline = None
+    for processes in [1] + args.processes:
+        elapsed = run(args, frames, processes)
+        baseline = baseline or elapsed
+        print(
+            f"{processes:>2} process(es): {args.frames / elapsed:7.1f} frames/s "
+            f"({baseline / elapsed:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark how fast FFMPEG_Writer can feed raw frames to ffmpeg.
+
+Frames go to ffmpeg's null muxer with the ``rawvideo`` codec, so encoding
+costs next to nothing and the numbers show the cost of the feeding path
+itself: the default buffered stdin pipe versus unbuffered writes into a
+pipe resized with ``F_SETPIPE_SZ`` (VideoWriter's ``"Pipe size (MB)"``).
+
+Usage::
+
+    python benchmarks/ffmpeg_feed_benchmark.py --width 3840 --height 2160 --frames 300
+
+Pipe sizes above ``/proc/sys/fs/pipe-max-size`` need root (or are capped at
+that limit).  Run it from the repository root with rataGUI installed
+(``pip install -e .``).
+"""
+
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+
+from rataGUI.plugins.video_writer import FFMPEG_Writer
+
+
+def run(frames, num_frames, pipe_size_mb):
+    writer = FFMPEG_Writer(
+        os.devnull,
+        input_dict={"-framerate": "120"},
+        output_dict={"-vcodec": "rawvideo", "-f": "null"},
+        buffer_size=8,
+        pipe_size=pipe_size_mb * 2**20,
+    )
+    writer.write_frame(frames[0])  # Starts ffmpeg
+    t0 = time.perf_counter()
+    for i in range(1, num_frames + 1):
+        writer.write_frame(frames[i % len(frames)])
+    writer.close()  # Waits until ffmpeg has consumed every frame
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument(
+        "--pipe-sizes",
+        type=int,
+        nargs="+",
+        default=[1, 8, 64],
+        help="pipe sizes (MB) to compare with the default stdin pipe",
+    )
+    args = parser.parse_args()
+
+    logging.getLogger("rataGUI").setLevel(logging.WARNING)
+    rng = np.random.default_rng(0)
+    shape = (args.height, args.width, 3)
+    frames = [rng.integers(0, 255, shape, dtype=np.uint8) for _ in range(4)]
+    frame_mb = frames[0].nbytes / 2**20
+    print(f"{args.frames} frames of {args.width}x{args.height} RGB ({frame_mb:.1f} MB)")
+
+    for label, pipe_size_mb in [("stdin (buffered)", 0)] + [
+        (f"pipe {size} MB", size) for size in args.pipe_sizes
+    ]:
+        elapsed = run(frames, args.frames, pipe_size_mb)
+        print(
+            f"{label:>18}: {args.frames / elapsed:7.1f} frames/s, "
+            f"{args.frames * frame_mb / elapsed:8.1f} MB/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
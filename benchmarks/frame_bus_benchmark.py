@@ -0,0 +1,148 @@
+"""Benchmark the shared-memory frame bus (see rataGUI.frame_bus).
+
+Measures:
+
+- attach latency: time for a FrameBusReader to attach to (and detach from)
+  an existing bus;
+- publish throughput of a FrameBus in this process;
+- cross-process delivery: a publisher process streams frames at a fixed
+  rate (or as fast as it can) while this process reads them with
+  ``FrameBusReader.frames()``, reporting frames read and missed and the
+  publish-to-read latency.
+
+Usage::
+
+    python benchmarks/frame_bus_benchmark.py --width 1920 --height 1080 --fps 200
+
+Run it from the repository root with rataGUI installed (``pip install -e .``).
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from rataGUI.frame_bus import FrameBus, FrameBusReader
+
+
+def frame_shape(args) -> tuple:
+    shape = (args.height, args.width)
+    return shape + (3,) if args.channels == 3 else shape
+
+
+def bench_attach(name: str, count: int) -> None:
+    latencies = np.empty(count)
+    for i in range(count):
+        t0 = time.perf_counter_ns()
+        reader = FrameBusReader(name)
+        latencies[i] = time.perf_counter_ns() - t0
+        reader.close()
+    latencies /= 1e3
+    print(
+        f"attach: first {latencies[0]:.0f} us, mean {latencies[1:].mean():.0f} us, "
+        f"p99 {np.percentile(latencies[1:], 99):.0f} us ({count} attaches)"
+    )
+
+
+def bench_publish(bus: FrameBus, frame: np.ndarray, count: int) -> None:
+    t0 = time.perf_counter()
+    for i in range(count):
+        bus.publish(frame, {"Frame Index": i})
+    elapsed = time.perf_counter() - t0
+    print(
+        f"publish: {count / elapsed:.0f} frames/s, "
+        f"{count * frame.nbytes / elapsed / 1e9:.2f} GB/s in-process"
+    )
+
+
+def publisher(name, shape, slots, count, fps, ready, start):
+    logging.getLogger("rataGUI").setLevel(logging.WARNING)
+    bus = FrameBus.create(name, slots, shape, np.uint8, source="benchmark")
+    frame = np.random.default_rng(0).integers(0, 255, shape, dtype=np.uint8)
+    ready.set()
+    start.wait()
+    period = 1 / fps if fps else 0
+    next_time = time.perf_counter()
+    for i in range(count):
+        if period:
+            next_time += period
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        bus.publish(frame, {"Frame Index": i})
+    time.sleep(0.05)  # Let the reader catch up before the bus closes
+    bus.close()
+
+
+def bench_cross_process(args) -> None:
+    name = f"rataGUI_bench_{os.getpid()}"
+    ctx = multiprocessing.get_context("spawn")
+    ready, start = ctx.Event(), ctx.Event()
+    proc = ctx.Process(
+        target=publisher,
+        args=(name, frame_shape(args), args.slots, args.frames, args.fps, ready, start),
+    )
+    proc.start()
+    ready.wait(30)
+
+    reader = FrameBusReader(name)
+    frames = reader.frames(copy=args.copy, timeout=5.0)
+    latencies, torn, checksum = [], 0, 0
+    start.set()
+    t0 = time.perf_counter()
+    for frame, meta in frames:
+        checksum += int(frame[0, 0].sum())  # touch the frame
+        latencies.append(time.monotonic_ns() - meta["Monotonic ns"])
+        if not args.copy and not reader.valid(meta["Sequence"]):
+            torn += 1
+    elapsed = time.perf_counter() - t0
+    proc.join()
+    reader.close()
+
+    latencies = np.array(latencies) / 1e3
+    mode = "copies" if args.copy else "zero-copy views"
+    print(
+        f"cross-process ({mode}): read {len(latencies)} of {args.frames} frames "
+        f"in {elapsed:.2f} s ({len(latencies) / elapsed:.0f} frames/s), "
+        f"missed {reader.missed}, overwritten while read {torn}"
+    )
+    if len(latencies):
+        print(
+            f"  publish-to-read latency: median {np.median(latencies):.0f} us, "
+            f"p99 {np.percentile(latencies, 99):.0f} us, max {latencies.max():.0f} us"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--channels", type=int, choices=(1, 3), default=3)
+    parser.add_argument("--slots", type=int, default=8)
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--fps", type=float, default=0, help="0: as fast as possible")
+    parser.add_argument("--attaches", type=int, default=200)
+    parser.add_argument("--copy", action="store_true", help="read copies, not views")
+    args = parser.parse_args()
+
+    logging.getLogger("rataGUI").setLevel(logging.WARNING)
+    shape = frame_shape(args)
+    print(f"{args.slots} slots of {'x'.join(map(str, shape))} uint8")
+
+    name = f"rataGUI_bench_{os.getpid()}_local"
+    bus = FrameBus.create(name, args.slots, shape, np.uint8)
+    try:
+        frame = np.random.default_rng(0).integers(0, 255, shape, dtype=np.uint8)
+        bench_publish(bus, frame, args.frames)
+        bench_attach(name, args.attaches)
+    finally:
+        bus.close()
+
+    bench_cross_process(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark frame ring allocation options (see rataGUI.frame_memory).
+
+For each ``"frame memory"`` configuration, allocates a FrameRingBuffer and
+publishes frames into it: the first pass over the ring touches every slot
+for the first time (page faults happen here unless the memory was
+pre-faulted), the second pass shows the steady state.  Reports allocation
+time, per-frame publish latency of both passes and how much of the process's
+memory ended up in transparent huge pages.
+
+Usage::
+
+    python benchmarks/frame_memory_benchmark.py --width 3840 --height 2160 --slots 16
+
+Run it from the repository root with rataGUI installed (``pip install -e .``).
+"""
+
+import argparse
+import gc
+import logging
+import time
+
+import numpy as np
+
+from rataGUI.frame_format import FrameFormat
+from rataGUI.frame_memory import FrameMemory, numa_nodes
+from rataGUI.frame_ring_buffer import FrameRingBuffer
+
+CONFIGS = {
+    "default": {},
+    "prefault": {"prefault": True},
+    "transparent": {"huge pages": "transparent"},
+    "transparent + prefault": {"huge pages": "transparent", "prefault": True},
+    "hugetlbfs + prefault": {"huge pages": "hugetlbfs", "prefault": True},
+}
+
+
+def anon_huge_pages_kb() -> int:
+    """Transparent huge pages mapped by this process, in kB (0 if unknown)."""
+    try:
+        with open("/proc/self/smaps_rollup") as smaps:
+            for line in smaps:
+                if line.startswith("AnonHugePages:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def publish_pass(ring: FrameRingBuffer, frame: np.ndarray, count: int) -> np.ndarray:
+    latencies = np.empty(count)
+    for i in range(count):
+        t0 = time.perf_counter_ns()
+        ring.publish(frame, {"Frame Index": i})
+        latencies[i] = time.perf_counter_ns() - t0
+    return latencies / 1e6
+
+
+def run(name: str, config: dict, args) -> None:
+    shape = (args.height, args.width)
+    if args.channels == 3:
+        shape += (3,)
+    frame = np.random.default_rng(0).integers(0, 255, shape, dtype=np.uint8)
+    huge_before = anon_huge_pages_kb()
+
+    t0 = time.perf_counter()
+    memory = FrameMemory(config) if config else None
+    ring = FrameRingBuffer.from_format(
+        args.slots, FrameFormat(shape, np.uint8), num_consumers=0, memory=memory
+    )
+    alloc_ms = (time.perf_counter() - t0) * 1e3
+
+    first = publish_pass(ring, frame, args.slots)
+    steady = publish_pass(ring, frame, args.slots * args.passes)
+    huge_mb = (anon_huge_pages_kb() - huge_before) / 1024
+    print(
+        f"{name:<24} {alloc_ms:>9.1f} {first.mean():>9.2f} {first.max():>9.2f}"
+        f" {steady.mean():>9.2f} {np.percentile(steady, 99):>9.2f} {huge_mb:>9.0f}"
+    )
+    del ring, memory
+    gc.collect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--channels", type=int, choices=(1, 3), default=3)
+    parser.add_argument("--slots", type=int, default=16)
+    parser.add_argument("--passes", type=int, default=4, help="steady-state passes")
+    parser.add_argument("--numa-node", default=None, help='node number or "auto"')
+    args = parser.parse_args()
+
+    logging.getLogger("rataGUI").setLevel(logging.WARNING)
+    configs = dict(CONFIGS)
+    if args.numa_node is not None or len(numa_nodes()) > 1:
+        node = args.numa_node if args.numa_node is not None else 0
+        configs["numa node + THP"] = {"huge pages": "transparent", "numa node": node}
+
+    print(f"{args.slots} slots of {args.width}x{args.height}x{args.channels} uint8")
+    print(
+        f"{'config':<24} {'alloc ms':>9} {'1st mean':>9} {'1st max':>9}"
+        f" {'mean ms':>9} {'p99 ms':>9} {'THP MB':>9}"
+    )
+    for name, config in configs.items():
+        run(name, config, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Benchmark the pipeline engine's hot path (see rataGUI.pipeline_engine).
+
+A synthetic camera produces frames as fast as the pipeline accepts them and
+runs them through:
+
+- a chain of ``--serial`` pass-through plugins,
+- followed by a non-blocking reader on the fan-out ring and a blocking
+  writer fed through its queue (the FrameDisplay/VideoWriter layout),
+
+or, with ``--graph``, the same plugins arranged as a ``"pipeline graph"``
+with the reader and writer on separate branches.  The GUI and the headless
+runner both use this engine, so the numbers hold for either.
+
+Usage::
+
+    python benchmarks/pipeline_engine_benchmark.py --frames 2000 --serial 3
+
+Run it from the repository root with rataGUI installed (``pip install -e .``).
+"""
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+
+import numpy as np
+
+from rataGUI.executor_pools import ExecutorPools
+from rataGUI.headless.context import HeadlessConfigManager, PipelineContext
+from rataGUI.pipeline_engine import PipelineEngine
+
+
+class SyntheticCamera:
+    def __init__(self, shape, num_frames):
+        self.cameraID = self.display_name = "Synthetic"
+        self._running = True
+        self.frames_acquired = 0
+        self._num_frames = num_frames
+        self._frame = np.random.default_rng(0).integers(0, 255, shape, dtype=np.uint8)
+
+    def getDisplayName(self):
+        return self.display_name
+
+    def readCamera(self):
+        self.frames_acquired += 1
+        self._running = self.frames_acquired < self._num_frames  # Ends cleanly
+        return True, self._frame
+
+    def getMetadata(self):
+        return {"Frame Index": self.frames_acquired}
+
+    def closeCamera(self):
+        pass
+
+
+def make_plugin(ctx, name, blocking=False, independent=False):
+    from rataGUI.plugins.base_plugin import BasePlugin
+
+    class Plugin(BasePlugin):
+        def process(self, frame, metadata):
+            return frame, metadata
+
+    Plugin.__name__ = name
+    plugin = Plugin(ctx, HeadlessConfigManager())
+    plugin.blocking = blocking
+    plugin.independent = independent
+    plugin.modifies_frame = False
+    return plugin
+
+
+def run(args, graph: bool) -> None:
+    shape = (args.height, args.width, 3)
+    with tempfile.TemporaryDirectory() as save_dir:
+        ctx = PipelineContext(
+            SyntheticCamera(shape, args.frames), HeadlessConfigManager(), save_dir, []
+        )
+        names = [f"Serial{i}" for i in range(args.serial)]
+        ctx.plugins = [make_plugin(ctx, name) for name in names]
+        ctx.plugins += [
+            make_plugin(ctx, "Reader", independent=True),
+            make_plugin(ctx, "Writer", blocking=True, independent=True),
+        ]
+        ctx.plugin_names = [type(plugin).__name__ for plugin in ctx.plugins]
+
+        spec = None
+        if graph:
+            spec = {"camera": names[:1] or ["Reader", "Writer"]}
+            for parent, child in zip(names, names[1:]):
+                spec[parent] = [child]
+            if names:
+                spec[names[-1]] = ["Reader", "Writer"]
+
+        pools = ExecutorPools()
+        engine = PipelineEngine(pools, spec)
+        t0 = time.perf_counter()
+        asyncio.run(engine.run(ctx))
+        elapsed = time.perf_counter() - t0
+        pools.shutdown()
+
+    layout = "graph" if graph else "chain + fan-out"
+    print(
+        f"{layout}: {args.frames / elapsed:.0f} frames/s, "
+        f"latency {ctx.avg_latency:.2f} ms (moving average)"
+    )
+    for name, stages in ctx.timings.stats().items():
+        if "end-to-end" in stages:
+            stats = stages["end-to-end"]
+            print(
+                f"  {name} end-to-end: p50 {stats['p50 (ms)']:.2f} ms, "
+                f"p99 {stats['p99 (ms)']:.2f} ms, max {stats['max (ms)']:.2f} ms"
+            )
+    for name, stats in ctx.fan_out.stats().items():
+        if "delivered" in stats:
+            print(
+                f"  {name}: {stats['delivered']} delivered, "
+                f"dispatch {stats['mean dispatch (ms)']:.3f} ms mean / "
+                f"{stats['max dispatch (ms)']:.3f} ms max"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--serial", type=int, default=2, help="pass-through plugins")
+    parser.add_argument("--graph", action="store_true", help="only run the graph")
+    args = parser.parse_args()
+
+    logging.getLogger("rataGUI").setLevel(logging.WARNING)
+    print(f"{args.frames} frames of {args.width}x{args.height} RGB")
+    if not args.graph:
+        run(args, graph=False)
+    run(args, graph=True)
+
+
+if __name__ == "__main__":
+    main()
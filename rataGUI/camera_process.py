@@ -1,11 +1,19 @@
 """Subprocess target for multi-process camera acquisition.
 
-Each camera runs in its own process, reading frames into shared memory
-and sending lightweight metadata through a multiprocessing.Queue.  This
-eliminates GIL contention between cameras in multi-camera setups.
-
-The main process creates the SharedMemory and spawns this function via
-``multiprocessing.Process``.  All heavy imports (camera SDKs, numpy) are
+Each camera runs in its own process, reading frames and their metadata
+records into shared memory and ringing a pipe "doorbell" when the main
+process is waiting for them.  This eliminates GIL contention between
+cameras in multi-camera setups.
+
+Slots in the shared-memory ring are owned by exactly one side at a time.
+The subprocess writes into a free slot and publishes it; the main process gives plugins a read-only view
+of the slot (no copy) and marks it free again once the last holder is done.
+When no slot is free the subprocess applies a backpressure policy.  See
+:mod:`rataGUI.shared_frame_ring`.
+
+The main process spawns this function via ``multiprocessing.Process`` and
+creates the SharedMemory once the subprocess has reported the geometry of
+the camera's frames.  All heavy imports (camera SDKs, numpy) are
 deferred to inside the function body so that Windows ``spawn`` start
 method works correctly.
 """
@@ -20,29 +28,48 @@ def camera_acquisition_loop(
     camera_id,  # Camera identifier string
     camera_config_dict,  # Plain dict (serializable) of camera settings
     plugin_names,  # List of plugin name strings
-    shm_name,  # SharedMemory name for the frame ring buffer
-    shm_shape,  # (num_slots, H, W, C)
-    meta_queue,  # multiprocessing.Queue for (slot_idx, metadata_dict)
-    control_queue,  # multiprocessing.Queue for control signals
+    doorbell,  # Write end of a multiprocessing.Pipe: frame notifications and events
+    control_queue,  # multiprocessing.Queue for control signals and ring attach messages
     ready_event,  # multiprocessing.Event — set when camera initialized
     error_queue,  # multiprocessing.Queue for error reporting
+    ring_cond,  # multiprocessing.Condition shared with the main process's ring
     log_dir=None,  # Optional: directory path for file logging
+    backpressure="block",  # One of shared_frame_ring.BACKPRESSURE_POLICIES
 ):
     """Target function for camera acquisition subprocess.
 
     1. Sets up logging (console + optional file handler).
     2. Dynamically imports the camera class and creates an instance.
     3. Initialises the camera with the provided config dict.
-    4. Loops: readCamera() → write frame into shared memory slot →
-       put (slot_idx, metadata) into meta_queue.
-    5. Responds to control signals: ``"stop"``, ``"pause"``, ``"resume"``.
+    4. Reports the geometry of the first frame as a ``("geometry", dict)``
+       event on the doorbell and waits for the main process to answer on control_queue
+       with a ring sized to fit (see ``SharedFrameRing.control_message``).
+       The same happens again whenever the frame geometry changes.
+    5. Loops: readCamera() → write frame and its metadata record into a free
+       shared memory slot → publish it (ringing the doorbell if armed).
+    6. Responds to control signals: ``"stop"``, ``"pause"``, ``"resume"``.
+       While paused or waiting for a ring the process blocks on control_queue;
+       while waiting for a free slot it is woken by slot releases and by
+       ``SharedFrameRing.request_stop``.  Nothing polls.
+
+    A slot handed to the main process is not written again until the main
+    process releases it.  When every slot is taken, *backpressure* decides
+    whether to wait (``"block"``), discard the new frame (``"drop_newest"``)
+    or overwrite the oldest unclaimed one (``"drop_oldest"``).
 
     All parameters must be picklable (no Qt objects, no camera handles).
     """
     # -- Deferred imports (Windows spawn compatibility) ----------------------
+    import queue
+    import time
     import numpy as np
-    from multiprocessing.shared_memory import SharedMemory
     from datetime import datetime
+    from rataGUI.shared_frame_ring import (
+        SharedFrameRing,
+        frame_geometry,
+        send_event,
+        wait_for_slot,
+    )
 
     # -- Logging setup -------------------------------------------------------
     proc_logger = logging.getLogger(f"rataGUI.camera_process.{camera_module_name}")
@@ -74,18 +101,6 @@ def camera_acquisition_loop(
         camera_id,
     )
 
-    # -- Attach shared memory ------------------------------------------------
-    try:
-        shm = SharedMemory(name=shm_name, create=False)
-        frame_ring = np.ndarray(shm_shape, dtype=np.uint8, buffer=shm.buf)
-    except Exception as err:
-        proc_logger.exception("Failed to attach shared memory: %s", err)
-        error_queue.put(("shm_error", repr(err)))
-        return
-
-    num_slots = shm_shape[0]
-    write_pos = 0
-
     # -- Import and instantiate camera ---------------------------------------
     try:
         # Import camera modules to trigger __init_subclass__ registration
@@ -108,67 +123,104 @@ def camera_acquisition_loop(
     except Exception as err:
         proc_logger.exception("Camera initialization failed: %s", err)
         error_queue.put(("init_error", repr(err)))
-        shm.close()
         return
 
-    # -- Acquisition loop ----------------------------------------------------
+    # Shared memory ring, attached once the main process has sized it
+    ring = None
     paused = False
+
+    def handle_control(signal):
+        nonlocal paused, ring
+        if signal == "stop":
+            proc_logger.info("Received stop signal")
+            camera._running = False
+        elif signal == "pause":
+            proc_logger.info("Received pause signal")
+            paused = True
+        elif signal == "resume":
+            proc_logger.info("Received resume signal")
+            paused = False
+        elif isinstance(signal, tuple) and signal[0] == "ring":
+            _, name, num_slots, frame_shape, dtype = signal
+            if ring is not None:
+                ring.close()
+            ring = SharedFrameRing.attach(
+                name, num_slots, frame_shape, ring_cond, dtype, doorbell
+            )
+            proc_logger.info(
+                "Attached shared memory ring %s (%d slots of %s)",
+                name,
+                num_slots,
+                ring.format,
+            )
+
+    def drain_control():
+        """Apply pending control signals (non-blocking)."""
+        try:
+            while camera._running and not control_queue.empty():
+                handle_control(control_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+    def request_ring(frame):
+        """Report *frame*'s geometry and wait for a ring that fits it.
+
+        Returns ``False`` if the camera was stopped while waiting.
+        """
+        nonlocal ring
+        if ring is not None:
+            ring.close()
+            ring = None
+        geometry = frame_geometry(frame)
+        proc_logger.info("Requesting shared memory ring for frames of %s", geometry)
+        send_event(doorbell, ("geometry", geometry))
+        while camera._running and ring is None:
+            handle_control(control_queue.get())
+        return ring is not None
+
+    def should_stop():
+        drain_control()
+        if ring is not None and ring.stop_requested:
+            camera._running = False
+        return not camera._running
+
+    # -- Acquisition loop ----------------------------------------------------
     try:
         while camera._running:
             # Check for control signals (non-blocking)
-            try:
-                while not control_queue.empty():
-                    signal = control_queue.get_nowait()
-                    if signal == "stop":
-                        proc_logger.info("Received stop signal")
-                        camera._running = False
-                        break
-                    elif signal == "pause":
-                        proc_logger.info("Received pause signal")
-                        paused = True
-                    elif signal == "resume":
-                        proc_logger.info("Received resume signal")
-                        paused = False
-            except Exception:
-                pass  # Queue empty or other transient error
+            drain_control()
 
             if not camera._running:
                 break
 
             if paused:
-                import time
-
-                time.sleep(0.01)
+                handle_control(control_queue.get())  # Sleep until resumed or stopped
                 continue
 
             # Read frame from camera
             status, frame = camera.readCamera()
+            timestamp_ns = time.monotonic_ns()
 
             if not status or frame is None:
                 proc_logger.warning("Frame read failed on camera %s", camera_id)
                 continue
 
-            # Get metadata
-            metadata = camera.getMetadata()
-            metadata["Camera Name"] = camera.getDisplayName()
-            metadata["Timestamp"] = datetime.now()
-
-            # Write frame into shared memory ring slot
-            slot_idx = write_pos % num_slots
-            try:
-                np.copyto(frame_ring[slot_idx], frame)
-            except ValueError:
-                # Frame shape doesn't match shared memory — report and skip
-                proc_logger.error(
-                    "Frame shape %s does not match shared memory slot shape %s",
-                    frame.shape,
-                    frame_ring[slot_idx].shape,
-                )
-                continue
-
-            # Send metadata + slot index to main process
-            meta_queue.put((slot_idx, metadata))
-            write_pos += 1
+            # (Re)size the ring on the first frame and whenever the geometry changes
+            if (
+                ring is None
+                or frame.shape != ring.frame_shape
+                or frame.dtype != ring.dtype
+            ):
+                if not request_ring(frame):
+                    break
+
+            # Write frame into a shared memory ring slot owned by this process
+            slot_idx = wait_for_slot(ring, backpressure, should_stop)
+            if slot_idx is None:
+                continue  # Dropped by backpressure policy, or stopped
+            np.copyto(ring.frames[slot_idx], frame)
+            ring.write_record(slot_idx, camera.getMetadata(), timestamp_ns)
+            ring.commit(slot_idx)
 
     except Exception as err:
         proc_logger.exception("Acquisition loop error: %s", err)
@@ -181,5 +233,9 @@ def camera_acquisition_loop(
             camera.closeCamera()
         except Exception as err:
             proc_logger.exception("Error closing camera: %s", err)
-        shm.close()
+        if ring is not None:
+            proc_logger.info("Shared memory ring (%s): %s", backpressure, ring.stats())
+            ring.close()
+        doorbell.close()  # Main process sees EOF once this process is done
         proc_logger.info("Camera acquisition process exiting")
+
@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
 from pyqtconfig import ConfigManager
-from typing import Any, Tuple, List, Dict
+from typing import Any, Tuple, List, Dict, Optional, TYPE_CHECKING
 from numpy.typing import NDArray
 
+if TYPE_CHECKING:
+    from rataGUI.frame_format import FrameFormat
+
 
 class BaseCamera(ABC):
     """
@@ -86,9 +89,24 @@ class BaseCamera(ABC):
         """
         return self._running  # Overwrite for custom behavior
 
+    def getFrameFormat(self) -> Optional["FrameFormat"]:
+        """
+        Returns the format (shape and dtype) of the frames readCamera will return,
+        or None if it is not known before the first frame (the default)
+        """
+        return None
+
     def getMetadata(self) -> Dict[str, Any]:
         """
         Returns camera metadata associated with last acquired frame
+
+        When the camera runs in a subprocess, the metadata crosses to the main
+        process in shared memory: ``"Frame Index"``, ``"Camera Index"`` and up
+        to 8 further int, float or bool values with names of at most 32 bytes
+        are stored as numbers; any other values are pickled, up to 4 KiB per
+        frame (see :mod:`rataGUI.shared_frame_ring`).  Metadata beyond that is
+        dropped and counted in the ring's ``"metadata_dropped"`` stat.  A
+        ``"Timestamp"`` is always replaced with the acquisition time.
         """
         return {"Frame Index": self.frames_acquired}
 
@@ -66,6 +66,7 @@ class FLIRCamera(BaseCamera):
     # Pixel Format Info
     PIXEL_FORMAT_NAMES = {
         "Mono8": "Mono 8-bit",
+        "Mono16": "Mono 16-bit",
         "BayerRG8": "Bayer RG 8-bit",
         "BayerGR8": "Bayer GR 8-bit",
         "BayerGB8": "Bayer GB 8-bit",
@@ -594,10 +595,8 @@ class FLIRCamera(BaseCamera):
             fmt = self.pixel_format
 
             if fmt in FLIRCamera.MONO_FORMATS:
-                # Expand to (H, W, 3): the ring buffer, VideoWriter and FrameDisplay
-                # all unpack a 3-tuple shape.
-                code = cv2.COLOR_GRAY2BGR if colorspace == "BGR" else cv2.COLOR_GRAY2RGB
-                self.last_frame = cv2.cvtColor(raw, code)
+                # Native (H, W) uint8/uint16 frame; colorspace does not apply
+                self.last_frame = raw.copy()
             elif fmt in FLIRCamera.BAYER_CONVERSIONS:
                 rgb_code, bgr_code = FLIRCamera.BAYER_CONVERSIONS[fmt]
                 self.last_frame = cv2.cvtColor(raw, bgr_code if colorspace == "BGR" else rgb_code)
@@ -1,6 +1,9 @@
 from rataGUI.cameras.BaseCamera import BaseCamera, ConfigManager
 
 import cv2
+import numpy as np
+
+from rataGUI.frame_format import FrameFormat
 
 import logging
 
@@ -42,6 +45,16 @@ class WebCamera(BaseCamera):
         self._running = True
         return True
 
+    def getFrameFormat(self):
+        """Format of the RGB frames read from the opened stream, if it reports its size."""
+        if self._stream is None or not self._stream.isOpened():
+            return None
+        width = int(self._stream.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self._stream.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width <= 0 or height <= 0:
+            return None
+        return FrameFormat((height, width, 3), np.uint8)
+
     def readCamera(self, colorspace="RGB"):
         """Read the next frame, converting colorspace if specified. Returns (success, frame)."""
         ret, frame = self._stream.read()
@@ -0,0 +1,225 @@
+"""CPU placement for headless sessions: which cores each process may run on.
+
+The plan comes from the ``"cpu affinity"`` key of a headless config::
+
+    "cpu affinity": {
+        "main": [0, 1],                     # plugin event loop (main process)
+        "cameras": {"FLIR 12345": [2], "FLIR 67890": "3"},
+        "encoders": "4-7",                  # ffmpeg processes started by VideoWriter
+        "realtime priority": 50             # optional SCHED_FIFO priority for cameras
+    }
+
+Cores are given as a list of ints or a string such as ``"0-3,6"``.  Camera
+entries are keyed by display name or camera ID; cameras without an entry (and
+encoders, when ``"encoders"`` is omitted) may run on any available core.  Affinity is applied with ``os.sched_setaffinity``
+to every thread of the target process, so it is only available on Linux;
+elsewhere the plan is ignored with a warning.
+"""
+
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+AFFINITY_KEY = "cpu affinity"
+
+_warned_unsupported = False
+
+
+def parse_cores(spec) -> set:
+    """Parse a core list (``[0, 2]``, ``2``, ``"0-3,6"``) into a set of ints.
+
+    :raises ValueError: If *spec* is malformed.
+    """
+    if spec is None:
+        return set()
+    if isinstance(spec, int):
+        return {spec}
+    if isinstance(spec, str):
+        cores = set()
+        for part in spec.replace(" ", "").split(","):
+            if not part:
+                continue
+            if "-" in part:
+                first, last = part.split("-", 1)
+                cores.update(range(int(first), int(last) + 1))
+            else:
+                cores.add(int(part))
+        return cores
+    return {int(core) for core in spec}
+
+
+def format_cores(cores) -> str:
+    """Compact string for a set of cores, e.g. ``{0, 1, 2, 5}`` -> ``"0-2,5"``."""
+    ranges = []
+    for core in sorted(cores):
+        if ranges and core == ranges[-1][1] + 1:
+            ranges[-1][1] = core
+        else:
+            ranges.append([core, core])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def _supported() -> bool:
+    global _warned_unsupported
+    if hasattr(os, "sched_setaffinity"):
+        return True
+    if not _warned_unsupported:
+        _warned_unsupported = True
+        logger.warning("CPU affinity is not supported on this platform ... ignoring")
+    return False
+
+
+def pin_process(pid: int, cores, label: str) -> set | None:
+    """Restrict every thread of process *pid* to *cores* and log the result.
+
+    Threads started later inherit the affinity of the thread that creates
+    them.  Returns the affinity actually applied, or ``None`` if nothing was
+    done (no cores, unsupported platform, or the call failed).
+    """
+    cores = set(cores or ())
+    if not cores or not _supported():
+        return None
+    task_dir = f"/proc/{pid}/task"
+    try:
+        tids = [int(tid) for tid in os.listdir(task_dir)]
+    except OSError:
+        tids = [pid]
+    try:
+        for tid in tids:
+            try:
+                os.sched_setaffinity(tid, cores)
+            except ProcessLookupError:
+                pass  # Thread exited in the meantime
+        applied = os.sched_getaffinity(pid)
+    except OSError as err:
+        logger.warning(
+            "Could not pin %s (PID %d) to CPUs %s: %s",
+            label,
+            pid,
+            format_cores(cores),
+            err,
+        )
+        return None
+    logger.info("Pinned %s (PID %d) to CPUs %s", label, pid, format_cores(applied))
+    return applied
+
+
+def set_realtime_priority(pid: int, priority: int, label: str) -> bool:
+    """Run process *pid* under ``SCHED_FIFO`` at *priority* (1-99).
+
+    Usually requires root or ``CAP_SYS_NICE``; failure is logged, not raised.
+    """
+    if not priority or not hasattr(os, "sched_setscheduler"):
+        return False
+    try:
+        os.sched_setscheduler(pid, os.SCHED_FIFO, os.sched_param(priority))
+    except OSError as err:
+        logger.warning(
+            "Could not give %s (PID %d) real-time priority %d: %s",
+            label,
+            pid,
+            priority,
+            err,
+        )
+        return False
+    logger.info("Set %s (PID %d) to SCHED_FIFO priority %d", label, pid, priority)
+    return True
+
+
+class AffinityPlan:
+    """Validated CPU placement for the main process, cameras and encoders.
+
+    Cores outside the set this process may run on are dropped with a warning.
+
+    :param config: The ``"cpu affinity"`` config dict (may be empty or ``None``).
+    """
+
+    def __init__(self, config: dict | None = None):
+        config = config or {}
+        if hasattr(os, "sched_getaffinity"):
+            self.available = os.sched_getaffinity(0)
+        else:
+            self.available = set(range(os.cpu_count() or 1))
+
+        self.main_cores = self._cores("main", config.get("main"))
+        self.encoder_cores = self._cores("encoders", config.get("encoders"))
+        self.camera_cores = {
+            str(name): self._cores(f"camera {name}", spec)
+            for name, spec in (config.get("cameras") or {}).items()
+        }
+        self.realtime_priority = self._priority(config.get("realtime priority", 0))
+
+    @staticmethod
+    def _priority(spec) -> int:
+        """SCHED_FIFO priority from the config, or 0 (disabled) if it is invalid."""
+        if hasattr(os, "SCHED_FIFO"):
+            low = os.sched_get_priority_min(os.SCHED_FIFO)
+            high = os.sched_get_priority_max(os.SCHED_FIFO)
+        else:
+            low, high = 1, 99
+        try:
+            priority = int(spec or 0)
+        except (TypeError, ValueError):
+            logger.warning("Invalid real-time priority %r ... disabling", spec)
+            return 0
+        if priority and not low <= priority <= high:
+            logger.warning(
+                "Real-time priority %d outside %d-%d ... disabling", priority, low, high
+            )
+            return 0
+        return priority
+
+    def _cores(self, role: str, spec) -> set:
+        try:
+            cores = parse_cores(spec)
+        except (TypeError, ValueError):
+            logger.warning("Invalid CPU list %r for %s ... ignoring", spec, role)
+            return set()
+        unavailable = cores - self.available
+        if unavailable:
+            logger.warning(
+                "CPUs %s for %s are not available (available: %s) ... ignoring them",
+                format_cores(unavailable),
+                role,
+                format_cores(self.available),
+            )
+        return cores & self.available
+
+    def __bool__(self):
+        return bool(
+            self.main_cores
+            or self.encoder_cores
+            or any(self.camera_cores.values())
+            or self.realtime_priority
+        )
+
+    @property
+    def default_cores(self) -> set:
+        """Cores for processes without an entry.
+
+        Child processes inherit the main process's affinity, so once the main
+        process is pinned they are explicitly given every available core.
+        """
+        return set(self.available) if self.main_cores else set()
+
+    def cores_for_camera(self, camera) -> set:
+        """Cores for *camera*, looked up by display name, then by camera ID."""
+        for key in (camera.getDisplayName(), str(camera.cameraID)):
+            if self.camera_cores.get(key):
+                return self.camera_cores[key]
+        return self.default_cores
+
+    def cores_for_encoders(self) -> set:
+        """Cores for ffmpeg encoder processes."""
+        return self.encoder_cores or self.default_cores
+
+    def apply_main(self) -> None:
+        """Pin the calling (main) process, i.e. the plugin event loop."""
+        pin_process(os.getpid(), self.main_cores, "plugin event loop")
+
+    def apply_camera(self, pid: int, camera) -> None:
+        """Pin and prioritise the acquisition subprocess *pid* of *camera*."""
+        label = f"camera {camera.getDisplayName()}"
+        pin_process(pid, self.cores_for_camera(camera), label)
+        set_realtime_priority(pid, self.realtime_priority, label)
@@ -0,0 +1,156 @@
+"""Dedicated, instrumented thread pools for camera acquisition and plugins.
+
+Every camera gets an acquisition pool with a single thread for its blocking
+``readCamera`` calls, and a single-thread pool of its own for each class of
+``blocking`` plugins in its pipeline, so a slow camera or plugin can no
+longer starve the others of threads, and a stalled plugin (say, a
+VideoWriter waiting on its encoder) only holds up its own camera.  A plugin
+processes one frame at a time, in order, so one thread per plugin is all it
+can use.
+
+Each pool records how often work arrived while every worker was busy
+(saturation) and how long work waited for a free worker (queue wait); see
+:meth:`InstrumentedExecutor.stats`.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor that tracks saturation and queue-wait time.
+
+    :param max_workers: Number of worker threads.
+    :param name: Pool name, used for thread names and in :meth:`stats`.
+    """
+
+    def __init__(self, max_workers: int, name: str):
+        super().__init__(max_workers=max_workers, thread_name_prefix=name)
+        self.name = name
+        self._stats_lock = threading.Lock()
+        self._pending = 0  # Submitted, not finished
+        self._busy = 0
+        self.submitted = 0
+        self.completed = 0
+        self.saturated = 0  # Submissions that found every worker busy
+        self.peak_busy = 0
+        self._wait_total_ns = 0
+        self._wait_max_ns = 0
+        self.closed = False
+
+    def shutdown(self, wait=True, **kwargs):
+        self.closed = True
+        super().shutdown(wait=wait, **kwargs)
+
+    def submit(self, fn, /, *args, **kwargs):
+        submitted_ns = time.monotonic_ns()
+        with self._stats_lock:
+            self.submitted += 1
+            if self._pending >= self._max_workers:
+                self.saturated += 1
+            self._pending += 1
+
+        def run():
+            wait_ns = time.monotonic_ns() - submitted_ns
+            with self._stats_lock:
+                self._busy += 1
+                self.peak_busy = max(self.peak_busy, self._busy)
+                self._wait_total_ns += wait_ns
+                self._wait_max_ns = max(self._wait_max_ns, wait_ns)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._stats_lock:
+                    self._busy -= 1
+                    self._pending -= 1
+                    self.completed += 1
+
+        return super().submit(run)
+
+    def stats(self) -> dict:
+        """Usage counters of this pool (wait times in milliseconds)."""
+        with self._stats_lock:
+            started = self.completed + self._busy
+            return {
+                "workers": self._max_workers,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "busy": self._busy,
+                "peak busy": self.peak_busy,
+                "saturated": self.saturated,
+                "saturation": (
+                    self.saturated / self.submitted if self.submitted else 0.0
+                ),
+                "mean queue wait (ms)": (
+                    self._wait_total_ns / started / 1e6 if started else 0.0
+                ),
+                "max queue wait (ms)": self._wait_max_ns / 1e6,
+            }
+
+
+class ExecutorPools:
+    """Lazily created single-thread pools: one per camera for acquisition, one
+    per camera and plugin class for blocking plugins."""
+
+    def __init__(self):
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, name: str, max_workers: int) -> InstrumentedExecutor:
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None or pool.closed:
+                pool = self._pools[name] = InstrumentedExecutor(max_workers, name)
+            return pool
+
+    def acquisition(self, camera_name: str) -> InstrumentedExecutor:
+        """Single-thread pool for *camera_name*'s blocking camera calls."""
+        return self._pool(f"acquisition {camera_name}", 1)
+
+    def for_plugin(self, camera_name: str, plugin_name: str) -> InstrumentedExecutor:
+        """Single-thread pool running ``process()`` of blocking plugins of class
+        *plugin_name* in *camera_name*'s pipeline."""
+        return self._pool(f"plugin {camera_name}/{plugin_name}", 1)
+
+    def stats(self) -> dict:
+        """:meth:`InstrumentedExecutor.stats` of every pool, keyed by pool name."""
+        with self._lock:
+            pools = dict(self._pools)
+        return {name: pool.stats() for name, pool in pools.items()}
+
+    def log_stats(self) -> None:
+        """Log usage of every pool, warning about pools that were saturated."""
+        for name, stats in self.stats().items():
+            log = logger.warning if stats["saturated"] else logger.info
+            log(
+                "Thread pool %s: %d/%d workers peak, %d of %d tasks waited for a "
+                "worker, queue wait %.2f ms mean / %.2f ms max",
+                name,
+                stats["peak busy"],
+                stats["workers"],
+                stats["saturated"],
+                stats["submitted"],
+                stats["mean queue wait (ms)"],
+                stats["max queue wait (ms)"],
+            )
+
+    def close_acquisition(self, camera_name: str) -> None:
+        """Shut down *camera_name*'s acquisition pool (recreated on next use)."""
+        with self._lock:
+            pool = self._pools.pop(f"acquisition {camera_name}", None)
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down every pool.
+
+        Their :meth:`stats` remain available; pools are recreated if used again.
+        """
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.shutdown(wait=wait)
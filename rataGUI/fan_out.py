@@ -0,0 +1,201 @@
+"""Fan-out stage delivering each frame to every trailing independent plugin.
+
+Frames leave the serial part of a pipeline through one source queue (or,
+with a ``"pipeline graph"``, leave each branch point; see
+:mod:`rataGUI.pipeline_graph`).
+:class:`FanOut` publishes each frame into the pipeline's
+:class:`~rataGUI.frame_ring_buffer.FrameRingBuffer`, from which
+non-blocking plugins read at their own pace through their
+:class:`~rataGUI.frame_ring_buffer.RingConsumer`, and hands it to the
+remaining plugins (blocking ones, or all of them without a ring buffer)
+through their input queues.
+
+Delivery to queue consumers happens concurrently: a frame is offered to
+every queue at once, and only plugins whose queue is full *and* whose
+``drop_policy`` is ``"block"`` are waited for, together.  A full queue
+therefore no longer delays delivery to the plugins after it.  Blocking
+plugins share one read-only copy of each frame, each with its own copy of
+the metadata dict; plugins that write into frames copy it again before
+processing (see ``modifies_frame``).  Without a ring buffer, a frame handed
+to several queues is marked read-only instead of copied, for the same
+reason.
+
+Per-consumer dispatch statistics (frames delivered, dropped and waited
+for, dispatch latency) are available from :meth:`FanOut.stats` and are
+logged by :meth:`FanOut.log_stats`.
+"""
+
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _QueueTarget:
+    """Dispatch state and counters of one queue fed by the fan-out."""
+
+    def __init__(self, name: str, queue, drop_policy: str = "block"):
+        self.name = name
+        self.queue = queue
+        self.drop_policy = drop_policy
+        self.delivered = 0
+        self.dropped = 0  # Evicted by drop_oldest
+        self.waits = 0  # Frames that had to wait for room in a full queue
+        self._dispatch_total_ns = 0
+        self._dispatch_max_ns = 0
+
+    def offer(self, item, arrived_ns: int) -> bool:
+        """Enqueue *item* if that does not require waiting."""
+        in_queue = self.queue
+        if self.drop_policy == "drop_oldest" and in_queue.full():
+            try:
+                in_queue.get_nowait()
+                in_queue.task_done()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        try:
+            in_queue.put_nowait(item)
+        except asyncio.QueueFull:
+            return False
+        self._delivered(arrived_ns)
+        return True
+
+    async def put(self, item, arrived_ns: int) -> None:
+        """Wait for room in the queue (``"block"`` policy) and enqueue *item*."""
+        self.waits += 1
+        await self.queue.put(item)
+        self._delivered(arrived_ns)
+
+    def _delivered(self, arrived_ns: int) -> None:
+        dispatch_ns = time.perf_counter_ns() - arrived_ns
+        self._dispatch_total_ns += dispatch_ns
+        self._dispatch_max_ns = max(self._dispatch_max_ns, dispatch_ns)
+        self.delivered += 1
+
+    def stats(self) -> dict:
+        delivered = self.delivered
+        return {
+            "policy": self.drop_policy,
+            "delivered": delivered,
+            "dropped": self.dropped,
+            "waits": self.waits,
+            "mean dispatch (ms)": (
+                self._dispatch_total_ns / delivered / 1e6 if delivered else 0.0
+            ),
+            "max dispatch (ms)": self._dispatch_max_ns / 1e6,
+        }
+
+
+class FanOut:
+    """Distribute frames from one source queue to several independent plugins.
+
+    :param source_queue: Queue of ``(frame, metadata)`` items to distribute.
+    :param queue_plugins: Plugins fed through their ``in_queue``.
+    :param ring_buffer: Optional ring buffer the frames are published into
+        for the plugins reading it through ring consumers.
+    :param release_frame: Called with a frame's metadata once the frame no
+        longer needs its source buffer (a shared-memory slot in multiprocess
+        mode), i.e. after it has been copied.
+    """
+
+    def __init__(
+        self, source_queue, queue_plugins, ring_buffer=None, release_frame=None
+    ):
+        self.source_queue = source_queue
+        self.ring_buffer = ring_buffer
+        self._release_frame = release_frame
+        self._targets = []
+        for plugin in queue_plugins:
+            self.add_queue(type(plugin).__name__, plugin.in_queue, plugin.drop_policy)
+
+    def add_queue(self, name: str, queue, drop_policy: str = "block") -> None:
+        """Also deliver every frame to *queue*, e.g. one input of a join.
+
+        :param name: Consumer name reported in :meth:`stats`.
+        :param drop_policy: ``"block"`` or ``"drop_oldest"`` when *queue* is full.
+        """
+        self._targets.append(_QueueTarget(name, queue, drop_policy))
+
+    async def run(self) -> None:
+        """Distribute frames until cancelled."""
+        while True:
+            frame, metadata = await self.source_queue.get()
+            try:
+                await self.dispatch(frame, metadata)
+            finally:
+                self.source_queue.task_done()
+
+    async def dispatch(self, frame, metadata) -> None:
+        """Deliver one frame to every consumer."""
+        arrived_ns = time.perf_counter_ns()
+        released = False
+        if self.ring_buffer is not None:
+            # Awaits a free slot when a consumer holds the ring back (backpressure)
+            slot_idx = await self.ring_buffer.publish_async(frame, metadata)
+            self._release(metadata)  # The ring holds its own copy now
+            released = True
+            if self._targets:
+                frame, metadata = self.ring_buffer.get_view(slot_idx)
+        if not self._targets:
+            return
+
+        if not frame.flags.writeable:
+            # Ring slot or shared-memory view: one private copy for all queue
+            # consumers, kept read-only so nobody writes into the others' frame
+            frame = frame.copy()
+            frame.flags.writeable = False
+            if not released:
+                self._release(metadata)
+        elif len(self._targets) > 1:
+            # Shared by several branches: read-only, so plugins that write
+            # into frames copy it first instead of changing the others' frame
+            frame.flags.writeable = False
+        # Each consumer gets its own metadata dict: plugins on other branches
+        # (and ring readers, who share the slot's) add keys to theirs
+        # concurrently
+        items = [(frame, dict(metadata)) for _ in self._targets]
+
+        waiting = [
+            target.put(item, arrived_ns)
+            for target, item in zip(self._targets, items)
+            if not target.offer(item, arrived_ns)
+        ]
+        if waiting:
+            await asyncio.gather(*waiting)
+
+    def _release(self, metadata) -> None:
+        if self._release_frame is not None:
+            self._release_frame(metadata)
+
+    def stats(self) -> dict:
+        """Dispatch counters of every consumer, keyed by plugin name.
+
+        For queue consumers, dispatch is the time from the frame reaching the
+        fan-out to it entering the plugin's queue; for ring consumers (see
+        :meth:`~rataGUI.frame_ring_buffer.RingConsumer.stats`) the time from
+        the frame being published to the plugin claiming it.
+        """
+        stats = {target.name: target.stats() for target in self._targets}
+        if self.ring_buffer is not None:
+            stats.update(self.ring_buffer.consumer_stats())
+        return stats
+
+    def log_stats(self) -> None:
+        """Log the dispatch counters of the queue consumers (and the ring's)."""
+        for target in self._targets:
+            stats = target.stats()
+            logger.info(
+                "Fan-out to %s (%s): %d frames delivered, %d dropped, "
+                "%d waited for a full queue, dispatch %.2f ms mean / %.2f ms max",
+                target.name,
+                stats["policy"],
+                stats["delivered"],
+                stats["dropped"],
+                stats["waits"],
+                stats["mean dispatch (ms)"],
+                stats["max dispatch (ms)"],
+            )
+        if self.ring_buffer is not None:
+            self.ring_buffer.log_stats()
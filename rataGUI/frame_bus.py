@@ -0,0 +1,496 @@
+"""Shared-memory frame bus: live frames for other processes on the same machine.
+
+A :class:`FrameBus` publishes one camera's frames into a named shared memory
+segment that any local process can attach to with a :class:`FrameBusReader`
+and read without copying.  The bus never waits for its readers: it
+overwrites its slots round-robin, and each reader follows the sequence
+numbers to detect the frames it missed.  Readers only map the segment
+read-only, so they cannot disturb the publisher or each other.
+
+The layout is fixed and versioned (see ``docs/frame-bus.md``) so that
+readers need nothing but numpy; this module has no other dependencies
+and may be copied into analysis scripts as is.  Segment layout::
+
+    header   HEADER_DTYPE            in a HEADER_SIZE block at offset 0
+    records  RECORD_DTYPE[num_slots] at header["records_offset"]
+    frames   num_slots slots of header["slot_bytes"] bytes at header["frames_offset"]
+
+Each slot is protected by its record's ``seq`` (a seqlock): the publisher
+sets it to ``-seq`` before writing slot *seq* and to ``seq`` once the frame
+and record are complete, then advances ``header["write_seq"]``.  A reader
+takes a view of a slot whose ``seq`` is positive and, once done with it,
+checks with :meth:`FrameBusReader.valid` that the slot still holds that
+sequence number (i.e. was not overwritten while being read).
+"""
+
+import os
+import sys
+import mmap
+import time
+import logging
+from datetime import datetime
+
+import numpy as np
+from multiprocessing.shared_memory import SharedMemory
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"RATAFBUS"
+# Readers refuse segments of any other version
+BUS_VERSION = 1
+
+# Bus states, in header["state"]
+OPEN, CLOSED, REPLACED = 0, 1, 2
+
+MAX_DIMS = 4
+HEADER_SIZE = 256
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("header_size", "<u4"),
+        ("num_slots", "<u4"),
+        ("ndim", "<u4"),
+        ("shape", "<u8", (MAX_DIMS,)),
+        ("dtype", "S8"),  # numpy type string, e.g. "|u1" or "<u2"
+        ("frame_bytes", "<u8"),
+        ("records_offset", "<u8"),
+        ("frames_offset", "<u8"),
+        ("slot_bytes", "<u8"),
+        ("write_seq", "<i8"),  # sequence number of the newest complete frame
+        ("state", "<i8"),
+        ("producer_pid", "<i8"),
+        ("created_ns", "<i8"),  # time.time_ns() when the bus was created
+        ("source", "S64"),  # camera display name, UTF-8
+    ]
+)
+RECORD_DTYPE = np.dtype(
+    [
+        ("seq", "<i8"),  # -seq while the slot is being written
+        ("frame_index", "<i8"),
+        ("camera_index", "<i8"),  # -1 when the camera does not report one
+        ("timestamp_ns", "<i8"),  # acquisition wall-clock time (time.time_ns)
+        ("monotonic_ns", "<i8"),  # publish time (time.monotonic_ns)
+        ("reserved", "<i8", (3,)),
+    ]
+)
+
+_ALIGN = 64
+
+
+def _aligned(nbytes: int, align: int = _ALIGN) -> int:
+    return (nbytes + align - 1) // align * align
+
+
+def _c_strides(shape: tuple, itemsize: int) -> tuple:
+    strides = []
+    for dim in reversed(shape):
+        strides.append(itemsize)
+        itemsize *= dim
+    return tuple(reversed(strides))
+
+
+def bus_name(source: str) -> str:
+    """Default segment name for the bus of camera *source*."""
+    safe = "".join(c if c.isalnum() or c in "-_" else "-" for c in source)
+    return f"rataGUI_{safe.strip('-')}"
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    return True
+
+
+def _attach_read_only(name: str):
+    """Map segment *name* read-only.  Returns ``(buffer, closer)``."""
+    path = os.path.join("/dev/shm", name.lstrip("/"))
+    if sys.platform == "linux" and os.path.isdir("/dev/shm"):
+        fd = os.open(path, os.O_RDONLY)  # FileNotFoundError if there is no bus
+        try:
+            mapping = mmap.mmap(fd, 0, prot=mmap.PROT_READ)
+        finally:
+            os.close(fd)
+        return mapping, mapping.close
+    # Elsewhere, attach read-write through SharedMemory without letting this
+    # process's resource tracker unlink the publisher's segment at exit
+    try:
+        shm = SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        shm = SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+    return shm.buf, shm.close
+
+
+class FrameBus:
+    """Publisher side of a frame bus (single writer).
+
+    Use :meth:`create`; the publisher owns the segment and unlinks it in
+    :meth:`close`.
+
+    :param shm: The ``SharedMemory`` segment.
+    """
+
+    def __init__(self, shm: SharedMemory):
+        self.shm = shm
+        self.header = np.ndarray((), HEADER_DTYPE, shm.buf, 0)
+        self._map_slots()
+
+    def _map_slots(self) -> None:
+        header = self.header
+        self.num_slots = int(header["num_slots"])
+        self.shape = tuple(int(d) for d in header["shape"][: int(header["ndim"])])
+        self.dtype = np.dtype(header["dtype"].item().decode())
+        self.records = np.ndarray(
+            (self.num_slots,), RECORD_DTYPE, self.shm.buf, int(header["records_offset"])
+        )
+        self.frames = np.ndarray(
+            (self.num_slots, *self.shape),
+            self.dtype,
+            self.shm.buf,
+            int(header["frames_offset"]),
+            (int(header["slot_bytes"]), *_c_strides(self.shape, self.dtype.itemsize)),
+        )
+        self._seq = self.records["seq"]
+
+    @staticmethod
+    def nbytes(num_slots: int, shape: tuple, dtype) -> int:
+        """Size in bytes of a bus holding *num_slots* frames of *shape* and *dtype*."""
+        frame_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        frames_offset = _aligned(HEADER_SIZE + num_slots * RECORD_DTYPE.itemsize, 4096)
+        return frames_offset + num_slots * _aligned(frame_bytes)
+
+    @classmethod
+    def create(
+        cls, name: str, num_slots: int, shape: tuple, dtype=np.uint8, source: str = ""
+    ) -> "FrameBus":
+        """Create bus *name* for frames of *shape* and *dtype*.
+
+        A segment left behind by a publisher that no longer runs is replaced.
+
+        :raises FileExistsError: If a running publisher already owns *name*.
+        :raises ValueError: If the frame has more than ``MAX_DIMS`` dimensions.
+        """
+        shape = tuple(int(d) for d in shape)
+        dtype = np.dtype(dtype)
+        if len(shape) > MAX_DIMS or num_slots < 1:
+            raise ValueError(f"Unsupported frame bus geometry {num_slots} x {shape}")
+        size = cls.nbytes(num_slots, shape, dtype)
+        try:
+            shm = SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            cls._unlink_stale(name)
+            shm = SharedMemory(name=name, create=True, size=size)
+
+        frame_bytes = int(np.prod(shape)) * dtype.itemsize
+        header = np.ndarray((), HEADER_DTYPE, shm.buf, 0)
+        header[...] = np.zeros((), HEADER_DTYPE)
+        header["version"] = BUS_VERSION
+        header["header_size"] = HEADER_SIZE
+        header["num_slots"] = num_slots
+        header["ndim"] = len(shape)
+        header["shape"][: len(shape)] = shape
+        header["dtype"] = dtype.str.encode()
+        header["frame_bytes"] = frame_bytes
+        header["records_offset"] = HEADER_SIZE
+        header["frames_offset"] = _aligned(
+            HEADER_SIZE + num_slots * RECORD_DTYPE.itemsize, 4096
+        )
+        header["slot_bytes"] = _aligned(frame_bytes)
+        header["state"] = OPEN
+        header["producer_pid"] = os.getpid()
+        header["created_ns"] = time.time_ns()
+        header["source"] = source.encode()[:64]
+        np.ndarray((num_slots,), RECORD_DTYPE, shm.buf, HEADER_SIZE)[:] = np.zeros(
+            (), RECORD_DTYPE
+        )
+        header["magic"] = MAGIC  # Last: the header is complete
+        del header
+
+        bus = cls(shm)
+        logger.info(
+            "Frame bus %s: %d slots of %s %s (%.1f MB)",
+            name,
+            num_slots,
+            "x".join(map(str, shape)),
+            dtype,
+            size / 2**20,
+        )
+        return bus
+
+    @staticmethod
+    def _unlink_stale(name: str) -> None:
+        stale = SharedMemory(name=name)
+        try:
+            header = np.ndarray((), HEADER_DTYPE, stale.buf, 0)
+            pid = int(header["producer_pid"]) if stale.size >= HEADER_SIZE else 0
+            del header
+            # Our own pid is alive too: another publisher in this process
+            # (e.g. a second camera with the same name) still owns the bus
+            if _pid_alive(pid):
+                raise FileExistsError(
+                    f"Frame bus {name} is in use by running process {pid}"
+                )
+            logger.warning("Replacing stale frame bus %s (process %d)", name, pid)
+        finally:
+            stale.close()
+        stale.unlink()
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def write_seq(self) -> int:
+        return int(self.header["write_seq"])
+
+    def matches(self, frame: np.ndarray) -> bool:
+        """Whether *frame* fits this bus's slots."""
+        return frame.shape == self.shape and frame.dtype == self.dtype
+
+    def publish(self, frame: np.ndarray, metadata: dict) -> int:
+        """Copy *frame* into the next slot and return its sequence number.
+
+        :raises ValueError: If *frame* does not match the bus geometry.
+        """
+        if not self.matches(frame):
+            raise ValueError(
+                f"Frame {frame.shape} {frame.dtype} does not fit frame bus "
+                f"{self.shape} {self.dtype}"
+            )
+        seq = int(self.header["write_seq"]) + 1
+        slot_idx = (seq - 1) % self.num_slots
+        self._seq[slot_idx] = -seq  # Readers now reject this slot
+        np.copyto(self.frames[slot_idx], frame)
+        record = self.records[slot_idx]
+        record["frame_index"] = metadata.get("Frame Index", seq)
+        camera_index = metadata.get("Camera Index")
+        record["camera_index"] = -1 if camera_index is None else camera_index
+        timestamp = metadata.get("Timestamp")
+        record["timestamp_ns"] = (
+            int(timestamp.timestamp() * 1e9)
+            if isinstance(timestamp, datetime)
+            else time.time_ns()
+        )
+        record["monotonic_ns"] = time.monotonic_ns()
+        self._seq[slot_idx] = seq
+        self.header["write_seq"] = seq
+        return seq
+
+    def close(self, state: int = CLOSED) -> None:
+        """Tell readers the bus is gone (*state*), then close and unlink it."""
+        if self.header is None:
+            return
+        self.header["state"] = state
+        self.header = self.records = self.frames = self._seq = None
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def replace(self, shape: tuple, dtype=np.uint8) -> "FrameBus":
+        """Close this bus as REPLACED and create one for a new frame geometry.
+
+        Readers of the old segment see :attr:`FrameBusReader.replaced` and can
+        :meth:`~FrameBusReader.reopen` the new one under the same name.
+        """
+        name, num_slots = self.name, self.num_slots
+        source = self.header["source"].item().decode(errors="replace")
+        self.close(REPLACED)
+        return FrameBus.create(name, num_slots, shape, dtype, source)
+
+
+class FrameBusReader:
+    """Read-only view of a frame bus from any local process.
+
+    Example::
+
+        with FrameBusReader("rataGUI_FLIR-12345") as bus:
+            for frame, metadata in bus.frames(copy=True):
+                ...
+
+    :param name: Name of the bus segment (see :func:`bus_name`).
+    :raises FileNotFoundError: If no bus of that name exists.
+    :raises ValueError: If the segment is not a frame bus of version ``BUS_VERSION``.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.missed = 0  # Frames overwritten before frames() got to them
+        self._buf = self._close_buf = None
+        self._attach()
+
+    def _attach(self) -> None:
+        buf, closer = _attach_read_only(self.name)
+        header = np.ndarray((), HEADER_DTYPE, buf, 0)
+        if header["magic"].item() != MAGIC:
+            del header
+            closer()
+            raise ValueError(f"{self.name} is not a rataGUI frame bus")
+        version = int(header["version"])
+        if version != BUS_VERSION:
+            del header
+            closer()
+            raise ValueError(
+                f"Frame bus {self.name} has version {version}, "
+                f"this reader supports version {BUS_VERSION}"
+            )
+        self._buf, self._close_buf = buf, closer
+        self.header = header
+        self.num_slots = int(header["num_slots"])
+        self.shape = tuple(int(d) for d in header["shape"][: int(header["ndim"])])
+        self.dtype = np.dtype(header["dtype"].item().decode())
+        self.source = header["source"].item().decode(errors="replace")
+        self.records = np.ndarray(
+            (self.num_slots,), RECORD_DTYPE, buf, int(header["records_offset"])
+        )
+        self.slots = np.ndarray(
+            (self.num_slots, *self.shape),
+            self.dtype,
+            buf,
+            int(header["frames_offset"]),
+            (int(header["slot_bytes"]), *_c_strides(self.shape, self.dtype.itemsize)),
+        )
+        self.slots.flags.writeable = False
+        self._seq = self.records["seq"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def latest_seq(self) -> int:
+        """Sequence number of the newest frame (0 before the first one)."""
+        return int(self.header["write_seq"])
+
+    @property
+    def state(self) -> int:
+        return int(self.header["state"])
+
+    @property
+    def closed(self) -> bool:
+        """Whether the publisher has closed the bus."""
+        return self.state == CLOSED
+
+    @property
+    def replaced(self) -> bool:
+        """Whether the publisher moved to a new segment (new frame geometry)."""
+        return self.state == REPLACED
+
+    def valid(self, seq: int) -> bool:
+        """Whether frame *seq* is still in its slot (not overwritten or being written)."""
+        return seq > 0 and int(self._seq[(seq - 1) % self.num_slots]) == seq
+
+    def get(self, seq: int) -> tuple[np.ndarray, dict] | None:
+        """Zero-copy read-only view of frame *seq* and its metadata, or ``None``.
+
+        The view stays valid only until the publisher wraps around to its
+        slot; check :meth:`valid` once done with it (or use :meth:`read`).
+        """
+        if not self.valid(seq):
+            return None
+        slot_idx = (seq - 1) % self.num_slots
+        record = self.records[slot_idx]
+        metadata = {
+            "Sequence": seq,
+            "Frame Index": int(record["frame_index"]),
+            "Timestamp": datetime.fromtimestamp(int(record["timestamp_ns"]) / 1e9),
+            "Monotonic ns": int(record["monotonic_ns"]),
+        }
+        if record["camera_index"] >= 0:
+            metadata["Camera Index"] = int(record["camera_index"])
+        if not self.valid(seq):  # Overwritten while reading the record
+            return None
+        return self.slots[slot_idx], metadata
+
+    def read(self, seq: int) -> tuple[np.ndarray, dict] | None:
+        """Copy of frame *seq* and its metadata, or ``None`` if it is gone."""
+        result = self.get(seq)
+        if result is None:
+            return None
+        frame = result[0].copy()
+        return (frame, result[1]) if self.valid(seq) else None
+
+    def latest(self, copy: bool = False) -> tuple[np.ndarray, dict] | None:
+        """Newest frame (a view, or a copy with *copy*), or ``None`` if there is none."""
+        seq = self.latest_seq
+        return self.read(seq) if copy else self.get(seq)
+
+    def frames(self, timeout: float | None = None, copy: bool = False, poll=0.001):
+        """Yield ``(frame, metadata)`` for each new frame, oldest first.
+
+        Frames overwritten before they could be read are skipped and counted
+        in :attr:`missed`.  Stops when the bus is closed, or when no frame
+        arrives for *timeout* seconds.  A bus replaced by its publisher is
+        reopened automatically.  Without *copy*, each view must be used
+        before the next iteration and checked with :meth:`valid`.
+        """
+        # "New" means published after this call, not after the first next()
+        return self._iter_frames(self.latest_seq + 1, timeout, copy, poll)
+
+    def _iter_frames(self, next_seq: int, timeout, copy: bool, poll: float):
+        idle_since = time.monotonic()
+        while True:
+            latest = self.latest_seq
+            if latest >= next_seq:
+                oldest = max(next_seq, latest - self.num_slots + 1)
+                self.missed += oldest - next_seq
+                next_seq = oldest
+                result = self.read(next_seq) if copy else self.get(next_seq)
+                if result is None:
+                    self.missed += 1
+                else:
+                    yield result
+                next_seq += 1
+                idle_since = time.monotonic()
+                continue
+            if self.replaced:
+                self.reopen()
+                next_seq = 1
+                continue
+            if self.closed:
+                return
+            if timeout is not None and time.monotonic() - idle_since > timeout:
+                return
+            time.sleep(poll)
+
+    def reopen(self, timeout: float = 5.0) -> None:
+        """Attach to the segment now published under :attr:`name`."""
+        self.close()
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self._attach()
+                return
+            except (FileNotFoundError, ValueError):
+                # Not (fully) created yet
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.01)
+
+    def close(self) -> None:
+        """Unmap the segment.  Views obtained from the reader must be gone by now."""
+        if self._close_buf is None:
+            return
+        self.header = self.records = self.slots = self._seq = None
+        try:
+            self._close_buf()
+        except BufferError:
+            logger.warning(
+                "Frame bus %s still has live frame views at close", self.name
+            )
+        self._buf = self._close_buf = None
@@ -0,0 +1,90 @@
+"""Description of a frame's layout shared by ring buffers, writers and plugins."""
+
+import numpy as np
+
+# Raw-video pixel format ffmpeg should read for each (channels, dtype) pair
+_FFMPEG_PIX_FMTS = {
+    (1, np.dtype(np.uint8)): "gray",
+    (2, np.dtype(np.uint8)): "ya8",
+    (3, np.dtype(np.uint8)): "rgb24",
+    (4, np.dtype(np.uint8)): "rgba",
+    (1, np.dtype(np.uint16)): "gray16le",
+    (2, np.dtype(np.uint16)): "ya16le",
+    (3, np.dtype(np.uint16)): "rgb48le",
+    (4, np.dtype(np.uint16)): "rgba64le",
+}
+
+
+class FrameFormat:
+    """Shape and pixel type of a video frame.
+
+    Mono frames are carried natively as 2-D ``(H, W)`` arrays; colour frames
+    as ``(H, W, C)``.  The element type is ``uint8`` or ``uint16``.
+
+    :param shape: ``(H, W)`` or ``(H, W, C)``.
+    :param dtype: Pixel element type.
+    """
+
+    def __init__(self, shape, dtype=np.uint8):
+        self.shape = tuple(int(n) for n in shape)
+        self.dtype = np.dtype(dtype)
+        if len(self.shape) not in (2, 3):
+            raise ValueError(f"Frame shape must be (H, W) or (H, W, C), got {shape}")
+
+    @classmethod
+    def of(cls, frame: np.ndarray) -> "FrameFormat":
+        """Format of an existing frame."""
+        return cls(frame.shape, frame.dtype)
+
+    @property
+    def height(self) -> int:
+        return self.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.shape[1]
+
+    @property
+    def channels(self) -> int:
+        return self.shape[2] if len(self.shape) == 3 else 1
+
+    @property
+    def is_mono(self) -> bool:
+        return self.channels == 1
+
+    @property
+    def max_value(self) -> int:
+        """Brightest representable pixel value (255 or 65535)."""
+        return int(np.iinfo(self.dtype).max)
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+    def ffmpeg_pix_fmt(self) -> str:
+        """Raw-video input pixel format for ffmpeg (e.g. ``gray16le``)."""
+        try:
+            return _FFMPEG_PIX_FMTS[(self.channels, self.dtype)]
+        except KeyError:
+            raise ValueError(f"No ffmpeg pixel format for {self}") from None
+
+    def __eq__(self, other):
+        if not isinstance(other, FrameFormat):
+            return NotImplemented
+        return self.shape == other.shape and self.dtype == other.dtype
+
+    def __hash__(self):
+        return hash((self.shape, self.dtype))
+
+    def __repr__(self):
+        return f"{'x'.join(map(str, self.shape))} {self.dtype.name}"
+
+
+def declared_format(camera) -> FrameFormat | None:
+    """Format *camera* says its frames will have, or ``None`` if unknown.
+
+    Uses the camera's optional ``getFrameFormat()`` hook (see
+    :class:`~rataGUI.cameras.BaseCamera.BaseCamera`).
+    """
+    get_format = getattr(camera, "getFrameFormat", None)
+    return get_format() if get_format is not None else None
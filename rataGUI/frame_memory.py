@@ -0,0 +1,360 @@
+"""Placement of frame buffers in memory: huge pages, pre-faulting and NUMA nodes.
+
+The ring buffers a camera writes into are allocated by a :class:`FrameMemory`
+built from the ``"frame memory"`` key of a headless config::
+
+    "frame memory": {
+        "huge pages": "transparent",   # "off" (default), "transparent" or "hugetlbfs"
+        "prefault": true,              # touch every page at startup
+        "numa node": "auto"            # node number, or "auto" for the camera's node
+    }
+
+``"transparent"`` asks the kernel for transparent huge pages with
+``madvise(MADV_HUGEPAGE)``, which takes effect when
+``/sys/kernel/mm/transparent_hugepage/enabled`` is ``always`` or ``madvise``
+(for shared memory, ``shmem_enabled`` must be ``advise`` or better).
+``"hugetlbfs"`` maps files on a hugetlbfs mount (``/dev/hugepages`` unless
+``"hugetlbfs directory"`` says otherwise) and needs huge pages reserved in
+``/proc/sys/vm/nr_hugepages``; without them the allocation falls back to
+ordinary pages with a warning.
+
+Pre-faulting writes one byte per page when a buffer is allocated, so the
+first frames do not pay for page faults (and huge page assembly) in the
+acquisition path.  NUMA placement relies on the kernel's default first-touch
+policy: the pages are pre-faulted from a thread pinned to the cores of the
+chosen node, so binding implies pre-faulting.  ``"auto"`` picks the node
+holding the camera's cores from ``"cpu affinity"`` (see
+:mod:`rataGUI.cpu_affinity`).  All of this is Linux-only; elsewhere the
+buffers are ordinary allocations.
+"""
+
+import os
+import sys
+import mmap
+import secrets
+import tempfile
+import threading
+import logging
+
+import numpy as np
+from multiprocessing.shared_memory import SharedMemory
+
+from rataGUI.cpu_affinity import parse_cores, format_cores
+
+logger = logging.getLogger(__name__)
+
+MEMORY_KEY = "frame memory"
+
+HUGE_PAGE_MODES = ("off", "transparent", "hugetlbfs")
+
+HUGETLBFS_DIR = "/dev/hugepages"
+SHM_DIR = "/dev/shm"
+
+_NODE_DIR = "/sys/devices/system/node"
+_DEFAULT_HUGE_PAGE_SIZE = 2 * 1024 * 1024
+
+
+def huge_page_size() -> int:
+    """Default huge page size in bytes, from ``/proc/meminfo``."""
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("Hugepagesize:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return _DEFAULT_HUGE_PAGE_SIZE
+
+
+def numa_nodes() -> dict:
+    """Map each NUMA node number to its set of CPU cores (empty if unknown)."""
+    nodes = {}
+    try:
+        entries = os.listdir(_NODE_DIR)
+    except OSError:
+        return nodes
+    for entry in entries:
+        if not (entry.startswith("node") and entry[4:].isdigit()):
+            continue
+        try:
+            with open(os.path.join(_NODE_DIR, entry, "cpulist")) as cpulist:
+                nodes[int(entry[4:])] = parse_cores(cpulist.read().strip())
+        except (OSError, ValueError):
+            continue
+    return nodes
+
+
+def numa_node_for_cores(cores) -> int | None:
+    """NUMA node holding most of *cores*, or ``None`` if none of them is known."""
+    cores = set(cores or ())
+    best, best_overlap = None, 0
+    for node, node_cores in sorted(numa_nodes().items()):
+        overlap = len(cores & node_cores)
+        if overlap > best_overlap:
+            best, best_overlap = node, overlap
+    return best
+
+
+def prefault(array: np.ndarray, cores=None) -> None:
+    """Fault in every page of the freshly allocated, zeroed *array*.
+
+    Writes a zero to the first byte of each page, so it must not be used on
+    buffers that already hold data.  With *cores*, the pages are touched from
+    a thread pinned to them, placing them on those cores' NUMA node.
+    """
+    flat = array.reshape(-1).view(np.uint8)
+
+    def touch():
+        flat[:: mmap.PAGESIZE] = 0
+
+    if not cores or not hasattr(os, "sched_setaffinity"):
+        touch()
+        return
+
+    def pinned_touch():
+        try:
+            os.sched_setaffinity(0, cores)  # this thread only
+        except OSError as err:
+            logger.warning("Could not pin prefault thread to cores %s: %s", cores, err)
+        touch()
+
+    thread = threading.Thread(target=pinned_touch, name="FramePrefault")
+    thread.start()
+    thread.join()
+
+
+def _advise_huge_pages(buffer: mmap.mmap) -> bool:
+    advice = getattr(mmap, "MADV_HUGEPAGE", None)
+    if advice is None:
+        return False
+    try:
+        buffer.madvise(advice)
+    except OSError as err:
+        logger.debug("madvise(MADV_HUGEPAGE) failed: %s", err)
+        return False
+    return True
+
+
+class FileSegment:
+    """Shared memory segment backed by a mapped file (on hugetlbfs or ``/dev/shm``).
+
+    Stands in for ``multiprocessing.shared_memory.SharedMemory``: it has the
+    same ``buf``, ``name``, ``size``, ``close()`` and ``unlink()``, with the
+    absolute file path as its name.  Use :func:`open_segment` to attach to
+    either kind by name.
+
+    :param path: File backing the segment.
+    :param create: Create the file (which must not exist) instead of opening it.
+    :param size: Size in bytes when creating; rounded up to *page_size*.
+    :param page_size: Allocation granularity of the file system.
+    """
+
+    def __init__(
+        self, path: str, create: bool = False, size: int = 0, page_size: int = 0
+    ):
+        flags = os.O_RDWR | (os.O_CREAT | os.O_EXCL if create else 0)
+        fd = os.open(path, flags, 0o600)
+        try:
+            if create:
+                if page_size:
+                    size = -(-size // page_size) * page_size
+                try:
+                    os.ftruncate(fd, size)
+                except OSError:
+                    os.unlink(path)
+                    raise
+            else:
+                size = os.fstat(fd).st_size
+            try:
+                # Shared hugetlbfs mappings reserve their huge pages here, so
+                # a shortage surfaces as an error rather than SIGBUS on touch
+                self._mmap = mmap.mmap(fd, size)
+            except OSError:
+                if create:
+                    os.unlink(path)
+                raise
+        finally:
+            os.close(fd)
+        self.name = path
+        self.size = size
+        self.buf = memoryview(self._mmap)
+
+    def close(self) -> None:
+        """Unmap the segment.  Raises ``BufferError`` while views of it exist."""
+        if self.buf is not None:
+            self.buf.release()
+            self.buf = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def unlink(self) -> None:
+        os.unlink(self.name)
+
+
+def open_segment(name: str):
+    """Attach to a segment created by :meth:`FrameMemory.shared_segment`."""
+    if os.path.isabs(name):
+        return FileSegment(name)
+    return SharedMemory(name=name, create=False)
+
+
+class FrameMemory:
+    """Allocator for frame buffers following a ``"frame memory"`` config.
+
+    :param config: The ``"frame memory"`` config dict (``None`` for defaults).
+    :param cores: CPU cores of the camera the buffers are for, used by
+        ``"numa node": "auto"``.
+    """
+
+    def __init__(self, config: dict | None = None, cores=None):
+        config = dict(config or {})
+        self.huge_pages = config.get("huge pages", "off")
+        if self.huge_pages is True:
+            self.huge_pages = "transparent"
+        elif self.huge_pages in (None, False):
+            self.huge_pages = "off"
+        if self.huge_pages not in HUGE_PAGE_MODES:
+            logger.warning(
+                "Invalid huge pages mode %r (expected one of %s) ... using 'off'",
+                self.huge_pages,
+                ", ".join(HUGE_PAGE_MODES),
+            )
+            self.huge_pages = "off"
+        self.hugetlbfs_dir = config.get("hugetlbfs directory", HUGETLBFS_DIR)
+        self.prefault = bool(config.get("prefault", False))
+
+        self.numa_node = None
+        self.node_cores = set()
+        node = config.get("numa node")
+        if node == "auto":
+            node = numa_node_for_cores(cores)
+        if node is not None:
+            nodes = numa_nodes()
+            try:
+                node = int(node)
+            except (TypeError, ValueError):
+                node = None
+            if node in nodes:
+                self.numa_node = node
+                self.node_cores = nodes[node]
+            else:
+                logger.warning(
+                    "Invalid NUMA node %r (available: %s) ... not binding frame memory",
+                    config.get("numa node"),
+                    sorted(nodes) or "none",
+                )
+        if sys.platform != "linux" and (
+            self.huge_pages != "off" or self.numa_node is not None
+        ):
+            logger.warning(
+                "Frame memory placement is only supported on Linux ... ignoring"
+            )
+            self.huge_pages = "off"
+            self.numa_node = None
+            self.node_cores = set()
+
+    def __bool__(self) -> bool:
+        """Whether anything differs from an ordinary allocation."""
+        return self.huge_pages != "off" or self.prefault or self.numa_node is not None
+
+    def __str__(self) -> str:
+        parts = []
+        if self.huge_pages != "off":
+            parts.append(f"{self.huge_pages} huge pages")
+        if self.numa_node is not None:
+            parts.append(
+                f"NUMA node {self.numa_node} (cores {format_cores(self.node_cores)})"
+            )
+        elif self.prefault:
+            parts.append("prefaulted")
+        return ", ".join(parts) or "default"
+
+    def empty(self, shape: tuple, dtype=np.uint8) -> np.ndarray:
+        """Zeroed array of *shape* and *dtype*, placed as configured."""
+        dtype = np.dtype(dtype)
+        if not self:
+            return np.zeros(shape, dtype=dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        buffer = None
+        if self.huge_pages == "hugetlbfs":
+            buffer = self._map_hugetlbfs(nbytes)
+        if buffer is None:
+            # Private anonymous mapping (zero-filled): shared anonymous memory
+            # is shmem, which follows the stricter shmem_enabled THP setting
+            flags = mmap.MAP_PRIVATE | getattr(mmap, "MAP_ANONYMOUS", 0)
+            buffer = mmap.mmap(-1, max(nbytes, 1), flags=flags)
+            if self.huge_pages == "transparent":
+                _advise_huge_pages(buffer)
+        # The array keeps the mapping alive through its base
+        array = np.frombuffer(buffer, dtype=dtype, count=int(np.prod(shape)))
+        array = array.reshape(shape)
+        self._place(array)
+        return array
+
+    def shared_segment(self, size: int):
+        """Shared memory segment of at least *size* bytes, placed as configured.
+
+        Returns a ``SharedMemory`` or, for huge pages, a :class:`FileSegment`;
+        either can be attached to by name with :func:`open_segment`.
+        """
+        segment = None
+        if self.huge_pages == "hugetlbfs":
+            segment = self._hugetlbfs_segment(size)
+        elif self.huge_pages == "transparent" and os.path.isdir(SHM_DIR):
+            segment = FileSegment(self._segment_path(SHM_DIR), create=True, size=size)
+            _advise_huge_pages(segment._mmap)
+        if segment is None:
+            segment = SharedMemory(create=True, size=size)
+        if self.prefault or self.numa_node is not None:
+            self._place(np.frombuffer(segment.buf, dtype=np.uint8))
+        return segment
+
+    # -- Internals -------------------------------------------------------------
+
+    def _place(self, array: np.ndarray) -> None:
+        if self.numa_node is not None:
+            prefault(array, self.node_cores)
+        elif self.prefault:
+            prefault(array)
+
+    @staticmethod
+    def _segment_path(directory: str) -> str:
+        return os.path.join(directory, f"rataGUI_{secrets.token_hex(8)}")
+
+    def _map_hugetlbfs(self, nbytes: int) -> mmap.mmap | None:
+        page_size = huge_page_size()
+        size = -(-max(nbytes, 1) // page_size) * page_size
+        try:
+            fd, path = tempfile.mkstemp(prefix="rataGUI_", dir=self.hugetlbfs_dir)
+        except OSError as err:
+            self._warn_hugetlbfs(err)
+            return None
+        try:
+            os.unlink(path)  # the mapping outlives the name
+            os.ftruncate(fd, size)
+            return mmap.mmap(fd, size)
+        except OSError as err:
+            self._warn_hugetlbfs(err)
+            return None
+        finally:
+            os.close(fd)
+
+    def _hugetlbfs_segment(self, size: int) -> FileSegment | None:
+        try:
+            return FileSegment(
+                self._segment_path(self.hugetlbfs_dir),
+                create=True,
+                size=size,
+                page_size=huge_page_size(),
+            )
+        except OSError as err:
+            self._warn_hugetlbfs(err)
+            return None
+
+    def _warn_hugetlbfs(self, err: OSError) -> None:
+        logger.warning(
+            "Could not allocate huge pages in %s (%s) ... using ordinary pages",
+            self.hugetlbfs_dir,
+            err,
+        )
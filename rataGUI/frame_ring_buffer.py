@@ -1,27 +1,321 @@
 """Fixed-size ring buffer for zero-copy frame distribution to independent plugins."""
 
+import sys
+import time
+import asyncio
 import threading
 import numpy as np
 
+from rataGUI.frame_format import FrameFormat
+
 import logging
 
 logger = logging.getLogger(__name__)
 
+CONSUMER_POLICIES = ("lossless", "latest", "every N")
+
+# Sequence number of a slot the producer is about to overwrite
+_RECYCLING = -1
+
+
+def _wake(future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def parse_policy(spec: str) -> tuple[str, int]:
+    """Parse a consumer policy into ``(policy, step)``.
+
+    ``"lossless"`` reads every frame, ``"latest"`` reads only the newest frame
+    whenever the consumer is ready and ``"every N"`` reads every Nth frame
+    without losing any of them (e.g. ``"every 3"``).
+
+    :raises ValueError: If *spec* is not one of :data:`CONSUMER_POLICIES`.
+    """
+    words = str(spec).split()
+    if len(words) == 1 and words[0] in ("lossless", "latest"):
+        return words[0], 1
+    if len(words) == 2 and words[0] == "every":
+        try:
+            step = int(words[1])
+        except ValueError:
+            step = 0
+        if step >= 1:
+            return ("lossless", 1) if step == 1 else ("every", step)
+    raise ValueError(
+        f"Invalid consumer policy {spec!r} (expected one of "
+        f"{', '.join(CONSUMER_POLICIES)})"
+    )
+
+
+class RingConsumer:
+    """Named reader of a :class:`FrameRingBuffer` with its own read cursor.
+
+    Create with :meth:`FrameRingBuffer.add_consumer`.  Each claimed slot must
+    be read with :meth:`get_view` and handed back with :meth:`release`; a
+    consumer holds at most one slot at a time.
+
+    - ``"lossless"`` consumers see every frame.  The producer waits for them
+      when the ring is full.
+    - ``"every N"`` consumers see every Nth frame and hold the producer back
+      only for those frames.
+    - ``"latest"`` consumers skip to the newest frame whenever they claim one
+      and never hold the producer back for frames they skip (counted as
+      ``dropped``).  The producer only waits for the one slot such a consumer
+      is reading.
+
+    :param ring: The ring buffer read from.
+    :param name: Name used in :meth:`FrameRingBuffer.consumer_stats`.
+    :param policy: One of :data:`CONSUMER_POLICIES`.
+    """
+
+    def __init__(self, ring, name: str, policy: str = "lossless"):
+        self.ring = ring
+        self.name = name
+        self.policy, self.step = parse_policy(policy)
+        self.closed = False
+        self._waiter = None  # Wake-up of a claim_async() waiting for a frame
+        self.delivered = 0
+        self.dropped = 0
+        self.max_lag = 0
+        self._hold_total_ns = 0
+        self._hold_max_ns = 0
+        # Time from publishing a frame to this consumer claiming it
+        self._dispatch_total_ns = 0
+        self._dispatch_max_ns = 0
+        self._held = None  # (slot_idx, seq, store, claimed_ns) of the claimed frame
+        # Oldest sequence number this consumer still needs (read by the producer)
+        if self.policy == "latest":
+            self.needed = sys.maxsize
+        else:
+            self.needed = ring.write_pos + 1
+        self._last_seq = ring.write_pos  # Last sequence number delivered
+
+    @property
+    def lag(self) -> int:
+        """Frames published since the last frame this consumer claimed."""
+        return max(0, self.ring.write_pos - self._last_seq)
+
+    def try_claim(self) -> int | None:
+        """Claim the next frame for this consumer without waiting.
+
+        :returns: The slot index to pass to :meth:`get_view`, or ``None`` if
+            there is no new frame for this consumer.
+        """
+        if self._held is not None:
+            raise RuntimeError(
+                f"Consumer {self.name} already holds slot {self._held[0]}"
+            )
+        ring = self.ring
+        write_pos = ring.write_pos
+        if self.policy == "latest":
+            seq = write_pos
+            if seq <= self._last_seq:
+                return None
+            store = ring._store_for(seq)
+            slot_idx = (seq - 1) % ring.num_slots
+            # Pin, then check the slot still holds seq.  The producer marks a
+            # slot as recycling before it checks pins, so one of the two
+            # always sees the other.
+            np.add.at(store.pins, slot_idx, 1)
+            if store.slot_seq[slot_idx] != seq:
+                np.add.at(store.pins, slot_idx, -1)
+                ring._wake_producer()
+                return None  # Being overwritten by a newer frame
+            self.dropped += seq - self._last_seq - 1
+        else:
+            seq = self.needed
+            if seq > write_pos:
+                return None
+            store = ring._store_for(seq)
+            slot_idx = (seq - 1) % ring.num_slots
+        claimed_ns = time.perf_counter_ns()
+        dispatch_ns = claimed_ns - int(store.published_ns[slot_idx])
+        self._dispatch_total_ns += dispatch_ns
+        self._dispatch_max_ns = max(self._dispatch_max_ns, dispatch_ns)
+        self.delivered += 1
+        self.max_lag = max(self.max_lag, write_pos - seq)
+        self._last_seq = seq
+        self._held = (slot_idx, seq, store, claimed_ns)
+        return slot_idx
+
+    async def claim_async(self) -> int:
+        """Wait on the running event loop for the next frame for this consumer."""
+        while True:
+            slot_idx = self.try_claim()
+            if slot_idx is not None:
+                return slot_idx
+            loop = asyncio.get_running_loop()
+            woken = loop.create_future()
+            self._waiter = lambda: loop.call_soon_threadsafe(_wake, woken)
+            try:
+                slot_idx = self.try_claim()  # Published before the waiter was set
+                if slot_idx is not None:
+                    return slot_idx
+                await woken
+            finally:
+                self._waiter = None
+
+    def get_view(self, slot_idx: int) -> tuple[np.ndarray, dict]:
+        """Read-only view and metadata of the claimed frame in *slot_idx*.
+
+        Unlike :meth:`FrameRingBuffer.get_view`, this stays valid when the
+        ring is reallocated while the frame is held.
+        """
+        held = self._held
+        if held is None or held[0] != slot_idx:
+            raise RuntimeError(f"Consumer {self.name} does not hold slot {slot_idx}")
+        return held[2].view(slot_idx)
+
+    def release(self, slot_idx: int) -> None:
+        """Hand back the slot returned by the last claim.  Safe to call from any thread."""
+        held = self._held
+        if held is None or held[0] != slot_idx:
+            return  # Not held (e.g. released twice)
+        self._held = None
+        _, seq, store, claimed_ns = held
+        hold_ns = time.perf_counter_ns() - claimed_ns
+        self._hold_total_ns += hold_ns
+        self._hold_max_ns = max(self._hold_max_ns, hold_ns)
+        if self.policy == "latest":
+            np.add.at(store.pins, slot_idx, -1)
+        elif not self.closed:
+            self.needed = seq + self.step
+        self.ring._wake_producer()
+
+    async def join(self, poll_interval: float = 0.01) -> None:
+        """Wait until this consumer has read everything it will read."""
+        while not self.closed and (
+            self._held is not None
+            or (self.needed if self.policy != "latest" else self._last_seq + 1)
+            <= self.ring.write_pos
+        ):
+            await asyncio.sleep(poll_interval)
+
+    def close(self) -> None:
+        """Stop reading; the producer no longer waits for this consumer."""
+        self.closed = True
+        self.needed = sys.maxsize
+        self.ring._remove_consumer(self)
+        self.ring._wake_producer()
+
+    def stats(self) -> dict:
+        """Delivery counters of this consumer (times in milliseconds).
+
+        Dispatch is the time from a frame being published to this consumer
+        claiming it, hold the time from claiming it to releasing it.
+        """
+        delivered = self.delivered
+        return {
+            "policy": self.policy if self.step == 1 else f"every {self.step}",
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "lag": self.lag,
+            "max lag": self.max_lag,
+            "mean dispatch (ms)": (
+                self._dispatch_total_ns / delivered / 1e6 if delivered else 0.0
+            ),
+            "max dispatch (ms)": self._dispatch_max_ns / 1e6,
+            "mean hold (ms)": (
+                self._hold_total_ns / delivered / 1e6 if delivered else 0.0
+            ),
+            "max hold (ms)": self._hold_max_ns / 1e6,
+        }
+
+
+class _SlotStore:
+    """Backing store of one ring generation: the slots for one frame format.
+
+    :param num_slots: Number of frame slots.
+    :param frame_format: Format of the frames stored.
+    :param generation: Number of reallocations before this store.
+    :param first_seq: Sequence number of the first frame written here.
+    :param memory: Optional :class:`~rataGUI.frame_memory.FrameMemory` placing the slots.
+    """
+
+    def __init__(
+        self,
+        num_slots: int,
+        frame_format: FrameFormat,
+        generation: int,
+        first_seq: int,
+        memory=None,
+    ):
+        self.format = frame_format
+        self.generation = generation
+        self.first_seq = first_seq
+        # Contiguous allocation for all frame slots
+        shape = (num_slots, *frame_format.shape)
+        if memory is not None:
+            self.frames = memory.empty(shape, frame_format.dtype)
+        else:
+            self.frames = np.zeros(shape, dtype=frame_format.dtype)
+        self.metadata = [None] * num_slots
+        # Sequence number (1-based write position) of the frame in each slot
+        self.slot_seq = np.zeros(num_slots, dtype=np.int64)
+        # perf_counter_ns() when each slot's frame was published
+        self.published_ns = np.zeros(num_slots, dtype=np.int64)
+        # References handed out (producer only) and returned (consumers)
+        self.acquired = np.zeros(num_slots, dtype=np.int64)
+        self.released = np.zeros(num_slots, dtype=np.int64)
+        # Latest-only consumers reading each slot
+        self.pins = np.zeros(num_slots, dtype=np.int64)
+
+    def view(self, slot_idx: int) -> tuple[np.ndarray, dict]:
+        # New view object so the writeable flag is local
+        view = self.frames[slot_idx].view()
+        view.flags.writeable = False
+        return view, self.metadata[slot_idx]
+
+    def slot_free(self, slot_idx: int) -> bool:
+        return self.released[slot_idx] >= self.acquired[slot_idx]
+
+    def idle(self) -> bool:
+        """Whether no anonymous or latest-only consumer holds any slot."""
+        return bool((self.released >= self.acquired).all() and not self.pins.any())
+
 
 class FrameRingBuffer:
     """Pre-allocated ring buffer that allows multiple consumers to read frames
     via zero-copy numpy views.
 
-    The producer calls :meth:`publish` to copy a frame into the next available
-    slot.  Each consumer calls :meth:`get_view` to obtain a **read-only** numpy
-    view of the frame (no copy) and :meth:`release` when it is done.  A slot
-    becomes reusable once all consumers have released it.
+    The producer calls :meth:`publish` (or awaits :meth:`publish_async` from
+    the event loop) to copy a frame into the next available slot.  Consumers
+    obtain a **read-only** numpy view of a slot's frame (no copy) in one of
+    two ways:
+
+    - Anonymous consumers: every published frame is held for
+      ``num_consumers`` readers, each of which calls :meth:`get_view` and
+      then :meth:`release` when it is done.  A slot becomes reusable once all
+      of them have released it.
+    - Named consumers (:meth:`add_consumer`) read at their own pace through a
+      :class:`RingConsumer` with its own cursor and policy, so a lossy
+      display does not throttle a lossless writer sharing the ring.
+
+    The ring is single-producer/multi-consumer and takes no locks.  Per-slot
+    counters in int64 arrays track the references handed out (written only by
+    the producer) and returned (incremented by consumers with a single ufunc
+    call, which the GIL makes atomic), and each slot records the sequence
+    number of the frame it holds.  Only a producer that finds its next slot
+    still held parks on a one-shot wake-up, which the release that frees a
+    slot fires.
+
+    The buffer adopts the format (shape and dtype) of the frames it is given,
+    so mono ``(H, W)`` and 16-bit frames are stored at their native size.  A
+    frame of a new format starts a new *generation* of slots; sequence
+    numbers carry on, and the previous generation stays alive until its last
+    reader is done with it, so no frame in flight is lost or overwritten.
+    Use :meth:`from_format` to size the ring from a camera's declared format
+    (or on the first frame) instead of reallocating a placeholder.
 
     :param num_slots: Number of frame slots in the ring.
     :param height: Frame height in pixels.
     :param width: Frame width in pixels.
-    :param channels: Number of colour channels (e.g. 3 for RGB).
-    :param num_consumers: Expected number of concurrent consumers.
+    :param channels: Number of colour channels (e.g. 3 for RGB, 1 for mono).
+    :param num_consumers: Expected number of anonymous consumers.
+    :param dtype: Pixel element type (``uint8`` or ``uint16``).
+    :param memory: Optional :class:`~rataGUI.frame_memory.FrameMemory` that
+        allocates the slots (huge pages, pre-faulting, NUMA placement).
     """
 
     def __init__(
@@ -31,30 +325,115 @@ class FrameRingBuffer:
         width: int,
         channels: int,
         num_consumers: int = 1,
+        dtype=np.uint8,
+        memory=None,
     ):
+        shape = (height, width) if channels == 1 else (height, width, channels)
+        self._setup(num_slots, FrameFormat(shape, dtype), num_consumers, memory)
+
+    @classmethod
+    def from_format(
+        cls,
+        num_slots: int,
+        frame_format: FrameFormat | None,
+        num_consumers: int = 1,
+        memory=None,
+    ) -> "FrameRingBuffer":
+        """Ring for frames of *frame_format*.
+
+        :param frame_format: Declared format of the frames, or ``None`` to
+            allocate the slots when the first frame is published.
+        :param memory: Optional :class:`~rataGUI.frame_memory.FrameMemory`.
+        """
+        ring = cls.__new__(cls)
+        ring._setup(num_slots, frame_format, num_consumers, memory)
+        return ring
+
+    def _setup(
+        self,
+        num_slots: int,
+        frame_format: FrameFormat | None,
+        num_consumers: int,
+        memory=None,
+    ) -> None:
         self.num_slots = num_slots
         self.num_consumers = num_consumers
-        self._shape = (height, width, channels)
+        self.memory = memory
+        # Monotonically increasing write position (sequence number of the
+        # newest frame), carried across reallocations
+        self.write_pos = 0
+        # Live generations, oldest first; like the consumer list below, it is
+        # replaced (never mutated) so readers can iterate it while it changes
+        self._stores = []
+        self._generations = 0
+        # Named consumers
+        self._consumers = []
+        self._closed_stats = {}  # Final stats of closed consumers
 
-        # Contiguous allocation for all frame slots
-        self.frames = np.zeros((num_slots, height, width, channels), dtype=np.uint8)
-        self.metadata = [None] * num_slots
-        self.ref_counts = [0] * num_slots
+        # Wake-up of a producer waiting for a slot (backpressure), or None
+        self._waiter = None
 
-        # Condition variable for backpressure (wait_for_slot)
-        self._slot_released = threading.Condition(threading.Lock())
+        if frame_format is None:
+            logger.info(
+                "FrameRingBuffer: %d slots, allocated on first frame (%d consumers)",
+                num_slots,
+                num_consumers,
+            )
+        else:
+            self._new_generation(frame_format)
 
-        # Monotonically increasing write position
-        self.write_pos = 0
+    # -- Current generation --------------------------------------------------
 
-        logger.info(
-            "Allocated FrameRingBuffer: %d slots, %dx%dx%d (%d consumers)",
-            num_slots,
-            height,
-            width,
-            channels,
-            num_consumers,
-        )
+    @property
+    def format(self) -> FrameFormat | None:
+        """Format of the frames in the current generation (``None`` until allocated)."""
+        return self._stores[-1].format if self._stores else None
+
+    @property
+    def frames(self) -> np.ndarray | None:
+        """Slot array of the current generation."""
+        return self._stores[-1].frames if self._stores else None
+
+    @property
+    def metadata(self) -> list:
+        return self._stores[-1].metadata if self._stores else [None] * self.num_slots
+
+    @property
+    def slot_seq(self) -> np.ndarray:
+        """Sequence number of the frame in each slot of the current generation."""
+        if not self._stores:
+            return np.zeros(self.num_slots, dtype=np.int64)
+        return self._stores[-1].slot_seq
+
+    @property
+    def generation(self) -> int:
+        """Generation of the slots the newest frame was written to."""
+        return self._stores[-1].generation if self._stores else 0
+
+    @property
+    def ref_counts(self) -> np.ndarray:
+        """Number of anonymous consumers still holding each slot."""
+        if not self._stores:
+            return np.zeros(self.num_slots, dtype=np.int64)
+        store = self._stores[-1]
+        return store.acquired - store.released
+
+    def _store_for(self, seq: int) -> _SlotStore:
+        """Generation holding the frame with sequence number *seq*."""
+        stores = self._stores
+        for store in reversed(stores):
+            if seq >= store.first_seq:
+                return store
+        return stores[0]
+
+    def _store_of_generation(self, generation: int | None) -> _SlotStore:
+        stores = self._stores
+        if generation is None and stores:
+            return stores[-1]
+        for store in stores:
+            if store.generation == generation:
+                return store
+        raise KeyError(f"Ring buffer generation {generation} is not allocated")
 
     # -- Producer API --------------------------------------------------------
 
@@ -64,74 +443,203 @@ class FrameRingBuffer:
         Blocks if the target slot is still held by consumers (backpressure).
         Returns the slot index that was written.
         """
+        store, slot_idx = self._start_write(frame)
+        while not self._slot_ready(store, slot_idx):
+            self._log_backpressure(store, slot_idx)
+            woken = threading.Event()
+            self._waiter = woken.set
+            if self._slot_ready(store, slot_idx):
+                break  # Released before the waiter was set
+            woken.wait()
+        self._waiter = None
+        return self._write(store, slot_idx, frame, metadata)
+
+    async def publish_async(self, frame: np.ndarray, metadata: dict) -> int:
+        """Like :meth:`publish`, but awaits a free slot on the running event loop.
+
+        Lets the event loop publish frames itself instead of handing every
+        frame to an executor thread.
+        """
+        store, slot_idx = self._start_write(frame)
+        while not self._slot_ready(store, slot_idx):
+            self._log_backpressure(store, slot_idx)
+            loop = asyncio.get_running_loop()
+            woken = loop.create_future()
+            self._waiter = lambda: loop.call_soon_threadsafe(_wake, woken)
+            try:
+                if self._slot_ready(store, slot_idx):
+                    break  # Released before the waiter was set
+                await woken
+            finally:
+                self._waiter = None
+        return self._write(store, slot_idx, frame, metadata)
+
+    def _start_write(self, frame: np.ndarray) -> tuple[_SlotStore, int]:
+        store = self._stores[-1] if self._stores else None
+        # Frames of a new shape or dtype go to a new generation of slots
+        if store is None or FrameFormat.of(frame) != store.format:
+            store = self._new_generation(FrameFormat.of(frame))
         slot_idx = self.write_pos % self.num_slots
+        # Latest-only consumers can no longer pin the frame being overwritten
+        store.slot_seq[slot_idx] = _RECYCLING
+        return store, slot_idx
+
+    def _slot_ready(self, store: _SlotStore, slot_idx: int) -> bool:
+        """Whether the producer may overwrite *slot_idx* with the next frame."""
+        if not store.slot_free(slot_idx) or store.pins[slot_idx] > 0:
+            return False
+        overwritten_seq = self.write_pos + 1 - self.num_slots
+        if overwritten_seq < store.first_seq:
+            return True  # Never written in this generation
+        return all(consumer.needed > overwritten_seq for consumer in self._consumers)
 
-        # Wait until slot is free (ref_count == 0)
-        with self._slot_released:
-            while self.ref_counts[slot_idx] > 0:
-                logger.debug(
-                    "Backpressure on slot %d (ref_count=%d)",
-                    slot_idx,
-                    self.ref_counts[slot_idx],
-                )
-                self._slot_released.wait()
-
-        # Resize buffer lazily if frame shape changed
-        frame_shape = frame.shape
-        if frame_shape != self._shape:
-            self._reallocate(frame_shape)
-            slot_idx = self.write_pos % self.num_slots
-
-        np.copyto(self.frames[slot_idx], frame)
-        self.metadata[slot_idx] = metadata
-        self.ref_counts[slot_idx] = self.num_consumers
-        self.write_pos += 1
+    def _write(
+        self, store: _SlotStore, slot_idx: int, frame: np.ndarray, metadata: dict
+    ) -> int:
+        np.copyto(store.frames[slot_idx], frame)
+        store.metadata[slot_idx] = metadata
+        store.published_ns[slot_idx] = time.perf_counter_ns()
+        store.acquired[slot_idx] += self.num_consumers
+        store.slot_seq[slot_idx] = self.write_pos + 1
+        self.write_pos += 1  # Makes the frame visible to named consumers
+        for consumer in self._consumers:
+            waiter = consumer._waiter
+            if waiter is not None:
+                consumer._waiter = None
+                waiter()
+        if len(self._stores) > 1:
+            self._retire_generations()
         return slot_idx
 
+    def _wake_producer(self) -> None:
+        waiter = self._waiter
+        if waiter is not None:
+            self._waiter = None
+            waiter()
+
+    def _log_backpressure(self, store: _SlotStore, slot_idx: int) -> None:
+        logger.debug(
+            "Backpressure on slot %d (ref_count=%d, pins=%d)",
+            slot_idx,
+            store.acquired[slot_idx] - store.released[slot_idx],
+            store.pins[slot_idx],
+        )
+
     # -- Consumer API --------------------------------------------------------
 
-    def get_view(self, slot_idx: int) -> tuple[np.ndarray, dict]:
+    def get_view(
+        self, slot_idx: int, generation: int | None = None
+    ) -> tuple[np.ndarray, dict]:
         """Return a *read-only* numpy view of the frame and its metadata.
 
+        :param generation: :attr:`generation` the slot was published in
+            (default: the current one).  Readers that may hold a slot across
+            a change of frame format should record it when the frame is
+            published.
         :returns: ``(frame_view, metadata)`` tuple.
         """
-        view = self.frames[slot_idx]
-        view = view.view()  # new view object so writeable flag is local
-        view.flags.writeable = False
-        return view, self.metadata[slot_idx]
+        return self._store_of_generation(generation).view(slot_idx)
 
-    def release(self, slot_idx: int) -> None:
-        """Signal that this consumer is done with *slot_idx*.
+    def release(self, slot_idx: int, generation: int | None = None) -> None:
+        """Signal that this anonymous consumer is done with *slot_idx*.
 
         When all consumers have released the slot it becomes available for
-        reuse by the producer.
+        reuse by the producer.  Safe to call from any thread.
+        """
+        try:
+            store = self._store_of_generation(generation)
+        except KeyError:
+            return  # Generation already retired
+        if store.slot_free(slot_idx):
+            return  # Not held (e.g. released twice)
+        np.add.at(store.released, slot_idx, 1)
+        if store.slot_free(slot_idx):
+            logger.debug("Slot %d fully released", slot_idx)
+            self._wake_producer()
+
+    def add_consumer(self, name: str, policy: str = "lossless") -> RingConsumer:
+        """Register a named consumer that reads from the next published frame.
+
+        :param policy: One of :data:`CONSUMER_POLICIES`.
+        :raises ValueError: If *name* is taken or *policy* is invalid.
         """
-        with self._slot_released:
-            self.ref_counts[slot_idx] = max(0, self.ref_counts[slot_idx] - 1)
-            if self.ref_counts[slot_idx] == 0:
-                logger.debug("Slot %d fully released, notifying producer", slot_idx)
-                self._slot_released.notify_all()
+        if any(consumer.name == name for consumer in self._consumers):
+            raise ValueError(f"Ring buffer consumer {name!r} already exists")
+        consumer = RingConsumer(self, name, policy)
+        self._consumers = self._consumers + [consumer]
+        return consumer
+
+    def _remove_consumer(self, consumer: RingConsumer) -> None:
+        self._consumers = [c for c in self._consumers if c is not consumer]
+        self._closed_stats[consumer.name] = consumer.stats()
+
+    def consumer_stats(self) -> dict:
+        """:meth:`RingConsumer.stats` of every named consumer, keyed by name."""
+        stats = dict(self._closed_stats)
+        stats.update((c.name, c.stats()) for c in self._consumers)
+        return stats
+
+    def log_stats(self) -> None:
+        """Log delivery counters of every named consumer."""
+        for name, stats in self.consumer_stats().items():
+            logger.info(
+                "Ring consumer %s (%s): %d frames delivered, %d dropped, "
+                "lag %d (max %d), dispatch %.2f ms mean / %.2f ms max, "
+                "hold %.2f ms mean / %.2f ms max",
+                name,
+                stats["policy"],
+                stats["delivered"],
+                stats["dropped"],
+                stats["lag"],
+                stats["max lag"],
+                stats["mean dispatch (ms)"],
+                stats["max dispatch (ms)"],
+                stats["mean hold (ms)"],
+                stats["max hold (ms)"],
+            )
 
     # -- Configuration -------------------------------------------------------
 
     def set_num_consumers(self, n: int) -> None:
-        """Update the expected consumer count for future publishes."""
+        """Update the expected anonymous consumer count for future publishes."""
         self.num_consumers = n
 
     # -- Internal ------------------------------------------------------------
 
-    def _reallocate(self, new_shape: tuple[int, int, int]) -> None:
-        """Resize the internal buffer when frame dimensions change."""
-        h, w, c = new_shape
-        logger.info(
-            "Reallocating FrameRingBuffer: %dx%dx%d -> %dx%dx%d",
-            *self._shape,
-            h,
-            w,
-            c,
+    def _new_generation(self, new_format: FrameFormat) -> _SlotStore:
+        """Allocate slots for frames of *new_format*, keeping older generations readable."""
+        if self._stores:
+            logger.info(
+                "Reallocating FrameRingBuffer: %s -> %s", self.format, new_format
+            )
+        else:
+            logger.info(
+                "Allocated FrameRingBuffer: %d slots, %s (%d consumers)",
+                self.num_slots,
+                new_format,
+                self.num_consumers,
+            )
+        store = _SlotStore(
+            self.num_slots,
+            new_format,
+            self._generations,
+            self.write_pos + 1,
+            self.memory,
         )
-        self._shape = (h, w, c)
-        self.frames = np.zeros((self.num_slots, h, w, c), dtype=np.uint8)
-        self.metadata = [None] * self.num_slots
-        self.ref_counts = [0] * self.num_slots
-        self.write_pos = 0
+        self._generations += 1
+        self._stores = self._stores + [store]
+        self._retire_generations()
+        return store
+
+    def _retire_generations(self) -> None:
+        """Drop old generations that no consumer can read any more (producer only)."""
+        stores = self._stores
+        needed = min((c.needed for c in self._consumers), default=sys.maxsize)
+        retired = 0
+        while retired < len(stores) - 1:
+            if needed < stores[retired + 1].first_seq or not stores[retired].idle():
+                break  # Frames in this generation are still being read
+            retired += 1
+        if retired:
+            self._stores = stores[retired:]
+            logger.debug("Released %d FrameRingBuffer generation(s)", retired)
@@ -4,6 +4,7 @@ Usage::
 
     rataGUI-headless config.json
     rataGUI-headless --config config.json --save-dir /data/output --multiprocess
+    rataGUI-headless config.json --offload
 """
 
 import argparse
@@ -45,6 +46,12 @@ def main() -> None:
         default=False,
         help="Use multiprocess camera acquisition",
     )
+    parser.add_argument(
+        "--offload",
+        action="store_true",
+        default=False,
+        help="Run each camera's plugins in the camera's subprocess",
+    )
 
     args = parser.parse_args()
     config_path = args.config or args.config_flag
@@ -68,6 +75,8 @@ def main() -> None:
         config["Save Directory"] = args.save_dir
     if args.multiprocess:
         config["multiprocess"] = True
+    if args.offload:
+        config["multiprocess"] = "offload"
 
     from rataGUI.headless.runner import PipelineRunner
 
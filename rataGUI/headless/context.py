@@ -10,6 +10,8 @@ from typing import Any
 
 from rataGUI import __version__
 from rataGUI.utils import slugify
+from rataGUI.pipeline_wakeup import PipelineWakeup
+from rataGUI.shared_frame_ring import DEFAULT_BUDGET_MB
 
 logger = logging.getLogger(__name__)
 
@@ -101,17 +103,50 @@ class PipelineContext:
         self.failed_plugins = {}
 
         self.avg_latency = 0
-        self.active = True
+        self.latency_budget = None  # LatencyBudget for latency-critical plugins
+        self.wakeup = PipelineWakeup()  # bound to the event loop by the runner
+        self._active = True
         self.multiprocess = False
+        self.offload = False  # Plugins run in the camera's subprocess
+        self.backpressure = "block"
+        self.shm_budget_mb = DEFAULT_BUDGET_MB
+        self.encoder_cores = set()  # CPUs for ffmpeg processes (see cpu_affinity)
+        # Allocators for the fan-out ring and the shared memory ring (see frame_memory)
+        self.frame_memory = None
+        self.shm_frame_memory = None
+        self.fan_out = None  # FanOut feeding the trailing independent plugins
+        self.timings = None  # PipelineTimings of the running pipeline
+        self.preview_width = 0  # Keep latest_frame when non-zero
+        self.latest_frame = None  # A thumbnail when the pipeline is offloaded
+        self.offload_status = None  # Last status report of an offloaded pipeline
 
         # Multiprocess resources (initialised lazily by runner)
         self._acquisition_queue = None
         self._mp_process = None
-        self._mp_shm = None
-        self._mp_shm_frames = None
-        self._mp_meta_queue = None
+        self._mp_ring = None
+        self._mp_ring_cond = None
+        self._mp_doorbell = None
         self._mp_control_queue = None
         self._mp_error_queue = None
+        self._mp_leases = None
+
+    @property
+    def active(self) -> bool:
+        """Whether frames are being acquired (``False`` while paused)."""
+        return self._active
+
+    @active.setter
+    def active(self, value: bool) -> None:
+        # Thread-safe: wakes the acquisition task and, in multiprocess mode,
+        # pauses or resumes the camera subprocess.
+        changed = value != self._active
+        self._active = value
+        self.wakeup.notify()
+        if changed and self.camera._running and self._mp_control_queue is not None:
+            try:
+                self._mp_control_queue.put("resume" if value else "pause")
+            except Exception:
+                pass
 
     def stop_camera_pipeline(self) -> None:
         """Signal the pipeline to stop."""
@@ -120,6 +155,8 @@ class PipelineContext:
         if self._mp_control_queue is not None:
             try:
                 self._mp_control_queue.put("stop")
+                if self._mp_ring is not None:
+                    self._mp_ring.request_stop()
             except Exception:
                 pass
         self.clean_session_dir()
@@ -154,6 +191,8 @@ class PipelineContext:
 
     def clean_session_dir(self) -> None:
         """Remove save_dir if it contains only the metadata file or is empty."""
+        if self.offload:
+            return  # Owned by the offloaded pipeline's subprocess
         if os.path.isdir(self.save_dir):
             dir_list = os.listdir(self.save_dir)
             metadata_file = slugify(self.camera.getDisplayName()) + "_metadata.json"
@@ -0,0 +1,181 @@
+"""Subprocess target for "full offload" pipelines.
+
+With ``"multiprocess": "offload"`` each camera gets a process of its own that
+opens the camera, builds the camera's :class:`PipelineContext` and plugins,
+and runs the whole plugin chain on its own asyncio event loop.  Cameras then
+no longer share one interpreter (and GIL) for plugin work.
+
+Only small messages cross between the processes:
+
+- control signals (``"stop"``, ``"pause"``, ``"resume"``) on a
+  ``multiprocessing.Queue`` from the main process, and
+- ``("status", dict)`` reports every :data:`STATUS_INTERVAL` seconds plus a
+  final ``("finished", dict)`` report on a pipe back to the main process
+  (see :func:`status_report` for the keys).  With a non-zero
+  ``"offload preview width"`` each report carries a thumbnail of the latest
+  frame.
+
+All parameters must be picklable (no Qt objects, no camera handles).
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds between status reports sent to the main process
+STATUS_INTERVAL = 1.0
+
+
+def thumbnail(frame, width: int):
+    """Downsample *frame* by an integer stride so it is at most *width* pixels wide."""
+    step = max(1, -(-frame.shape[1] // width))  # ceil division
+    return frame[::step, ::step].copy()
+
+
+def status_report(ctx, preview_width: int = 0, pools=None) -> dict:
+    """Snapshot of an offloaded pipeline's state for the main process.
+
+    :param pools: The subprocess's :class:`~rataGUI.executor_pools.ExecutorPools`,
+        whose metrics are included under ``"thread pools"``.
+    """
+    report = {
+        "running": ctx.camera._running,
+        "frames acquired": ctx.camera.frames_acquired,
+        "average latency": ctx.avg_latency,
+        # Plugins that failed to initialise or were deactivated after failures
+        "failed plugins": sorted(
+            set(ctx.failed_plugins)
+            | {type(plugin).__name__ for plugin in ctx.plugins if plugin.failed}
+        ),
+        "preview": None,
+        "thread pools": pools.stats() if pools is not None else {},
+        # Latency histograms, see PipelineTimings.as_dict
+        "latency": ctx.timings.as_dict() if ctx.timings is not None else {},
+    }
+    frame = ctx.latest_frame
+    if preview_width and frame is not None:
+        report["preview"] = thumbnail(frame, preview_width)
+    return report
+
+
+def _follow_control(ctx, control_queue) -> None:
+    """Apply control signals from the main process (runs in a daemon thread)."""
+    while True:
+        try:
+            signal = control_queue.get()
+        except (EOFError, OSError):
+            return  # Main process went away
+        if signal == "stop":
+            ctx.stop_camera_pipeline()
+            return
+        if signal in ("pause", "resume"):
+            ctx.active = signal == "resume"
+
+
+async def _report_status(ctx, status_pipe, preview_width: int, pools) -> None:
+    """Send a status report to the main process every :data:`STATUS_INTERVAL` seconds."""
+    import asyncio
+    from rataGUI.shared_frame_ring import send_event
+
+    while True:
+        await asyncio.sleep(STATUS_INTERVAL)
+        send_event(status_pipe, ("status", status_report(ctx, preview_width, pools)))
+
+
+async def run_offloaded_pipeline(
+    runner, ctx, status_pipe, control_queue, preview_width: int = 0
+) -> None:
+    """Run *ctx*'s pipeline in this process, reporting status on *status_pipe*."""
+    import asyncio
+    import threading
+    from rataGUI.shared_frame_ring import send_event
+
+    ctx.preview_width = preview_width
+    threading.Thread(
+        target=_follow_control, args=(ctx, control_queue), daemon=True
+    ).start()
+    reporter = asyncio.create_task(
+        _report_status(ctx, status_pipe, preview_width, runner._pools)
+    )
+    try:
+        await runner._run_single_pipeline(ctx)
+    finally:
+        reporter.cancel()
+        ctx.camera._running = False
+        runner._pools.log_stats()
+        send_event(
+            status_pipe,
+            ("finished", status_report(ctx, preview_width, runner._pools)),
+        )
+        runner._pools.shutdown()
+
+
+def offloaded_pipeline_loop(
+    config,  # Headless config dict (picklable)
+    camera_module_name,  # Key in BaseCamera.modules
+    camera_id,  # Camera identifier string
+    display_name,  # Display name assigned by the main process
+    session_dir,  # Session directory shared by all cameras
+    status_pipe,  # Write end of a multiprocessing.Pipe for status reports
+    control_queue,  # multiprocessing.Queue for control signals
+    log_dir=None,  # Optional: directory path for file logging
+    preview_width=0,  # Width of preview thumbnails (0 disables previews)
+):
+    """Target function for a full-offload pipeline subprocess.
+
+    1. Imports the enabled camera, plugin and trigger modules.
+    2. Creates the camera and builds its PipelineContext and plugins exactly
+       as :class:`PipelineRunner` would in a single-process session.
+       Triggers are not available: trigger devices stay with the main process.
+    3. Runs the threaded pipeline on a new asyncio event loop while reporting
+       status to the main process and applying its control signals.
+    """
+    # -- Deferred imports (Windows spawn compatibility) ----------------------
+    import asyncio
+    from rataGUI import add_file_logger, logger as package_logger
+    from rataGUI.headless import runner as runner_module
+    from rataGUI.shared_frame_ring import send_event
+
+    if log_dir is not None and not any(
+        isinstance(h, logging.FileHandler) for h in package_logger.handlers
+    ):
+        add_file_logger(log_dir)
+
+    name = display_name or str(camera_id)
+    logger.info("Offloaded pipeline process starting for %s (ID: %s)", name, camera_id)
+    try:
+        runner = runner_module.PipelineRunner(config)
+        runner._load_modules()
+
+        from rataGUI.cameras.BaseCamera import BaseCamera
+
+        if camera_module_name not in BaseCamera.modules:
+            raise ImportError(
+                f"Camera module '{camera_module_name}' not found in BaseCamera.modules. "
+                f"Available: {list(BaseCamera.modules.keys())}"
+            )
+        camera = BaseCamera.modules[camera_module_name](camera_id)
+        camera.display_name = display_name
+
+        ctx = runner._build_context(camera, session_dir, triggers=[])
+        if not ctx.plugins:
+            raise RuntimeError(f"No plugins could be initialised for {name}")
+        ctx.save_widget_data()
+    except Exception as err:
+        logger.exception("Offloaded pipeline setup failed: %s", err)
+        send_event(status_pipe, ("error", repr(err)))
+        status_pipe.close()
+        return
+
+    try:
+        asyncio.run(
+            run_offloaded_pipeline(
+                runner, ctx, status_pipe, control_queue, preview_width
+            )
+        )
+    except Exception as err:
+        logger.exception("Offloaded pipeline error: %s", err)
+        send_event(status_pipe, ("error", repr(err)))
+    finally:
+        status_pipe.close()  # Main process sees EOF once this process is done
+        logger.info("Offloaded pipeline process for %s exiting", name)
@@ -4,31 +4,33 @@ from __future__ import annotations
 
 import os
 import json
-import time
 import asyncio
 import logging
 import multiprocessing
 from importlib import import_module
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
-from multiprocessing.shared_memory import SharedMemory
 from typing import Any
 
-import numpy as np
-
 from rataGUI import add_file_logger
 from rataGUI.utils import slugify
 from rataGUI.headless.context import HeadlessConfigManager, PipelineContext
+from rataGUI.cpu_affinity import AFFINITY_KEY, AffinityPlan
+from rataGUI.executor_pools import ExecutorPools
+from rataGUI.frame_memory import MEMORY_KEY, FrameMemory
+from rataGUI.latency_budget import BUDGET_KEY, LatencyBudget
+from rataGUI.latency_histogram import PipelineTimings, dump_timings
+from rataGUI.pipeline_engine import PipelineEngine
+from rataGUI.pipeline_graph import GRAPH_KEY
+from rataGUI.frame_ring_buffer import parse_policy
+from rataGUI.plugin_worker import EXECUTION_MODES, ProcessPlugin
+from rataGUI.shared_frame_ring import (
+    BACKPRESSURE_POLICIES,
+    DEFAULT_BUDGET_MB,
+    drain_doorbell,
+)
 
 logger = logging.getLogger(__name__)
 
-# Shared bounded thread pool for camera I/O and blocking plugin execution.
-thread_pool = ThreadPoolExecutor(max_workers=8)
-
-# Exponential moving average decay factor for smoothing pipeline latency measurements.
-# Higher values weight recent samples more heavily (0.8 = 80% new, 20% old).
-EXP_AVG_DECAY = 0.8
-
 
 class PipelineRunner:
     """Run rataGUI pipelines without Qt.
@@ -61,6 +63,11 @@ class PipelineRunner:
             self._config["Save Directory"] = save_dir
 
         self._contexts = []
+        self._log_dir = None
+        self._affinity = AffinityPlan(self._config.get(AFFINITY_KEY))
+        # Camera I/O and blocking plugin execution
+        self._pools = ExecutorPools()
+        self._engine = PipelineEngine(self._pools, self._config.get(GRAPH_KEY))
 
     # ------------------------------------------------------------------
     # Public API
@@ -75,6 +82,50 @@ class PipelineRunner:
         for ctx in self._contexts:
             ctx.stop_camera_pipeline()
 
+    def executor_stats(self) -> dict:
+        """Saturation and queue-wait metrics of the acquisition and plugin thread pools.
+
+        See :meth:`rataGUI.executor_pools.InstrumentedExecutor.stats`.
+        """
+        return self._pools.stats()
+
+    def dispatch_stats(self) -> dict:
+        """Per-consumer fan-out counters and dispatch latency of each camera.
+
+        Keyed by camera display name, then plugin name; see
+        :meth:`rataGUI.fan_out.FanOut.stats`.
+        """
+        return {
+            ctx.camera.getDisplayName(): ctx.fan_out.stats()
+            for ctx in self._contexts
+            if ctx.fan_out is not None
+        }
+
+    def latency_stats(self) -> dict:
+        """Latency percentiles of each plugin of each camera.
+
+        Keyed by camera display name, then plugin name, then ``"queue wait"``,
+        ``"service"`` or ``"end-to-end"``; see
+        :meth:`rataGUI.latency_histogram.PipelineTimings.stats`.
+        """
+        return {
+            ctx.camera.getDisplayName(): ctx.timings.stats()
+            for ctx in self._contexts
+            if ctx.timings is not None
+        }
+
+    def latency_budget_stats(self) -> dict:
+        """Frames each latency-critical plugin processed, skipped and finished late.
+
+        Keyed by camera display name, then plugin name, for cameras with a
+        latency budget; see :meth:`rataGUI.latency_budget.LatencyBudget.stats`.
+        """
+        return {
+            ctx.camera.getDisplayName(): ctx.latency_budget.stats()
+            for ctx in self._contexts
+            if ctx.latency_budget is not None
+        }
+
     async def run(self) -> None:
         """Initialise and run all camera pipelines concurrently."""
         self._load_modules()
@@ -85,11 +136,10 @@ class PipelineRunner:
             save_dir, datetime.now().strftime("%Y_%m_%d-%H_%M_%S")
         )
 
-        log_dir = os.path.join(save_dir, "logs")
-        add_file_logger(log_dir)
+        self._log_dir = os.path.join(save_dir, "logs")
+        add_file_logger(self._log_dir)
 
         from rataGUI.cameras.BaseCamera import BaseCamera
-        from rataGUI.plugins.base_plugin import BasePlugin
         from rataGUI.triggers.base_trigger import BaseTrigger
 
         # Discover cameras
@@ -137,94 +187,52 @@ class PipelineRunner:
                     )
 
         # Resolve enabled plugins (excluding display-only plugins)
-        plugin_module_names = [
-            n
-            for n in self._config.get("Enabled Plugin Modules", [])
-            if n not in self.EXCLUDED_PLUGINS
-        ]
+        plugin_module_names = self._plugin_module_names()
 
-        multiprocess = self._config.get("multiprocess", False)
-        cam_overrides = self._config.get("cameras", {})
-        plugin_overrides = self._config.get("plugins", {})
+        mode = self._pipeline_mode()
+        if mode == "offload" and triggers:
+            logger.warning(
+                "Triggers stay in the main process and are not available to "
+                "plugins in offloaded pipelines"
+            )
 
         # Build pipeline context per camera
         self._contexts = []
         for camera in cameras:
             display_name = camera.getDisplayName()
-            cam_save_dir = os.path.join(session_dir, slugify(display_name))
-
-            # Camera config
-            cam_config = HeadlessConfigManager()
-            cam_cls = type(camera)
-            if hasattr(cam_cls, "DEFAULT_PROPS"):
-                cam_config.set_defaults(cam_cls.DEFAULT_PROPS)
-            user_cam = cam_overrides.get(display_name, {})
-            if user_cam:
-                cam_config.set_many(user_cam)
-
-            ctx = PipelineContext(
-                camera=camera,
-                camera_config=cam_config,
-                save_dir=cam_save_dir,
-                triggers=triggers,
-                session_dir=session_dir,
-            )
-            ctx.multiprocess = multiprocess
-
-            # Instantiate plugins
-            for pname in plugin_module_names:
-                pcls = BasePlugin.modules.get(pname)
-                if pcls is None:
-                    logger.warning("Plugin module %s not found", pname)
-                    continue
-                pconfig = HeadlessConfigManager()
-                if hasattr(pcls, "DEFAULT_CONFIG"):
-                    pconfig.set_defaults(pcls.DEFAULT_CONFIG)
-                user_plugin = plugin_overrides.get(pname, {})
-                if user_plugin:
-                    pconfig.set_many(user_plugin)
-                if pcls.__name__ == "VideoWriter" and user_plugin:
-                    from rataGUI.plugins.video_codec_rules import validate_config
-
-                    codec = user_plugin.get("vcodec", pconfig.get("vcodec"))
-                    validate_config(codec, user_plugin, strict=True)
-                try:
-                    ctx.plugins.append(pcls(ctx, pconfig))
-                    ctx.plugin_names.append(pcls.__name__)
-                except Exception as err:
-                    config_dict = pconfig.as_dict()
-                    config_dict["Error Message"] = repr(err)
-                    ctx.failed_plugins[pcls.__name__] = config_dict
-                    logger.exception(
-                        "Plugin %s failed to init for camera %s: %s",
-                        pcls.__name__,
-                        display_name,
-                        err,
+            if mode == "offload":
+                # Plugins are built by the camera's own subprocess
+                ctx = self._build_context(
+                    camera, session_dir, triggers, create_plugins=False
+                )
+                if not plugin_module_names:
+                    logger.warning(
+                        "No plugins for camera %s — skipping", display_name
                     )
+                    continue
+            else:
+                ctx = self._build_context(camera, session_dir, triggers)
+                if not ctx.plugins:
                     logger.warning(
-                        "Plugin %s failed to initialize and will not run. "
-                        "If this is VideoWriter, video will NOT be saved! "
-                        "Camera: %s",
-                        pcls.__name__,
-                        display_name,
+                        "No plugins for camera %s — skipping", display_name
                     )
-
-            if not ctx.plugins:
-                logger.warning("No plugins for camera %s — skipping", display_name)
-                continue
-
-            ctx.save_widget_data()
+                    continue
+                ctx.save_widget_data()
             self._contexts.append(ctx)
 
         if not self._contexts:
             logger.error("No pipelines to run")
             return
 
+        self._affinity.apply_main()
         logger.info("Starting %d pipeline(s)", len(self._contexts))
         await asyncio.gather(
             *[self._run_single_pipeline(ctx) for ctx in self._contexts]
         )
         logger.info("All pipelines finished")
+        self._pools.log_stats()
+        self._dump_timings(session_dir)
+        self._pools.shutdown()
 
         # Clean up triggers
         for trig in triggers:
@@ -242,6 +250,188 @@ class PipelineRunner:
                 cam_cls.releaseResources()
                 released.add(cam_cls)
 
+    def _dump_timings(self, session_dir: str) -> None:
+        """Write every camera's latency histograms to ``latency.json``.
+
+        Skipped when the session directory was removed for holding no data.
+        """
+        timings = {
+            ctx.camera.getDisplayName(): ctx.timings
+            for ctx in self._contexts
+            if ctx.timings is not None
+        }
+        if not timings or not os.path.isdir(session_dir):
+            return
+        path = os.path.join(session_dir, "latency.json")
+        try:
+            dump_timings(path, timings)
+            logger.info("Latency histograms saved to %s", path)
+        except OSError as err:
+            logger.warning("Could not save latency histograms to %s: %s", path, err)
+
+    def _pipeline_mode(self) -> str:
+        """``"threaded"``, ``"multiprocess"`` or ``"offload"`` from the config."""
+        multiprocess = self._config.get("multiprocess", False)
+        if multiprocess == "offload":
+            return "offload"
+        if multiprocess not in (True, False):
+            logger.warning(
+                "Unknown multiprocess mode %r (expected true, false or 'offload') "
+                "... using multiprocess acquisition",
+                multiprocess,
+            )
+        return "multiprocess" if multiprocess else "threaded"
+
+    def _build_context(
+        self,
+        camera: Any,
+        session_dir: str,
+        triggers: list,
+        create_plugins: bool = True,
+    ) -> PipelineContext:
+        """Build the pipeline context of *camera* from the config.
+
+        :param create_plugins: Instantiate the enabled plugins.  Offloaded
+            pipelines skip this in the main process; the camera's subprocess
+            builds its own context with plugins.
+        """
+        from rataGUI.plugins.base_plugin import BasePlugin
+
+        display_name = camera.getDisplayName()
+        cam_save_dir = os.path.join(session_dir, slugify(display_name))
+
+        # Camera config
+        cam_config = HeadlessConfigManager()
+        cam_cls = type(camera)
+        if hasattr(cam_cls, "DEFAULT_PROPS"):
+            cam_config.set_defaults(cam_cls.DEFAULT_PROPS)
+        user_cam = self._config.get("cameras", {}).get(display_name, {})
+        if user_cam:
+            cam_config.set_many(user_cam)
+
+        ctx = PipelineContext(
+            camera=camera,
+            camera_config=cam_config,
+            save_dir=cam_save_dir,
+            triggers=triggers,
+            session_dir=session_dir,
+        )
+        mode = self._pipeline_mode()
+        ctx.multiprocess = mode == "multiprocess"
+        ctx.offload = mode == "offload"
+        ctx.backpressure = self._backpressure_policy()
+        ctx.shm_budget_mb = self._config.get(
+            "shared memory budget (MB)", DEFAULT_BUDGET_MB
+        )
+        ctx.encoder_cores = self._affinity.cores_for_encoders()
+        ctx.latency_budget = LatencyBudget.from_config(
+            self._config.get(BUDGET_KEY), display_name
+        )
+        memory_config = self._config.get(MEMORY_KEY)
+        if memory_config:
+            # The fan-out ring lives with the plugins, the shared memory ring
+            # is written by the camera subprocess
+            camera_cores = self._affinity.cores_for_camera(camera)
+            main_cores = self._affinity.main_cores
+            ctx.shm_frame_memory = FrameMemory(memory_config, camera_cores)
+            ctx.frame_memory = FrameMemory(
+                memory_config, camera_cores if ctx.offload else main_cores
+            )
+            logger.info("Frame memory for %s: %s", display_name, ctx.frame_memory)
+        if mode == "threaded" and self._affinity.camera_cores.get(display_name):
+            logger.warning(
+                "CPU affinity for camera %s only applies in multiprocess mode",
+                display_name,
+            )
+        if not create_plugins:
+            return ctx
+
+        # Instantiate plugins
+        plugin_overrides = self._config.get("plugins", {})
+        for pname in self._plugin_module_names():
+            pcls = BasePlugin.modules.get(pname)
+            if pcls is None:
+                logger.warning("Plugin module %s not found", pname)
+                continue
+            pconfig = HeadlessConfigManager()
+            if hasattr(pcls, "DEFAULT_CONFIG"):
+                pconfig.set_defaults(pcls.DEFAULT_CONFIG)
+            user_plugin = dict(plugin_overrides.get(pname, {}))
+            execution = user_plugin.pop("execution", "default")
+            if execution not in EXECUTION_MODES:
+                logger.warning(
+                    "Unknown execution mode %r for plugin %s (expected one of %s) "
+                    "... using 'default'",
+                    execution,
+                    pname,
+                    ", ".join(EXECUTION_MODES),
+                )
+                execution = "default"
+            ring_policy = user_plugin.pop("ring policy", None)
+            if ring_policy is not None:
+                try:
+                    parse_policy(ring_policy)
+                except ValueError as err:
+                    logger.warning("%s for plugin %s ... ignoring", err, pname)
+                    ring_policy = None
+            latency_critical = user_plugin.pop("latency critical", None)
+            if user_plugin:
+                pconfig.set_many(user_plugin)
+            if pcls.__name__ == "VideoWriter" and user_plugin:
+                from rataGUI.plugins.video_codec_rules import validate_config
+
+                codec = user_plugin.get("vcodec", pconfig.get("vcodec"))
+                validate_config(codec, user_plugin, strict=True)
+            try:
+                if execution == "process":
+                    plugin = ProcessPlugin.wrap(pcls)(ctx, pconfig, pname)
+                else:
+                    plugin = pcls(ctx, pconfig)
+                if ring_policy is not None:
+                    plugin.ring_policy = ring_policy
+                if latency_critical is not None:
+                    plugin.latency_critical = bool(latency_critical)
+                ctx.plugins.append(plugin)
+                ctx.plugin_names.append(pcls.__name__)
+            except Exception as err:
+                config_dict = pconfig.as_dict()
+                config_dict["Error Message"] = repr(err)
+                ctx.failed_plugins[pcls.__name__] = config_dict
+                logger.exception(
+                    "Plugin %s failed to init for camera %s: %s",
+                    pcls.__name__,
+                    display_name,
+                    err,
+                )
+                logger.warning(
+                    "Plugin %s failed to initialize and will not run. "
+                    "If this is VideoWriter, video will NOT be saved! "
+                    "Camera: %s",
+                    pcls.__name__,
+                    display_name,
+                )
+        return ctx
+
+    def _plugin_module_names(self) -> list:
+        """Enabled plugin modules, excluding display-only plugins."""
+        return [
+            n
+            for n in self._config.get("Enabled Plugin Modules", [])
+            if n not in self.EXCLUDED_PLUGINS
+        ]
+
+    def _backpressure_policy(self) -> str:
+        """Validated ``"backpressure"`` policy for shared-memory rings."""
+        backpressure = self._config.get("backpressure", "block")
+        if backpressure not in BACKPRESSURE_POLICIES:
+            logger.warning(
+                "Unknown backpressure policy %r (expected one of %s) ... using 'block'",
+                backpressure,
+                ", ".join(BACKPRESSURE_POLICIES),
+            )
+            backpressure = "block"
+        return backpressure
+
     # ------------------------------------------------------------------
     # Module loading
     # ------------------------------------------------------------------
@@ -268,7 +458,9 @@ class PipelineRunner:
     async def _run_single_pipeline(self, ctx: PipelineContext) -> None:
         """Run one camera's full pipeline lifecycle."""
         try:
-            if ctx.multiprocess:
+            if ctx.offload:
+                await self._start_offloaded_pipeline(ctx)
+            elif ctx.multiprocess:
                 await self._start_multiprocess_pipeline(ctx)
             else:
                 await self._start_threaded_pipeline(ctx)
@@ -293,410 +485,99 @@ class PipelineRunner:
             ctx.camera._running = True
             ctx.camera.frames_acquired = 0
             logger.info("Started pipeline for camera: %s", ctx.camera.getDisplayName())
-            await self._process_plugin_pipeline(ctx, multiprocess=False)
+            await self._engine.run(ctx)
         except Exception as err:
             logger.exception(err)
             ctx.stop_camera_pipeline()
 
     async def _start_multiprocess_pipeline(self, ctx: PipelineContext) -> None:
         """Multi-process pipeline: camera in subprocess, plugins in main process."""
-        from rataGUI.camera_process import camera_acquisition_loop
+        try:
+            self._engine.start_camera_process(
+                ctx, on_started=lambda pid: self._affinity.apply_camera(pid, ctx.camera)
+            )
+            ctx.camera._running = True
+            ctx.camera.frames_acquired = 0
+            await self._engine.run(ctx, multiprocess=True)
+        except Exception as err:
+            logger.exception(err)
+            ctx.stop_camera_pipeline()
+        finally:
+            self._engine.cleanup_camera_process(ctx)
 
-        default_h, default_w, default_c = 1080, 1920, 3
-        # Number of ring buffer slots in shared memory for frame handoff
-        # between the camera subprocess and the main process plugin pipeline.
-        num_slots = 8
-        shm_shape = (num_slots, default_h, default_w, default_c)
-        shm_nbytes = int(np.prod(shm_shape))
+    async def _start_offloaded_pipeline(self, ctx: PipelineContext) -> None:
+        """Full offload: camera and plugin chain both run in a subprocess."""
+        from rataGUI.headless.offload import offloaded_pipeline_loop
 
         try:
-            ctx._mp_shm = SharedMemory(create=True, size=shm_nbytes)
-            ctx._mp_shm_frames = np.ndarray(
-                shm_shape, dtype=np.uint8, buffer=ctx._mp_shm.buf
-            )
-            ctx._mp_meta_queue = multiprocessing.Queue()
+            ctx.wakeup.bind()
+            ctx._mp_doorbell, status_pipe = multiprocessing.Pipe(duplex=False)
             ctx._mp_control_queue = multiprocessing.Queue()
-            ctx._mp_error_queue = multiprocessing.Queue()
-            ready_event = multiprocessing.Event()
-
-            camera_config_dict = ctx.camera_config.as_dict()
+            config = dict(self._config, multiprocess=False)
 
+            # Not a daemon: offloaded plugins may start processes of their own
             ctx._mp_process = multiprocessing.Process(
-                target=camera_acquisition_loop,
+                target=offloaded_pipeline_loop,
                 kwargs={
+                    "config": config,
                     "camera_module_name": ctx.camera_type,
                     "camera_id": ctx.camera.cameraID,
-                    "camera_config_dict": camera_config_dict,
-                    "plugin_names": ctx.plugin_names,
-                    "shm_name": ctx._mp_shm.name,
-                    "shm_shape": shm_shape,
-                    "meta_queue": ctx._mp_meta_queue,
+                    "display_name": ctx.camera.display_name,
+                    "session_dir": ctx.session_dir,
+                    "status_pipe": status_pipe,
                     "control_queue": ctx._mp_control_queue,
-                    "ready_event": ready_event,
-                    "error_queue": ctx._mp_error_queue,
-                    "log_dir": ctx.session_dir,
+                    "log_dir": self._log_dir,
+                    "preview_width": self._config.get("offload preview width", 0),
                 },
-                daemon=True,
             )
             ctx._mp_process.start()
+            status_pipe.close()  # Only the subprocess writes status reports
+            self._affinity.apply_camera(ctx._mp_process.pid, ctx.camera)
+            ctx.camera._running = True
             logger.info(
-                "Started camera subprocess for %s (PID: %d)",
+                "Started offloaded pipeline for %s (PID: %d)",
                 ctx.camera.getDisplayName(),
                 ctx._mp_process.pid,
             )
-
-            if not ready_event.wait(timeout=30):
-                if not ctx._mp_error_queue.empty():
-                    err_type, err_msg = ctx._mp_error_queue.get_nowait()
-                    raise IOError(f"Camera subprocess error ({err_type}): {err_msg}")
-                raise IOError("Camera subprocess timed out during initialization")
-
-            ctx.camera._running = True
-            ctx.camera.frames_acquired = 0
-            logger.info("Camera subprocess ready for %s", ctx.camera.getDisplayName())
-
-            await self._process_plugin_pipeline(ctx, multiprocess=True)
+            await self._follow_offloaded_pipeline(ctx)
         except Exception as err:
             logger.exception(err)
             ctx.stop_camera_pipeline()
         finally:
-            self._cleanup_multiprocess(ctx)
+            self._engine.cleanup_camera_process(ctx)
 
-    def _cleanup_multiprocess(self, ctx: PipelineContext) -> None:
-        """Clean up multiprocess resources."""
-        if ctx._mp_process is not None and ctx._mp_process.is_alive():
-            try:
-                ctx._mp_control_queue.put("stop")
-                ctx._mp_process.join(timeout=10)
-                if ctx._mp_process.is_alive():
-                    logger.warning("Camera subprocess did not exit, terminating")
-                    ctx._mp_process.terminate()
-                    ctx._mp_process.join(timeout=5)
-            except Exception as err:
-                logger.exception("Error stopping camera subprocess: %s", err)
-
-        if ctx._mp_shm is not None:
-            try:
-                ctx._mp_shm.close()
-                ctx._mp_shm.unlink()
-            except Exception:
-                pass
-            ctx._mp_shm = None
-
-    # ------------------------------------------------------------------
-    # Async pipeline methods (ported from CameraWidget)
-    # ------------------------------------------------------------------
-
-    async def _acquire_frames(self, ctx: PipelineContext) -> None:
-        """Read frames from camera in thread pool and enqueue them."""
-        t0 = time.time()
-        try:
-            loop = asyncio.get_running_loop()
-            while ctx.camera._running:
-                if ctx.active:
-                    status, frame = await loop.run_in_executor(
-                        thread_pool, ctx.camera.readCamera
-                    )
-                    metadata = ctx.camera.getMetadata()
-                    metadata["Camera Name"] = ctx.camera.getDisplayName()
-                    metadata["Timestamp"] = datetime.now()
-                    metadata["Average Latency"] = ctx.avg_latency
-
-                    if status:
-                        target_queue = ctx._acquisition_queue or ctx.plugins[0].in_queue
-                        await target_queue.put((frame, metadata))
-                        await asyncio.sleep(0)
-                    else:
-                        raise IOError(
-                            f"Frame not found on camera: {ctx.camera.getDisplayName()}"
-                        )
-                else:
-                    await asyncio.sleep(0)
-        except Exception as err:
-            logger.exception(err)
-            logger.error(
-                "Exception acquiring frame from camera: %s ... stopping",
-                ctx.camera.getDisplayName(),
-            )
-            ctx.stop_camera_pipeline()
-
-        t1 = time.time()
-        elapsed = t1 - t0
-        if elapsed > 0:
-            logger.debug("FPS: %s", ctx.camera.frames_acquired / elapsed)
-        ctx.camera.closeCamera()
-
-    def _read_from_mp_queue(self, ctx: PipelineContext) -> tuple[int, dict] | None:
-        """Blocking read from multiprocessing metadata queue."""
-        import queue as _queue
-
-        while ctx.camera._running:
-            try:
-                return ctx._mp_meta_queue.get(timeout=0.1)
-            except _queue.Empty:
-                if not ctx._mp_error_queue.empty():
-                    err_type, err_msg = ctx._mp_error_queue.get_nowait()
-                    raise IOError(f"Camera subprocess error ({err_type}): {err_msg}")
-                continue
-        return None
-
-    async def _acquire_frames_mp(self, ctx: PipelineContext) -> None:
-        """Acquire frames from camera subprocess via shared memory."""
-        t0 = time.time()
-        try:
-            loop = asyncio.get_running_loop()
-            while ctx.camera._running:
-                if ctx.active:
-                    result = await loop.run_in_executor(
-                        thread_pool, self._read_from_mp_queue, ctx
-                    )
-                    if result is None:
-                        break
-
-                    slot_idx, metadata = result
-                    metadata["Average Latency"] = ctx.avg_latency
-                    ctx.camera.frames_acquired += 1
-
-                    frame = ctx._mp_shm_frames[slot_idx].copy()
-
-                    target_queue = ctx._acquisition_queue or ctx.plugins[0].in_queue
-                    await target_queue.put((frame, metadata))
-                    await asyncio.sleep(0)
-                else:
-                    await asyncio.sleep(0)
-        except Exception as err:
-            logger.exception(err)
-            logger.error(
-                "Exception in multiprocess acquisition for camera: %s ... stopping",
-                ctx.camera.getDisplayName(),
-            )
-            ctx.stop_camera_pipeline()
-
-        t1 = time.time()
-        elapsed = t1 - t0
-        if elapsed > 0:
-            logger.debug("FPS: %s", ctx.camera.frames_acquired / elapsed)
-
-    async def _put_to_queue(
-        self,
-        target_queue: Any,
-        item: Any,
-        drop_policy: str = "block",
-        ring_buffer: Any = None,
-    ) -> None:
-        """Put item to queue, respecting the drop policy."""
-        if drop_policy == "drop_oldest" and target_queue.full():
-            try:
-                dropped = target_queue.get_nowait()
-                if ring_buffer is not None and isinstance(dropped, int):
-                    ring_buffer.release(dropped)
-                target_queue.task_done()
-            except asyncio.QueueEmpty:
-                pass
-        await target_queue.put(item)
-
-    async def _plugin_process(
-        self, ctx: PipelineContext, plugin: Any, ring_buffer: Any = None
-    ) -> None:
-        """Async execution loop for a single plugin."""
-        loop = asyncio.get_running_loop()
-        failures = 0
+    async def _follow_offloaded_pipeline(self, ctx: PipelineContext) -> None:
+        """Apply status reports from an offloaded pipeline until it finishes."""
         while True:
-            raw_item = await plugin.in_queue.get()
-
-            if ring_buffer is not None and isinstance(raw_item, int):
-                slot_idx = raw_item
-                frame, metadata = ring_buffer.get_view(slot_idx)
-                if plugin.blocking:
-                    frame = frame.copy()
-                    ring_buffer.release(slot_idx)
-                    slot_idx = None
-            else:
-                slot_idx = None
-                frame, metadata = raw_item
-
             try:
-                if plugin.active:
-                    if plugin.blocking:
-                        result = await loop.run_in_executor(
-                            thread_pool, plugin.process, frame, metadata
-                        )
-                    else:
-                        result = plugin.process(frame, metadata)
-                else:
-                    result = (frame, metadata)
-
-                if plugin.out_queue is not None:
-                    await plugin.out_queue.put(result)
-                elif not plugin.blocking:
-                    delta_t = datetime.now() - metadata["Timestamp"]
-                    ctx.avg_latency = (
-                        delta_t.total_seconds() * 1000 * EXP_AVG_DECAY
-                        + ctx.avg_latency * (1 - EXP_AVG_DECAY)
-                    )
-            except Exception as err:
-                failures += 1
-                logger.error(
-                    "Plugin %s failure #%d: camera=%s, frame_index=%s, "
-                    "frame_shape=%s, error=%s",
-                    type(plugin).__name__,
-                    failures,
-                    ctx.camera.getDisplayName(),
-                    metadata.get("Frame Index", "?") if metadata else "?",
-                    frame.shape if frame is not None else None,
-                    err,
+                events = drain_doorbell(ctx._mp_doorbell)
+            except EOFError:
+                raise IOError(
+                    f"Offloaded pipeline for {ctx.camera.getDisplayName()} "
+                    "exited without reporting"
                 )
-                logger.exception(err)
-                if failures > 5:
-                    logger.error(
-                        "Plugin %s exceeded failure threshold (5), deactivating. "
-                        "Camera: %s, total_frames_acquired: %d",
-                        type(plugin).__name__,
+            for kind, payload in events:
+                if kind == "error":
+                    raise IOError(f"Offloaded pipeline error: {payload}")
+                ctx.offload_status = payload
+                ctx.camera.frames_acquired = payload["frames acquired"]
+                ctx.avg_latency = payload["average latency"]
+                if kind == "finished" and payload["latency"]:
+                    ctx.timings = PipelineTimings.from_dict(payload["latency"])
+                if payload["preview"] is not None:
+                    ctx.latest_frame = payload["preview"]
+                if kind == "finished":
+                    logger.info(
+                        "Offloaded pipeline for %s finished (frames acquired: %d)",
                         ctx.camera.getDisplayName(),
                         ctx.camera.frames_acquired,
                     )
-                    plugin.failed = True
-                    plugin.active = False
-                    logger.warning(
-                        "Plugin %s has been deactivated due to repeated failures. "
-                        "If this is VideoWriter, video is NOT being saved! "
-                        "Camera: %s",
-                        type(plugin).__name__,
-                        ctx.camera.getDisplayName(),
-                    )
-                    plugin.close()
-            finally:
-                if ring_buffer is not None and slot_idx is not None:
-                    ring_buffer.release(slot_idx)
-                plugin.in_queue.task_done()
-
-    async def _fan_out(
-        self, source_queue: Any, target_plugins: list, ring_buffer: Any = None
-    ) -> None:
-        """Distribute frames from one source queue to multiple independent plugins."""
-        loop = asyncio.get_running_loop()
-        while True:
-            item = await source_queue.get()
-            try:
-                if ring_buffer is not None:
-                    frame, metadata = item
-                    slot_idx = await loop.run_in_executor(
-                        None, ring_buffer.publish, frame, metadata
-                    )
-                    for plugin in target_plugins:
-                        if plugin.blocking:
-                            view, meta = ring_buffer.get_view(slot_idx)
-                            frame_copy = view.copy()
-                            ring_buffer.release(slot_idx)
-                            await self._put_to_queue(
-                                plugin.in_queue,
-                                (frame_copy, meta),
-                                plugin.drop_policy,
-                            )
-                        else:
-                            await self._put_to_queue(
-                                plugin.in_queue,
-                                slot_idx,
-                                plugin.drop_policy,
-                                ring_buffer=ring_buffer,
-                            )
-                else:
-                    for plugin in target_plugins:
-                        await self._put_to_queue(
-                            plugin.in_queue, item, plugin.drop_policy
+                    if payload["failed plugins"]:
+                        logger.warning(
+                            "Plugins failed in offloaded pipeline for %s: %s",
+                            ctx.camera.getDisplayName(),
+                            ", ".join(payload["failed plugins"]),
                         )
-            finally:
-                source_queue.task_done()
-
-    async def _process_plugin_pipeline(
-        self, ctx: PipelineContext, multiprocess: bool = False
-    ) -> None:
-        """Orchestrate acquisition, plugin chain, and fan-out."""
-        if multiprocess:
-            acquisition_task = asyncio.create_task(self._acquire_frames_mp(ctx))
-        else:
-            acquisition_task = asyncio.create_task(self._acquire_frames(ctx))
-
-        serial_plugins = list(ctx.plugins)
-        independent_plugins = []
-
-        while serial_plugins and serial_plugins[-1].independent:
-            independent_plugins.insert(0, serial_plugins.pop())
-
-        plugin_tasks = []
-        for cur_plugin, next_plugin in zip(serial_plugins, serial_plugins[1:]):
-            cur_plugin.out_queue = next_plugin.in_queue
-            plugin_tasks.append(
-                asyncio.create_task(self._plugin_process(ctx, cur_plugin))
-            )
-
-        fan_out_queue = None
-        ring_buffer = None
-        if independent_plugins:
-            fan_out_queue = asyncio.Queue()
-
-            num_slots = max(
-                sum(
-                    p.in_queue.maxsize
-                    for p in independent_plugins
-                    if p.in_queue.maxsize > 0
-                ),
-                8,
-            )
-            try:
-                from rataGUI.frame_ring_buffer import FrameRingBuffer
-
-                ring_buffer = FrameRingBuffer(
-                    num_slots=num_slots,
-                    height=1,
-                    width=1,
-                    channels=3,
-                    num_consumers=len(independent_plugins),
-                )
-                logger.info(
-                    "Ring buffer enabled for %d independent plugins (%d slots)",
-                    len(independent_plugins),
-                    num_slots,
-                )
-            except Exception as err:
-                logger.warning(
-                    "Ring buffer init failed, falling back to queue fan-out: %s", err
-                )
-                ring_buffer = None
-
-            if serial_plugins:
-                serial_plugins[-1].out_queue = fan_out_queue
-                plugin_tasks.append(
-                    asyncio.create_task(self._plugin_process(ctx, serial_plugins[-1]))
-                )
-            else:
-                ctx._acquisition_queue = fan_out_queue
-
-            plugin_tasks.append(
-                asyncio.create_task(
-                    self._fan_out(fan_out_queue, independent_plugins, ring_buffer)
-                )
-            )
-
-            for plugin in independent_plugins:
-                plugin_tasks.append(
-                    asyncio.create_task(
-                        self._plugin_process(ctx, plugin, ring_buffer=ring_buffer)
-                    )
-                )
-        else:
-            plugin_tasks.append(
-                asyncio.create_task(self._plugin_process(ctx, serial_plugins[-1]))
-            )
-
-        await acquisition_task
-
-        for plugin in ctx.plugins:
-            await plugin.in_queue.join()
-        if fan_out_queue is not None:
-            await fan_out_queue.join()
-
-        for task in plugin_tasks:
-            task.cancel()
-
-        ctx._acquisition_queue = None
+                    ctx.camera._running = False
+                    return
+            await ctx.wakeup.wait(ctx._mp_doorbell)
@@ -0,0 +1,117 @@
+"""Per-pipeline latency budget for latency-critical plugins.
+
+Closed-loop experiments care more about acting on a recent frame than about
+acting on every frame.  With a budget configured, a plugin flagged
+``latency_critical`` (such as pose inference) skips frames that are already
+older than the budget when it receives them, so a backlog drains at once
+instead of adding to the latency of every later frame.  Skipped frames are
+still forwarded unprocessed, so lossless consumers such as VideoWriter
+further down the pipeline get every frame.  The budget comes from the
+``"latency budget (ms)"`` key of a headless config, either one number for
+every camera or per camera display name::
+
+    "latency budget (ms)": {"default": 50, "FLIR 12345": 20}
+
+Every decision is counted; see :meth:`LatencyBudget.stats`.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+BUDGET_KEY = "latency budget (ms)"
+
+# Metadata key listing the plugins that skipped a frame, in pipeline order
+SKIPPED_KEY = "Skipped By"
+
+
+def frame_age_ms(metadata: dict) -> float:
+    """Milliseconds since the frame's ``"Timestamp"`` (0 if it has none)."""
+    timestamp = metadata.get("Timestamp")
+    if timestamp is None:
+        return 0.0
+    return (datetime.now() - timestamp).total_seconds() * 1000
+
+
+class LatencyBudget:
+    """Admission decisions and counters for one pipeline's latency budget.
+
+    :param budget_ms: Maximum age in milliseconds of a frame that a
+        latency-critical plugin still processes.
+    """
+
+    def __init__(self, budget_ms: float):
+        if budget_ms <= 0:
+            raise ValueError(f"Latency budget must be positive, got {budget_ms!r}")
+        self.budget_ms = budget_ms
+        self._counts = {}  # Plugin name -> [processed, skipped, late]
+
+    @classmethod
+    def from_config(cls, config, camera_name: str) -> LatencyBudget | None:
+        """Budget of *camera_name* from the ``"latency budget (ms)"`` config.
+
+        :returns: ``None`` when no budget applies to the camera or the
+            configured value is invalid (logged).
+        """
+        budget_ms = config
+        if isinstance(config, dict):
+            budget_ms = config.get(camera_name, config.get("default"))
+        if budget_ms is None:
+            return None
+        try:
+            return cls(float(budget_ms))
+        except (TypeError, ValueError):
+            logger.warning(
+                "Invalid latency budget %r for camera %s ... ignoring",
+                budget_ms,
+                camera_name,
+            )
+            return None
+
+    def _entry(self, name: str) -> list:
+        counts = self._counts.get(name)
+        if counts is None:
+            counts = self._counts[name] = [0, 0, 0]
+        return counts
+
+    def admit(self, name: str, metadata: dict) -> bool:
+        """Whether plugin *name* should process the frame of *metadata*.
+
+        Frames older than the budget are rejected and counted as skipped.
+        """
+        counts = self._entry(name)
+        if frame_age_ms(metadata) > self.budget_ms:
+            counts[1] += 1
+            return False
+        counts[0] += 1
+        return True
+
+    def finished(self, name: str, metadata: dict) -> None:
+        """Count an admitted frame that plugin *name* finished past the budget."""
+        if frame_age_ms(metadata) > self.budget_ms:
+            self._entry(name)[2] += 1
+
+    def stats(self) -> dict:
+        """Frames processed, skipped and finished late per latency-critical plugin."""
+        return {
+            name: {"processed": processed, "skipped": skipped, "late": late}
+            for name, (processed, skipped, late) in self._counts.items()
+        }
+
+    def log_stats(self, camera_name: str) -> None:
+        """Log the counters of *camera_name*'s pipeline, warning about skips."""
+        for name, stats in self.stats().items():
+            log = logger.warning if stats["skipped"] else logger.info
+            log(
+                "Latency budget %.1f ms for %s on %s: %d frames processed "
+                "(%d finished late), %d skipped",
+                self.budget_ms,
+                name,
+                camera_name,
+                stats["processed"],
+                stats["late"],
+                stats["skipped"],
+            )
@@ -0,0 +1,211 @@
+"""Fixed-bucket latency histograms for the stages of a pipeline.
+
+:class:`LatencyHistogram` records microsecond values into log-linear buckets
+in the style of HdrHistogram: values below 128 us get a bucket each, and
+every further power of two is split into 64 buckets, so any recorded value
+is known to within 1.6% up to about 19 hours.  The bucket counts are
+allocated once; recording a value is an index computation and an increment.
+
+:class:`PipelineTimings` keeps three histograms for every plugin of a
+pipeline (see :meth:`PipelineTimings.stage`):
+
+- ``"queue wait"``: from the frame being handed to the plugin (by the camera
+  or the previous plugin) until the plugin picks it up,
+- ``"service"``: the plugin's ``process()`` call (for blocking plugins,
+  including any wait for a free worker thread),
+- ``"end-to-end"``: from acquisition until the plugin is done with the
+  frame, recorded by plugins that are last on their branch.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Metadata key stamped with time.perf_counter_ns() whenever a frame is handed
+# to the next stage, for queue-wait measurements
+HANDOFF_KEY = "Handoff Time (ns)"
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS  # Exact buckets for values below this
+HALF_BUCKETS = SUB_BUCKETS // 2  # Buckets per further power of two
+MAX_VALUE_BITS = 36  # Larger values (~19 hours in us) go to the last bucket
+NUM_BUCKETS = SUB_BUCKETS + (MAX_VALUE_BITS - SUB_BUCKET_BITS) * HALF_BUCKETS
+MAX_VALUE = (1 << MAX_VALUE_BITS) - 1
+
+STAGES = ("queue wait", "service", "end-to-end")
+PERCENTILES = (50, 95, 99)
+
+
+def bucket_index(value: int) -> int:
+    """Index of the bucket holding *value* (clamped to the trackable range)."""
+    if value < SUB_BUCKETS:
+        return value if value > 0 else 0
+    if value > MAX_VALUE:
+        value = MAX_VALUE
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF_BUCKETS + (value >> shift) - HALF_BUCKETS
+
+
+def bucket_bounds(index: int) -> tuple[int, int]:
+    """Smallest and largest value of bucket *index*."""
+    if index < SUB_BUCKETS:
+        return index, index
+    shift, sub = divmod(index - SUB_BUCKETS, HALF_BUCKETS)
+    shift += 1
+    sub += HALF_BUCKETS
+    return sub << shift, ((sub + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Counts of latency values in microseconds, in fixed log-linear buckets."""
+
+    def __init__(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int, count: int = 1) -> None:
+        """Record *value* microseconds, *count* times."""
+        if value < 0:
+            value = 0  # Wall-clock adjustments
+        self.counts[bucket_index(value)] += count
+        self.count += count
+        self.total += value * count
+        if value > self.max:
+            self.max = value
+
+    def record_since(self, start_ns: int, now_ns: int | None = None) -> None:
+        """Record the time since ``time.perf_counter_ns()`` was *start_ns*."""
+        if now_ns is None:
+            now_ns = time.perf_counter_ns()
+        self.record((now_ns - start_ns) // 1000)
+
+    def percentile(self, percent: float) -> int:
+        """Largest value (us) of the bucket holding the *percent* th percentile.
+
+        Never more than the largest recorded value; 0 when empty.
+        """
+        if self.count == 0:
+            return 0
+        target = max(1, -(-self.count * percent // 100))  # ceil
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(bucket_bounds(index)[1], self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """Count, mean, p50/p95/p99 and max in milliseconds."""
+        summary = {
+            "count": self.count,
+            "mean (ms)": self.total / self.count / 1000 if self.count else 0.0,
+        }
+        for percent in PERCENTILES:
+            summary[f"p{percent} (ms)"] = self.percentile(percent) / 1000
+        summary["max (ms)"] = self.max / 1000
+        return summary
+
+    def as_dict(self) -> dict:
+        """:meth:`summary` plus the non-empty buckets as ``[low, high, count]`` (us)."""
+        summary = self.summary()
+        summary["buckets"] = [
+            [*bucket_bounds(index), bucket_count]
+            for index, bucket_count in enumerate(self.counts)
+            if bucket_count
+        ]
+        return summary
+
+    @classmethod
+    def from_dict(cls, data: dict) -> LatencyHistogram:
+        """Rebuild a histogram from :meth:`as_dict` output."""
+        histogram = cls()
+        for low, _, bucket_count in data["buckets"]:
+            histogram.counts[bucket_index(low)] += bucket_count
+        histogram.count = data["count"]
+        histogram.total = round(data["mean (ms)"] * 1000 * data["count"])
+        histogram.max = round(data["max (ms)"] * 1000)
+        return histogram
+
+
+class PipelineTimings:
+    """Queue-wait, service and end-to-end histograms of every plugin in a pipeline."""
+
+    def __init__(self):
+        self._stages = {}  # Plugin name -> {stage: LatencyHistogram}
+
+    def stage(self, name: str) -> dict:
+        """Histograms of plugin *name*, keyed by the names in :data:`STAGES`."""
+        histograms = self._stages.get(name)
+        if histograms is None:
+            histograms = self._stages[name] = {
+                stage: LatencyHistogram() for stage in STAGES
+            }
+        return histograms
+
+    def stats(self) -> dict:
+        """:meth:`LatencyHistogram.summary` per plugin and stage, empty stages omitted."""
+        return {
+            name: {
+                stage: histogram.summary()
+                for stage, histogram in histograms.items()
+                if histogram.count
+            }
+            for name, histograms in self._stages.items()
+        }
+
+    def as_dict(self) -> dict:
+        """Like :meth:`stats`, with the histogram buckets."""
+        return {
+            name: {
+                stage: histogram.as_dict()
+                for stage, histogram in histograms.items()
+                if histogram.count
+            }
+            for name, histograms in self._stages.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> PipelineTimings:
+        """Rebuild timings from :meth:`as_dict` output (e.g. from a subprocess)."""
+        timings = cls()
+        for name, stages in data.items():
+            histograms = timings.stage(name)
+            for stage, histogram in stages.items():
+                histograms[stage] = LatencyHistogram.from_dict(histogram)
+        return timings
+
+    def log_stats(self, camera_name: str) -> None:
+        """Log each plugin's latency percentiles."""
+        for name, stages in self.stats().items():
+            for stage, summary in stages.items():
+                logger.info(
+                    "%s latency of %s on %s: p50 %.2f ms, p95 %.2f ms, "
+                    "p99 %.2f ms, max %.2f ms (%d frames)",
+                    stage.capitalize(),
+                    name,
+                    camera_name,
+                    summary["p50 (ms)"],
+                    summary["p95 (ms)"],
+                    summary["p99 (ms)"],
+                    summary["max (ms)"],
+                    summary["count"],
+                )
+
+
+def dump_timings(path: str, timings: dict) -> None:
+    """Write ``{camera name: PipelineTimings}`` to *path* as JSON."""
+    with open(path, "w") as file:
+        json.dump(
+            {
+                camera: camera_timings.as_dict()
+                for camera, camera_timings in timings.items()
+            },
+            file,
+            indent=2,
+        )
@@ -0,0 +1,791 @@
+"""Async frame pipeline shared by the GUI and the headless runner.
+
+:class:`PipelineEngine` runs one camera's pipeline: frame acquisition (in
+this process or from a camera subprocess through shared memory), the plugin
+chain or :mod:`pipeline graph <rataGUI.pipeline_graph>`, fan-out to
+independent plugins and the final drain.  It has no Qt dependency.
+:class:`~rataGUI.interface.camera_widget.CameraWidget` and
+:class:`~rataGUI.headless.runner.PipelineRunner` both drive it, so the two
+behave identically; the GUI only subscribes to its events (see
+:meth:`PipelineEngine.subscribe`).
+
+The engine keeps no per-camera state of its own.  Each call takes the
+camera's pipeline context, a ``CameraWidget`` or a
+:class:`~rataGUI.headless.context.PipelineContext`, which provides:
+
+- ``camera``, ``camera_type``, ``camera_config``, ``session_dir``;
+- ``plugins`` and ``plugin_names``;
+- ``active``, ``wakeup`` and ``stop_camera_pipeline()``;
+- ``avg_latency``, ``latency_budget``, ``preview_width`` and
+  ``latest_frame``;
+- ``backpressure``, ``shm_budget_mb``, ``frame_memory`` and
+  ``shm_frame_memory``;
+- ``fan_out``, ``timings``, ``_acquisition_queue`` and the ``_mp_*``
+  multiprocess resources, all set by the engine.
+"""
+
+from __future__ import annotations
+
+import time
+import asyncio
+import logging
+import multiprocessing
+import queue
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from rataGUI.fan_out import FanOut
+from rataGUI.latency_budget import SKIPPED_KEY
+from rataGUI.latency_histogram import HANDOFF_KEY, PipelineTimings
+from rataGUI.pipeline_graph import (
+    SOURCE,
+    GraphDispatch,
+    Join,
+    PipelineGraph,
+)
+from rataGUI.shared_frame_ring import SharedFrameLeases, ring_for_geometry
+
+logger = logging.getLogger(__name__)
+
+# Exponential moving average decay factor for smoothing pipeline latency measurements.
+# Higher values weight recent samples more heavily (0.8 = 80% new, 20% old).
+EXP_AVG_DECAY = 0.8
+_MICROSECOND = timedelta(microseconds=1)
+
+# Events published to subscribers, with the arguments their callbacks receive
+PLUGIN_FAILED = "plugin failed"  # (camera name, plugin name)
+EVENTS = (PLUGIN_FAILED,)
+
+
+class PipelineEngine:
+    """Run camera pipelines on the calling thread's event loop.
+
+    :param pools: :class:`~rataGUI.executor_pools.ExecutorPools` providing the
+        acquisition threads and the blocking plugins' thread pools.
+    :param graph_spec: Optional ``"pipeline graph"`` config entry arranging
+        the plugins (see :mod:`rataGUI.pipeline_graph`).
+    """
+
+    def __init__(self, pools, graph_spec: dict | None = None) -> None:
+        self.pools = pools
+        self.graph_spec = graph_spec
+        self._subscribers = {event: [] for event in EVENTS}
+
+    def subscribe(self, event: str, callback: Callable) -> None:
+        """Call *callback* whenever *event* happens.
+
+        Callbacks run on the pipeline's thread, so GUI code should hand them
+        to its own thread (a Qt signal's ``emit`` does).
+
+        :param event: One of :data:`EVENTS`.
+        :raises ValueError: If *event* is unknown.
+        """
+        if event not in self._subscribers:
+            raise ValueError(
+                f"Unknown pipeline event {event!r} (expected one of {', '.join(EVENTS)})"
+            )
+        self._subscribers[event].append(callback)
+
+    def _emit(self, event: str, *args) -> None:
+        for callback in self._subscribers[event]:
+            try:
+                callback(*args)
+            except Exception as err:
+                logger.exception("Subscriber to %r failed: %s", event, err)
+
+    # ------------------------------------------------------------------
+    # Camera subprocess (multiprocess mode)
+    # ------------------------------------------------------------------
+
+    def start_camera_process(self, ctx, on_started: Callable | None = None) -> None:
+        """Start the camera subprocess of *ctx* and wait until it is ready.
+
+        The shared memory ring itself is allocated by :meth:`resize_ring` once
+        the subprocess reports the geometry of the camera's frames.
+
+        :param on_started: Called with the subprocess's PID once it started,
+            e.g. to apply its CPU affinity.
+        :raises IOError: If the camera fails to initialize in the subprocess.
+        """
+        from rataGUI.camera_process import camera_acquisition_loop
+
+        ctx._mp_ring_cond = multiprocessing.Condition()
+        ctx._mp_doorbell, doorbell = multiprocessing.Pipe(duplex=False)
+        ctx._mp_control_queue = multiprocessing.Queue()
+        ctx._mp_error_queue = multiprocessing.Queue()
+        ctx._mp_leases = SharedFrameLeases(on_drained=ctx.wakeup.notify)
+        ready_event = multiprocessing.Event()
+
+        ctx._mp_process = multiprocessing.Process(
+            target=camera_acquisition_loop,
+            kwargs={
+                "camera_module_name": ctx.camera_type,
+                "camera_id": ctx.camera.cameraID,
+                "camera_config_dict": ctx.camera_config.as_dict(),
+                "plugin_names": ctx.plugin_names,
+                "doorbell": doorbell,
+                "control_queue": ctx._mp_control_queue,
+                "ready_event": ready_event,
+                "error_queue": ctx._mp_error_queue,
+                "ring_cond": ctx._mp_ring_cond,
+                "log_dir": ctx.session_dir,
+                "backpressure": ctx.backpressure,
+            },
+            daemon=True,
+        )
+        ctx._mp_process.start()
+        doorbell.close()  # Only the subprocess writes to the doorbell
+        if on_started is not None:
+            on_started(ctx._mp_process.pid)
+        logger.info(
+            "Started camera subprocess for %s (PID: %d)",
+            ctx.camera.getDisplayName(),
+            ctx._mp_process.pid,
+        )
+
+        if not ready_event.wait(timeout=30):
+            if not ctx._mp_error_queue.empty():
+                err_type, err_msg = ctx._mp_error_queue.get_nowait()
+                raise IOError(f"Camera subprocess error ({err_type}): {err_msg}")
+            raise IOError("Camera subprocess timed out during initialization")
+        logger.info("Camera subprocess ready for %s", ctx.camera.getDisplayName())
+
+    def cleanup_camera_process(self, ctx) -> None:
+        """Stop the camera subprocess of *ctx* and release its resources."""
+        if ctx._mp_process is not None and ctx._mp_process.is_alive():
+            try:
+                ctx._mp_control_queue.put("stop")
+                ctx._mp_process.join(timeout=10)
+                if ctx._mp_process.is_alive():
+                    logger.warning("Camera subprocess did not exit, terminating")
+                    ctx._mp_process.terminate()
+                    ctx._mp_process.join(timeout=5)
+            except Exception as err:
+                logger.exception("Error stopping camera subprocess: %s", err)
+
+        ctx._mp_leases = None
+        ctx._mp_ring_cond = None
+        if ctx._mp_doorbell is not None:
+            ctx._mp_doorbell.close()
+            ctx._mp_doorbell = None
+        if ctx._mp_ring is not None:
+            logger.info(
+                "Shared memory ring for %s (%s): %s",
+                ctx.camera.getDisplayName(),
+                ctx.backpressure,
+                ctx._mp_ring.stats(),
+            )
+            try:
+                ctx._mp_ring.close()
+            except Exception:
+                pass
+            ctx._mp_ring = None
+
+    async def resize_ring(self, ctx, geometry: dict) -> None:
+        """Allocate a shared memory ring fitting *geometry* and hand it to the subprocess.
+
+        Frames from the previous ring are allowed to leave the pipeline first,
+        since plugins may still hold views into it.
+        """
+        while ctx._mp_leases.outstanding() and ctx.camera._running:
+            await ctx.wakeup.wait()  # Notified when the last frame is released
+
+        old_ring = ctx._mp_ring
+        ctx._mp_ring = ring_for_geometry(
+            geometry, ctx._mp_ring_cond, ctx.shm_budget_mb, ctx.shm_frame_memory
+        )
+        ctx._mp_leases.set_ring(ctx._mp_ring)
+        ctx._mp_control_queue.put(ctx._mp_ring.control_message())
+        if old_ring is not None:
+            old_ring.close()
+
+        logger.info(
+            "Allocated %d shared memory slots of %s for %s (%.1f MB)",
+            ctx._mp_ring.num_slots,
+            ctx._mp_ring.format,
+            ctx.camera.getDisplayName(),
+            ctx._mp_ring.shm.size / 2**20,
+        )
+
+    async def acquire_frames(self, ctx) -> None:
+        """Read frames from the camera in its acquisition thread and enqueue them.
+
+        Runs until the camera stops, then closes the camera.
+        """
+        t0 = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self.pools.acquisition(ctx.camera.getDisplayName())
+            while ctx.camera._running:
+                if ctx.active:
+                    status, frame = await loop.run_in_executor(
+                        executor, ctx.camera.readCamera
+                    )
+                    metadata = ctx.camera.getMetadata()
+                    metadata["Camera Name"] = ctx.camera.getDisplayName()
+                    metadata["Timestamp"] = datetime.now()
+                    metadata["Average Latency"] = ctx.avg_latency
+
+                    if status:
+                        if ctx.preview_width:
+                            ctx.latest_frame = frame
+                        target_queue = ctx._acquisition_queue or ctx.plugins[0].in_queue
+                        metadata[HANDOFF_KEY] = time.perf_counter_ns()
+                        await target_queue.put((frame, metadata))
+                        await asyncio.sleep(0)
+                    else:
+                        raise IOError(
+                            f"Frame not found on camera: {ctx.camera.getDisplayName()}"
+                        )
+                else:
+                    await ctx.wakeup.wait()  # Paused: sleep until resumed or stopped
+        except Exception as err:
+            logger.exception(err)
+            logger.error(
+                "Exception acquiring frame from camera: %s ... stopping",
+                ctx.camera.getDisplayName(),
+            )
+            ctx.stop_camera_pipeline()
+
+        t1 = time.time()
+        elapsed = t1 - t0
+        if elapsed > 0:
+            logger.debug("FPS: %s", ctx.camera.frames_acquired / elapsed)
+        ctx.camera.closeCamera()
+
+    async def _wait_for_mp_frames(self, ctx) -> tuple | None:
+        """Wait for frames published by the camera subprocess.
+
+        Sleeps on the doorbell pipe and ``ctx.wakeup`` instead of polling.
+        Returns ``(frames, events)`` from :meth:`SharedFrameLeases.poll` (both
+        empty if the pipeline was paused or stopped meanwhile), or ``None``
+        once the subprocess has exited.
+        """
+        while ctx.camera._running and ctx.active:
+            try:
+                frames, events = ctx._mp_leases.poll(ctx._mp_doorbell, timeout=0)
+            except EOFError:
+                # An error report may still be in flight from the exiting process
+                loop = asyncio.get_running_loop()
+                try:
+                    err_type, err_msg = await loop.run_in_executor(
+                        self.pools.acquisition(ctx.camera.getDisplayName()),
+                        ctx._mp_error_queue.get,
+                        True,
+                        1,
+                    )
+                except queue.Empty:
+                    logger.info(
+                        "Camera subprocess for %s exited", ctx.camera.getDisplayName()
+                    )
+                    return None
+                raise IOError(f"Camera subprocess error ({err_type}): {err_msg}")
+            if frames or events:
+                return frames, events
+            await ctx.wakeup.wait(ctx._mp_doorbell)
+        return [], []
+
+    async def acquire_frames_mp(self, ctx) -> None:
+        """Acquire frames from camera subprocess via shared memory."""
+        t0 = time.time()
+        try:
+            while ctx.camera._running:
+                if ctx.active:
+                    result = await self._wait_for_mp_frames(ctx)
+                    if result is None:
+                        break
+
+                    frames, events = result
+                    for slot_idx, seq in frames:
+                        # Zero-copy: plugins read the shared-memory slot directly
+                        # until the frame leaves the pipeline and the slot is released.
+                        leased = ctx._mp_leases.acquire(slot_idx, seq)
+                        if leased is None:
+                            continue  # Overwritten under the drop_oldest policy
+                        frame, metadata = leased
+                        metadata["Camera Name"] = ctx.camera.getDisplayName()
+                        metadata["Average Latency"] = ctx.avg_latency
+                        ctx.camera.frames_acquired += 1
+
+                        target_queue = ctx._acquisition_queue or ctx.plugins[0].in_queue
+                        metadata[HANDOFF_KEY] = time.perf_counter_ns()
+                        await target_queue.put((frame, metadata))
+                        await asyncio.sleep(0)
+
+                    for event in events:
+                        if event[0] == "geometry":
+                            await self.resize_ring(ctx, event[1])
+                else:
+                    await ctx.wakeup.wait()  # Paused: sleep until resumed or stopped
+        except Exception as err:
+            logger.exception(err)
+            logger.error(
+                "Exception in multiprocess acquisition for camera: %s ... stopping",
+                ctx.camera.getDisplayName(),
+            )
+            ctx.stop_camera_pipeline()
+
+        t1 = time.time()
+        elapsed = t1 - t0
+        if elapsed > 0:
+            logger.debug("FPS: %s", ctx.camera.frames_acquired / elapsed)
+
+    def release_shared_frame(self, ctx, metadata: dict) -> None:
+        """Return the shared-memory slot backing this frame to the camera subprocess."""
+        if ctx._mp_leases is not None:
+            ctx._mp_leases.release_metadata(metadata)
+
+    async def plugin_process(
+        self,
+        ctx,
+        plugin: Any,
+        consumer: Any = None,
+    ) -> None:
+        """Async execution loop for a single plugin.
+
+        Reads from the plugin's input queue (or its ring buffer consumer),
+        runs its ``process()`` method (in a thread pool for blocking plugins),
+        and forwards results to the next queue, recording the plugin's queue
+        wait, service time and (last on a branch) end-to-end latency in
+        ``ctx.timings``.  Latency-critical plugins
+        pass frames older than the pipeline's latency budget on unprocessed.
+        Deactivates the plugin after repeated failures and publishes
+        :data:`PLUGIN_FAILED`.
+
+        :param consumer: The plugin's
+            :class:`~rataGUI.frame_ring_buffer.RingConsumer` when it reads
+            frames from the fan-out ring buffer instead of its queue.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self.pools.for_plugin(
+            ctx.camera.getDisplayName(), type(plugin).__name__
+        )
+        failures = 0
+        name = type(plugin).__name__
+        budget = ctx.latency_budget if plugin.latency_critical else None
+        histograms = ctx.timings.stage(name)
+        queue_wait = histograms["queue wait"]
+        service = histograms["service"]
+        end_to_end = histograms["end-to-end"]
+        while True:
+            if consumer is not None:
+                slot_idx = await consumer.claim_async()
+                frame, metadata = consumer.get_view(slot_idx)
+            else:
+                frame, metadata = await plugin.in_queue.get()
+            handoff_ns = metadata.get(HANDOFF_KEY)
+            if handoff_ns is not None:
+                queue_wait.record_since(handoff_ns)
+
+            # Stale frames skip latency-critical plugins but stay in the
+            # pipeline for the plugins after them
+            skip = (
+                budget is not None
+                and plugin.active
+                and not budget.admit(name, metadata)
+            )
+
+            # Copy-on-write for read-only (zero-copy) frames: plugins that
+            # write into the frame, or hold on to a view of a slot past
+            # process(), get a private copy, and the shared slot can be
+            # returned right away.  Read-only frames that own their data are
+            # the fan-out's shared copy, which blocking plugins may keep.
+            if (
+                plugin.active
+                and not frame.flags.writeable
+                and (
+                    (not skip and plugin.modifies_frame)
+                    or (not skip and plugin.blocking and not frame.flags.owndata)
+                    # A ring slot is reused once this plugin is done with it
+                    or (consumer is not None and plugin.out_queue is not None)
+                )
+            ):
+                frame = frame.copy()
+                self.release_shared_frame(ctx, metadata)
+                if consumer is not None:
+                    metadata = dict(metadata)
+            if skip and plugin.out_queue is not None:
+                # New dict: ring metadata is shared with the other readers
+                skipped_by = metadata.get(SKIPPED_KEY, ()) + (name,)
+                metadata = {**metadata, SKIPPED_KEY: skipped_by}
+
+            forwarded = False
+            try:
+                if plugin.active and not skip:
+                    start_ns = time.perf_counter_ns()
+                    if plugin.blocking:
+                        result = await loop.run_in_executor(
+                            executor, plugin.process, frame, metadata
+                        )
+                    else:
+                        result = plugin.process(frame, metadata)
+                    service.record_since(start_ns)
+                    if budget is not None:
+                        budget.finished(name, metadata)
+                else:
+                    result = (frame, metadata)
+
+                if plugin.out_queue is not None:
+                    result[1][HANDOFF_KEY] = time.perf_counter_ns()
+                    await plugin.out_queue.put(result)
+                    forwarded = True
+                else:
+                    delta_t = datetime.now() - metadata["Timestamp"]
+                    end_to_end.record(delta_t // _MICROSECOND)
+                    if not plugin.blocking:
+                        ctx.avg_latency = (
+                            delta_t.total_seconds() * 1000 * EXP_AVG_DECAY
+                            + ctx.avg_latency * (1 - EXP_AVG_DECAY)
+                        )
+            except Exception as err:
+                failures += 1
+                logger.error(
+                    "Plugin %s failure #%d: camera=%s, frame_index=%s, "
+                    "frame_shape=%s, error=%s",
+                    name,
+                    failures,
+                    ctx.camera.getDisplayName(),
+                    metadata.get("Frame Index", "?") if metadata else "?",
+                    frame.shape if frame is not None else None,
+                    err,
+                )
+                logger.exception(err)
+                if failures > 5:
+                    logger.error(
+                        "Plugin %s exceeded failure threshold (5), deactivating. "
+                        "Camera: %s, total_frames_acquired: %d",
+                        type(plugin).__name__,
+                        ctx.camera.getDisplayName(),
+                        ctx.camera.frames_acquired,
+                    )
+                    plugin.failed = True
+                    plugin.active = False
+                    logger.warning(
+                        "Plugin %s has been deactivated due to repeated failures. "
+                        "If this is VideoWriter, video is NOT being saved! "
+                        "Camera: %s",
+                        type(plugin).__name__,
+                        ctx.camera.getDisplayName(),
+                    )
+                    plugin.close()
+                    self._emit(
+                        PLUGIN_FAILED,
+                        ctx.camera.getDisplayName(),
+                        type(plugin).__name__,
+                    )
+            finally:
+                if consumer is not None:
+                    consumer.release(slot_idx)
+                if not forwarded:
+                    # Frame leaves the pipeline here (terminal plugin or failure)
+                    self.release_shared_frame(ctx, metadata)
+                if consumer is None:
+                    plugin.in_queue.task_done()
+
+    async def run(self, ctx, multiprocess: bool = False) -> None:
+        """Run the pipeline of *ctx* until its camera stops, then drain it.
+
+        Wires the plugins as the configured pipeline graph or, by default, as
+        a serial chain followed by a fan-out to the trailing independent
+        plugins, then waits for the camera to stop before draining all queues
+        and cancelling the plugin tasks.
+
+        :param multiprocess: Read frames from the camera subprocess started
+            by :meth:`start_camera_process`.
+        """
+        ctx.wakeup.bind()
+        ctx.timings = PipelineTimings()
+        graph = self.plugin_graph(ctx)
+        if multiprocess:
+            acquisition_task = asyncio.create_task(self.acquire_frames_mp(ctx))
+        else:
+            acquisition_task = asyncio.create_task(self.acquire_frames(ctx))
+        if graph is not None:
+            await self._run_graph(ctx, graph, acquisition_task)
+            return
+
+        serial_plugins = list(ctx.plugins)
+        independent_plugins = []
+
+        while serial_plugins and serial_plugins[-1].independent:
+            independent_plugins.insert(0, serial_plugins.pop())
+
+        plugin_tasks = []
+        for cur_plugin, next_plugin in zip(serial_plugins, serial_plugins[1:]):
+            cur_plugin.out_queue = next_plugin.in_queue
+            plugin_tasks.append(
+                asyncio.create_task(self.plugin_process(ctx, cur_plugin))
+            )
+
+        fan_out_queue = None
+        ring_buffer = None
+        consumers = {}
+        ctx.fan_out = None  # Independent plugin -> its RingConsumer
+        if independent_plugins:
+            fan_out_queue = asyncio.Queue()
+
+            # Only non-blocking plugins read the ring; without any, frames
+            # would be copied into slots nobody reads
+            readers = [p for p in independent_plugins if not p.blocking]
+            num_slots = max(
+                sum(
+                    p.in_queue.maxsize
+                    for p in independent_plugins
+                    if p.in_queue.maxsize > 0
+                ),
+                8,
+            )
+            try:
+                from rataGUI.frame_format import declared_format
+                from rataGUI.frame_ring_buffer import FrameRingBuffer
+
+                if readers:
+                    ring_buffer = FrameRingBuffer.from_format(
+                        num_slots,
+                        declared_format(ctx.camera),  # None: sized by the first frame
+                        num_consumers=0,
+                        memory=ctx.frame_memory,
+                    )
+                    for plugin in readers:
+                        consumers[plugin] = ring_buffer.add_consumer(
+                            type(plugin).__name__, plugin.ring_policy
+                        )
+                    logger.info(
+                        "Ring buffer enabled for %d independent plugins (%d slots)",
+                        len(readers),
+                        num_slots,
+                    )
+            except Exception as err:
+                logger.warning(
+                    "Ring buffer init failed, falling back to queue fan-out: %s", err
+                )
+                ring_buffer = None
+                consumers = {}
+
+            if serial_plugins:
+                serial_plugins[-1].out_queue = fan_out_queue
+                plugin_tasks.append(
+                    asyncio.create_task(self.plugin_process(ctx, serial_plugins[-1]))
+                )
+            else:
+                ctx._acquisition_queue = fan_out_queue
+
+            fan_out = FanOut(
+                fan_out_queue,
+                [p for p in independent_plugins if p not in consumers],
+                ring_buffer,
+                release_frame=lambda metadata: self.release_shared_frame(ctx, metadata),
+            )
+            ctx.fan_out = fan_out
+            plugin_tasks.append(asyncio.create_task(fan_out.run()))
+
+            for plugin in independent_plugins:
+                plugin_tasks.append(
+                    asyncio.create_task(
+                        self.plugin_process(ctx, plugin, consumer=consumers.get(plugin))
+                    )
+                )
+        else:
+            plugin_tasks.append(
+                asyncio.create_task(self.plugin_process(ctx, serial_plugins[-1]))
+            )
+
+        await acquisition_task
+
+        for plugin in ctx.plugins:
+            await plugin.in_queue.join()
+        if fan_out_queue is not None:
+            await fan_out_queue.join()
+        for consumer in consumers.values():
+            await consumer.join()
+
+        for task in plugin_tasks:
+            task.cancel()
+        if ctx.fan_out is not None:
+            ctx.fan_out.log_stats()
+        ctx.timings.log_stats(ctx.camera.getDisplayName())
+        if ctx.latency_budget is not None:
+            ctx.latency_budget.log_stats(ctx.camera.getDisplayName())
+
+        ctx._acquisition_queue = None
+
+    def plugin_graph(self, ctx) -> PipelineGraph | None:
+        """The camera's ``"pipeline graph"``, or ``None`` for the default chain.
+
+        :raises ValueError: If the graph in the config is invalid.
+        """
+        spec = self.graph_spec
+        if not spec:
+            return None
+        from rataGUI.plugins.base_plugin import BasePlugin
+
+        aliases = {name: pcls.__name__ for name, pcls in BasePlugin.modules.items()}
+        graph = PipelineGraph.from_config(spec, ctx.plugin_names, aliases)
+        logger.info(
+            "Pipeline graph for %s: %s", ctx.camera.getDisplayName(), graph.describe()
+        )
+        return graph
+
+    async def _run_graph(self, ctx, graph: PipelineGraph, acquisition_task) -> None:
+        """Run the plugins as arranged by *graph* until acquisition finishes.
+
+        Every branch point gets a :class:`FanOut` with a ring buffer of its own,
+        which its non-blocking children read through ring consumers; every
+        join a :class:`~rataGUI.pipeline_graph.Join` fed by one queue per
+        incoming edge.  Other edges hand frames straight to the child's queue.
+        """
+        plugins = dict(zip(ctx.plugin_names, ctx.plugins))
+        dispatch = GraphDispatch()
+        ctx.fan_out = dispatch
+        inputs = {}  # (parent, child) -> queue the child's frames from parent go to
+        consumers = {}  # Plugin -> its RingConsumer at its parent's branch point
+        tasks = []
+
+        for node in graph.nodes:
+            plugin = plugins[node]
+            edges = graph.parents(node)
+            if len(edges) == 1:
+                edge = edges[0]
+                if edge.queue_size is not None:
+                    plugin.in_queue = asyncio.Queue(edge.queue_size)
+                if edge.drop_policy is not None:
+                    plugin.drop_policy = edge.drop_policy
+                if edge.ring_policy is not None:
+                    plugin.ring_policy = edge.ring_policy
+                inputs[edge.parent, node] = plugin.in_queue
+                continue
+            join_inputs = []
+            for edge in edges:
+                queue_size = edge.queue_size
+                if queue_size is None:
+                    queue_size = plugin.in_queue.maxsize
+                join_inputs.append(asyncio.Queue(queue_size))
+                inputs[edge.parent, node] = join_inputs[-1]
+            dispatch.joins[node] = Join(node, join_inputs, plugin.in_queue)
+            tasks.append(asyncio.create_task(dispatch.joins[node].run()))
+
+        for parent in [SOURCE] + graph.nodes:
+            edges = graph.children(parent)
+            if not edges:
+                continue
+            if len(edges) == 1 and edges[0].drop_policy != "drop_oldest":
+                out_queue = inputs[parent, edges[0].child]
+            else:
+                out_queue = asyncio.Queue()
+                ring_buffer = None
+                if len(edges) > 1:
+                    ring_buffer = self._branch_ring(
+                        ctx, graph, parent, plugins, consumers
+                    )
+                fan_out = FanOut(
+                    out_queue,
+                    [],
+                    ring_buffer,
+                    release_frame=lambda metadata: self.release_shared_frame(
+                        ctx, metadata
+                    ),
+                )
+                for edge in edges:
+                    child = plugins[edge.child]
+                    if child in consumers:
+                        continue
+                    if graph.is_join(edge.child):
+                        fan_out.add_queue(
+                            f"{edge.child} (from {parent})",
+                            inputs[parent, edge.child],
+                            edge.drop_policy or "block",
+                        )
+                    else:
+                        fan_out.add_queue(edge.child, child.in_queue, child.drop_policy)
+                dispatch.fan_outs[parent] = fan_out
+                tasks.append(asyncio.create_task(fan_out.run()))
+            if parent == SOURCE:
+                ctx._acquisition_queue = out_queue
+            else:
+                plugins[parent].out_queue = out_queue
+
+        for node in graph.nodes:
+            plugin = plugins[node]
+            tasks.append(
+                asyncio.create_task(
+                    self.plugin_process(ctx, plugin, consumer=consumers.get(plugin))
+                )
+            )
+
+        await acquisition_task
+
+        # Drain in topological order, so nothing upstream can refill a node
+        # once it is empty
+        for node in [SOURCE] + graph.nodes:
+            if node != SOURCE:
+                plugin = plugins[node]
+                if plugin in consumers:
+                    await consumers[plugin].join()
+                if graph.is_join(node):
+                    for edge in graph.parents(node):
+                        await inputs[edge.parent, node].join()
+                await plugin.in_queue.join()
+            if node in dispatch.fan_outs:
+                await dispatch.fan_outs[node].source_queue.join()
+
+        for task in tasks:
+            task.cancel()
+        dispatch.log_stats()
+        ctx.timings.log_stats(ctx.camera.getDisplayName())
+        if ctx.latency_budget is not None:
+            ctx.latency_budget.log_stats(ctx.camera.getDisplayName())
+        ctx._acquisition_queue = None
+
+    def _branch_ring(self, ctx, graph, node, plugins, consumers):
+        """Ring buffer for branch point *node*, or ``None`` if no child reads one.
+
+        Registers a ring consumer in *consumers* for each non-blocking child
+        that is not a join.
+        """
+        readers = [
+            plugins[edge.child]
+            for edge in graph.children(node)
+            if not plugins[edge.child].blocking and not graph.is_join(edge.child)
+        ]
+        if not readers:
+            return None
+        num_slots = max(
+            sum(
+                plugins[edge.child].in_queue.maxsize
+                for edge in graph.children(node)
+                if plugins[edge.child].in_queue.maxsize > 0
+            ),
+            8,
+        )
+        try:
+            from rataGUI.frame_format import declared_format
+            from rataGUI.frame_ring_buffer import FrameRingBuffer
+
+            ring_buffer = FrameRingBuffer.from_format(
+                num_slots,
+                # Frames leaving a plugin may differ: sized by the first frame
+                declared_format(ctx.camera) if node == SOURCE else None,
+                num_consumers=0,
+                memory=ctx.frame_memory,
+            )
+            for plugin in readers:
+                consumers[plugin] = ring_buffer.add_consumer(
+                    type(plugin).__name__, plugin.ring_policy
+                )
+        except Exception as err:
+            logger.warning(
+                "Ring buffer init failed at branch point %s, falling back to "
+                "queue fan-out: %s",
+                node,
+                err,
+            )
+            for plugin in readers:
+                consumers.pop(plugin, None)
+            return None
+        logger.info(
+            "Ring buffer enabled at branch point %s for %d plugins (%d slots)",
+            node,
+            len(readers),
+            num_slots,
+        )
+        return ring_buffer
@@ -0,0 +1,351 @@
+"""Declarative plugin topology read from the ``"pipeline graph"`` config key.
+
+By default a camera's plugins form a chain, and only the independent plugins
+at the end of it receive frames in parallel.  A pipeline graph arranges the
+plugins as a directed acyclic graph instead.  Each entry maps a node to the
+list of its children::
+
+    "pipeline graph": {
+        "camera": ["Undistort"],
+        "Undistort": ["DLCInference", "VideoWriter",
+                      {"to": "FrameDisplay", "ring policy": "latest"}],
+        "DLCInference": [{"to": "PixelToWorld", "queue size": 4,
+                          "drop policy": "drop_oldest"}]
+    }
+
+Nodes are plugins, named by class or module name, plus the frame source
+:data:`SOURCE`.  A child given as a dict configures its edge:
+
+- ``"queue size"``: capacity of the child's input queue (0 = unbounded);
+- ``"drop policy"``: ``"block"`` or ``"drop_oldest"`` when that queue is full;
+- ``"ring policy"``: how a non-blocking child reads the branch point's ring
+  buffer (see :func:`~rataGUI.frame_ring_buffer.parse_policy`).
+
+Settings left out keep the plugin's own.  Every node with several children
+is a branch point: a :class:`~rataGUI.fan_out.FanOut` with a ring buffer of
+its own delivers each frame to all branches, which then run concurrently.
+A node with several parents is a join (see :class:`Join`).
+
+Enabled plugins that the graph does not mention read frames from the camera
+directly.  Plugins named in the graph but not running (not enabled, or
+failed to initialize) are bypassed: their children are connected to their
+parents.
+"""
+
+import asyncio
+import logging
+
+from rataGUI.frame_ring_buffer import parse_policy
+
+logger = logging.getLogger(__name__)
+
+GRAPH_KEY = "pipeline graph"
+SOURCE = "camera"  # Node the camera's frames come from
+DROP_POLICIES = ("block", "drop_oldest")
+EDGE_KEYS = ("queue size", "drop policy", "ring policy")
+
+
+class Edge:
+    """Connection from node *parent* to node *child*.
+
+    :param queue_size: Capacity of the child's input queue, or ``None`` to
+        keep the plugin's own.
+    :param drop_policy: One of :data:`DROP_POLICIES`, or ``None`` to keep
+        the plugin's own.
+    :param ring_policy: Ring buffer consumer policy, or ``None`` to keep
+        the plugin's own.
+    :raises ValueError: If a setting is invalid.
+    """
+
+    def __init__(
+        self, parent, child, queue_size=None, drop_policy=None, ring_policy=None
+    ):
+        if queue_size is not None and (
+            not isinstance(queue_size, int)
+            or isinstance(queue_size, bool)
+            or queue_size < 0
+        ):
+            raise ValueError(
+                f"Invalid queue size {queue_size!r} for edge {parent} -> {child}"
+            )
+        if drop_policy is not None and drop_policy not in DROP_POLICIES:
+            raise ValueError(
+                f"Invalid drop policy {drop_policy!r} for edge {parent} -> {child} "
+                f"(expected one of {', '.join(DROP_POLICIES)})"
+            )
+        if ring_policy is not None:
+            parse_policy(ring_policy)
+        self.parent = parent
+        self.child = child
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.ring_policy = ring_policy
+
+    def settings(self) -> dict:
+        """Edge settings that were given, keyed as in the config."""
+        values = (self.queue_size, self.drop_policy, self.ring_policy)
+        return {
+            key: value for key, value in zip(EDGE_KEYS, values) if value is not None
+        }
+
+    def __repr__(self) -> str:
+        return f"Edge({self.parent!r} -> {self.child!r}, {self.settings()})"
+
+
+class PipelineGraph:
+    """Validated plugin topology.
+
+    :param edges: The graph's :class:`Edge` objects.
+    :raises ValueError: If the edges lead into :data:`SOURCE` or form a cycle.
+    """
+
+    def __init__(self, edges):
+        self.edges = list(edges)
+        self._children = {}
+        self._parents = {}
+        for edge in self.edges:
+            if edge.child == SOURCE:
+                raise ValueError(f"Edge {edge.parent} -> {SOURCE} enters the source")
+            self._children.setdefault(edge.parent, []).append(edge)
+            self._parents.setdefault(edge.child, []).append(edge)
+        self.nodes = self._topological_order()
+
+    @classmethod
+    def from_config(cls, spec, available, aliases=None) -> "PipelineGraph":
+        """Build the graph of the running plugins from a ``"pipeline graph"`` entry.
+
+        :param spec: Dict mapping each node to a list of children, each a
+            node name or a dict with ``"to"`` and edge settings.
+        :param available: Names of the plugins that are running.
+        :param aliases: Maps other names (e.g. module names) to names in
+            *available*.
+        :raises ValueError: If *spec* is malformed.
+        """
+        aliases = aliases or {}
+        available = list(available)
+        if not isinstance(spec, dict):
+            raise ValueError(f"{GRAPH_KEY!r} must map nodes to lists of children")
+
+        edges = []
+        for parent, children in spec.items():
+            parent = aliases.get(parent, parent)
+            if isinstance(children, (str, dict)):
+                children = [children]
+            if not isinstance(children, list):
+                raise ValueError(f"Children of {parent} must be a list")
+            for child in children:
+                if isinstance(child, str):
+                    settings = {}
+                elif isinstance(child, dict) and "to" in child:
+                    settings = dict(child)
+                    child = settings.pop("to")
+                else:
+                    raise ValueError(f"Invalid child {child!r} of {parent}")
+                unknown = set(settings) - set(EDGE_KEYS)
+                if unknown:
+                    raise ValueError(
+                        f"Unknown settings {sorted(unknown)} for edge {parent} -> "
+                        f"{child} (expected {', '.join(EDGE_KEYS)})"
+                    )
+                edges.append(
+                    Edge(
+                        parent,
+                        aliases.get(child, child),
+                        settings.get("queue size"),
+                        settings.get("drop policy"),
+                        settings.get("ring policy"),
+                    )
+                )
+
+        # Bypass plugins that are not running, then attach the plugins the
+        # graph leaves out (and any without a parent) to the source
+        named = {edge.parent for edge in edges} | {edge.child for edge in edges}
+        for node in named - set(available) - {SOURCE}:
+            logger.warning(
+                "Plugin %s in %s is not running ... bypassing", node, GRAPH_KEY
+            )
+            edges = _bypass(edges, node)
+        children = {edge.child for edge in edges}
+        for node in available:
+            if node not in children:
+                if node not in named:
+                    logger.info(
+                        "Plugin %s is not in %s ... reading from %s",
+                        node,
+                        GRAPH_KEY,
+                        SOURCE,
+                    )
+                edges.append(Edge(SOURCE, node))
+
+        seen = set()
+        unique = []
+        for edge in edges:
+            if (edge.parent, edge.child) not in seen:
+                seen.add((edge.parent, edge.child))
+                unique.append(edge)
+        return cls(unique)
+
+    def children(self, node) -> list:
+        """Edges leaving *node*, in config order."""
+        return self._children.get(node, [])
+
+    def parents(self, node) -> list:
+        """Edges entering *node*, in config order."""
+        return self._parents.get(node, [])
+
+    def is_branch(self, node) -> bool:
+        """Whether *node* hands its frames to several children."""
+        return len(self.children(node)) > 1
+
+    def is_join(self, node) -> bool:
+        """Whether *node* merges the frames of several parents."""
+        return len(self.parents(node)) > 1
+
+    def _topological_order(self) -> list:
+        """Nodes other than :data:`SOURCE`, each after all of its parents."""
+        pending = {node: len(edges) for node, edges in self._parents.items()}
+        ready = [node for node in self._children if node not in pending]
+        order = []
+        while ready:
+            node = ready.pop(0)
+            if node != SOURCE:
+                order.append(node)
+            for edge in self.children(node):
+                pending[edge.child] -= 1
+                if pending[edge.child] == 0:
+                    ready.append(edge.child)
+        cyclic = sorted(node for node, count in pending.items() if count > 0)
+        if cyclic:
+            raise ValueError(f"{GRAPH_KEY} has a cycle through {', '.join(cyclic)}")
+        return order
+
+    def describe(self) -> str:
+        """One line per edge, for the log."""
+        return "; ".join(
+            f"{edge.parent} -> {edge.child}"
+            + "".join(f", {key} {value}" for key, value in edge.settings().items())
+            for edge in self.edges
+        )
+
+
+def _bypass(edges, node) -> list:
+    """Replace *node* with edges from each of its parents to each of its children.
+
+    The new edges take the settings of the edges leaving *node*.
+    """
+    parents = [edge.parent for edge in edges if edge.child == node]
+    kept = []
+    for edge in edges:
+        if edge.child == node:
+            continue
+        if edge.parent == node:
+            kept += [
+                Edge(
+                    parent,
+                    edge.child,
+                    edge.queue_size,
+                    edge.drop_policy,
+                    edge.ring_policy,
+                )
+                for parent in parents
+            ]
+        else:
+            kept.append(edge)
+    return kept
+
+
+class Join:
+    """Merge the frames reaching a node through several edges.
+
+    A frame is forwarded once every input has delivered it, recognised by its
+    ``"Frame Index"``: the frame from the first input, with the metadata of
+    all inputs merged (later inputs win on conflicting keys).  Since each
+    input delivers frames in order, a frame still missing an input when a
+    later frame is complete was dropped on the way and is discarded.
+
+    :param name: Name of the joining node, for the log.
+    :param inputs: One queue of ``(frame, metadata)`` items per incoming edge.
+    :param out_queue: Queue the merged frames are put on.
+    """
+
+    KEY = "Frame Index"
+
+    def __init__(self, name: str, inputs, out_queue):
+        self.name = name
+        self.inputs = list(inputs)
+        self.out_queue = out_queue
+        self.joined = 0
+        self.incomplete = 0  # Discarded after an input dropped them
+        self._pending = {}  # Frame index -> [(frame, metadata) or None per input]
+
+    async def run(self) -> None:
+        """Merge frames until cancelled."""
+        await asyncio.gather(
+            *(self._collect(index, queue) for index, queue in enumerate(self.inputs))
+        )
+
+    async def _collect(self, index: int, queue) -> None:
+        while True:
+            frame, metadata = await queue.get()
+            try:
+                await self.add(index, frame, metadata)
+            finally:
+                queue.task_done()
+
+    async def add(self, index: int, frame, metadata: dict) -> None:
+        """Record the frame from input *index* and forward it once complete."""
+        key = metadata.get(self.KEY)
+        parts = self._pending.setdefault(key, [None] * len(self.inputs))
+        parts[index] = (frame, metadata)
+        if any(part is None for part in parts):
+            return
+        del self._pending[key]
+        for stale in [k for k in self._pending if k is not None and k < key]:
+            del self._pending[stale]
+            self.incomplete += 1
+
+        merged = {}
+        for _, part_metadata in parts:
+            merged.update(part_metadata)
+        await self.out_queue.put((parts[0][0], merged))
+        self.joined += 1
+
+    def stats(self) -> dict:
+        return {"joined": self.joined, "incomplete": self.incomplete}
+
+
+class GraphDispatch:
+    """The branch points and joins of a running pipeline graph.
+
+    Offers the same :meth:`stats` and :meth:`log_stats` as a single
+    :class:`~rataGUI.fan_out.FanOut`.
+    """
+
+    def __init__(self):
+        self.fan_outs = {}  # Branch point node -> FanOut
+        self.joins = {}  # Joining node -> Join
+
+    def stats(self) -> dict:
+        """Dispatch counters of every consumer of every branch point.
+
+        Join inputs are keyed ``"<child> (from <parent>)"`` and joins
+        ``"<node> (join)"``.
+        """
+        stats = {}
+        for fan_out in self.fan_outs.values():
+            stats.update(fan_out.stats())
+        for name, join in self.joins.items():
+            stats[f"{name} (join)"] = join.stats()
+        return stats
+
+    def log_stats(self) -> None:
+        for node, fan_out in self.fan_outs.items():
+            logger.info("Branch point %s:", node)
+            fan_out.log_stats()
+        for name, join in self.joins.items():
+            logger.info(
+                "Join %s: %d frames joined, %d incomplete frames discarded",
+                name,
+                join.joined,
+                join.incomplete,
+            )
@@ -0,0 +1,79 @@
+"""Event-driven wake-ups for a pipeline's asyncio event loop.
+
+Acquisition tasks park on a :class:`PipelineWakeup` instead of polling:
+they wake when a watched pipe becomes readable (e.g. the shared-memory
+doorbell of a camera subprocess) or when another thread calls
+:meth:`PipelineWakeup.notify` to signal a pause, resume or stop.
+"""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineWakeup:
+    """Thread-safe wake-up signal for tasks running on one event loop.
+
+    :meth:`notify` may be called from any thread at any time; a
+    notification sent while nothing is waiting is remembered until the next
+    :meth:`wait`.  Waiters must re-check the state they care about after
+    every wake-up.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._waiter = None
+        self._pending = False
+
+    def bind(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        """Attach to *loop* (default: the running loop) before the first :meth:`wait`."""
+        self._loop = loop or asyncio.get_running_loop()
+        self._waiter = None
+
+    def notify(self) -> None:
+        """Wake the current or next :meth:`wait`.  Safe to call from any thread."""
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._wake)
+        except RuntimeError:
+            pass  # Event loop already closed
+
+    def _wake(self):
+        self._pending = True
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def wait(self, conn=None) -> None:
+        """Sleep until :meth:`notify` is called or *conn* becomes readable.
+
+        :param conn: Optional ``multiprocessing.connection.Connection`` (or
+            any object with ``fileno()`` and ``poll()``) to watch.  EOF also
+            counts as readable.
+        """
+        if self._pending:
+            self._pending = False
+            return
+
+        loop = self._loop
+        waiter = self._waiter = loop.create_future()
+        fd = None
+        if conn is not None:
+            try:
+                fd = conn.fileno()
+                loop.add_reader(fd, self._wake)
+            except NotImplementedError:
+                # Windows' proactor loop cannot watch pipes; poll in a worker
+                # thread instead (notify() still wakes the wait immediately).
+                fd = None
+                poll = loop.run_in_executor(None, conn.poll, 0.1)
+                poll.add_done_callback(lambda _: self._wake())
+        try:
+            await waiter
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+            self._waiter = None
+            self._pending = False
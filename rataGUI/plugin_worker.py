@@ -0,0 +1,277 @@
+"""Run a plugin instance in a worker process ("process" execution mode).
+
+CPU-heavy plugins written in Python hold the GIL while they work, so running
+them on the shared thread pool still serialises them against every other
+plugin.  :class:`ProcessPlugin` keeps the real plugin in a worker process of
+its own and stands in for it in the pipeline:
+
+- Frames are copied into a shared memory slot owned by the proxy; the worker
+  processes a writable view of that slot and writes the result frame back
+  into it.  Only metadata (and result frames of a different geometry) are
+  pickled.
+- The proxy is a ``blocking`` plugin, so the runner calls
+  :meth:`ProcessPlugin.process` from its thread pool and waits for the
+  result while other plugins keep running.  One frame is in flight at a time,
+  so frames leave the plugin in the order they arrived.
+- Exceptions raised by the plugin are re-raised by :meth:`ProcessPlugin.process`,
+  so the runner's failure counting applies unchanged; a worker that dies
+  fails every later frame until the runner deactivates the plugin.
+
+Plugins run in a worker get a :class:`~rataGUI.headless.context.PipelineContext`
+describing the camera (name, ID, config, save directories) but no trigger
+devices, which stay in the pipeline's process.
+"""
+
+import logging
+import threading
+import traceback
+from asyncio import Queue
+from multiprocessing import shared_memory
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_MODES = ("default", "process")
+
+# Seconds to wait for the worker to start the plugin or to close it
+WORKER_TIMEOUT = 60
+
+
+class CameraInfo:
+    """Picklable stand-in for a camera, for plugins running in a worker."""
+
+    def __init__(self, camera):
+        self.cameraID = camera.cameraID
+        self.display_name = camera.display_name
+        self._running = True
+        self.frames_acquired = 0
+
+    def getDisplayName(self) -> str:
+        return self.display_name or str(self.cameraID)
+
+
+def _context_snapshot(cam_widget) -> dict:
+    """Picklable description of *cam_widget* for building the worker's context."""
+    return {
+        "camera": CameraInfo(cam_widget.camera),
+        "camera_config": cam_widget.camera_config.as_dict(),
+        "save_dir": cam_widget.save_dir,
+        "session_dir": cam_widget.session_dir,
+        "encoder_cores": set(getattr(cam_widget, "encoder_cores", ())),
+    }
+
+
+def plugin_worker_loop(module_name, snapshot, config_dict, conn):
+    """Worker process target: build the plugin, then serve frames from *conn*."""
+    from importlib import import_module
+    from rataGUI.headless.context import HeadlessConfigManager, PipelineContext
+    from rataGUI.plugins.base_plugin import BasePlugin
+
+    try:
+        if module_name not in BasePlugin.modules:
+            import_module(f"rataGUI.plugins.{module_name}")
+        ctx = PipelineContext(
+            camera=snapshot["camera"],
+            camera_config=HeadlessConfigManager(snapshot["camera_config"]),
+            save_dir=snapshot["save_dir"],
+            triggers=[],
+            session_dir=snapshot["session_dir"],
+        )
+        ctx.encoder_cores = snapshot["encoder_cores"]
+        plugin = BasePlugin.modules[module_name](
+            ctx, HeadlessConfigManager(config_dict)
+        )
+    except Exception as err:
+        conn.send(("error", repr(err), traceback.format_exc()))
+        conn.close()
+        return
+    conn.send(
+        (
+            "ready",
+            {
+                "independent": plugin.independent,
+                "drop_policy": plugin.drop_policy,
+                "ring_policy": plugin.ring_policy,
+                "modifies_frame": plugin.modifies_frame,
+                "latency_critical": plugin.latency_critical,
+            },
+        )
+    )
+
+    shm = None
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break  # Pipeline process went away
+            if message[0] == "close":
+                break
+            _, shm_name, shape, dtype, metadata = message
+            if shm is None or shm.name != shm_name:
+                if shm is not None:
+                    shm.close()
+                shm = shared_memory.SharedMemory(name=shm_name)
+            slot = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            try:
+                frame, metadata = plugin.process(slot, metadata)
+            except Exception as err:
+                conn.send(("error", repr(err), traceback.format_exc()))
+                continue
+            if frame is None or frame.shape != slot.shape or frame.dtype != slot.dtype:
+                conn.send(("ok", metadata, frame))  # New geometry: pickle the frame
+            else:
+                if frame is not slot:
+                    np.copyto(slot, frame)
+                del frame
+                conn.send(("ok", metadata, None))
+            del slot
+    finally:
+        try:
+            plugin.close()
+        except Exception as err:
+            logger.exception("Plugin %s failed to close: %s", module_name, err)
+        if shm is not None:
+            shm.close()
+        try:
+            conn.send(("closed",))
+        except (BrokenPipeError, OSError):
+            pass
+        conn.close()
+
+
+class ProcessPlugin:
+    """Pipeline stand-in for a plugin running in a worker process.
+
+    Use :meth:`wrap` to get a subclass named after the plugin class, so that
+    logs and metadata refer to the real plugin.
+
+    :param cam_widget: The PipelineContext the plugin belongs to.
+    :param config: The plugin's config manager.
+    :param module_name: Key of the plugin class in ``BasePlugin.modules``.
+    :param queue_size: Maximum size of the input async queue (0 = unbounded).
+    """
+
+    _wrapped = {}
+
+    @classmethod
+    def wrap(cls, plugin_cls):
+        """Subclass of :class:`ProcessPlugin` named after *plugin_cls*."""
+        if plugin_cls not in cls._wrapped:
+            cls._wrapped[plugin_cls] = type(plugin_cls.__name__, (cls,), {})
+        return cls._wrapped[plugin_cls]
+
+    def __init__(self, cam_widget, config, module_name, queue_size=0):
+        import multiprocessing
+
+        self.active = True
+        self.failed = False
+        self.blocking = True  # process() waits on the worker in the thread pool
+        self.independent = False
+        self.drop_policy = "block"
+        self.ring_policy = "lossless"
+        self.modifies_frame = True
+        self.latency_critical = False
+        self.config = config.as_dict()
+        self.in_queue = Queue(queue_size)
+        self.out_queue = None
+
+        self._lock = threading.Lock()
+        self._shm = None
+        self._conn, worker_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=plugin_worker_loop,
+            args=(module_name, _context_snapshot(cam_widget), self.config, worker_conn),
+            daemon=True,
+        )
+        self._process.start()
+        worker_conn.close()
+
+        if cam_widget.triggers:
+            logger.warning(
+                "Triggers are not available to %s in process execution mode",
+                type(self).__name__,
+            )
+        if not self._conn.poll(WORKER_TIMEOUT):
+            self._stop_worker()
+            raise TimeoutError(f"{type(self).__name__} worker did not start")
+        try:
+            reply = self._conn.recv()
+        except EOFError:
+            reply = ("error", "worker exited", "")
+        if reply[0] != "ready":
+            self._stop_worker()
+            raise RuntimeError(
+                f"{type(self).__name__} failed in worker process: {reply[1]}\n{reply[2]}"
+            )
+        for name, value in reply[1].items():
+            setattr(self, name, value)
+        logger.info(
+            "Started %s in worker process (PID: %d) for: %s",
+            type(self).__name__,
+            self._process.pid,
+            cam_widget.camera.getDisplayName(),
+        )
+
+    def _slot_for(self, frame):
+        """Shared memory view fitting *frame*, (re)allocated when it grows."""
+        if self._shm is None or self._shm.size < frame.nbytes:
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+            self._shm = shared_memory.SharedMemory(
+                create=True, size=max(frame.nbytes, 1)
+            )
+        return np.ndarray(frame.shape, dtype=frame.dtype, buffer=self._shm.buf)
+
+    def process(self, frame, metadata):
+        """Run the plugin on *frame* in the worker and return its result."""
+        with self._lock:
+            if self._conn is None:
+                raise RuntimeError(f"{type(self).__name__} worker is closed")
+            slot = self._slot_for(frame)
+            np.copyto(slot, frame)
+            try:
+                self._conn.send(
+                    ("frame", self._shm.name, frame.shape, frame.dtype.str, metadata)
+                )
+                reply = self._conn.recv()
+            except (EOFError, BrokenPipeError, OSError):
+                raise RuntimeError(
+                    f"{type(self).__name__} worker process exited "
+                    f"(exit code {self._process.exitcode})"
+                )
+            if reply[0] == "error":
+                raise RuntimeError(f"{reply[1]} in worker process:\n{reply[2]}")
+            _, metadata, result = reply
+            if result is None:
+                result = slot.copy()  # The slot is reused for the next frame
+            return result, metadata
+
+    def _stop_worker(self):
+        if self._conn is not None:
+            try:
+                self._conn.send(("close",))
+                if self._conn.poll(WORKER_TIMEOUT):
+                    self._conn.recv()
+            except (EOFError, BrokenPipeError, OSError):
+                pass
+            self._conn.close()
+            self._conn = None
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            logger.warning("%s worker did not exit, terminating", type(self).__name__)
+            self._process.terminate()
+            self._process.join(timeout=5)
+
+    def close(self) -> None:
+        """Close the plugin in the worker and stop the worker process."""
+        self.active = False
+        with self._lock:
+            self._stop_worker()
+            if self._shm is not None:
+                self._shm.close()
+                self._shm.unlink()
+                self._shm = None
+        logger.info(f"{type(self).__name__} closed")
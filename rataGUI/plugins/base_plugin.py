@@ -46,6 +46,15 @@ class BasePlugin(ABC):
         self.blocking = False
         self.independent = False  # Independent plugins can run in parallel via fan-out
         self.drop_policy = "block"  # "block" or "drop_oldest" when in_queue is full
+        # How an independent plugin reads the fan-out ring buffer: "lossless",
+        # "latest" (newest frame only) or "every N" (see frame_ring_buffer)
+        self.ring_policy = "lossless"
+        # Plugins that draw into or otherwise write the frame they are given.
+        # Read-only (zero-copy) frames are copied before reaching such plugins.
+        self.modifies_frame = True
+        # Plugins that skip frames older than the pipeline's latency budget
+        # (see latency_budget); frames they skip are passed on unprocessed
+        self.latency_critical = False
         self.config = config.as_dict()  # freeze plugin settings
         self.in_queue = Queue(queue_size)
         self.out_queue = None
@@ -46,6 +46,7 @@ class DLCInference(BasePlugin):
     def __init__(self, cam_widget, config, queue_size=0):
         """Initialize the DeepLabCut inference plugin, loading the frozen TF model."""
         super().__init__(cam_widget, config, queue_size)
+        self.latency_critical = True  # Skips stale frames given a latency budget
         self.model_dir = os.path.normpath(
             os.path.abspath(config.get("Model directory"))
         )
@@ -111,7 +112,11 @@ class DLCInference(BasePlugin):
 
         self.interval -= 1
         if self.interval <= 0:
-            image = frame.copy()
+            # Model input is RGB; mono frames are expanded only here
+            if frame.ndim == 2:
+                image = cv2.cvtColor(frame, cv2.COLOR_GRAY2RGB)
+            else:
+                image = frame.copy()
             scale = self.config.get("Scale factor")
             crop = self.config.get("Dynamic Cropping") and self.pose
             if crop:
@@ -0,0 +1,55 @@
+from rataGUI.plugins.base_plugin import BasePlugin
+from rataGUI.frame_bus import FrameBus, bus_name
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FrameBusPublisher(BasePlugin):
+    """
+    Plugin that publishes frames on a shared-memory frame bus, where other local
+    processes can read them live with a FrameBusReader (see rataGUI.frame_bus).
+
+    :param Bus name: Segment name; empty for ``rataGUI_<camera name>``.
+    :param Slots: Number of frames kept on the bus for slow readers.
+    """
+
+    DEFAULT_CONFIG = {
+        "Bus name": "",
+        "Slots": 8,
+    }
+
+    def __init__(self, cam_widget, config, queue_size=0):
+        """Initialize the publisher; the bus is created on the first frame."""
+        super().__init__(cam_widget, config, queue_size)
+        self.independent = True
+        self.ring_policy = "latest"  # Bus readers are lossy anyway
+        self.modifies_frame = False
+
+        self.source = cam_widget.camera.getDisplayName()
+        self.name = self.config.get("Bus name") or bus_name(self.source)
+        self.num_slots = max(1, int(self.config.get("Slots", 8)))
+        self.bus = None
+
+    def process(self, frame, metadata):
+        """Copy the frame onto the bus, (re)creating the bus for new frame formats."""
+        if self.bus is None:
+            self.bus = FrameBus.create(
+                self.name, self.num_slots, frame.shape, frame.dtype, self.source
+            )
+        elif not self.bus.matches(frame):
+            logger.info("Frame bus %s: frame format changed, replacing bus", self.name)
+            self.bus = self.bus.replace(frame.shape, frame.dtype)
+        self.bus.publish(frame, metadata)
+        return frame, metadata
+
+    def close(self):
+        """Close the bus so that readers stop"""
+        if self.bus is not None:
+            logger.info(
+                "Frame bus %s closed after %d frames", self.name, self.bus.write_seq
+            )
+            self.bus.close()
+            self.bus = None
+        super().close()
@@ -4,10 +4,18 @@ from PyQt6 import QtGui
 from PyQt6.QtCore import QObject, pyqtSignal
 
 import cv2
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
 
+# QImage format by channel count (frames are 8-bit by the time they reach Qt)
+_QIMAGE_FORMATS = {
+    1: QtGui.QImage.Format.Format_Grayscale8,
+    3: QtGui.QImage.Format.Format_RGB888,
+    4: QtGui.QImage.Format.Format_RGBA8888,
+}
+
 
 class DisplaySignal(QObject):
     """Qt signal wrapper for passing QImage instances across threads."""
@@ -37,6 +45,8 @@ class FrameDisplay(BasePlugin):
         super().__init__(cam_widget, config, queue_size)
         self.independent = True
         self.drop_policy = "drop_oldest"
+        self.ring_policy = "latest"  # Never hold back acquisition or recording
+        self.modifies_frame = False
 
         self.frame_width = config.get("Frame width")
         self.frame_height = config.get("Frame height")
@@ -51,7 +61,8 @@ class FrameDisplay(BasePlugin):
         try:
             self.interval = max(0, self.interval - 1)
             if self.interval == 0:
-                img_h, img_w, num_ch = frame.shape
+                image = frame
+                img_h, img_w = image.shape[:2]
                 target_w, target_h = self.frame_width, self.frame_height
 
                 # Downscale with cv2 before creating QImage — faster than Qt scaling
@@ -63,11 +74,15 @@ class FrameDisplay(BasePlugin):
                         new_h = int(img_h * scale)
                     else:
                         new_w, new_h = target_w, target_h
-                    frame = cv2.resize(
-                        frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+                    image = cv2.resize(
+                        image, (new_w, new_h), interpolation=cv2.INTER_LINEAR
                     )
-                    img_h, img_w, num_ch = frame.shape
+                    img_h, img_w = image.shape[:2]
 
+                # The display is 8-bit; keep the top byte of 16-bit frames
+                if image.dtype == np.uint16:
+                    image = (image >> 8).astype(np.uint8)
+                num_ch = image.shape[2] if image.ndim == 3 else 1
                 bytes_per_line = num_ch * img_w
                 # Deep copy so QImage owns its pixel data independently of the
                 # numpy buffer.  Without .copy() the QImage holds a raw pointer
@@ -75,11 +90,11 @@ class FrameDisplay(BasePlugin):
                 # numpy array is garbage-collected before the Qt main thread
                 # processes the queued signal — causing a use-after-free crash.
                 qt_image = QtGui.QImage(
-                    frame.data,
+                    image.data,
                     img_w,
                     img_h,
                     bytes_per_line,
-                    QtGui.QImage.Format.Format_RGB888,
+                    _QIMAGE_FORMATS[num_ch],
                 ).copy()
 
                 logger.debug(
@@ -1,4 +1,5 @@
 from rataGUI.plugins.base_plugin import BasePlugin
+from rataGUI.frame_format import FrameFormat
 
 import os
 import cv2
@@ -41,7 +42,10 @@ class MetadataWriter(BasePlugin):
     def process(self, frame, metadata):
         """Overlay selected metadata fields as text onto the frame. Returns (frame, metadata)."""
 
-        img_h, img_w, num_ch = frame.shape
+        frame_format = FrameFormat.of(frame)
+        img_h = frame_format.height
+        # Full-scale white for 8- and 16-bit, mono or colour frames
+        white = (frame_format.max_value,) * 3
 
         abbreviate = self.config.get("Abbreviate")
         count = 0
@@ -89,7 +93,7 @@ class MetadataWriter(BasePlugin):
                     pos,
                     cv2.FONT_HERSHEY_SIMPLEX,
                     fontScale=0.7,
-                    color=(255, 255, 255),
+                    color=white,
                     thickness=2,
                     lineType=cv2.LINE_4,
                 )
@@ -1,4 +1,5 @@
 from rataGUI.plugins.base_plugin import BasePlugin
+from rataGUI.latency_budget import SKIPPED_KEY
 from rataGUI.utils import slugify
 
 import datetime
@@ -28,6 +29,7 @@ class Pixel2World(BasePlugin):
     def __init__(self, cam_widget, config, queue_size=0):
         """Initialize the pixel-to-world transform plugin, loading calibration parameters."""
         super().__init__(cam_widget, config, queue_size)
+        self.latency_critical = True  # Skips stale frames given a latency budget
 
         try:
             param_file = os.path.normpath(
@@ -89,6 +91,8 @@ class Pixel2World(BasePlugin):
                 logger.error("Unable to find enabled socket trigger")
 
         self.validate = config.get("Calibration Validation Mode")
+        # Checkerboard corners are only drawn onto the frame in validation mode
+        self.modifies_frame = bool(self.validate)
         self.ncols = config.get("# of Columns")
         self.nrows = config.get("# of Rows")
 
@@ -125,6 +129,8 @@ class Pixel2World(BasePlugin):
                 if self.socket_trigger:
                     self.socket_trigger.execute(str(poses))
                 metadata["Real World Coordinates"] = poses
+            elif metadata.get(SKIPPED_KEY):
+                pass  # Inference skipped this frame to stay within its latency budget
             else:
                 logger.debug("No DLC Poses found. auto-disabling")
                 self.active = False
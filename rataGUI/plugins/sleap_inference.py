@@ -37,6 +37,7 @@ class SleapInference(BasePlugin):
     def __init__(self, cam_widget, config, queue_size=0):
         """Initialize the SLEAP inference plugin, loading the frozen TF model."""
         super().__init__(cam_widget, config, queue_size)
+        self.latency_critical = True  # Skips stale frames given a latency budget
         self.model_dir = os.path.normpath(config.get("Model directory"))
 
         try:
@@ -94,11 +95,14 @@ class SleapInference(BasePlugin):
 
     def process(self, frame, metadata):
         """Run SLEAP pose estimation on the frame. Returns (frame, metadata)."""
-        img_h, img_w, num_ch = frame.shape
+        img_h, img_w = frame.shape[:2]
         self.interval -= 1
 
         if self.interval <= 0:
-            image = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+            # Model input is single-channel; mono frames are used as-is
+            image = (
+                frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+            )
             image = cv2.resize(
                 image, (self.input_width, self.input_height)
             )  # resize uses reverse order
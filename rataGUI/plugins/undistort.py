@@ -15,6 +15,7 @@ class Undistort(BasePlugin):
     def __init__(self, cam_widget, config, queue_size=0):
         """Initialize the undistort plugin, computing rectification maps from calibration data."""
         super().__init__(cam_widget, config, queue_size)
+        self.modifies_frame = False  # remap() writes into a new array
         logger.debug(str(BasePlugin.modules.keys()))
 
         try:
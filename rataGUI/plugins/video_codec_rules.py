@@ -32,7 +32,8 @@ NVENC_ONLY_KEYS = frozenset(
 )
 
 #: Keys hidden when rawvideo is selected (essentially everything except
-#: framerate, buffer size, save directory, filename suffix, frame index).
+#: framerate, buffer size, save directory, filename suffix, frame index and
+#: segmenting).
 _RAWVIDEO_HIDDEN_KEYS = frozenset(
     {
         "speed (preset)",
@@ -44,6 +45,10 @@ _RAWVIDEO_HIDDEN_KEYS = frozenset(
         "B-Frames",
         "Tune",
         "GPU Pixel Conversion",
+        "Container",
+        "Fragment interval (ms)",
+        "Encoder processes",
+        "Chunk length (frames)",
     }
 )
 
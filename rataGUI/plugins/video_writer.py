@@ -5,10 +5,15 @@ from rataGUI.plugins.video_codec_rules import (
     NVENC_PIXEL_FORMATS as _NVENC_PIXEL_FORMATS,
 )
 from rataGUI.utils import slugify
+from rataGUI.frame_format import FrameFormat
+from rataGUI.cpu_affinity import pin_process
+from rataGUI.spill_buffer import SpillBuffer, SpillMetrics
 
 import os
 import subprocess as _sp
 import numpy as np
+import csv
+import threading
 from datetime import datetime
 from shutil import which as _which
 
@@ -17,6 +22,51 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+# Columns of the segment manifest; frame indices are the "Frame Index" metadata
+MANIFEST_COLUMNS = (
+    "segment",
+    "file",
+    "first frame index",
+    "last frame index",
+    "frames",
+    "first timestamp",
+    "last timestamp",
+)
+
+
+def locate_frame(manifest_path, frame_index):
+    """Find a recorded frame in a segmented recording.
+
+    :param manifest_path: The recording's ``manifest_*.csv``.
+    :param frame_index: The frame's ``"Frame Index"`` metadata.
+    :returns: ``(video file path, frame offset within that file)``.  The
+        offset comes from the segment's frame index file when there is one,
+        so frames dropped before the writer are accounted for.
+    :raises KeyError: If no segment holds the frame.
+    """
+    directory = os.path.dirname(manifest_path)
+    with open(manifest_path, newline="") as manifest:
+        for row in csv.DictReader(manifest):
+            first = int(row["first frame index"])
+            if not first <= frame_index <= int(row["last frame index"]):
+                continue
+            video_path = os.path.join(directory, row["file"])
+            name = os.path.splitext(row["file"])[0]
+            index_path = os.path.join(directory, f"frameindex_{name}")
+            if not os.path.isfile(index_path):
+                return video_path, frame_index - first
+            # The frame index file stores "Frame Index" - 1
+            indices = np.fromfile(index_path, dtype="<u4")
+            offsets = np.flatnonzero(indices == frame_index - 1)
+            if len(offsets) == 0:
+                break
+            return video_path, int(offsets[0])
+    raise KeyError(f"Frame {frame_index} not found in {manifest_path}")
+
+
+# Frame element types ffmpeg can read as raw video without conversion
+_RAW_DTYPES = (np.dtype(np.uint8), np.dtype(np.uint16))
+
 # Cached NVIDIA driver version (None = not yet checked, False = unavailable).
 # Caching avoids repeated nvidia-smi subprocess calls on every VideoWriter init.
 _nvidia_driver_version_cache = None
@@ -243,6 +293,24 @@ class VideoWriter(BasePlugin):
         "B-Frames": (0, 0, 4),
         "Tune": ["none", "hq", "ll", "ull"],
         "GPU Pixel Conversion": False,
+        # Split the recording into independently playable files of this many
+        # seconds, frames or megabytes (see VideoWriter._segment_full)
+        "Segment by": ["off", "duration (s)", "frames", "size (MB)"],
+        "Segment length": (600, 1, 1000000),
+        # Fragmented MP4 and Matroska files stay playable up to the last
+        # fragment written if the recording is interrupted
+        "Container": ["mp4", "fragmented mp4", "mkv"],
+        "Fragment interval (ms)": (1000, 100, 60000),
+        # Kernel pipe buffer feeding ffmpeg; 0 keeps the buffered stdin pipe
+        "Pipe size (MB)": (0, 0, 256),
+        # Encode consecutive chunks of this many frames in up to this many
+        # ffmpeg processes at once, stitched into one file (see EncoderPool)
+        "Encoder processes": (1, 1, 16),
+        "Chunk length (frames)": (120, 1, 10000),
+        # Frames that find the write buffer full overflow into a file of this
+        # size on a fast local disk instead of stalling the pipeline
+        "Spill size (MB)": (0, 0, 65536),
+        "Spill directory": "",  # Defaults to the video's directory
     }
 
     DISPLAY_CONFIG_MAP = {
@@ -259,6 +327,7 @@ class VideoWriter(BasePlugin):
         super().__init__(cam_widget, config, queue_size)
         self.blocking = True
         self.independent = True
+        self.modifies_frame = False
         self.input_params = {}
         self.output_params = {}
 
@@ -270,6 +339,17 @@ class VideoWriter(BasePlugin):
         self.tune = "none"
         self.gpu_pixel_conversion = False
 
+        self.segment_by = "off"
+        self.segment_length = 600
+        self.container = "mp4"
+        self.fragment_interval = 1000
+        self.pipe_size_mb = 0
+        self.encoder_processes = 1
+        self.chunk_frames = 120
+        self.spill_size_mb = 0
+        self.spill_dir = None
+        self.spill_metrics = SpillMetrics()
+
         for name, value in self.config.items():
             prop_name = VideoWriter.DISPLAY_CONFIG_MAP.get(name)
             if prop_name is None:
@@ -306,6 +386,32 @@ class VideoWriter(BasePlugin):
                 self.tune = value
             elif name == "GPU Pixel Conversion":
                 self.gpu_pixel_conversion = bool(value)
+            elif name == "Segment by":
+                self.segment_by = value
+            elif name == "Segment length":
+                self.segment_length = value
+            elif name == "Container":
+                self.container = value
+            elif name == "Fragment interval (ms)":
+                self.fragment_interval = int(value)
+            elif name == "Pipe size (MB)":
+                self.pipe_size_mb = int(value)
+            elif name == "Encoder processes":
+                self.encoder_processes = int(value)
+            elif name == "Chunk length (frames)":
+                self.chunk_frames = int(value)
+            elif name == "Spill size (MB)":
+                self.spill_size_mb = int(value)
+            elif name == "Spill directory":
+                if len(value) == 0:
+                    self.spill_dir = None
+                elif not os.path.isdir(value):
+                    logger.info(
+                        "Specified spill directory not found ... using save directory"
+                    )
+                    self.spill_dir = None
+                else:
+                    self.spill_dir = os.path.normpath(value)
             elif (
                 prop_name
                 in [
@@ -318,6 +424,15 @@ class VideoWriter(BasePlugin):
             else:  # output parameters
                 self.output_params["-" + prop_name] = str(value)
 
+        # Segment state: number, frames written and (Frame Index, Timestamp)
+        # of its first and last frame
+        self._segment = 0
+        self._segment_frames = 0
+        self._segment_first = None
+        self._segment_last = None
+        self._closers = []  # Threads closing the encoders of finished segments
+        self.manifest_path = None
+
         extension = ".mp4"
 
         # Configure codec-specific parameters
@@ -325,27 +440,28 @@ class VideoWriter(BasePlugin):
         vcodec = self.output_params.get("-vcodec")
         if vcodec in ["rawvideo"]:
             extension = ".raw"
+            self.encoder_processes = 1  # Nothing to encode in parallel
         elif vcodec in _NVENC_CODECS:
             self._configure_nvenc(vcodec, config)
         elif vcodec in ["libx264", "libx265"]:
             self._validate_cpu_preset(vcodec)
         elif vcodec == "libsvtav1":
             self._configure_svtav1(vcodec)
+        if vcodec != "rawvideo":
+            extension = self._configure_container()
 
         try:
             if os.access(self.save_dir, os.W_OK):
                 fld_name = datetime.now().strftime("video_%Y_%m_%d_%H_%M_%S")
                 self.save_dir = os.path.join(self.save_dir, fld_name)
                 os.makedirs(self.save_dir, exist_ok=True)
-                if self.write_frame_index:
-                    self.frameindex_file = open(
-                        os.path.join(self.save_dir, f"frameindex_{self.file_name}"),
-                        "wb",
-                    )
-                    self.timestamps_file = open(
-                        os.path.join(self.save_dir, f"timestamps_{self.file_name}.txt"),
-                        "w",
+                self._open_sidecars()
+                if self.segment_by != "off":
+                    self.manifest_path = os.path.join(
+                        self.save_dir, f"manifest_{self.file_name}.csv"
                     )
+                    with open(self.manifest_path, "w", newline="") as manifest:
+                        csv.writer(manifest).writerow(MANIFEST_COLUMNS)
             else:
                 raise OSError(
                     "Inaccessible save directory ... auto-disabling Video Writer plugin"
@@ -354,18 +470,65 @@ class VideoWriter(BasePlugin):
             logger.exception(err)
             self.active = False
 
-        self.file_path = os.path.join(self.save_dir, self.file_name + extension)
+        self.extension = extension
+        self.encoder_cores = getattr(cam_widget, "encoder_cores", None)
+        self.file_path = os.path.join(
+            self.save_dir, self._segment_name() + self.extension
+        )
+        self.writer = self._make_writer(self.file_path)
+
+    def _make_writer(self, file_path):
+        """Writer for *file_path* with this plugin's encoder settings.
 
-        self.writer = FFMPEG_Writer(
-            str(self.file_path),
-            input_dict=self.input_params,
+        An FFMPEG_Writer, or an EncoderPool of them when more than one
+        encoder process is configured.
+        """
+        buffer_size = getattr(self, "buffer_size", 120)
+
+        def make_ffmpeg_writer(path, buffer_size=buffer_size):
+            return FFMPEG_Writer(
+                str(path),
+                input_dict=dict(self.input_params),
+                output_dict=dict(self.output_params),
+                verbosity=0,
+                buffer_size=buffer_size,
+                gpu_pixel_conversion=self.gpu_pixel_conversion
+                and self.output_params.get("-vcodec") in _NVENC_CODECS,
+                use_hwaccel=self._use_hwaccel,
+                cpu_affinity=self.encoder_cores,
+                pipe_size=self.pipe_size_mb * 2**20,
+                spill_size=self.spill_size_mb * 2**20,
+                spill_dir=self.spill_dir,
+                spill_metrics=self.spill_metrics,
+            )
+
+        if self.encoder_processes <= 1:
+            return make_ffmpeg_writer(file_path)
+        return EncoderPool(
+            str(file_path),
+            make_ffmpeg_writer,
+            processes=self.encoder_processes,
+            chunk_frames=self.chunk_frames,
             output_dict=self.output_params,
-            verbosity=0,
-            buffer_size=getattr(self, "buffer_size", 120),
-            gpu_pixel_conversion=self.gpu_pixel_conversion and vcodec in _NVENC_CODECS,
-            use_hwaccel=self._use_hwaccel,
         )
 
+    def _segment_name(self):
+        """Base name of the current segment's video and sidecar files."""
+        if self.segment_by == "off":
+            return self.file_name
+        return f"{self.file_name}_{self._segment:04d}"
+
+    def _open_sidecars(self):
+        """Open the frame index and timestamp files of the current segment."""
+        if self.write_frame_index:
+            name = self._segment_name()
+            self.frameindex_file = open(
+                os.path.join(self.save_dir, f"frameindex_{name}"), "wb"
+            )
+            self.timestamps_file = open(
+                os.path.join(self.save_dir, f"timestamps_{name}.txt"), "w"
+            )
+
     def _configure_nvenc(self, vcodec, config):
         """Configure NVENC-specific ffmpeg parameters with driver version awareness."""
         # --- Encoder availability check ---
@@ -518,6 +681,27 @@ class VideoWriter(BasePlugin):
                 )
                 self.gpu_pixel_conversion = False
 
+    def _configure_container(self):
+        """Add the muxer options of the configured container; returns its extension.
+
+        Fragmented MP4 writes an empty ``moov`` header up front and a
+        self-contained fragment every ``fragment_interval`` ms, Matroska a
+        cluster, and both flush each packet, so a recording cut short by a
+        crash is playable up to its last complete fragment.
+        """
+        if self.container == "fragmented mp4":
+            self.output_params["-movflags"] = "+empty_moov+default_base_moof"
+            self.output_params["-frag_duration"] = str(self.fragment_interval * 1000)
+            self.output_params["-flush_packets"] = "1"
+            return ".mp4"
+        if self.container == "mkv":
+            self.output_params["-cluster_time_limit"] = str(self.fragment_interval)
+            self.output_params["-flush_packets"] = "1"
+            return ".mkv"
+        if self.container != "mp4":
+            logger.warning("Unknown container '%s', using mp4", self.container)
+        return ".mp4"
+
     def _validate_cpu_preset(self, vcodec):
         """Validate that an NVENC-only preset isn't used with a CPU codec."""
         preset = self.output_params.get("-preset")
@@ -593,6 +777,8 @@ class VideoWriter(BasePlugin):
             metadata.get("Frame Index", "?"),
             frame.shape,
         )
+        if self._segment_frames and self._segment_full(metadata):
+            self._next_segment()
         try:
             self.writer.write_frame(frame)
         except Exception as err:
@@ -619,16 +805,99 @@ class VideoWriter(BasePlugin):
                 )
                 raise
 
+        self._segment_last = (metadata.get("Frame Index"), metadata.get("Timestamp"))
+        if self._segment_frames == 0:
+            self._segment_first = self._segment_last
+        self._segment_frames += 1
         return frame, metadata
 
-    def close(self):
-        """Flush remaining frames and close the ffmpeg subprocess."""
+    def _segment_full(self, metadata):
+        """Whether the current segment reached its configured length."""
+        if self.segment_by == "frames":
+            return self._segment_frames >= self.segment_length
+        if self.segment_by == "duration (s)":
+            start = self._segment_first[1]
+            timestamp = metadata.get("Timestamp")
+            if start is None or timestamp is None:
+                return False
+            return (timestamp - start).total_seconds() >= self.segment_length
+        if self.segment_by == "size (MB)":
+            return self.writer.output_size() >= self.segment_length * 2**20
+        return False
+
+    def _next_segment(self):
+        """Start a new segment; the finished one's encoder is closed in the background.
+
+        The next encoder starts before the previous one has flushed, so
+        rotating does not hold up frame delivery.
+        """
+        writer = self._finish_segment()
+        closer = threading.Thread(
+            target=self._close_writer, args=(writer,), name="VideoWriter segment"
+        )
+        closer.start()
+        self._closers = [thread for thread in self._closers if thread.is_alive()]
+        self._closers.append(closer)
+
+        self._segment += 1
+        self._segment_frames = 0
+        self._open_sidecars()
+        self.file_path = os.path.join(
+            self.save_dir, self._segment_name() + self.extension
+        )
+        self.writer = self._make_writer(self.file_path)
+        logger.info("VideoWriter started segment %s", self.file_path)
+
+    def _finish_segment(self):
+        """Close the current segment's sidecars and add it to the manifest.
+
+        :returns: The segment's FFMPEG_Writer, still to be closed.
+        """
         if self.write_frame_index:
             self.frameindex_file.close()
             self.timestamps_file.close()
+        if self.manifest_path is not None and self._segment_frames:
+            (first_index, first_time), (last_index, last_time) = (
+                self._segment_first,
+                self._segment_last,
+            )
+            with open(self.manifest_path, "a", newline="") as manifest:
+                csv.writer(manifest).writerow(
+                    [
+                        self._segment,
+                        os.path.basename(self.file_path),
+                        first_index,
+                        last_index,
+                        self._segment_frames,
+                        first_time.timestamp() if first_time else "",
+                        last_time.timestamp() if last_time else "",
+                    ]
+                )
+        self._segment_frames = 0
+        return self.writer
+
+    @staticmethod
+    def _close_writer(writer):
+        try:
+            writer.close()
+        except Exception as err:
+            logger.exception(
+                "Closing video segment %s failed: %s", writer.file_path, err
+            )
+
+    def spill_stats(self):
+        """Spill usage of this recording's encoders (see SpillMetrics.stats)."""
+        return self.spill_metrics.stats()
+
+    def close(self):
+        """Flush remaining frames and close the ffmpeg subprocess."""
+        writer = self._finish_segment()
         logger.info("Video writer closed")
         self.active = False
-        self.writer.close()
+        writer.close()
+        for closer in self._closers:
+            closer.join()
+        self.spill_metrics.log_stats(self.file_name)
 
 
 import subprocess as sp
@@ -639,6 +908,37 @@ from collections import deque
 from shutil import which  # noqa: F401 — used as mock target by tests
 
 
+def set_pipe_size(fd, size):
+    """Resize the kernel buffer of pipe *fd* to at least *size* bytes (Linux only).
+
+    Unprivileged processes are limited to ``/proc/sys/fs/pipe-max-size``;
+    larger requests fall back to that limit.
+
+    :returns: The resulting buffer size, or ``None`` if it could not be changed.
+    """
+    try:
+        import fcntl
+
+        set_size = fcntl.F_SETPIPE_SZ
+    except (ImportError, AttributeError):
+        return None
+    try:
+        return fcntl.fcntl(fd, set_size, size)
+    except OSError as err:
+        try:
+            with open("/proc/sys/fs/pipe-max-size") as limit_file:
+                limit = int(limit_file.read())
+            if limit >= size:
+                raise err
+            logger.warning(
+                "Pipe size %d bytes exceeds pipe-max-size, using %d", size, limit
+            )
+            return fcntl.fcntl(fd, set_size, limit)
+        except (OSError, ValueError) as err:
+            logger.warning("Could not resize ffmpeg input pipe: %s", err)
+            return None
+
+
 class FFMPEG_Writer:
     """Write frames using ffmpeg as backend
 
@@ -651,6 +951,17 @@ class FFMPEG_Writer:
     :param output_dict: dictionary of output parameters to encode data to disk
     :param buffer_size: max frames to buffer before backpressure (default 120 ~4s at 30fps)
     :param gpu_pixel_conversion: if True, use hwupload_cuda filter for GPU-side format conversion
+    :param pipe_size: if non-zero, feed ffmpeg through an unbuffered pipe whose
+        kernel buffer is resized to this many bytes (see :func:`set_pipe_size`)
+        instead of a buffered stdin pipe.  Frames then go straight from the
+        frame's memory to the kernel without a copy into Python's write
+        buffer, in fewer, larger writes.
+    :param spill_size: if non-zero, frames that find the write queue full are
+        spilled into a memory-mapped file of this many bytes instead of
+        blocking, and written to ffmpeg from there once the queue has
+        drained (see :mod:`rataGUI.spill_buffer`)
+    :param spill_dir: directory of the spill file (default: the video's)
+    :param spill_metrics: SpillMetrics to count spill usage in
     """
 
     def __init__(
@@ -662,12 +973,18 @@ class FFMPEG_Writer:
         buffer_size=120,
         gpu_pixel_conversion=False,
         use_hwaccel=False,
+        cpu_affinity=None,
+        pipe_size=0,
+        spill_size=0,
+        spill_dir=None,
+        spill_metrics=None,
     ):
         """Initialize an ffmpeg pipe-based video writer.
 
         :param file_path: Output video file path.
         :param vcodec: Video codec name.
         :param fps: Target frame rate.
+        :param cpu_affinity: Optional set of CPUs to pin the ffmpeg process to.
         """
 
         self.file_path = os.path.abspath(os.path.normpath(file_path))
@@ -681,8 +998,15 @@ class FFMPEG_Writer:
         self.output_dict = output_dict
         self.verbosity = verbosity
         self.initialized = False
+        self.frame_format = None
         self.gpu_pixel_conversion = gpu_pixel_conversion
         self.use_hwaccel = use_hwaccel
+        self.cpu_affinity = cpu_affinity
+        self.pipe_size = pipe_size
+        self.spill_size = spill_size
+        self.spill_dir = spill_dir
+        self.spill_metrics = spill_metrics
+        self.spill = None
 
         self._FFMPEG_PATH = _which("ffmpeg")
 
@@ -723,15 +1047,45 @@ class FFMPEG_Writer:
         return "\n".join(self._stderr_lines)
 
     def _write_loop(self):
-        """Dedicated thread that drains the write queue to FFMPEG stdin."""
+        """Dedicated thread that drains the write queue to FFMPEG stdin.
+
+        Spilled frames are newer than every queued frame, so they are
+        written once the queue is empty, also after the shutdown sentinel.
+        """
+        closing = False
         try:
             while True:
-                data = self._write_queue.get()
+                spill = self.spill
+                spilled = False
+                try:
+                    data = self._write_queue.get_nowait()
+                except queue.Empty:
+                    if spill is not None and len(spill):
+                        data = spill.peek()
+                        spilled = True
+                    elif closing:
+                        break
+                    else:
+                        data = self._write_queue.get()
                 if data is None:  # Sentinel: shutdown
-                    break
+                    closing = True
+                    continue
                 try:
-                    # Write numpy buffer directly via memoryview — zero-copy to pipe
-                    self._proc.stdin.write(memoryview(data))
+                    if self.pipe_size:
+                        self._write_direct(data)
+                    else:
+                        # Write numpy buffer directly via memoryview — zero-copy to pipe
+                        self._proc.stdin.write(memoryview(data))
+                        idle = self._write_queue.empty() and not (
+                            spill is not None and len(spill) > spilled
+                        )
+                        if idle:
+                            # Don't leave small frames in the pipe's write buffer
+                            # while idle, where a crash would lose them
+                            self._proc.stdin.flush()
+                    if spilled:
+                        data = None  # Release the view of the spill file
+                        spill.pop()
                 except IOError as err:
                     stderr_msg = self._get_stderr_output()
                     if stderr_msg:
@@ -744,22 +1098,30 @@ class FFMPEG_Writer:
         except Exception as err:
             self._write_error = err
 
-    def start_process(self, H, W, C):
-        """Launch the ffmpeg subprocess with the configured codec and resolution."""
+    def _write_direct(self, data):
+        """Write a frame to the unbuffered stdin pipe, which may accept it in parts."""
+        view = memoryview(data).cast("B")
+        while view:
+            written = self._proc.stdin.write(view)
+            view = view[written:]
+
+    def start_process(self, H, W, C, dtype=np.uint8):
+        """Launch the ffmpeg subprocess with the configured codec and resolution.
+
+        The raw input pixel format follows the frame layout, e.g. ``gray`` /
+        ``gray16le`` for 8/16-bit mono and ``rgb24`` / ``rgb48le`` for colour.
+        """
         self.initialized = True
+        shape = (H, W) if C == 1 else (H, W, C)
+        self.frame_format = FrameFormat(shape, dtype)
+        if self.spill_size:
+            self._make_spill()
 
         if "-s" not in self.input_dict:
             self.input_dict["-s"] = str(W) + "x" + str(H)
 
         if "-pix_fmt" not in self.input_dict:
-            if C == 1:
-                self.input_dict["-pix_fmt"] = "gray"
-            elif C == 2:
-                self.input_dict["-pix_fmt"] = "ya8"
-            elif C == 3:
-                self.input_dict["-pix_fmt"] = "rgb24"
-            elif C == 4:
-                self.input_dict["-pix_fmt"] = "rgba"
+            self.input_dict["-pix_fmt"] = self.frame_format.ffmpeg_pix_fmt()
 
         in_args = []
         for key, value in self.input_dict.items():
@@ -795,8 +1157,10 @@ class FFMPEG_Writer:
         self._cmd = " ".join(cmd)
 
         # Use 2MB pipe buffer when hwaccel is active (larger frames benefit),
-        # otherwise 1MB
+        # otherwise 1MB; no Python-side buffer when feeding a resized pipe
         pipe_bufsize = 2 * 1024 * 1024 if self.use_hwaccel else 1024 * 1024
+        if self.pipe_size:
+            pipe_bufsize = 0
 
         if self.verbosity >= 2:
             logger.info(cmd)
@@ -819,6 +1183,14 @@ class FFMPEG_Writer:
                 bufsize=pipe_bufsize,
             )
 
+        if self.cpu_affinity:
+            pin_process(self._proc.pid, self.cpu_affinity, "ffmpeg encoder")
+
+        if self.pipe_size:
+            actual = set_pipe_size(self._proc.stdin.fileno(), self.pipe_size)
+            if actual is not None:
+                logger.info("ffmpeg input pipe resized to %d bytes", actual)
+
         # Drain stderr in a background thread to prevent pipe buffer deadlock
         self._stderr_thread = threading.Thread(target=self._stderr_drain, daemon=True)
         self._stderr_thread.start()
@@ -838,20 +1210,59 @@ class FFMPEG_Writer:
                 f"{stderr_output}\n\nFFMPEG COMMAND: {self._cmd}"
             )
 
+    def _make_spill(self):
+        """Set up the spill buffer; its file is only created once frames spill."""
+        spill_dir = self.spill_dir or os.path.dirname(self.file_path)
+        path = os.path.join(spill_dir, f".{os.path.basename(self.file_path)}.spill")
+        try:
+            self.spill = SpillBuffer(
+                path, self.spill_size, self.frame_format.nbytes, self.spill_metrics
+            )
+        except ValueError as err:
+            logger.warning("%s ... not spilling frames", err)
+
+    def _enqueue(self, img_array):
+        """Queue a frame for the write thread, spilling it if the queue is full.
+
+        Once frames are spilled, later frames are spilled too until the
+        spill has drained, which keeps them in order.
+        """
+        spill = self.spill
+        if spill is not None and (len(spill) or self._write_queue.full()):
+            try:
+                spill.push(img_array)
+                return
+            except OSError as err:
+                if len(spill):
+                    raise
+                logger.error(
+                    "Cannot spill frames to %s ... blocking instead: %s",
+                    spill.path,
+                    err,
+                )
+                self.spill = None
+                spill.close()
+        self._write_queue.put(img_array)
+
     def write_frame(self, img_array):
         """Writes one frame to the file."""
 
-        H, W, C = img_array.shape
+        if img_array.dtype not in _RAW_DTYPES:
+            img_array = img_array.astype(np.uint8)
 
         if not self.initialized:
+            frame_format = FrameFormat.of(img_array)
             logger.info(
-                "FFMPEG_Writer starting: frame_shape=(%d,%d,%d), file=%s",
-                H,
-                W,
-                C,
+                "FFMPEG_Writer starting: frame_format=%s, file=%s",
+                frame_format,
                 self.file_path,
             )
-            self.start_process(H, W, C)
+            self.start_process(
+                frame_format.height,
+                frame_format.width,
+                frame_format.channels,
+                frame_format.dtype,
+            )
             self._frame_count = 0
 
         if self._write_error is not None:
@@ -861,11 +1272,11 @@ class FFMPEG_Writer:
                 msg += f"\nFFMPEG stderr:\n{stderr_output}\n"
             raise IOError(msg)
 
-        # Ensure uint8 C-contiguous layout; no-copy when already correct
-        img_array = np.ascontiguousarray(img_array, dtype=np.uint8)
+        # Ensure C-contiguous layout; no-copy when already correct
+        img_array = np.ascontiguousarray(img_array)
 
         # Enqueue numpy array directly; byte serialization deferred to writer thread
-        self._write_queue.put(img_array)
+        self._enqueue(img_array)
 
         self._frame_count += 1
         if self._frame_count % 1000 == 0:
@@ -880,11 +1291,28 @@ class FFMPEG_Writer:
                 self.file_path,
             )
 
+    def output_size(self):
+        """Bytes ffmpeg has written to the output file so far (0 before it exists)."""
+        try:
+            return os.path.getsize(self.file_path)
+        except OSError:
+            return 0
+
     def close(self):
         """Closes the writer, flushing all buffered frames before terminating."""
         if self._write_thread is not None and self._write_thread.is_alive():
             self._write_queue.put(None)  # Sentinel to stop write loop
             self._write_thread.join(timeout=30)
+            # Spilled frames may take longer to drain; wait while they do
+            while self._write_thread.is_alive() and self.spill is not None:
+                remaining = len(self.spill)
+                self._write_thread.join(timeout=30)
+                if len(self.spill) == remaining:
+                    break
+        if self.spill is not None and not (
+            self._write_thread is not None and self._write_thread.is_alive()
+        ):
+            self.spill.close()
 
         if self._proc is None or self._proc.poll() is not None:
             if self._stderr_thread is not None:
@@ -900,3 +1328,154 @@ class FFMPEG_Writer:
             self._stderr_thread.join(timeout=5)
 
         self._proc = None
+
+
+# Muxer options the stitched file keeps from the chunks' output options
+_CONTAINER_OPTIONS = ("-movflags", "-frag_duration", "-cluster_time_limit")
+
+
+class EncoderPool:
+    """Encode one video in several ffmpeg processes at once.
+
+    Frames are cut into chunks of ``chunk_frames`` consecutive frames, each
+    encoded into its own part file by a fresh FFMPEG_Writer, so every chunk
+    starts with a keyframe.  A finished chunk is closed in the background
+    while the next one is fed, keeping up to ``processes`` encoders busy;
+    starting a chunk beyond that waits for the oldest to finish.  Each
+    chunk's write queue holds the whole chunk, so the caller is not held up
+    by a slow encoder until all of them are busy.  :meth:`close` stitches
+    the parts into ``file_path`` with ffmpeg's concat demuxer, copying the
+    packets without re-encoding.
+
+    Only pays off when one encoder cannot keep up with the camera, and costs
+    up to ``processes * chunk_frames`` buffered frames of memory.
+
+    :param file_path: Path of the stitched video.
+    :param make_writer: Called with a part's path to create its FFMPEG_Writer,
+        and with ``buffer_size`` for the size of its write queue.
+    :param processes: Maximum number of encoder processes at once.
+    :param chunk_frames: Frames per chunk.
+    :param output_dict: The writers' output parameters, for the container
+        options of the stitched file.
+    """
+
+    def __init__(
+        self, file_path, make_writer, processes=2, chunk_frames=120, output_dict=None
+    ):
+        output_dict = output_dict or {}
+        self.file_path = os.path.abspath(os.path.normpath(file_path))
+        self.processes = max(1, processes)
+        self.chunk_frames = max(1, chunk_frames)
+        self._make_writer = make_writer
+        self._container_args = [
+            arg
+            for key in _CONTAINER_OPTIONS
+            if key in output_dict
+            for arg in (key, output_dict[key])
+        ]
+        self.part_paths = []
+        self._writer = None
+        self._chunk_count = 0
+        self._in_flight = []  # (FFMPEG_Writer, closing thread) of finished chunks
+        self._failed = []  # Part paths whose encoder failed to close
+
+    def _part_path(self, number):
+        base, extension = os.path.splitext(self.file_path)
+        return f"{base}.part{number:05d}{extension}"
+
+    def write_frame(self, img_array):
+        """Writes one frame, starting a new chunk when the current one is full."""
+        if self._writer is None or self._chunk_count >= self.chunk_frames:
+            self._next_chunk()
+        self._writer.write_frame(img_array)
+        self._chunk_count += 1
+
+    def _next_chunk(self):
+        if self._writer is not None:
+            # Backpressure: wait for an encoder to finish if all are busy
+            self._in_flight = [
+                entry for entry in self._in_flight if entry[1].is_alive()
+            ]
+            while self._in_flight and len(self._in_flight) >= self.processes - 1:
+                self._in_flight.pop(0)[1].join()
+            self._close_chunk(self._writer)
+        path = self._part_path(len(self.part_paths))
+        self.part_paths.append(path)
+        self._writer = self._make_writer(path, buffer_size=self.chunk_frames)
+        self._chunk_count = 0
+
+    def _close_chunk(self, writer):
+        def close():
+            try:
+                writer.close()
+            except Exception as err:
+                logger.exception(
+                    "Closing video chunk %s failed: %s", writer.file_path, err
+                )
+                self._failed.append(writer.file_path)
+
+        closer = threading.Thread(target=close, name="EncoderPool chunk")
+        closer.start()
+        self._in_flight.append((writer, closer))
+
+    def output_size(self):
+        """Bytes written to the part files so far."""
+        size = 0
+        for path in self.part_paths:
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def close(self):
+        """Closes all encoders and stitches their parts into ``file_path``."""
+        if self._writer is not None:
+            self._close_chunk(self._writer)
+            self._writer = None
+        for _, closer in self._in_flight:
+            closer.join()
+        self._in_flight = []
+        parts = [
+            path
+            for path in self.part_paths
+            if path not in self._failed and os.path.isfile(path)
+        ]
+        if not parts:
+            return
+        if len(parts) < len(self.part_paths):
+            logger.error(
+                "EncoderPool stitching %d of %d chunks of %s",
+                len(parts),
+                len(self.part_paths),
+                self.file_path,
+            )
+        self._stitch(parts)
+
+    def _stitch(self, parts):
+        """Concatenate *parts* into ``file_path``; parts are kept if that fails."""
+        list_path = os.path.splitext(self.file_path)[0] + ".parts.txt"
+        with open(list_path, "w") as list_file:
+            for path in parts:
+                escaped = path.replace("'", "'\\''")
+                list_file.write(f"file '{escaped}'\n")
+        cmd = (
+            [_which("ffmpeg"), "-y", "-v", "error", "-f", "concat", "-safe", "0"]
+            + ["-i", list_path, "-map", "0", "-c", "copy"]
+            + self._container_args
+            + [self.file_path]
+        )
+        result = sp.run(cmd, stdout=sp.DEVNULL, stderr=sp.PIPE)
+        if result.returncode != 0:
+            logger.error(
+                "Stitching %s failed, keeping its %d chunks: %s",
+                self.file_path,
+                len(parts),
+                result.stderr.decode("utf-8", errors="replace").strip(),
+            )
+            return
+        for path in parts + [list_path]:
+            os.remove(path)
+        logger.info(
+            "EncoderPool stitched %d chunks into %s", len(parts), self.file_path
+        )
@@ -0,0 +1,686 @@
+"""Cross-process frame ring in shared memory with per-slot ownership.
+
+The ring is one ``SharedMemory`` segment laid out as::
+
+    counters    int64[NUM_COUNTERS]   (see COUNTERS)
+    control     int64[NUM_CONTROLS]   doorbell handshake and stop request
+    slot_seq    int64[num_slots]      sequence number of the frame in each slot
+    slot_state  int64[num_slots]      FREE / WRITING / READY / HELD
+    extra_keys  KEY_DTYPE[MAX_EXTRA_KEYS]     names of extra metadata values
+    records     RECORD_DTYPE[num_slots]       metadata of the frame in each slot
+    overflow    uint8[num_slots, OVERFLOW_BYTES]  pickled metadata of each slot
+    frames      dtype[num_slots, *frame_shape]   (H, W) mono or (H, W, C)
+
+Each section starts on a 64-byte boundary.  The camera subprocess is the
+only producer: it takes a FREE slot, writes the frame (WRITING), and
+publishes it with a new sequence number (READY).  The main process claims a
+READY slot by ``(slot, seq)`` (HELD) and releases it back to FREE when every
+holder is done.  State transitions happen under a shared
+``multiprocessing.Condition`` so that a slot can never be written while the
+main process is reading it; the sequence number tells the main process when
+a READY slot it was told about has since been reclaimed for a newer frame.
+
+Frame metadata travels in the fixed-layout record next to each slot rather
+than being pickled per frame: frame index, camera index, a
+``time.monotonic_ns()`` acquisition timestamp, and up to
+``MAX_EXTRA_KEYS`` further numeric values whose names are registered once
+in the ``extra_keys`` table.  Values that do not fit there (strings,
+datetimes, nested values, long key names, keys beyond the first
+``MAX_EXTRA_KEYS``) are pickled into the slot's ``overflow`` area of
+``OVERFLOW_BYTES``; only metadata too large for that is dropped, counted in
+``"metadata_dropped"`` and logged.  The producer notifies the main process through
+a *doorbell* — the write end of a ``multiprocessing.Pipe`` — but only when
+the main process has found nothing new and armed it, so a busy consumer
+picks up whole batches of frames without any notification at all.  Rare
+out-of-band events (e.g. a geometry report) are sent pickled on the same
+pipe; anything other than :data:`DOORBELL` is such an event.
+"""
+
+import logging
+import pickle
+import time
+from datetime import datetime
+
+import numpy as np
+from multiprocessing.shared_memory import SharedMemory
+
+from rataGUI.frame_format import FrameFormat
+from rataGUI.frame_memory import open_segment
+
+logger = logging.getLogger(__name__)
+
+# Slot states
+FREE, WRITING, READY, HELD = 0, 1, 2, 3
+
+# What the camera subprocess does when every slot is in use:
+#   block        — wait for the main process to release a slot (lossless)
+#   drop_newest  — discard the frame that was just read
+#   drop_oldest  — overwrite the oldest frame the main process has not claimed yet
+BACKPRESSURE_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+# Counters stored at the start of the segment.  All but "stale_claims" are
+# written only by the producer; "stale_claims" only by the consumer.
+COUNTERS = (
+    "frames_published",
+    "blocked",
+    "blocked_ns",
+    "dropped_newest",
+    "dropped_oldest",
+    "stale_claims",
+    "doorbells",
+    "metadata_dropped",
+)
+NUM_COUNTERS = len(COUNTERS)
+
+# Control words, both written by the consumer: DOORBELL_ARMED when it is
+# about to wait for frames, STOP_REQUESTED to interrupt a blocked producer
+DOORBELL_ARMED = 0
+STOP_REQUESTED = 1
+NUM_CONTROLS = 2
+
+# Byte sent on the doorbell pipe to announce newly published frames
+DOORBELL = b"\x01"
+
+# Per-slot metadata record.  ``extra`` holds the raw 8 bytes of each value
+# named in the key table; bit i of ``extra_mask`` marks value i as present.
+# ``overflow_len`` is the size of the pickled overflow dict (0 for none).
+MAX_EXTRA_KEYS = 8
+MAX_KEY_LENGTH = 32
+OVERFLOW_BYTES = 4096
+RECORD_DTYPE = np.dtype(
+    [
+        ("frame_index", np.int64),
+        ("camera_index", np.int64),  # -1 when the camera does not report one
+        ("monotonic_ns", np.int64),
+        ("extra_mask", np.int64),
+        ("extra", np.int64, (MAX_EXTRA_KEYS,)),
+        ("overflow_len", np.int64),
+    ]
+)
+KEY_DTYPE = np.dtype([("name", f"S{MAX_KEY_LENGTH}"), ("kind", "S1")])
+
+# Metadata keys with a dedicated record field
+_RECORD_FIELDS = {"Frame Index": "frame_index", "Camera Index": "camera_index"}
+
+# Replaced by the acquisition time on the main process side (see
+# SharedFrameLeases.acquire), so never stored
+_TIMESTAMP_KEY = "Timestamp"
+
+_ALIGN = 64
+
+# Default shared memory per camera, and the bounds on the slot count it buys
+DEFAULT_BUDGET_MB = 256
+MIN_SLOTS = 2
+MAX_SLOTS = 32
+
+
+def _aligned(nbytes: int) -> int:
+    return (nbytes + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _value_kind(value) -> bytes | None:
+    """Extra-entry kind of a metadata value: ``b"i"``, ``b"f"`` or ``None``."""
+    if isinstance(value, (bool, int, np.integer)):
+        return b"i"
+    if isinstance(value, (float, np.floating)):
+        return b"f"
+    return None
+
+
+class SharedFrameRing:
+    """View of a shared-memory frame ring from either side of the process boundary.
+
+    Use :meth:`create` in the main process and :meth:`attach` in the camera
+    subprocess; both must be given the same *cond*.
+
+    :param shm: The backing ``SharedMemory`` (or :class:`~rataGUI.frame_memory.FileSegment`).
+    :param num_slots: Number of frame slots.
+    :param frame_shape: Shape of one frame, e.g. ``(H, W, C)``.
+    :param cond: ``multiprocessing.Condition`` guarding slot state transitions.
+    :param dtype: Frame element type.
+    :param owner: Whether :meth:`close` should also unlink the segment.
+    :param doorbell: Producer only: write end of the doorbell pipe.
+    """
+
+    def __init__(
+        self,
+        shm,
+        num_slots,
+        frame_shape,
+        cond,
+        dtype=np.uint8,
+        owner=False,
+        doorbell=None,
+    ):
+        self.shm = shm
+        self.num_slots = num_slots
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.cond = cond
+        self.doorbell = doorbell
+        self._owner = owner
+        self._extra_kinds = {}  # producer-side cache: name -> (index, kind)
+        self._overflow_keys = set()  # producer-side: keys that go to the overflow
+        self._overflow_warned = False
+
+        offset = 0
+        self.counters = np.ndarray((NUM_COUNTERS,), np.int64, shm.buf, offset)
+        offset += _aligned(self.counters.nbytes)
+        self.control = np.ndarray((NUM_CONTROLS,), np.int64, shm.buf, offset)
+        offset += _aligned(self.control.nbytes)
+        self.slot_seq = np.ndarray((num_slots,), np.int64, shm.buf, offset)
+        offset += _aligned(self.slot_seq.nbytes)
+        self.slot_state = np.ndarray((num_slots,), np.int64, shm.buf, offset)
+        offset += _aligned(self.slot_state.nbytes)
+        self.extra_keys = np.ndarray((MAX_EXTRA_KEYS,), KEY_DTYPE, shm.buf, offset)
+        offset += _aligned(self.extra_keys.nbytes)
+        self.records = np.ndarray((num_slots,), RECORD_DTYPE, shm.buf, offset)
+        offset += _aligned(self.records.nbytes)
+        self.overflow = np.ndarray(
+            (num_slots, OVERFLOW_BYTES), np.uint8, shm.buf, offset
+        )
+        offset += _aligned(self.overflow.nbytes)
+        self.frames = np.ndarray(
+            (num_slots, *self.frame_shape), self.dtype, shm.buf, offset
+        )
+
+    @staticmethod
+    def nbytes(num_slots: int, frame_shape: tuple, dtype=np.uint8) -> int:
+        """Size in bytes of a segment holding *num_slots* frames of *frame_shape*."""
+        frame_bytes = int(np.prod(frame_shape)) * np.dtype(dtype).itemsize
+        return (
+            _aligned(NUM_COUNTERS * 8)
+            + _aligned(NUM_CONTROLS * 8)
+            + 2 * _aligned(num_slots * 8)
+            + _aligned(MAX_EXTRA_KEYS * KEY_DTYPE.itemsize)
+            + _aligned(num_slots * RECORD_DTYPE.itemsize)
+            + _aligned(num_slots * OVERFLOW_BYTES)
+            + num_slots * frame_bytes
+        )
+
+    @classmethod
+    def create(cls, num_slots, frame_shape, cond, dtype=np.uint8, memory=None):
+        """Allocate a new zeroed segment.  The returned ring owns (unlinks) it.
+
+        :param memory: Optional :class:`~rataGUI.frame_memory.FrameMemory`
+            placing the segment (huge pages, pre-faulting, NUMA node).
+        """
+        size = cls.nbytes(num_slots, frame_shape, dtype)
+        if memory is not None:
+            shm = memory.shared_segment(size)
+        else:
+            shm = SharedMemory(create=True, size=size)
+        ring = cls(shm, num_slots, frame_shape, cond, dtype, owner=True)
+        ring.counters[:] = 0
+        ring.control[:] = 0
+        ring.slot_seq[:] = 0
+        ring.slot_state[:] = FREE
+        ring.extra_keys[:] = np.zeros((), KEY_DTYPE)
+        return ring
+
+    @classmethod
+    def attach(cls, name, num_slots, frame_shape, cond, dtype=np.uint8, doorbell=None):
+        """Attach to an existing segment created by :meth:`create`."""
+        shm = open_segment(name)
+        return cls(shm, num_slots, frame_shape, cond, dtype, doorbell=doorbell)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def format(self) -> FrameFormat:
+        return FrameFormat(self.frame_shape, self.dtype)
+
+    def control_message(self) -> tuple:
+        """Message telling the camera subprocess to attach to this ring."""
+        return ("ring", self.name, self.num_slots, self.frame_shape, self.dtype.str)
+
+    # -- Producer API (camera subprocess) -------------------------------------
+
+    def try_acquire(self) -> int | None:
+        """Take a FREE slot for writing, or return ``None`` if there is none."""
+        with self.cond:
+            return self._take_free()
+
+    def wait_acquire(self, timeout: float) -> int | None:
+        """Like :meth:`try_acquire` but wait up to *timeout* seconds for a release.
+
+        Returns immediately once a stop has been requested.
+        """
+        with self.cond:
+            slot_idx = self._take_free()
+            if slot_idx is None and not self.control[STOP_REQUESTED]:
+                self.cond.wait(timeout)
+                slot_idx = self._take_free()
+            return slot_idx
+
+    def reclaim_oldest(self) -> int | None:
+        """Take the oldest READY (published but unclaimed) slot for writing."""
+        with self.cond:
+            ready = np.flatnonzero(self.slot_state == READY)
+            if ready.size == 0:
+                return None
+            slot_idx = int(ready[np.argmin(self.slot_seq[ready])])
+            self.slot_state[slot_idx] = WRITING
+            return slot_idx
+
+    def write_record(self, slot_idx: int, metadata: dict, monotonic_ns: int) -> None:
+        """Store *metadata* in the record of the slot being written.
+
+        ``"Frame Index"`` and ``"Camera Index"`` have dedicated fields; other
+        int, float or bool values take one of ``MAX_EXTRA_KEYS`` extra
+        entries, registered by name the first time they are seen.  All other
+        values are pickled into the slot's overflow area (see
+        :meth:`_write_overflow`).  ``"Timestamp"`` is not stored; the main
+        process derives it from *monotonic_ns*.
+        """
+        record = self.records[slot_idx]
+        record["frame_index"] = metadata.get("Frame Index", -1)
+        record["camera_index"] = metadata.get("Camera Index", -1)
+        record["monotonic_ns"] = monotonic_ns
+        mask = 0
+        overflow = None
+        for key, value in metadata.items():
+            if key in _RECORD_FIELDS or key == _TIMESTAMP_KEY:
+                continue
+            entry = self._extra_entry(key, value)
+            if entry is None:
+                if overflow is None:
+                    overflow = {}
+                overflow[key] = value
+                continue
+            index, kind = entry
+            if kind == b"f":
+                record["extra"][index] = np.float64(value).view(np.int64)
+            else:
+                record["extra"][index] = int(value)
+            mask |= 1 << index
+        record["extra_mask"] = mask
+        record["overflow_len"] = self._write_overflow(slot_idx, overflow)
+
+    def _extra_entry(self, key, value):
+        """``(index, kind)`` of *key*'s extra entry, or ``None`` if it does not fit."""
+        kind = _value_kind(value)
+        entry = self._extra_kinds.get(key)
+        if entry is not None:
+            return entry if entry[1] == kind else None
+        if kind is None or key in self._overflow_keys:
+            return None
+        name = str(key).encode()
+        index = len(self._extra_kinds)
+        if len(name) > MAX_KEY_LENGTH or index >= MAX_EXTRA_KEYS:
+            self._overflow_keys.add(key)
+            return None
+        # Published to the consumer by the commit of the first frame using it
+        self.extra_keys[index] = (name, kind)
+        self._extra_kinds[key] = (index, kind)
+        return index, kind
+
+    def _write_overflow(self, slot_idx, overflow) -> int:
+        """Pickle *overflow* into the slot's overflow area; returns its length.
+
+        Metadata that cannot be pickled or takes more than ``OVERFLOW_BYTES``
+        is dropped, counted in ``"metadata_dropped"`` and logged once.
+        """
+        if not overflow:
+            return 0
+        try:
+            blob = pickle.dumps(overflow, protocol=pickle.HIGHEST_PROTOCOL)
+            if len(blob) > OVERFLOW_BYTES:
+                raise ValueError(
+                    f"{len(blob)} bytes pickled, the limit is {OVERFLOW_BYTES}"
+                )
+        except Exception as err:
+            self.count("metadata_dropped")
+            if not self._overflow_warned:
+                self._overflow_warned = True
+                logger.warning(
+                    "Metadata %s does not fit in the shared memory record "
+                    "(%s) ... dropping it",
+                    sorted(map(str, overflow)),
+                    err,
+                )
+            return 0
+        self.overflow[slot_idx, : len(blob)] = np.frombuffer(blob, np.uint8)
+        return len(blob)
+
+    def commit(self, slot_idx: int) -> int:
+        """Publish the frame written into *slot_idx*.  Returns its sequence number.
+
+        Rings the doorbell if the consumer armed it while waiting for frames.
+        """
+        seq = int(self.counters[0]) + 1
+        with self.cond:
+            self.slot_seq[slot_idx] = seq
+            self.slot_state[slot_idx] = READY
+            wake = bool(self.control[DOORBELL_ARMED])
+            self.control[DOORBELL_ARMED] = 0
+        self.counters[0] = seq
+        if wake and self.doorbell is not None:
+            self.doorbell.send_bytes(DOORBELL)
+            self.count("doorbells")
+        return seq
+
+    def abort(self, slot_idx: int) -> None:
+        """Return a slot taken for writing without publishing it."""
+        with self.cond:
+            self.slot_state[slot_idx] = FREE
+            self.cond.notify()
+
+    @property
+    def stop_requested(self) -> bool:
+        """Whether the main process asked the producer to stop (see :meth:`request_stop`)."""
+        return bool(self.control[STOP_REQUESTED])
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        """Increment one of :data:`COUNTERS`."""
+        self.counters[COUNTERS.index(counter)] += amount
+
+    def _take_free(self) -> int | None:
+        free = np.flatnonzero(self.slot_state == FREE)
+        if free.size == 0:
+            return None
+        slot_idx = int(free[0])
+        self.slot_state[slot_idx] = WRITING
+        return slot_idx
+
+    # -- Consumer API (main process) ------------------------------------------
+
+    def ready_after(self, seq: int, arm_doorbell: bool = False) -> list:
+        """``(slot, seq)`` of READY frames published after *seq*, oldest first.
+
+        With *arm_doorbell*, ask the producer to ring the doorbell on its next
+        commit if there is nothing to return.
+        """
+        with self.cond:
+            slots = np.flatnonzero((self.slot_state == READY) & (self.slot_seq > seq))
+            if slots.size == 0:
+                if arm_doorbell:
+                    self.control[DOORBELL_ARMED] = 1
+                return []
+            slots = slots[np.argsort(self.slot_seq[slots])]
+            return [(int(slot_idx), int(self.slot_seq[slot_idx])) for slot_idx in slots]
+
+    def read_record(self, slot_idx: int) -> tuple[dict, int]:
+        """Metadata of the frame in a claimed slot, and its ``monotonic_ns`` timestamp."""
+        record = self.records[slot_idx]
+        metadata = {"Frame Index": int(record["frame_index"])}
+        if record["camera_index"] >= 0:
+            metadata["Camera Index"] = int(record["camera_index"])
+        mask = int(record["extra_mask"])
+        for index in range(MAX_EXTRA_KEYS):
+            if mask & (1 << index):
+                name, kind = self.extra_keys[index]
+                value = record["extra"][index]
+                if kind == b"f":
+                    metadata[name.decode()] = float(value.view(np.float64))
+                else:
+                    metadata[name.decode()] = int(value)
+        overflow_len = int(record["overflow_len"])
+        if overflow_len:
+            metadata.update(pickle.loads(self.overflow[slot_idx, :overflow_len]))
+        return metadata, int(record["monotonic_ns"])
+
+    def claim(self, slot_idx: int, seq: int) -> bool:
+        """Take ownership of frame *seq* in *slot_idx*.
+
+        Returns ``False`` if the slot has been reclaimed for a newer frame
+        since *seq* was published (``drop_oldest`` policy).
+        """
+        with self.cond:
+            if self.slot_state[slot_idx] == READY and self.slot_seq[slot_idx] == seq:
+                self.slot_state[slot_idx] = HELD
+                return True
+        self.count("stale_claims")
+        return False
+
+    def release(self, slot_idx: int) -> None:
+        """Hand *slot_idx* back to the producer and wake it if it is waiting."""
+        with self.cond:
+            self.slot_state[slot_idx] = FREE
+            self.cond.notify()
+
+    def request_stop(self) -> None:
+        """Ask the producer to stop, waking it if it is blocked waiting for a slot."""
+        with self.cond:
+            self.control[STOP_REQUESTED] = 1
+            self.cond.notify_all()
+
+    # -- Housekeeping ---------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Snapshot of the ring's counters."""
+        return {name: int(value) for name, value in zip(COUNTERS, self.counters)}
+
+    def close(self) -> None:
+        """Drop the numpy views and close (and, for the creator, unlink) the segment."""
+        self.counters = self.control = self.slot_seq = self.slot_state = None
+        self.extra_keys = self.records = self.overflow = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            logger.warning(
+                "Shared frame ring %s still has live frame views at close", self.name
+            )
+        if self._owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass  # already unlinked (or Windows, where unlink is a no-op)
+
+
+# Metadata key carrying the shared-memory slot a frame view points into.
+SHM_SLOT_KEY = "Shared Memory Slot"
+
+
+class SharedFrameLeases:
+    """Main-process ownership of frames living in a :class:`SharedFrameRing`.
+
+    :meth:`poll` waits on the doorbell for newly published frames;
+    :meth:`acquire` claims one and hands out a **read-only** view of it (no
+    copy) together with its metadata, tagged with the slot index.
+    Every holder of the view must eventually call :meth:`release` (or
+    :meth:`release_metadata`); when the reference count drops to zero the
+    slot is returned to the camera subprocess.
+
+    All methods are expected to run on the pipeline's event loop thread.
+
+    :param ring: The ring the camera subprocess publishes into.  May be set
+        later with :meth:`set_ring` once the frame geometry is known.
+    :param on_drained: Optional callback run when the last held slot is released.
+    """
+
+    def __init__(self, ring: SharedFrameRing | None = None, on_drained=None):
+        self.ring = None
+        self.ref_counts = []
+        self.last_seq = 0
+        self.on_drained = on_drained
+        if ring is not None:
+            self.set_ring(ring)
+
+    def set_ring(self, ring: SharedFrameRing) -> None:
+        """Switch to a new ring.  Every frame of the previous ring must be released."""
+        if self.outstanding():
+            raise RuntimeError(
+                f"Cannot switch rings with {self.outstanding()} frames still held"
+            )
+        self.ring = ring
+        self.ref_counts = [0] * ring.num_slots
+        self.last_seq = 0
+
+    def poll(self, doorbell, timeout: float) -> tuple[list, list]:
+        """Wait up to *timeout* seconds for new frames or subprocess events.
+
+        Returns ``(frames, events)``:
+        ``(slot, seq)`` pairs to pass to :meth:`acquire`, oldest first, and
+        any events read from the doorbell pipe.  Frames are always from
+        before the events, so they should be handled first.
+
+        :param doorbell: Read end of the doorbell pipe.
+        :raises EOFError: If the producer closed the doorbell (process exited).
+        """
+        frames = self._ready(arm_doorbell=True)
+        events = []
+        if not frames and doorbell.poll(timeout):
+            try:
+                events = drain_doorbell(doorbell)
+            except EOFError:
+                # Frames published just before the producer exited come first
+                frames = self._ready()
+                if not frames:
+                    raise
+            else:
+                frames = self._ready()
+        if frames:
+            self.last_seq = frames[-1][1]
+        return frames, events
+
+    def _ready(self, arm_doorbell=False):
+        if self.ring is None:
+            return []
+        return self.ring.ready_after(self.last_seq, arm_doorbell)
+
+    def acquire(self, slot_idx: int, seq: int) -> tuple[np.ndarray, dict] | None:
+        """Claim frame *seq* in *slot_idx*.
+
+        Returns a read-only view of the frame and its metadata (with a
+        wall-clock ``"Timestamp"``), or ``None`` if the frame was overwritten
+        before it could be claimed.
+        """
+        if not self.ring.claim(slot_idx, seq):
+            return None
+        self.ref_counts[slot_idx] = 1
+        metadata, monotonic_ns = self.ring.read_record(slot_idx)
+        wall_ns = monotonic_ns + time.time_ns() - time.monotonic_ns()
+        metadata["Timestamp"] = datetime.fromtimestamp(wall_ns / 1e9)
+        metadata[SHM_SLOT_KEY] = slot_idx
+        view = self.ring.frames[slot_idx].view()
+        view.flags.writeable = False
+        return view, metadata
+
+    def retain(self, slot_idx: int) -> None:
+        """Register an additional holder of *slot_idx*."""
+        self.ref_counts[slot_idx] += 1
+
+    def release(self, slot_idx: int) -> None:
+        """Drop one reference to *slot_idx*, returning it to the subprocess at zero."""
+        if self.ref_counts[slot_idx] <= 0:
+            return
+        self.ref_counts[slot_idx] -= 1
+        if self.ref_counts[slot_idx] == 0:
+            self.ring.release(slot_idx)
+            if self.on_drained is not None and not self.outstanding():
+                self.on_drained()
+
+    def release_metadata(self, metadata: dict | None) -> None:
+        """Release the slot recorded in *metadata*, if any.  Idempotent per frame."""
+        if metadata is None:
+            return
+        slot_idx = metadata.pop(SHM_SLOT_KEY, None)
+        if slot_idx is not None:
+            self.release(slot_idx)
+
+    def outstanding(self) -> int:
+        """Number of slots currently held by the main process."""
+        return sum(1 for count in self.ref_counts if count > 0)
+
+
+def send_event(doorbell, event) -> None:
+    """Send a (rare) out-of-band *event* to the main process on the doorbell pipe."""
+    doorbell.send_bytes(pickle.dumps(event))
+
+
+def drain_doorbell(doorbell) -> list:
+    """Read everything pending on the doorbell pipe and return the events among it.
+
+    :raises EOFError: If the pipe is closed and no event preceded the EOF.
+    """
+    events = []
+    while doorbell.poll():
+        try:
+            message = doorbell.recv_bytes()
+        except EOFError:
+            if events:
+                break  # EOF is reported by the next call
+            raise
+        if message != DOORBELL:
+            events.append(pickle.loads(message))
+    return events
+
+
+def frame_geometry(frame: np.ndarray) -> dict:
+    """Shape, dtype and strides of a frame as reported by the camera subprocess."""
+    return {
+        "shape": tuple(frame.shape),
+        "dtype": frame.dtype.str,
+        "strides": tuple(frame.strides),
+    }
+
+
+def slots_for_budget(frame_shape: tuple, dtype, budget_mb: float) -> int:
+    """Number of ring slots for frames of *frame_shape* that fit in *budget_mb*.
+
+    Clamped to ``[MIN_SLOTS, MAX_SLOTS]``; a budget too small for
+    ``MIN_SLOTS`` frames is exceeded rather than starving the pipeline.
+    """
+    frame_bytes = int(np.prod(frame_shape)) * np.dtype(dtype).itemsize
+    num_slots = int(budget_mb * 1024 * 1024) // max(frame_bytes, 1)
+    if num_slots < MIN_SLOTS:
+        logger.warning(
+            "Shared memory budget of %s MB holds fewer than %d frames of shape %s ... "
+            "using %d slots",
+            budget_mb,
+            MIN_SLOTS,
+            frame_shape,
+            MIN_SLOTS,
+        )
+    return max(MIN_SLOTS, min(MAX_SLOTS, num_slots))
+
+
+def ring_for_geometry(
+    geometry: dict, cond, budget_mb: float = DEFAULT_BUDGET_MB, memory=None
+):
+    """Create a :class:`SharedFrameRing` sized for frames described by *geometry*."""
+    frame_shape = tuple(geometry["shape"])
+    dtype = np.dtype(geometry["dtype"])
+    num_slots = slots_for_budget(frame_shape, dtype, budget_mb)
+    return SharedFrameRing.create(num_slots, frame_shape, cond, dtype, memory=memory)
+
+
+def wait_for_slot(ring: SharedFrameRing, policy: str, should_stop) -> int | None:
+    """Producer-side slot selection implementing a backpressure *policy*.
+
+    Returns a slot index ready to be written, or ``None`` if the frame must
+    be dropped (``drop_*`` policies) or *should_stop()* became true while
+    blocking.  A blocked producer is woken by every release and by
+    :meth:`SharedFrameRing.request_stop`; the wait timeout is only a safety
+    net in case the main process dies.  Updates the ring's per-policy counters.
+    """
+    slot_idx = ring.try_acquire()
+    if slot_idx is not None:
+        return slot_idx
+
+    if policy == "drop_newest":
+        ring.count("dropped_newest")
+        return None
+
+    if policy == "drop_oldest":
+        slot_idx = ring.reclaim_oldest()
+        if slot_idx is None:
+            # Every slot is held by the main process; nothing can be reclaimed
+            ring.count("dropped_newest")
+        else:
+            ring.count("dropped_oldest")
+        return slot_idx
+
+    ring.count("blocked")
+    t0 = time.perf_counter_ns()
+    try:
+        while slot_idx is None:
+            if should_stop() or ring.stop_requested:
+                return None
+            slot_idx = ring.wait_acquire(timeout=1.0)
+        return slot_idx
+    finally:
+        ring.count("blocked_ns", time.perf_counter_ns() - t0)
@@ -0,0 +1,177 @@
+"""Disk overflow for a video encoder's write queue.
+
+FFMPEG_Writer hands frames to ffmpeg through a bounded in-memory queue.  If
+the encoder stalls for longer than the queue covers, ``write_frame`` blocks
+and the stall backs up through the pipeline into the camera.  A
+:class:`SpillBuffer` adds a second tier: frames that do not fit into the
+queue are copied into a fixed-size, memory-mapped file on a fast local disk
+and written to ffmpeg from there, in order, once the queue has drained.
+Only a full spill file blocks the caller again.
+
+The file is created on the first spilled frame and removed on close.  Usage
+is counted in a :class:`SpillMetrics`, which several buffers may share
+(e.g. the segments and chunks of one recording).
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class SpillMetrics:
+    """Spill counters, safe to share between the buffers of one recording."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spilled = 0  # Frames written to a spill file
+        self.drained = 0  # Spilled frames passed on to the encoder
+        self.in_spill = 0  # Frames currently spilled
+        self.peak = 0  # Most frames spilled at once
+        self.peak_bytes = 0
+        self.full_waits = 0  # Frames that had to wait for a full spill file
+        self._bytes = 0
+
+    def _spilled(self, nbytes: int) -> None:
+        with self._lock:
+            self.spilled += 1
+            self.in_spill += 1
+            self._bytes += nbytes
+            self.peak = max(self.peak, self.in_spill)
+            self.peak_bytes = max(self.peak_bytes, self._bytes)
+
+    def _drained(self, nbytes: int) -> None:
+        with self._lock:
+            self.drained += 1
+            self.in_spill -= 1
+            self._bytes -= nbytes
+
+    def _full_wait(self) -> None:
+        with self._lock:
+            self.full_waits += 1
+
+    def stats(self) -> dict:
+        """Frames spilled, drained and still spilled, peak usage and full waits."""
+        with self._lock:
+            return {
+                "spilled": self.spilled,
+                "drained": self.drained,
+                "in spill": self.in_spill,
+                "peak frames": self.peak,
+                "peak (MB)": self.peak_bytes / 2**20,
+                "full waits": self.full_waits,
+            }
+
+    def log_stats(self, name: str) -> None:
+        """Log the counters of recording *name*, warning if the spill file filled up."""
+        stats = self.stats()
+        if not stats["spilled"]:
+            return
+        log = logger.warning if stats["full waits"] else logger.info
+        log(
+            "Encoder spill of %s: %d frames spilled (peak %d frames, %.1f MB), "
+            "%d drained, %d waited for a full spill file",
+            name,
+            stats["spilled"],
+            stats["peak frames"],
+            stats["peak (MB)"],
+            stats["drained"],
+            stats["full waits"],
+        )
+
+
+class SpillBuffer:
+    """FIFO of equally sized frames in a memory-mapped file.
+
+    One thread pushes frames, another reads them with :meth:`peek` and
+    releases them with :meth:`pop` once written, so a frame is read straight
+    from the mapping without a copy.
+
+    :param path: Spill file to create (removed again by :meth:`close`).
+    :param size: Size of the file in bytes; it holds ``size // frame_nbytes``
+        frames.
+    :param frame_nbytes: Bytes per frame.
+    :param metrics: Counters to update; a new :class:`SpillMetrics` if omitted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        frame_nbytes: int,
+        metrics: SpillMetrics | None = None,
+    ):
+        self.path = path
+        self.frame_nbytes = frame_nbytes
+        self.capacity = size // frame_nbytes
+        if self.capacity < 1:
+            raise ValueError(
+                f"Spill size of {size} bytes cannot hold a {frame_nbytes}-byte frame"
+            )
+        self.metrics = metrics if metrics is not None else SpillMetrics()
+        self._map = None
+        self._head = 0  # Slot of the oldest frame
+        self._count = 0
+        self._cond = threading.Condition()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _open(self) -> None:
+        size = self.capacity * self.frame_nbytes
+        with open(self.path, "w+b") as file:
+            file.truncate(size)
+            self._map = mmap.mmap(file.fileno(), size)
+        logger.info(
+            "Spilling encoder input to %s (%d frames, %.1f MB)",
+            self.path,
+            self.capacity,
+            size / 2**20,
+        )
+
+    def push(self, frame) -> None:
+        """Copy C-contiguous *frame* into the file, waiting while it is full."""
+        with self._cond:
+            if self._count == self.capacity:
+                self.metrics._full_wait()
+                while self._count == self.capacity:
+                    self._cond.wait()
+            tail = (self._head + self._count) % self.capacity
+        if self._map is None:
+            self._open()
+        # Only this thread writes the tail slot, so copy outside the lock
+        offset = tail * self.frame_nbytes
+        self._map[offset : offset + self.frame_nbytes] = memoryview(frame).cast("B")
+        with self._cond:
+            self._count += 1
+        self.metrics._spilled(self.frame_nbytes)
+
+    def peek(self) -> memoryview | None:
+        """The oldest frame's bytes (valid until :meth:`pop`), or ``None``."""
+        if self._count == 0:
+            return None
+        offset = self._head * self.frame_nbytes
+        return memoryview(self._map)[offset : offset + self.frame_nbytes]
+
+    def pop(self) -> None:
+        """Release the oldest frame's slot."""
+        with self._cond:
+            self._head = (self._head + 1) % self.capacity
+            self._count -= 1
+            self._cond.notify()
+        self.metrics._drained(self.frame_nbytes)
+
+    def close(self) -> None:
+        """Unmap and delete the spill file; frames still in it are lost."""
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:  # A peeked frame is still referenced
+                logger.warning("Spill file %s still in use when closed", self.path)
+            self._map = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
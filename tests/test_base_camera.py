@@ -54,6 +54,9 @@ class TestBaseCameraInit:
         meta = cam.getMetadata()
         assert meta == {"Frame Index": 10}
 
+    def test_frame_format_unknown_by_default(self):
+        assert ConcreteCamera("cam0").getFrameFormat() is None
+
     def test_str_representation(self):
         cam = ConcreteCamera("cam0")
         assert str(cam) == "Camera ID: cam0"
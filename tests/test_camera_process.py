@@ -8,6 +8,7 @@ for mod_name in _qt_modules:
         sys.modules[mod_name] = MagicMock()
 
 import multiprocessing
+import queue
 import threading
 import time
 
@@ -15,6 +16,7 @@ import numpy as np
 import pytest
 
 from rataGUI.cameras.BaseCamera import BaseCamera
+from rataGUI.shared_frame_ring import SharedFrameRing
 
 
 # --- Concrete test camera that records calls --------------------------------
@@ -26,6 +28,7 @@ class _MockCamera(BaseCamera):
     _init_should_fail = False
     _frames_to_produce = 5
     _frame_shape = (480, 640, 3)
+    _resized_frame = None  # frame returned from the third frame on, if set
 
     @staticmethod
     def getAvailableCameras():
@@ -43,6 +46,8 @@ class _MockCamera(BaseCamera):
             self._running = False
             return False, None
         self.frames_acquired += 1
+        if self._resized_frame is not None and self.frames_acquired > 2:
+            return True, self._resized_frame
         frame = np.full(self._frame_shape, self.frames_acquired, dtype=np.uint8)
         return True, frame
 
@@ -51,6 +56,38 @@ class _MockCamera(BaseCamera):
         return True
 
 
+def _serve_ring(doorbell, control_queue, ring_cond, num_slots, timeout=5):
+    """Answer the subprocess's geometry report with a ring of *num_slots* slots."""
+    from rataGUI.shared_frame_ring import SharedFrameRing, drain_doorbell
+
+    assert doorbell.poll(timeout), "No geometry report from the subprocess"
+    [(tag, geometry)] = drain_doorbell(doorbell)
+    assert tag == "geometry"
+    ring = SharedFrameRing.create(
+        num_slots, geometry["shape"], ring_cond, geometry["dtype"]
+    )
+    control_queue.put(ring.control_message())
+    return ring
+
+
+def _wait_frames(leases, doorbell, timeout=5):
+    """Poll until the subprocess publishes frames and return their ``(slot, seq)``."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        frames, _ = leases.poll(doorbell, timeout=0.05)
+        if frames:
+            return frames
+    return []
+
+
+def _published(ring):
+    """``(slot, seq, metadata)`` of every frame still published in *ring*."""
+    return [
+        (slot_idx, seq, ring.read_record(slot_idx)[0])
+        for slot_idx, seq in ring.ready_after(0)
+    ]
+
+
 class TestCameraAcquisitionLoop:
     """Tests for rataGUI.camera_process.camera_acquisition_loop."""
 
@@ -60,12 +97,15 @@ class TestCameraAcquisitionLoop:
         camera_id="test-cam",
         config_dict=None,
         plugin_names=None,
-        num_slots=4,
-        frame_shape=(480, 640, 3),
+        num_slots=8,
+        backpressure="drop_oldest",
         timeout=10,
     ):
-        """Helper that runs camera_acquisition_loop in a thread and returns results."""
-        from multiprocessing.shared_memory import SharedMemory
+        """Helper that runs camera_acquisition_loop in a thread and returns results.
+
+        Nothing releases slots here, so the default policy overwrites unclaimed
+        frames instead of blocking once the ring is full.
+        """
         from rataGUI.camera_process import camera_acquisition_loop
 
         if config_dict is None:
@@ -73,12 +113,8 @@ class TestCameraAcquisitionLoop:
         if plugin_names is None:
             plugin_names = []
 
-        H, W, C = frame_shape
-        shm_shape = (num_slots, H, W, C)
-        shm_nbytes = int(np.prod(shm_shape))
-
-        shm = SharedMemory(create=True, size=shm_nbytes)
-        meta_queue = multiprocessing.Queue()
+        ring_cond = multiprocessing.Condition()
+        doorbell_rx, doorbell = multiprocessing.Pipe(duplex=False)
         control_queue = multiprocessing.Queue()
         ready_event = multiprocessing.Event()
         error_queue = multiprocessing.Queue()
@@ -91,47 +127,48 @@ class TestCameraAcquisitionLoop:
                 "camera_id": camera_id,
                 "camera_config_dict": config_dict,
                 "plugin_names": plugin_names,
-                "shm_name": shm.name,
-                "shm_shape": shm_shape,
-                "meta_queue": meta_queue,
+                "doorbell": doorbell,
                 "control_queue": control_queue,
                 "ready_event": ready_event,
                 "error_queue": error_queue,
+                "ring_cond": ring_cond,
+                "backpressure": backpressure,
             },
             daemon=True,
         )
         t.start()
+        ring = None
+        while t.is_alive() and not ready_event.wait(timeout=0.05):
+            pass
+        if ready_event.is_set():
+            ring = _serve_ring(doorbell_rx, control_queue, ring_cond, num_slots)
         t.join(timeout=timeout)
 
-        # Collect results
-        results = []
-        while not meta_queue.empty():
-            results.append(meta_queue.get_nowait())
-
+        # multiprocessing.Queue.empty() can report True before the feeder
+        # thread has flushed, so drain with a short timeout.
         errors = []
-        while not error_queue.empty():
-            errors.append(error_queue.get_nowait())
-
-        frame_ring = np.ndarray(shm_shape, dtype=np.uint8, buffer=shm.buf)
+        while True:
+            try:
+                errors.append(error_queue.get(timeout=0.2))
+            except queue.Empty:
+                break
 
         return {
-            "results": results,
+            "results": _published(ring) if ring is not None else [],
             "errors": errors,
             "ready": ready_event.is_set(),
-            "shm": shm,
-            "frame_ring": frame_ring,
+            "ring": ring,
+            "doorbell": doorbell_rx,
             "control_queue": control_queue,
         }
 
     def _cleanup(self, data):
-        try:
-            data["shm"].close()
-            data["shm"].unlink()
-        except Exception:
-            pass
+        if data["ring"] is not None:
+            data["ring"].close()
+        data["doorbell"].close()
 
     def test_acquisition_loop_reads_frames(self):
-        """Mock camera returns 5 frames, verify they appear in metadata queue."""
+        """Mock camera returns 5 frames, verify they are published with metadata."""
         _MockCamera._frames_to_produce = 5
         _MockCamera._init_should_fail = False
         data = self._run_loop()
@@ -140,12 +177,11 @@ class TestCameraAcquisitionLoop:
             assert len(data["results"]) == 5
             assert len(data["errors"]) == 0
 
-            # Verify slot indices and metadata
-            for slot_idx, metadata in data["results"]:
+            # Verify slot indices, sequence numbers and metadata records
+            for n, (slot_idx, seq, metadata) in enumerate(data["results"], start=1):
                 assert isinstance(slot_idx, int)
-                assert "Camera Name" in metadata
-                assert "Timestamp" in metadata
-                assert "Frame Index" in metadata
+                assert seq == n
+                assert metadata["Frame Index"] == n
         finally:
             self._cleanup(data)
 
@@ -176,14 +212,10 @@ class TestCameraAcquisitionLoop:
         _MockCamera._frames_to_produce = 1000000  # would run forever
         _MockCamera._init_should_fail = False
 
-        from multiprocessing.shared_memory import SharedMemory
         from rataGUI.camera_process import camera_acquisition_loop
 
-        H, W, C = 480, 640, 3
-        num_slots = 4
-        shm_shape = (num_slots, H, W, C)
-        shm = SharedMemory(create=True, size=int(np.prod(shm_shape)))
-        meta_queue = multiprocessing.Queue()
+        ring_cond = multiprocessing.Condition()
+        doorbell_rx, doorbell = multiprocessing.Pipe(duplex=False)
         control_queue = multiprocessing.Queue()
         ready_event = multiprocessing.Event()
         error_queue = multiprocessing.Queue()
@@ -195,12 +227,11 @@ class TestCameraAcquisitionLoop:
                 "camera_id": "test-cam",
                 "camera_config_dict": {},
                 "plugin_names": [],
-                "shm_name": shm.name,
-                "shm_shape": shm_shape,
-                "meta_queue": meta_queue,
+                "doorbell": doorbell,
                 "control_queue": control_queue,
                 "ready_event": ready_event,
                 "error_queue": error_queue,
+                "ring_cond": ring_cond,
             },
             daemon=True,
         )
@@ -208,18 +239,18 @@ class TestCameraAcquisitionLoop:
 
         # Wait for ready
         assert ready_event.wait(timeout=5), "Camera did not initialize in time"
+        ring = _serve_ring(doorbell_rx, control_queue, ring_cond, num_slots=4)
 
-        # Let it run briefly then stop
+        # Let it run briefly (filling the ring and blocking) then stop
         time.sleep(0.1)
         control_queue.put("stop")
+        ring.request_stop()
+        t0 = time.monotonic()
         t.join(timeout=5)
         assert not t.is_alive(), "Thread should have exited after stop signal"
-
-        try:
-            shm.close()
-            shm.unlink()
-        except Exception:
-            pass
+        # Woken straight away rather than at the slot wait's safety timeout
+        assert time.monotonic() - t0 < 0.5
+        ring.close()
 
     def test_frame_data_in_shared_memory(self):
         """Verify actual frame data is written to shared memory."""
@@ -229,28 +260,272 @@ class TestCameraAcquisitionLoop:
         try:
             assert len(data["results"]) == 2
             # The mock camera fills frames with frame_number (1, 2, ...)
-            # Check that at least one slot has non-zero data
-            frame_ring = data["frame_ring"]
-            slot_idx_0 = data["results"][0][0]
-            assert frame_ring[slot_idx_0].max() > 0
+            frames = data["ring"].frames
+            for slot_idx, _, metadata in data["results"]:
+                assert frames[slot_idx].max() == metadata["Frame Index"]
         finally:
             self._cleanup(data)
 
     def test_metadata_contains_timestamp(self):
-        """Verify metadata includes a Timestamp field."""
+        """Verify leased frames carry a wall-clock Timestamp close to now."""
         from datetime import datetime
+        from rataGUI.shared_frame_ring import SharedFrameLeases
 
         _MockCamera._frames_to_produce = 1
         _MockCamera._init_should_fail = False
         data = self._run_loop()
         try:
             assert len(data["results"]) == 1
-            _, metadata = data["results"][0]
+            slot_idx, seq, _ = data["results"][0]
+            _, metadata = SharedFrameLeases(data["ring"]).acquire(slot_idx, seq)
             assert isinstance(metadata["Timestamp"], datetime)
+            assert abs((datetime.now() - metadata["Timestamp"]).total_seconds()) < 5
+        finally:
+            self._cleanup(data)
+
+    def test_doorbell_closed_on_exit(self):
+        """The main process sees EOF on the doorbell once the loop returns."""
+        _MockCamera._frames_to_produce = 1
+        _MockCamera._init_should_fail = False
+        data = self._run_loop()
+        try:
+            with pytest.raises(EOFError):
+                data["doorbell"].recv_bytes()
         finally:
             self._cleanup(data)
 
 
+class TestFrameGeometry:
+    """The ring is sized from the frames the camera actually produces."""
+
+    def test_geometry_reported_and_reallocated_on_change(self):
+        from rataGUI.camera_process import camera_acquisition_loop
+        from rataGUI.shared_frame_ring import SharedFrameLeases
+
+        _MockCamera._resized_frame = np.zeros((2, 3), dtype=np.uint16)
+        _MockCamera._frames_to_produce = 4
+        _MockCamera._init_should_fail = False
+        _MockCamera._frame_shape = (4, 4, 3)
+        ring_cond = multiprocessing.Condition()
+        doorbell_rx, doorbell = multiprocessing.Pipe(duplex=False)
+        control_queue = multiprocessing.Queue()
+        t = threading.Thread(
+            target=camera_acquisition_loop,
+            kwargs={
+                "camera_module_name": "test_camera_process",
+                "camera_id": "test-cam",
+                "camera_config_dict": {},
+                "plugin_names": [],
+                "doorbell": doorbell,
+                "control_queue": control_queue,
+                "ready_event": multiprocessing.Event(),
+                "error_queue": multiprocessing.Queue(),
+                "ring_cond": ring_cond,
+            },
+            daemon=True,
+        )
+        t.start()
+        rings = []
+        try:
+            rings.append(_serve_ring(doorbell_rx, control_queue, ring_cond, 4))
+            assert rings[0].frame_shape == (4, 4, 3)
+
+            # Both frames of the first geometry precede the second report
+            leases = SharedFrameLeases(rings[0])
+            frames, events = [], []
+            deadline = time.monotonic() + 5
+            while not events and time.monotonic() < deadline:
+                new_frames, events = leases.poll(doorbell_rx, timeout=0.05)
+                frames += new_frames
+            assert [seq for _, seq in frames] == [1, 2]
+            [(tag, geometry)] = events
+            assert tag == "geometry"
+            assert geometry["shape"] == (2, 3)
+
+            rings.append(
+                SharedFrameRing.create(4, geometry["shape"], ring_cond, geometry["dtype"])
+            )
+            control_queue.put(rings[1].control_message())
+            assert rings[1].dtype == np.uint16
+            leases = SharedFrameLeases(rings[1])
+            [(slot_idx, seq)] = _wait_frames(leases, doorbell_rx)[:1]
+            _, metadata = leases.acquire(slot_idx, seq)
+            assert metadata["Frame Index"] == 3
+        finally:
+            control_queue.put("stop")
+            t.join(timeout=5)
+            _MockCamera._frame_shape = (480, 640, 3)
+            _MockCamera._resized_frame = None
+            for ring in rings:
+                ring.close()
+            doorbell_rx.close()
+        assert not t.is_alive()
+
+
+class TestSlotOwnership:
+    """Slots handed to the main process are not rewritten until released."""
+
+    def _start(self, num_slots, backpressure="block", frames_to_produce=5):
+        from rataGUI.camera_process import camera_acquisition_loop
+
+        _MockCamera._frames_to_produce = frames_to_produce
+        _MockCamera._init_should_fail = False
+        ring_cond = multiprocessing.Condition()
+        doorbell_rx, doorbell = multiprocessing.Pipe(duplex=False)
+        control_queue = multiprocessing.Queue()
+        _MockCamera._frame_shape = (4, 4, 3)
+        t = threading.Thread(
+            target=camera_acquisition_loop,
+            kwargs={
+                "camera_module_name": "test_camera_process",
+                "camera_id": "test-cam",
+                "camera_config_dict": {},
+                "plugin_names": [],
+                "doorbell": doorbell,
+                "control_queue": control_queue,
+                "ready_event": multiprocessing.Event(),
+                "error_queue": multiprocessing.Queue(),
+                "ring_cond": ring_cond,
+                "backpressure": backpressure,
+            },
+            daemon=True,
+        )
+        t.start()
+        ring = _serve_ring(doorbell_rx, control_queue, ring_cond, num_slots)
+        return t, ring, doorbell_rx, control_queue
+
+    def _stop(self, t, ring, doorbell_rx, control_queue):
+        control_queue.put("stop")
+        ring.request_stop()
+        t.join(timeout=5)
+        _MockCamera._frame_shape = (480, 640, 3)
+        ring.close()
+        doorbell_rx.close()
+        assert not t.is_alive()
+
+    def test_waits_for_release_when_all_slots_held(self):
+        from rataGUI.shared_frame_ring import SharedFrameLeases
+
+        t, ring, doorbell_rx, control_queue = self._start(2)
+        leases = SharedFrameLeases(ring)
+        try:
+            frames = _wait_frames(leases, doorbell_rx)
+            while len(frames) < 2:
+                frames += _wait_frames(leases, doorbell_rx)
+            first, second = frames
+            assert {first[0], second[0]} == {0, 1}
+            _, metadata = leases.acquire(*first)
+            assert metadata["Frame Index"] == 1
+            assert _wait_frames(leases, doorbell_rx, timeout=0.3) == []
+
+            leases.release_metadata(metadata)
+            [third] = _wait_frames(leases, doorbell_rx)
+            assert third[0] == first[0]
+            assert leases.acquire(*third)[1]["Frame Index"] == 3
+            assert ring.stats()["blocked"] >= 1
+        finally:
+            self._stop(t, ring, doorbell_rx, control_queue)
+
+    def test_stop_while_waiting_for_release(self):
+        t, ring, doorbell_rx, control_queue = self._start(1, frames_to_produce=100)
+        deadline = time.monotonic() + 5
+        while ring.stats()["frames_published"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self._stop(t, ring, doorbell_rx, control_queue)
+
+    def test_drop_newest_discards_new_frames(self):
+        t, ring, doorbell_rx, control_queue = self._start(2, backpressure="drop_newest")
+        t.join(timeout=5)
+        try:
+            results = _published(ring)
+            assert [metadata["Frame Index"] for _, _, metadata in results] == [1, 2]
+            assert all(ring.claim(slot_idx, seq) for slot_idx, seq, _ in results)
+            assert ring.stats()["dropped_newest"] == 3
+        finally:
+            self._stop(t, ring, doorbell_rx, control_queue)
+
+    def test_drop_oldest_overwrites_unclaimed_frames(self):
+        t, ring, doorbell_rx, control_queue = self._start(2, backpressure="drop_oldest")
+        t.join(timeout=5)
+        try:
+            results = _published(ring)
+            assert [metadata["Frame Index"] for _, _, metadata in results] == [4, 5]
+            # A frame announced before it was overwritten can no longer be claimed
+            assert not ring.claim(results[0][0], 1)
+            stats = ring.stats()
+            assert stats["frames_published"] == 5
+            assert stats["dropped_oldest"] == 3
+            assert stats["stale_claims"] == 1
+            # The slot holds the newest frame written into it
+            assert ring.frames[results[-1][0]].max() == 5
+        finally:
+            self._stop(t, ring, doorbell_rx, control_queue)
+
+
+class TestPause:
+    def test_paused_process_blocks_until_resumed(self):
+        from rataGUI.shared_frame_ring import SharedFrameLeases
+
+        t, ring, doorbell_rx, control_queue = TestSlotOwnership()._start(
+            4, backpressure="drop_oldest", frames_to_produce=1000000
+        )
+        leases = SharedFrameLeases(ring)
+        try:
+            control_queue.put("pause")
+            time.sleep(0.2)
+            published = ring.stats()["frames_published"]
+            time.sleep(0.2)
+            assert ring.stats()["frames_published"] == published
+
+            leases.poll(doorbell_rx, timeout=0)  # Arm the doorbell
+            control_queue.put("resume")
+            assert doorbell_rx.poll(5)
+            assert ring.stats()["frames_published"] > published
+        finally:
+            TestSlotOwnership()._stop(t, ring, doorbell_rx, control_queue)
+
+
+class TestMetadataTransport:
+    """Metadata travels in shared memory; the doorbell only rings when armed."""
+
+    def test_doorbell_rings_only_when_consumer_waits(self):
+        from rataGUI.shared_frame_ring import SharedFrameLeases
+
+        t, ring, doorbell_rx, control_queue = TestSlotOwnership()._start(
+            8, frames_to_produce=100
+        )
+        leases = SharedFrameLeases(ring)
+        try:
+            # The consumer never armed the doorbell, so the frames that fill
+            # the ring are picked up in one batch without any notification.
+            deadline = time.monotonic() + 5
+            while ring.stats()["blocked"] == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert ring.stats()["doorbells"] == 0
+            frames, events = leases.poll(doorbell_rx, timeout=0)
+            assert [seq for _, seq in frames] == list(range(1, 9))
+            assert events == []
+        finally:
+            TestSlotOwnership()._stop(t, ring, doorbell_rx, control_queue)
+    def test_string_metadata_survives(self, monkeypatch):
+        monkeypatch.setattr(
+            _MockCamera,
+            "getMetadata",
+            lambda self: {"Frame Index": self.frames_acquired, "Serial": "SN-42"},
+        )
+        _MockCamera._frames_to_produce = 2
+        _MockCamera._init_should_fail = False
+        loop = TestCameraAcquisitionLoop()
+        data = loop._run_loop()
+        try:
+            assert [metadata for _, _, metadata in data["results"]] == [
+                {"Frame Index": 1, "Serial": "SN-42"},
+                {"Frame Index": 2, "Serial": "SN-42"},
+            ]
+        finally:
+            loop._cleanup(data)
+
+
 class TestBaseCameraCreateAndInitialize:
     """Tests for BaseCamera.create_and_initialize classmethod."""
 
@@ -0,0 +1,112 @@
+"""Tests for the CPU affinity plan."""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from rataGUI.cpu_affinity import (
+    AffinityPlan,
+    format_cores,
+    parse_cores,
+    pin_process,
+)
+
+needs_affinity = pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity"), reason="CPU affinity is Linux-only"
+)
+
+
+def _make_camera(display_name="Cam A", camera_id="123"):
+    camera = MagicMock()
+    camera.cameraID = camera_id
+    camera.getDisplayName.return_value = display_name
+    return camera
+
+
+class TestParseCores:
+    def test_int(self):
+        assert parse_cores(3) == {3}
+
+    def test_list(self):
+        assert parse_cores([0, "2"]) == {0, 2}
+
+    def test_range_string(self):
+        assert parse_cores("0-3, 6") == {0, 1, 2, 3, 6}
+
+    def test_none(self):
+        assert parse_cores(None) == set()
+
+    def test_malformed(self):
+        with pytest.raises(ValueError):
+            parse_cores("a-b")
+
+    def test_format_round_trip(self):
+        assert format_cores({0, 1, 2, 5, 7, 8}) == "0-2,5,7-8"
+        assert parse_cores(format_cores({0, 1, 2, 5})) == {0, 1, 2, 5}
+
+
+class TestAffinityPlan:
+    def test_empty_plan(self):
+        plan = AffinityPlan(None)
+        assert not plan
+        assert plan.cores_for_camera(_make_camera()) == set()
+        assert plan.cores_for_encoders() == set()
+
+    def test_unavailable_cores_dropped(self):
+        plan = AffinityPlan({"encoders": [min(AffinityPlan().available), 100000]})
+        assert plan.encoder_cores == {min(plan.available)}
+
+    def test_invalid_spec_ignored(self):
+        plan = AffinityPlan({"main": "x"})
+        assert plan.main_cores == set()
+
+    def test_camera_lookup_by_name_and_id(self):
+        core = min(AffinityPlan().available)
+        plan = AffinityPlan({"cameras": {"Cam A": [core], "456": [core]}})
+        assert plan.cores_for_camera(_make_camera()) == {core}
+        assert plan.cores_for_camera(_make_camera("Cam B", "456")) == {core}
+        assert plan.cores_for_camera(_make_camera("Cam C", "789")) == set()
+
+    def test_pinned_main_widens_children(self):
+        core = min(AffinityPlan().available)
+        plan = AffinityPlan({"main": [core]})
+        assert plan.cores_for_camera(_make_camera()) == plan.available
+        assert plan.cores_for_encoders() == plan.available
+
+    @pytest.mark.parametrize("priority", [500, -5, "high", [50]])
+    def test_invalid_realtime_priority_disabled(self, priority, caplog):
+        assert AffinityPlan({"realtime priority": priority}).realtime_priority == 0
+        assert "real-time priority" in caplog.text.lower()
+
+    def test_realtime_priority(self):
+        assert AffinityPlan({"realtime priority": "50"}).realtime_priority == 50
+        assert AffinityPlan({"realtime priority": None}).realtime_priority == 0
+
+    def test_apply_camera(self):
+        core = min(AffinityPlan().available)
+        plan = AffinityPlan({"cameras": {"Cam A": [core]}, "realtime priority": 10})
+        with patch("rataGUI.cpu_affinity.pin_process") as pin, patch(
+            "rataGUI.cpu_affinity.set_realtime_priority"
+        ) as prio:
+            plan.apply_camera(4321, _make_camera())
+        pin.assert_called_once_with(4321, {core}, "camera Cam A")
+        prio.assert_called_once_with(4321, 10, "camera Cam A")
+
+
+class TestPinProcess:
+    def test_no_cores_is_noop(self):
+        assert pin_process(os.getpid(), set(), "test") is None
+
+    @needs_affinity
+    def test_pins_current_process(self):
+        available = os.sched_getaffinity(0)
+        try:
+            assert pin_process(os.getpid(), available, "test") == available
+        finally:
+            os.sched_setaffinity(0, available)
+
+    @needs_affinity
+    def test_failure_is_logged(self):
+        with patch("os.sched_setaffinity", side_effect=PermissionError("denied")):
+            assert pin_process(os.getpid(), {0}, "test") is None
@@ -0,0 +1,86 @@
+"""Tests for the acquisition and plugin thread pools."""
+
+import threading
+import time
+
+from rataGUI.executor_pools import ExecutorPools, InstrumentedExecutor
+
+
+class TestInstrumentedExecutor:
+    def test_counts_saturation_and_queue_wait(self):
+        pool = InstrumentedExecutor(1, "test")
+        release = threading.Event()
+        try:
+            first = pool.submit(release.wait)
+            second = pool.submit(lambda: 42)  # Waits behind the first task
+            time.sleep(0.05)
+            stats = pool.stats()
+            assert stats["busy"] == 1
+            assert stats["saturated"] == 1
+            release.set()
+            first.result(timeout=5)
+            assert second.result(timeout=5) == 42
+        finally:
+            pool.shutdown()
+
+        stats = pool.stats()
+        assert stats["submitted"] == stats["completed"] == 2
+        assert stats["peak busy"] == 1
+        assert stats["saturation"] == 0.5
+        assert stats["max queue wait (ms)"] >= 40
+
+    def test_idle_workers_not_saturated(self):
+        pool = InstrumentedExecutor(4, "test")
+        try:
+            for future in [pool.submit(time.sleep, 0.01) for _ in range(4)]:
+                future.result(timeout=5)
+        finally:
+            pool.shutdown()
+        assert pool.stats()["saturated"] == 0
+
+    def test_exceptions_propagate(self):
+        pool = InstrumentedExecutor(1, "test")
+        try:
+            future = pool.submit(int, "x")
+            assert isinstance(future.exception(timeout=5), ValueError)
+        finally:
+            pool.shutdown()
+        assert pool.stats()["completed"] == 1
+
+
+class TestExecutorPools:
+    def test_pool_sizes(self):
+        pools = ExecutorPools()
+        try:
+            assert pools.acquisition("Cam A")._max_workers == 1
+            assert pools.acquisition("Cam A") is pools.acquisition("Cam A")
+            assert pools.acquisition("Cam A") is not pools.acquisition("Cam B")
+            # Plugins process one frame at a time, so one thread each
+            assert pools.for_plugin("Cam A", "VideoWriter")._max_workers == 1
+            assert pools.for_plugin("Cam A", "VideoWriter") is not pools.for_plugin(
+                "Cam A", "SleapInference"
+            )
+            # Every camera gets pools of its own
+            assert pools.for_plugin("Cam A", "VideoWriter") is not pools.for_plugin(
+                "Cam B", "VideoWriter"
+            )
+        finally:
+            pools.shutdown()
+
+    def test_stats_survive_shutdown(self):
+        pools = ExecutorPools()
+        pool = pools.for_plugin("Cam A", "MetadataWriter")
+        pool.submit(lambda: None).result(timeout=5)
+        pools.shutdown()
+        assert pools.stats()["plugin Cam A/MetadataWriter"]["completed"] == 1
+        # A pool used after shutdown is recreated
+        new_pool = pools.for_plugin("Cam A", "MetadataWriter")
+        assert new_pool.submit(lambda: 1).result(timeout=5) == 1
+        pools.shutdown()
+
+    def test_close_acquisition(self):
+        pools = ExecutorPools()
+        pool = pools.acquisition("Cam A")
+        pools.close_acquisition("Cam A")
+        assert pool.closed
+        assert "acquisition Cam A" not in pools.stats()
@@ -302,3 +302,98 @@ class TestFanOutNoRingBuffer:
         assert isinstance(item2, tuple)
         np.testing.assert_array_equal(item1[0], frame)
         np.testing.assert_array_equal(item2[0], frame)
+
+
+# ---------------------------------------------------------------------------
+# Tests: rataGUI.fan_out.FanOut
+# ---------------------------------------------------------------------------
+
+
+class TestConcurrentFanOut:
+    """The real fan-out stage delivers to all queue consumers concurrently."""
+
+    @pytest.mark.asyncio
+    async def test_full_queue_does_not_delay_later_consumers(self):
+        from rataGUI.fan_out import FanOut
+
+        slow = _make_plugin(queue_size=1)
+        fast = _make_plugin(queue_size=1)
+        slow.in_queue.put_nowait("backlog")
+        fan_out = FanOut(asyncio.Queue(), [slow, fast])
+
+        frame = np.zeros((2, 2), dtype=np.uint8)
+        dispatch = asyncio.create_task(fan_out.dispatch(frame, {}))
+        await asyncio.sleep(0.01)
+        # Delivered to the second plugin while waiting for the first
+        assert fast.in_queue.qsize() == 1
+        assert not dispatch.done()
+
+        slow.in_queue.get_nowait()
+        await asyncio.wait_for(dispatch, timeout=1.0)
+        assert slow.in_queue.qsize() == 1
+        slow_target, fast_target = fan_out._targets
+        assert slow_target.waits == 1 and fast_target.waits == 0
+        assert slow_target.stats()["max dispatch (ms)"] >= 10
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_never_waits(self):
+        from rataGUI.fan_out import FanOut
+
+        plugin = _make_plugin(queue_size=1, drop_policy="drop_oldest")
+        fan_out = FanOut(asyncio.Queue(), [plugin])
+        for value in range(3):
+            frame = np.full((2, 2), value, dtype=np.uint8)
+            await asyncio.wait_for(fan_out.dispatch(frame, {}), timeout=1.0)
+
+        (stats,) = fan_out.stats().values()
+        assert stats["delivered"] == 3
+        assert stats["dropped"] == 2
+        assert stats["waits"] == 0
+        assert stats["max dispatch (ms)"] >= stats["mean dispatch (ms)"] >= 0
+        frame, _ = plugin.in_queue.get_nowait()
+        assert frame[0, 0] == 2
+
+    @pytest.mark.asyncio
+    async def test_blocking_consumers_share_one_copy(self):
+        from rataGUI.fan_out import FanOut
+
+        ring_buffer = FrameRingBuffer(2, 2, 2, 1, num_consumers=0)
+        consumer = ring_buffer.add_consumer("Display", "latest")
+        writers = [_make_plugin(blocking=True), _make_plugin(blocking=True)]
+        released = []
+        fan_out = FanOut(asyncio.Queue(), writers, ring_buffer, released.append)
+
+        metadata = {"Frame Index": 1}
+        await fan_out.dispatch(np.full((2, 2), 7, dtype=np.uint8), metadata)
+
+        first, _ = writers[0].in_queue.get_nowait()
+        second, _ = writers[1].in_queue.get_nowait()
+        assert first is second
+        assert not first.flags.writeable and first.flags.owndata
+        assert (first == 7).all()
+        assert released == [metadata]
+        # The copy is independent of the ring slot
+        for value in (8, 9):
+            await fan_out.dispatch(np.full((2, 2), value, dtype=np.uint8), {})
+        assert (first == 7).all()
+        assert "Display" in fan_out.stats()
+        assert fan_out.stats()["Display"]["delivered"] == 0
+        consumer.close()
+
+    @pytest.mark.asyncio
+    async def test_queue_consumers_get_their_own_metadata(self):
+        from rataGUI.fan_out import FanOut
+
+        ring_buffer = FrameRingBuffer(2, 2, 2, 1, num_consumers=0)
+        consumer = ring_buffer.add_consumer("Display", "latest")
+        writer = _make_plugin(blocking=True)
+        fan_out = FanOut(asyncio.Queue(), [writer], ring_buffer)
+        await fan_out.dispatch(np.zeros((2, 2), dtype=np.uint8), {"Frame Index": 1})
+
+        _, metadata = writer.in_queue.get_nowait()
+        metadata["Pose"] = True
+        slot_idx = consumer.try_claim()
+        _, ring_metadata = consumer.get_view(slot_idx)
+        assert ring_metadata == {"Frame Index": 1}
+        consumer.release(slot_idx)
+        consumer.close()
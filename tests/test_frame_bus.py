@@ -0,0 +1,222 @@
+"""Tests for the shared-memory frame bus and its publisher plugin."""
+
+import multiprocessing
+import os
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from rataGUI.frame_bus import (
+    BUS_VERSION,
+    HEADER_DTYPE,
+    FrameBus,
+    FrameBusReader,
+    bus_name,
+)
+
+
+@pytest.fixture
+def name():
+    return f"rataGUI_test_{uuid.uuid4().hex[:8]}"
+
+
+def _frame(value, shape=(4, 6)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def _publish_in_child(name, count, ready, done):
+    bus = FrameBus.create(name, 4, (4, 6), np.uint8, source="child")
+    try:
+        for i in range(1, count + 1):
+            bus.publish(_frame(i), {"Frame Index": i})
+        ready.set()
+        done.wait(30)
+    finally:
+        bus.close()
+
+
+class TestFrameBus:
+    def test_header_describes_geometry(self, name):
+        bus = FrameBus.create(name, 3, (4, 6), np.uint16, source="Cam A")
+        try:
+            with FrameBusReader(name) as reader:
+                assert reader.shape == (4, 6)
+                assert reader.dtype == np.uint16
+                assert reader.num_slots == 3
+                assert reader.source == "Cam A"
+                assert reader.latest_seq == 0
+                assert reader.latest() is None
+        finally:
+            bus.close()
+
+    def test_publish_and_read_zero_copy(self, name):
+        bus = FrameBus.create(name, 3, (4, 6))
+        try:
+            stamp = datetime(2024, 1, 2, 3, 4, 5)
+            seq = bus.publish(_frame(7), {"Frame Index": 42, "Timestamp": stamp})
+            with FrameBusReader(name) as reader:
+                view, meta = reader.latest()
+                assert (view == 7).all()
+                assert not view.flags.writeable
+                assert meta["Sequence"] == seq == 1
+                assert meta["Frame Index"] == 42
+                assert meta["Timestamp"] == stamp
+                assert "Camera Index" not in meta
+                # A view reflects the shared segment rather than a copy
+                bus.publish(_frame(8), {})
+                bus.publish(_frame(9), {})
+                bus.publish(_frame(10), {})  # Overwrites slot 0
+                assert (view == 10).all()
+                assert not reader.valid(seq)
+                assert reader.get(seq) is None
+                del view
+        finally:
+            bus.close()
+
+    def test_read_returns_copy(self, name):
+        bus = FrameBus.create(name, 2, (4, 6))
+        try:
+            bus.publish(_frame(1), {"Camera Index": 3})
+            with FrameBusReader(name) as reader:
+                frame, meta = reader.read(1)
+                assert meta["Camera Index"] == 3
+                bus.publish(_frame(2), {})
+                bus.publish(_frame(3), {})
+                assert (frame == 1).all()
+        finally:
+            bus.close()
+
+    def test_rejects_mismatched_frames(self, name):
+        bus = FrameBus.create(name, 2, (4, 6))
+        try:
+            with pytest.raises(ValueError):
+                bus.publish(np.zeros((4, 6, 3), np.uint8), {})
+        finally:
+            bus.close()
+
+    def test_reader_rejects_other_versions(self, name):
+        bus = FrameBus.create(name, 2, (4, 6))
+        try:
+            bus.header["version"] = BUS_VERSION + 1
+            with pytest.raises(ValueError, match="version"):
+                FrameBusReader(name)
+        finally:
+            bus.close()
+
+    def test_missing_bus(self, name):
+        with pytest.raises(FileNotFoundError):
+            FrameBusReader(name)
+
+    def test_stale_segment_is_replaced(self, name):
+        stale = FrameBus.create(name, 2, (4, 6))
+        stale.header["producer_pid"] = 0  # Not a running process
+        stale.shm.close()  # Left behind without unlinking
+        bus = FrameBus.create(name, 2, (4, 6))
+        try:
+            with FrameBusReader(name) as reader:
+                assert reader.latest_seq == 0
+        finally:
+            bus.close()
+
+    def test_live_owner_keeps_name(self, name):
+        bus = FrameBus.create(name, 2, (4, 6))
+        bus.header["producer_pid"] = os.getppid()
+        try:
+            with pytest.raises(FileExistsError):
+                FrameBus.create(name, 2, (4, 6))
+        finally:
+            bus.close()
+
+    def test_bus_of_this_process_keeps_name(self, name):
+        bus = FrameBus.create(name, 2, (4, 6))
+        try:
+            with pytest.raises(FileExistsError):
+                FrameBus.create(name, 2, (4, 6))
+            bus.publish(np.ones((4, 6), np.uint8), {})
+            with FrameBusReader(name) as reader:
+                assert reader.latest_seq == 1
+        finally:
+            bus.close()
+
+    def test_header_layout_is_stable(self):
+        offsets = {field: HEADER_DTYPE.fields[field][1] for field in HEADER_DTYPE.names}
+        assert offsets["version"] == 8
+        assert offsets["write_seq"] == 96
+        assert offsets["source"] == 128
+        assert HEADER_DTYPE.itemsize <= 256
+
+    def test_bus_name(self):
+        assert bus_name("FLIR 12345") == "rataGUI_FLIR-12345"
+
+
+class TestFrameBusReaderIteration:
+    def test_frames_counts_missed_and_stops_on_close(self, name):
+        bus = FrameBus.create(name, 2, (4, 6))
+        reader = FrameBusReader(name)
+        frames = reader.frames(copy=True, timeout=1.0)
+        for i in range(1, 6):  # Only the last two fit in the ring
+            bus.publish(_frame(i), {"Frame Index": i})
+        bus.close()
+        received = [meta["Frame Index"] for _, meta in frames]
+        assert received == [4, 5]
+        assert reader.missed == 3
+        reader.close()
+
+    def test_frames_follows_replaced_bus(self, name):
+        bus = FrameBus.create(name, 2, (4, 6))
+        reader = FrameBusReader(name)
+        frames = reader.frames(copy=True, timeout=1.0)
+        bus.publish(_frame(1), {"Frame Index": 1})
+        frame, meta = next(frames)
+        assert frame.shape == (4, 6)
+        bus = bus.replace((2, 2, 3), np.uint8)
+        bus.publish(np.ones((2, 2, 3), np.uint8), {"Frame Index": 2})
+        frame, meta = next(frames)
+        assert frame.shape == (2, 2, 3) and meta["Frame Index"] == 2
+        bus.close()
+        assert list(frames) == []
+        reader.close()
+
+    def test_reader_in_other_process(self, name):
+        ctx = multiprocessing.get_context("spawn")
+        ready, done = ctx.Event(), ctx.Event()
+        child = ctx.Process(target=_publish_in_child, args=(name, 3, ready, done))
+        child.start()
+        try:
+            assert ready.wait(30)
+            with FrameBusReader(name) as reader:
+                assert reader.source == "child"
+                frame, meta = reader.latest(copy=True)
+                assert (frame == 3).all() and meta["Frame Index"] == 3
+                assert reader.read(1)[1]["Frame Index"] == 1
+                done.set()
+                child.join(timeout=30)
+                assert reader.closed
+        finally:
+            done.set()
+            child.join(timeout=30)
+        assert child.exitcode == 0
+
+
+class TestFrameBusPublisher:
+    def test_publishes_and_replaces_on_format_change(
+        self, name, mock_cam_widget, mock_config_manager
+    ):
+        from rataGUI.plugins.frame_bus_publisher import FrameBusPublisher
+
+        config = mock_config_manager({"Bus name": name, "Slots": 2})
+        plugin = FrameBusPublisher(mock_cam_widget, config)
+        assert plugin.independent and not plugin.modifies_frame
+        plugin.process(_frame(3), {"Frame Index": 1})
+        with FrameBusReader(name) as reader:
+            assert reader.source == "TestCam"
+            assert reader.latest(copy=True)[1]["Frame Index"] == 1
+            plugin.process(np.zeros((2, 2), np.uint16), {"Frame Index": 2})
+            assert reader.replaced
+            reader.reopen()
+            assert reader.dtype == np.uint16
+        plugin.close()
+        with pytest.raises(FileNotFoundError):
+            FrameBusReader(name)
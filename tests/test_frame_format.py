@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from rataGUI.frame_format import FrameFormat
+
+
+class TestFrameFormat:
+    def test_mono_frame(self):
+        fmt = FrameFormat.of(np.zeros((480, 640), dtype=np.uint16))
+        assert (fmt.height, fmt.width, fmt.channels) == (480, 640, 1)
+        assert fmt.is_mono
+        assert fmt.max_value == 65535
+        assert fmt.nbytes == 480 * 640 * 2
+
+    def test_colour_frame(self):
+        fmt = FrameFormat.of(np.zeros((4, 6, 3), dtype=np.uint8))
+        assert fmt.channels == 3
+        assert not fmt.is_mono
+        assert fmt.max_value == 255
+
+    @pytest.mark.parametrize(
+        "shape, dtype, pix_fmt",
+        [
+            ((2, 2), np.uint8, "gray"),
+            ((2, 2), np.uint16, "gray16le"),
+            ((2, 2, 1), np.uint8, "gray"),
+            ((2, 2, 3), np.uint8, "rgb24"),
+            ((2, 2, 3), np.uint16, "rgb48le"),
+            ((2, 2, 4), np.uint8, "rgba"),
+        ],
+    )
+    def test_ffmpeg_pix_fmt(self, shape, dtype, pix_fmt):
+        assert FrameFormat(shape, dtype).ffmpeg_pix_fmt() == pix_fmt
+
+    def test_unsupported_pix_fmt(self):
+        with pytest.raises(ValueError):
+            FrameFormat((2, 2), np.float32).ffmpeg_pix_fmt()
+
+    def test_invalid_shape(self):
+        with pytest.raises(ValueError):
+            FrameFormat((2,))
+
+    def test_equality(self):
+        assert FrameFormat((2, 3), np.uint8) == FrameFormat([2, 3], "u1")
+        assert FrameFormat((2, 3), np.uint8) != FrameFormat((2, 3), np.uint16)
+        assert repr(FrameFormat((2, 3, 3), np.uint16)) == "2x3x3 uint16"
@@ -0,0 +1,150 @@
+"""Tests for frame buffer placement (huge pages, pre-faulting, NUMA nodes)."""
+
+import os
+import sys
+import multiprocessing
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from rataGUI import frame_memory
+from rataGUI.frame_format import FrameFormat
+from rataGUI.frame_memory import (
+    FileSegment,
+    FrameMemory,
+    numa_node_for_cores,
+    open_segment,
+    prefault,
+)
+from rataGUI.frame_ring_buffer import FrameRingBuffer
+from rataGUI.shared_frame_ring import SharedFrameRing
+
+linux_only = pytest.mark.skipif(
+    sys.platform != "linux", reason="Frame memory placement is Linux-only"
+)
+
+TWO_NODES = {0: {0, 1}, 1: {2, 3}}
+
+
+class TestFrameMemoryConfig:
+    def test_defaults_are_plain_allocation(self):
+        memory = FrameMemory()
+        assert not memory
+        assert str(memory) == "default"
+        array = memory.empty((2, 3), np.uint16)
+        assert array.shape == (2, 3) and array.dtype == np.uint16
+        assert not array.any()
+
+    def test_invalid_mode_falls_back(self, caplog):
+        memory = FrameMemory({"huge pages": "gigantic"})
+        assert memory.huge_pages == "off"
+        assert "Invalid huge pages mode" in caplog.text
+
+    @linux_only
+    def test_true_means_transparent(self):
+        assert FrameMemory({"huge pages": True}).huge_pages == "transparent"
+
+    @patch.object(frame_memory, "numa_nodes", return_value=TWO_NODES)
+    def test_auto_node_follows_camera_cores(self, _nodes):
+        memory = FrameMemory({"numa node": "auto"}, cores={2})
+        if sys.platform == "linux":
+            assert memory.numa_node == 1
+            assert memory.node_cores == {2, 3}
+
+    @patch.object(frame_memory, "numa_nodes", return_value=TWO_NODES)
+    def test_unknown_node_is_ignored(self, _nodes, caplog):
+        memory = FrameMemory({"numa node": 5})
+        assert memory.numa_node is None
+        assert "Invalid NUMA node" in caplog.text
+
+    @patch.object(frame_memory, "numa_nodes", return_value=TWO_NODES)
+    def test_node_for_cores_majority(self, _nodes):
+        assert numa_node_for_cores({1, 2, 3}) == 1
+        assert numa_node_for_cores({7}) is None
+        assert numa_node_for_cores(set()) is None
+
+
+@linux_only
+class TestAllocation:
+    def test_transparent_prefaulted_array(self):
+        memory = FrameMemory({"huge pages": "transparent", "prefault": True})
+        array = memory.empty((3, 64, 64, 3), np.uint8)
+        assert array.shape == (3, 64, 64, 3)
+        assert array.flags.writeable and not array.any()
+        array[:] = 7
+        assert (array == 7).all()
+
+    def test_missing_hugetlbfs_falls_back(self, tmp_path, caplog):
+        missing = str(tmp_path / "missing")
+        config = {"huge pages": "hugetlbfs", "hugetlbfs directory": missing}
+        memory = FrameMemory(config)
+        array = memory.empty((4, 4), np.uint8)
+        assert array.shape == (4, 4)
+        assert "Could not allocate huge pages" in caplog.text
+
+    def test_prefault_pins_touching_thread(self):
+        cores = set()
+
+        def fake_setaffinity(pid, requested):
+            cores.update(requested)
+
+        array = np.zeros(3 * 4096, np.uint8)
+        with patch.object(os, "sched_setaffinity", fake_setaffinity):
+            prefault(array, {0})
+        assert cores == {0}
+        assert not array.any()
+
+    def test_ring_buffer_slots_use_memory(self):
+        memory = FrameMemory({"prefault": True})
+        ring = FrameRingBuffer.from_format(4, FrameFormat((8, 8), np.uint8), 1, memory)
+        assert ring.frames.shape == (4, 8, 8)
+        ring.publish(np.full((8, 8), 5, np.uint8), {})
+        view, _ = ring.get_view(0)
+        assert (view == 5).all()
+        # A new frame format allocates its generation the same way
+        ring.release(0)
+        ring.publish(np.ones((4, 4), np.uint8), {})
+        assert ring.frames.shape == (4, 4, 4)
+
+
+@linux_only
+class TestSharedSegment:
+    def test_file_segment_round_trip(self, tmp_path):
+        path = str(tmp_path / "segment")
+        segment = FileSegment(path, create=True, size=100, page_size=64)
+        assert segment.size == 128 and segment.name == path
+        segment.buf[:3] = b"abc"
+        other = open_segment(path)
+        assert bytes(other.buf[:3]) == b"abc"
+        other.close()
+        segment.close()
+        segment.unlink()
+        assert not os.path.exists(path)
+
+    @pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs /dev/shm")
+    def test_shared_frame_ring_with_huge_pages(self):
+        memory = FrameMemory({"huge pages": "transparent", "prefault": True})
+        cond = multiprocessing.Condition()
+        ring = SharedFrameRing.create(2, (16, 16), cond, np.uint8, memory=memory)
+        try:
+            assert isinstance(ring.shm, FileSegment)
+            assert os.path.isabs(ring.name)
+            peer = SharedFrameRing.attach(ring.name, 2, (16, 16), cond, np.uint8)
+            ring.frames[1] = 9
+            assert (peer.frames[1] == 9).all()
+            peer.close()
+        finally:
+            ring.close()
+        assert not os.path.exists(ring.name)
+
+    def test_plain_segment_is_shared_memory(self):
+        memory = FrameMemory({"prefault": True})
+        segment = memory.shared_segment(4096)
+        try:
+            assert not os.path.isabs(segment.name)
+            other = open_segment(segment.name)
+            other.close()
+        finally:
+            segment.close()
+            segment.unlink()
@@ -1,9 +1,12 @@
+import asyncio
 import threading
 import time
 
 import numpy as np
+import pytest
 
-from rataGUI.frame_ring_buffer import FrameRingBuffer
+from rataGUI.frame_format import FrameFormat
+from rataGUI.frame_ring_buffer import FrameRingBuffer, parse_policy
 
 
 class TestFrameRingBufferInit:
@@ -141,6 +144,30 @@ class TestLazyReallocation:
         assert meta["resized"] is True
 
 
+    def test_realloc_on_dtype_change(self):
+        buf = FrameRingBuffer(4, 2, 2, 3, num_consumers=1)
+        mono16 = np.full((4, 6), 4095, dtype=np.uint16)
+        idx = buf.publish(mono16, {})
+        assert buf.frames.shape == (4, 4, 6)
+        assert buf.frames.dtype == np.uint16
+        view, _ = buf.get_view(idx)
+        np.testing.assert_array_equal(view, mono16)
+
+
+class TestNativeFormats:
+    def test_mono_allocation(self):
+        buf = FrameRingBuffer(3, 4, 6, 1, dtype=np.uint16)
+        assert buf.frames.shape == (3, 4, 6)
+        assert buf.frames.dtype == np.uint16
+        assert buf.format.is_mono
+
+    def test_mono_publish_does_not_reallocate(self):
+        buf = FrameRingBuffer(3, 4, 6, 1, dtype=np.uint8)
+        frames = buf.frames
+        buf.publish(np.ones((4, 6), dtype=np.uint8), {})
+        assert buf.frames is frames
+
+
 class TestSetNumConsumers:
     def test_updates_consumer_count(self):
         buf = FrameRingBuffer(4, 2, 2, 3, num_consumers=1)
@@ -226,3 +253,263 @@ class TestMetadata:
         assert meta_a["slot"] == "A"
         assert meta_b["slot"] == "B"
         assert meta_c["slot"] == "C"
+
+
+class TestSequenceCounters:
+    def test_slot_seq_tracks_write_position(self):
+        buf = FrameRingBuffer(2, 2, 2, 3, num_consumers=0)
+        frame = np.zeros((2, 2, 3), dtype=np.uint8)
+        for _ in range(3):
+            buf.publish(frame, {})
+        assert buf.slot_seq.dtype == np.int64
+        assert list(buf.slot_seq) == [3, 2]
+
+    def test_realloc_starts_new_generation(self):
+        buf = FrameRingBuffer(2, 2, 2, 3, num_consumers=1)
+        buf.publish(np.zeros((2, 2, 3), dtype=np.uint8), {})
+        buf.publish(np.zeros((4, 4), dtype=np.uint8), {})
+        assert buf.write_pos == 2  # Sequence numbers carry on
+        assert buf.generation == 1
+        assert list(buf.slot_seq) == [0, 2]
+        assert list(buf.ref_counts) == [0, 1]
+
+
+class TestPublishAsync:
+    async def test_publish_async_writes_slot(self):
+        buf = FrameRingBuffer(2, 2, 2, 3, num_consumers=1)
+        frame = np.full((2, 2, 3), 7, dtype=np.uint8)
+        idx = await buf.publish_async(frame, {"Frame Index": 0})
+        view, meta = buf.get_view(idx)
+        np.testing.assert_array_equal(view, frame)
+        assert meta["Frame Index"] == 0
+
+    async def test_waits_for_release_on_loop(self):
+        buf = FrameRingBuffer(1, 2, 2, 3, num_consumers=1)
+        frame = np.zeros((2, 2, 3), dtype=np.uint8)
+        await buf.publish_async(frame, {})
+        publish = asyncio.create_task(buf.publish_async(frame, {}))
+        await asyncio.sleep(0.05)
+        assert not publish.done()  # Backpressure without blocking the loop
+        buf.release(0)
+        assert await asyncio.wait_for(publish, timeout=2) == 0
+        assert buf.write_pos == 2
+
+    async def test_waits_for_release_from_thread(self):
+        buf = FrameRingBuffer(1, 2, 2, 3, num_consumers=2)
+        frame = np.zeros((2, 2, 3), dtype=np.uint8)
+        await buf.publish_async(frame, {})
+
+        def consumers():
+            for _ in range(2):
+                time.sleep(0.02)
+                buf.release(0)
+
+        thread = threading.Thread(target=consumers)
+        thread.start()
+        await asyncio.wait_for(buf.publish_async(frame, {}), timeout=2)
+        thread.join()
+        assert buf.write_pos == 2
+
+
+def _publish(buf, n, start=0):
+    for i in range(start, start + n):
+        buf.publish(np.full((2, 2), i, dtype=np.uint8), {"Frame Index": i})
+
+
+class TestParsePolicy:
+    def test_valid(self):
+        assert parse_policy("lossless") == ("lossless", 1)
+        assert parse_policy("latest") == ("latest", 1)
+        assert parse_policy("every 3") == ("every", 3)
+        assert parse_policy("every 1") == ("lossless", 1)
+
+    def test_invalid(self):
+        for spec in ("sometimes", "every", "every 0", "every x"):
+            with pytest.raises(ValueError):
+                parse_policy(spec)
+
+
+class TestNamedConsumers:
+    def test_lossless_reads_every_frame_in_order(self):
+        buf = FrameRingBuffer(4, 2, 2, 1, num_consumers=0)
+        writer = buf.add_consumer("writer")
+        _publish(buf, 3)
+        seen = []
+        while (slot := writer.try_claim()) is not None:
+            seen.append(buf.get_view(slot)[1]["Frame Index"])
+            writer.release(slot)
+        assert seen == [0, 1, 2]
+        assert writer.stats()["delivered"] == 3
+        assert writer.stats()["max lag"] == 2
+
+    def test_latest_skips_to_newest_frame(self):
+        buf = FrameRingBuffer(4, 2, 2, 1, num_consumers=0)
+        display = buf.add_consumer("display", "latest")
+        _publish(buf, 3)
+        slot = display.try_claim()
+        assert buf.get_view(slot)[1]["Frame Index"] == 2
+        display.release(slot)
+        assert display.try_claim() is None
+        assert display.stats()["dropped"] == 2
+
+    def test_every_nth(self):
+        buf = FrameRingBuffer(8, 2, 2, 1, num_consumers=0)
+        sampler = buf.add_consumer("sampler", "every 3")
+        _publish(buf, 7)
+        seen = []
+        while (slot := sampler.try_claim()) is not None:
+            seen.append(buf.get_view(slot)[1]["Frame Index"])
+            sampler.release(slot)
+        assert seen == [0, 3, 6]
+        assert sampler.stats()["dropped"] == 0
+
+    def test_latest_consumer_does_not_hold_back_producer(self):
+        buf = FrameRingBuffer(2, 2, 2, 1, num_consumers=0)
+        buf.add_consumer("display", "latest")  # Never reads
+        _publish(buf, 10)  # Would block if the display held any slot
+        assert buf.write_pos == 10
+
+    def test_lossless_consumer_holds_back_producer(self):
+        buf = FrameRingBuffer(2, 2, 2, 1, num_consumers=0)
+        writer = buf.add_consumer("writer")
+        display = buf.add_consumer("display", "latest")
+        _publish(buf, 2)
+        published = threading.Event()
+
+        def publish_third():
+            _publish(buf, 1, start=2)
+            published.set()
+
+        threading.Thread(target=publish_third, daemon=True).start()
+        time.sleep(0.05)
+        assert not published.is_set()
+        slot = display.try_claim()  # The display keeps reading meanwhile
+        assert buf.get_view(slot)[1]["Frame Index"] == 1
+        display.release(slot)
+        slot = writer.try_claim()
+        writer.release(slot)  # Frees frame 0's slot
+        assert published.wait(timeout=2)
+        assert buf.get_view(0)[1]["Frame Index"] == 2
+
+    def test_pinned_slot_is_not_overwritten(self):
+        buf = FrameRingBuffer(2, 2, 2, 1, num_consumers=0)
+        display = buf.add_consumer("display", "latest")
+        _publish(buf, 1)
+        slot = display.try_claim()
+        view, _ = buf.get_view(slot)
+        published = threading.Event()
+
+        def publish_two():
+            _publish(buf, 2, start=1)
+            published.set()
+
+        threading.Thread(target=publish_two, daemon=True).start()
+        time.sleep(0.05)
+        assert not published.is_set()  # Frame 2 would overwrite the pinned slot
+        assert (view == 0).all()
+        display.release(slot)
+        assert published.wait(timeout=2)
+
+    def test_closed_consumer_stops_holding_back_producer(self):
+        buf = FrameRingBuffer(2, 2, 2, 1, num_consumers=0)
+        writer = buf.add_consumer("writer")
+        writer.close()
+        _publish(buf, 5)
+        assert buf.consumer_stats()["writer"]["delivered"] == 0
+
+    def test_duplicate_name_rejected(self):
+        buf = FrameRingBuffer(2, 2, 2, 1, num_consumers=0)
+        buf.add_consumer("writer")
+        with pytest.raises(ValueError):
+            buf.add_consumer("writer", "latest")
+
+    def test_hold_time_recorded(self):
+        buf = FrameRingBuffer(2, 2, 2, 1, num_consumers=0)
+        writer = buf.add_consumer("writer")
+        _publish(buf, 1)
+        slot = writer.try_claim()
+        time.sleep(0.01)
+        writer.release(slot)
+        assert writer.stats()["max hold (ms)"] >= 10
+
+    async def test_claim_async_and_join(self):
+        buf = FrameRingBuffer(2, 2, 2, 1, num_consumers=0)
+        writer = buf.add_consumer("writer")
+        display = buf.add_consumer("display", "latest")
+        seen = {"writer": [], "display": []}
+
+        async def read(consumer):
+            while True:
+                slot = await consumer.claim_async()
+                seen[consumer.name].append(buf.get_view(slot)[1]["Frame Index"])
+                await asyncio.sleep(0.01 if consumer is display else 0)
+                consumer.release(slot)
+
+        readers = [asyncio.create_task(read(c)) for c in (writer, display)]
+        for i in range(20):
+            await buf.publish_async(np.full((2, 2), i, np.uint8), {"Frame Index": i})
+        await asyncio.wait_for(writer.join(), timeout=2)
+        await asyncio.wait_for(display.join(), timeout=2)
+        for task in readers:
+            task.cancel()
+        assert seen["writer"] == list(range(20))
+        assert seen["display"][-1] == 19
+        assert display.stats()["delivered"] + display.stats()["dropped"] == 20
+
+
+class TestGenerations:
+    def test_held_frames_survive_reallocation(self):
+        buf = FrameRingBuffer(2, 2, 2, 1, num_consumers=0)
+        writer = buf.add_consumer("writer")
+        _publish(buf, 2)
+        slot = writer.try_claim()
+        view, meta = writer.get_view(slot)
+        buf.publish(np.full((4, 4), 9, dtype=np.uint8), {"Frame Index": 2})
+        assert buf.generation == 1
+        # The frame being read and the one queued behind it are intact
+        assert (view == 0).all() and meta["Frame Index"] == 0
+        writer.release(slot)
+        seen = []
+        while (slot := writer.try_claim()) is not None:
+            view, meta = writer.get_view(slot)
+            seen.append((meta["Frame Index"], view.shape))
+            writer.release(slot)
+        assert seen == [(1, (2, 2)), (2, (4, 4))]
+
+    def test_old_generation_released_after_readers(self):
+        buf = FrameRingBuffer(2, 2, 2, 1, num_consumers=0)
+        display = buf.add_consumer("display", "latest")
+        _publish(buf, 1)
+        slot = display.try_claim()
+        buf.publish(np.zeros((4, 4), dtype=np.uint8), {})
+        buf.publish(np.zeros((4, 4), dtype=np.uint8), {})
+        assert len(buf._stores) == 2  # Pinned by the display
+        display.release(slot)
+        buf.publish(np.zeros((4, 4), dtype=np.uint8), {})
+        assert len(buf._stores) == 1
+
+    def test_anonymous_reader_with_generation(self):
+        buf = FrameRingBuffer(2, 2, 2, 1, num_consumers=1)
+        idx = buf.publish(np.full((2, 2), 5, dtype=np.uint8), {})
+        generation = buf.generation
+        buf.publish(np.zeros((3, 3), dtype=np.uint8), {})
+        view, _ = buf.get_view(idx, generation)
+        assert view.shape == (2, 2) and (view == 5).all()
+        buf.release(idx, generation)
+        assert buf.ref_counts[idx] == 0
+
+    def test_declared_format_never_reallocates(self):
+        fmt = FrameFormat((4, 6), np.uint16)
+        buf = FrameRingBuffer.from_format(3, fmt, num_consumers=0)
+        frames = buf.frames
+        buf.publish(np.ones((4, 6), dtype=np.uint16), {})
+        assert buf.frames is frames
+        assert buf.generation == 0
+
+    def test_allocated_on_first_frame(self):
+        buf = FrameRingBuffer.from_format(3, None, num_consumers=1)
+        assert buf.frames is None and buf.format is None
+        idx = buf.publish(np.ones((4, 6, 3), dtype=np.uint8), {})
+        assert buf.format == FrameFormat((4, 6, 3), np.uint8)
+        assert buf.generation == 0
+        np.testing.assert_array_equal(buf.get_view(idx)[0], 1)
@@ -59,6 +59,21 @@ class TestCLIParsing:
             call_config = MockRunner.call_args[0][0]
             assert call_config["multiprocess"] is True
 
+    def test_offload_flag(self, tmp_path):
+        config = {"Enabled Camera Modules": [], "Save Directory": str(tmp_path)}
+        config_path = tmp_path / "config.json"
+        config_path.write_text(json.dumps(config))
+
+        with (
+            patch("rataGUI.headless.runner.PipelineRunner") as MockRunner,
+            patch("sys.argv", ["rataGUI-headless", str(config_path), "--offload"]),
+        ):
+            instance = MockRunner.return_value
+            instance.start = MagicMock()
+            cli.main()
+            call_config = MockRunner.call_args[0][0]
+            assert call_config["multiprocess"] == "offload"
+
     def test_empty_config_exits_cleanly(self):
         with (
             patch("rataGUI.launch_config", {}),
@@ -0,0 +1,43 @@
+"""Tests for the per-pipeline latency budget."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from rataGUI.latency_budget import LatencyBudget, frame_age_ms
+
+
+def _metadata(age_ms):
+    return {"Timestamp": datetime.now() - timedelta(milliseconds=age_ms)}
+
+
+class TestLatencyBudget:
+    def test_admit_counts_decisions(self):
+        budget = LatencyBudget(50)
+        assert budget.admit("DLCInference", _metadata(0))
+        assert not budget.admit("DLCInference", _metadata(200))
+        assert budget.admit("DLCInference", {})  # No timestamp, no age
+        budget.finished("DLCInference", _metadata(100))
+        budget.finished("DLCInference", _metadata(0))
+        assert budget.stats() == {
+            "DLCInference": {"processed": 2, "skipped": 1, "late": 1}
+        }
+
+    def test_frame_age(self):
+        assert frame_age_ms({}) == 0
+        assert frame_age_ms(_metadata(100)) >= 100
+
+    @pytest.mark.parametrize(
+        "config, budget_ms",
+        [
+            (None, None),
+            (20, 20.0),
+            ("bad", None),
+            (0, None),
+            ({"default": 50, "Cam 1": 20}, 20.0),
+            ({"Cam 2": 20}, None),
+        ],
+    )
+    def test_from_config(self, config, budget_ms):
+        budget = LatencyBudget.from_config(config, "Cam 1")
+        assert (budget and budget.budget_ms) == budget_ms
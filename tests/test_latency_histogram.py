@@ -0,0 +1,75 @@
+"""Tests for the fixed-bucket latency histograms."""
+
+import json
+
+import pytest
+
+from rataGUI.latency_histogram import (
+    NUM_BUCKETS,
+    LatencyHistogram,
+    PipelineTimings,
+    bucket_bounds,
+    bucket_index,
+    dump_timings,
+)
+
+
+class TestLatencyHistogram:
+    @pytest.mark.parametrize("value", [0, 1, 127, 128, 129, 1000, 65_535, 10**9])
+    def test_bucket_holds_value(self, value):
+        low, high = bucket_bounds(bucket_index(value))
+        assert low <= value <= high
+        assert high - low <= max(1, value / 64)
+
+    def test_bucket_range(self):
+        assert bucket_index(-5) == 0
+        assert bucket_index(2**40) == NUM_BUCKETS - 1
+        indices = [bucket_index(value) for value in range(0, 100_000, 7)]
+        assert indices == sorted(indices)
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 1001):  # 1 us .. 1 ms
+            histogram.record(value)
+        summary = histogram.summary()
+        assert summary["count"] == 1000
+        assert summary["mean (ms)"] == pytest.approx(0.5005)
+        assert summary["p50 (ms)"] == pytest.approx(0.5, rel=0.02)
+        assert summary["p99 (ms)"] == pytest.approx(0.99, rel=0.02)
+        assert summary["max (ms)"] == 1.0
+
+    def test_empty(self):
+        summary = LatencyHistogram().summary()
+        assert summary["count"] == 0 and summary["p99 (ms)"] == 0
+
+    def test_round_trip(self):
+        histogram = LatencyHistogram()
+        for value in (5, 5, 300, 70_000):
+            histogram.record(value)
+        restored = LatencyHistogram.from_dict(
+            json.loads(json.dumps(histogram.as_dict()))
+        )
+        assert restored.counts == histogram.counts
+        assert restored.summary() == histogram.summary()
+
+
+class TestPipelineTimings:
+    def test_stats_omit_empty_stages(self, tmp_path):
+        timings = PipelineTimings()
+        timings.stage("VideoWriter")["service"].record(2000)
+        assert timings.stats() == {
+            "VideoWriter": {
+                "service": {
+                    "count": 1,
+                    "mean (ms)": 2.0,
+                    "p50 (ms)": 2.0,
+                    "p95 (ms)": 2.0,
+                    "p99 (ms)": 2.0,
+                    "max (ms)": 2.0,
+                }
+            }
+        }
+        path = tmp_path / "latency.json"
+        dump_timings(str(path), {"Cam 1": timings})
+        data = json.loads(path.read_text())
+        assert PipelineTimings.from_dict(data["Cam 1"]).stats() == timings.stats()
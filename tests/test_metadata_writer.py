@@ -103,6 +103,33 @@ class TestMetadataWriterProcess:
         call_args = mock_cv2.putText.call_args
         assert "Frame Index" in call_args[0][1]
 
+    @patch("rataGUI.plugins.metadata_writer.cv2")
+    def test_overlay_on_mono16_frame(
+        self,
+        mock_cv2,
+        mock_cam_widget,
+        mock_config_manager,
+        sample_metadata,
+    ):
+        mock_cv2.getTextSize.return_value = ((100, 20), 0)
+
+        config = mock_config_manager(
+            {
+                "Overlay Frame Index": True,
+                "Abbreviate": False,
+                "Overlay Timestamp": False,
+                "Include date": False,
+                "Overlay Camera Name": False,
+            }
+        )
+        writer = MetadataWriter(mock_cam_widget, config)
+        frame = np.zeros((100, 200), dtype=np.uint16)
+        writer.process(frame, sample_metadata)
+
+        assert mock_cv2.putText.call_args.kwargs["color"] == (65535,) * 3
+        # Text is anchored to the bottom of the frame
+        assert mock_cv2.putText.call_args[0][2] == (5, 95)
+
     @patch("rataGUI.plugins.metadata_writer.cv2")
     def test_overlay_timestamp_without_date(
         self,
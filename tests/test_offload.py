@@ -0,0 +1,73 @@
+"""Tests for the full-offload subprocess helpers."""
+
+import queue
+import threading
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from rataGUI.headless.offload import _follow_control, status_report, thumbnail
+from rataGUI.latency_histogram import PipelineTimings
+
+
+def _make_ctx():
+    ctx = MagicMock()
+    ctx.camera._running = True
+    ctx.camera.frames_acquired = 12
+    ctx.avg_latency = 3.5
+    ctx.failed_plugins = {"DLCInference": {"Error Message": "boom"}}
+    failed = MagicMock(failed=True)
+    ok = MagicMock(failed=False)
+    ctx.plugins = [failed, ok]
+    ctx.latest_frame = np.zeros((480, 640), dtype=np.uint16)
+    return ctx
+
+
+class TestThumbnail:
+    def test_width_limited(self):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        assert thumbnail(frame, 100).shape == (69, 92, 3)
+
+    def test_never_upscaled(self):
+        frame = np.zeros((10, 20), dtype=np.uint16)
+        thumb = thumbnail(frame, 100)
+        assert thumb.shape == (10, 20)
+        assert thumb.base is None  # A copy, not a view into the frame
+
+
+class TestStatusReport:
+    def test_fields(self):
+        report = status_report(_make_ctx())
+        assert report["running"] is True
+        assert report["frames acquired"] == 12
+        assert report["average latency"] == 3.5
+        assert report["failed plugins"] == ["DLCInference", "MagicMock"]
+        assert report["preview"] is None
+
+    def test_latency(self):
+        ctx = _make_ctx()
+        ctx.timings = PipelineTimings()
+        ctx.timings.stage("VideoWriter")["end-to-end"].record(1500)
+        report = status_report(ctx)
+        restored = PipelineTimings.from_dict(report["latency"])
+        assert restored.stats() == ctx.timings.stats()
+
+    def test_preview(self):
+        report = status_report(_make_ctx(), preview_width=160)
+        assert report["preview"].shape == (120, 160)
+        assert report["preview"].dtype == np.uint16
+
+
+class TestFollowControl:
+    def test_pause_resume_stop(self):
+        ctx = MagicMock()
+        control = queue.Queue()
+        thread = threading.Thread(target=_follow_control, args=(ctx, control))
+        thread.start()
+        control.put("pause")
+        control.put("resume")
+        control.put("stop")
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        ctx.stop_camera_pipeline.assert_called_once()
+        assert ctx.active is True
@@ -61,8 +61,31 @@ class TestPipelineContext:
             session_dir=str(tmp_path),
         )
         ctx._mp_control_queue = MagicMock()
+        ctx._mp_ring = MagicMock()
         ctx.stop_camera_pipeline()
         ctx._mp_control_queue.put.assert_called_once_with("stop")
+        ctx._mp_ring.request_stop.assert_called_once()
+
+    def test_pause_and_resume_forwarded_to_subprocess(self, tmp_path):
+        camera = _make_camera()
+        camera._running = True
+        ctx = PipelineContext(
+            camera=camera,
+            camera_config=HeadlessConfigManager(),
+            save_dir=str(tmp_path / "output"),
+            triggers=[],
+            session_dir=str(tmp_path),
+        )
+        ctx._mp_control_queue = MagicMock()
+        ctx.wakeup = MagicMock()
+        ctx.active = False
+        ctx.active = False
+        ctx.active = True
+        assert [c.args for c in ctx._mp_control_queue.put.call_args_list] == [
+            ("pause",),
+            ("resume",),
+        ]
+        assert ctx.wakeup.notify.call_count == 3
 
     def test_save_widget_data(self, tmp_path):
         camera = _make_camera("MyCam")
@@ -0,0 +1,222 @@
+"""Tests for the pipeline engine shared by CameraWidget and PipelineRunner."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from rataGUI.executor_pools import ExecutorPools
+from rataGUI.headless.context import HeadlessConfigManager, PipelineContext
+from rataGUI.latency_budget import SKIPPED_KEY, LatencyBudget
+from rataGUI.pipeline_engine import PLUGIN_FAILED, PipelineEngine
+from rataGUI.pipeline_wakeup import PipelineWakeup
+
+
+class _Camera:
+    def __init__(self, num_frames):
+        self.cameraID = "EngineCam"
+        self.display_name = "EngineCam"
+        self._running = True
+        self.frames_acquired = 0
+        self._num_frames = num_frames
+        self.closed = False
+
+    def getDisplayName(self):
+        return self.display_name
+
+    def readCamera(self):
+        if self.frames_acquired >= self._num_frames:
+            self._running = False
+            return False, None
+        self.frames_acquired += 1
+        return True, np.zeros((4, 6), np.uint8)
+
+    def getMetadata(self):
+        return {"Frame Index": self.frames_acquired}
+
+    def closeCamera(self):
+        self.closed = True
+
+
+def _plugin(ctx, process, name="EnginePlugin", independent=False):
+    from rataGUI.plugins.base_plugin import BasePlugin
+
+    class EnginePlugin(BasePlugin):
+        def process(self, frame, metadata):
+            return process(frame, metadata)
+
+    EnginePlugin.__name__ = name
+    plugin = EnginePlugin(ctx, HeadlessConfigManager())
+    plugin.independent = independent
+    return plugin
+
+
+def _context(tmp_path, num_frames):
+    return PipelineContext(
+        _Camera(num_frames), HeadlessConfigManager(), str(tmp_path), triggers=[]
+    )
+
+
+class TestPipelineEngine:
+    def test_unknown_event(self):
+        with pytest.raises(ValueError):
+            PipelineEngine(ExecutorPools()).subscribe("frame", print)
+
+    @pytest.mark.asyncio
+    async def test_plugin_failure_is_published(self, tmp_path):
+        ctx = _context(tmp_path, num_frames=8)
+
+        def fail(frame, metadata):
+            raise RuntimeError("simulated failure")
+
+        ctx.plugins = [_plugin(ctx, fail)]
+        engine = PipelineEngine(ExecutorPools())
+        events = []
+        engine.subscribe(PLUGIN_FAILED, lambda *args: events.append(args))
+        engine.subscribe(PLUGIN_FAILED, lambda *args: 1 / 0)  # Logged, not raised
+        await engine.run(ctx)
+
+        assert events == [("EngineCam", "EnginePlugin")]
+        assert ctx.plugins[0].failed
+        assert ctx.camera.closed
+
+    @pytest.mark.asyncio
+    async def test_runs_any_context(self, tmp_path):
+        """The engine only needs the attributes a CameraWidget also has."""
+        seen = []
+        camera = _Camera(num_frames=3)
+        ctx = SimpleNamespace(
+            camera=camera,
+            plugins=[],
+            plugin_names=[],
+            avg_latency=0,
+            latency_budget=None,
+            active=True,
+            wakeup=PipelineWakeup(),
+            preview_width=0,
+            frame_memory=None,
+            fan_out=None,
+            _acquisition_queue=None,
+            _mp_leases=None,
+            stop_camera_pipeline=lambda: None,
+        )
+        ctx.plugins = [
+            _plugin(ctx, lambda f, m: seen.append(m["Frame Index"]), "Reader", True),
+            _plugin(ctx, lambda f, m: (f, m), "Display", True),
+        ]
+        await PipelineEngine(ExecutorPools()).run(ctx)
+
+        assert seen == [1, 2, 3]
+        assert ctx.fan_out.stats()["Display"]["delivered"] == 3  # Ring consumer
+        assert ctx.avg_latency > 0
+        stats = ctx.timings.stats()
+        for name in ("Reader", "Display"):
+            assert set(stats[name]) == {"queue wait", "service", "end-to-end"}
+            assert stats[name]["service"]["count"] == 3
+
+    @pytest.mark.asyncio
+    async def test_latency_budget_skips_stale_frames(self, tmp_path):
+        ctx = _context(tmp_path, num_frames=10)
+        ctx.latency_budget = LatencyBudget(10)
+        written = []
+
+        def infer(frame, metadata):
+            time.sleep(0.03)  # Slower than the camera: frames go stale
+            metadata["Pose"] = True
+            return frame, metadata
+
+        inference = _plugin(ctx, infer, "Inference")
+        inference.blocking = True
+        inference.latency_critical = True
+        ctx.plugins = [
+            inference,
+            _plugin(ctx, lambda f, m: written.append(m), "Writer"),
+        ]
+        await PipelineEngine(ExecutorPools()).run(ctx)
+
+        # The writer still gets every frame, skipped ones unprocessed
+        assert [m["Frame Index"] for m in written] == list(range(1, 11))
+        skipped = [m for m in written if SKIPPED_KEY in m]
+        assert all(m[SKIPPED_KEY] == ("Inference",) for m in skipped)
+        assert not any("Pose" in m for m in skipped)
+        stats = ctx.latency_budget.stats()["Inference"]
+        assert stats["skipped"] == len(skipped) > 0
+        assert stats["processed"] == 10 - len(skipped)
+        assert stats["late"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_blocked_plugin_only_stalls_its_camera(self, tmp_path):
+        """Blocking plugins of one class get a thread pool per camera."""
+        pools = ExecutorPools()
+        release = threading.Event()
+        ctx_a = _context(tmp_path, num_frames=3)
+        ctx_a.camera.display_name = "CamA"
+        ctx_b = _context(tmp_path, num_frames=3)
+        ctx_b.camera.display_name = "CamB"
+        written = []
+
+        def stalled(frame, metadata):
+            release.wait(timeout=10)  # Like an encoder stuck on backpressure
+            return frame, metadata
+
+        def write(frame, metadata):
+            written.append(metadata["Frame Index"])
+            return frame, metadata
+
+        for ctx, process in [(ctx_a, stalled), (ctx_b, write)]:
+            writer = _plugin(ctx, process, "Writer")
+            writer.blocking = True
+            ctx.plugins = [writer]
+
+        task_a = asyncio.create_task(PipelineEngine(pools).run(ctx_a))
+        try:
+            await asyncio.wait_for(PipelineEngine(pools).run(ctx_b), timeout=5)
+            assert written == [1, 2, 3]
+            assert not task_a.done()
+        finally:
+            release.set()
+            await asyncio.wait_for(task_a, timeout=10)
+            pools.shutdown()
+        assert {"plugin CamA/Writer", "plugin CamB/Writer"} <= set(pools.stats())
+
+    @pytest.mark.asyncio
+    async def test_branches_do_not_share_writeable_frames(self, tmp_path):
+        """A plugin drawing into its frame copies it first at a branch point."""
+        ctx = _context(tmp_path, num_frames=5)
+        seen = []
+
+        def draw(frame, metadata):
+            frame[:] = 255  # Like DLCInference drawing its markers
+            return frame, metadata
+
+        def check(frame, metadata):
+            time.sleep(0.01)  # While the other branch draws
+            seen.append(int(frame.max()))
+            return frame, metadata
+
+        drawer = _plugin(ctx, draw, "Drawer", independent=True)
+        drawer.modifies_frame = True
+        checker = _plugin(ctx, check, "Checker", independent=True)
+        for plugin in (drawer, checker):
+            plugin.blocking = True  # No ring readers at the branch point
+        ctx.plugins = [drawer, checker]
+        ctx.plugin_names = ["Drawer", "Checker"]
+        graph = {"camera": ["Drawer", "Checker"]}
+        await PipelineEngine(ExecutorPools(), graph).run(ctx)
+
+        assert seen == [0] * 5
+
+    @pytest.mark.asyncio
+    async def test_no_ring_without_ring_readers(self, tmp_path):
+        ctx = _context(tmp_path, num_frames=3)
+        written = []
+        writer = _plugin(ctx, lambda f, m: written.append(m), "Writer", True)
+        writer.blocking = True
+        ctx.plugins = [writer]
+        await PipelineEngine(ExecutorPools()).run(ctx)
+
+        assert len(written) == 3
+        assert ctx.fan_out.ring_buffer is None
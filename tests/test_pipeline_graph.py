@@ -0,0 +1,118 @@
+"""Tests for the declarative pipeline graph."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from rataGUI.pipeline_graph import SOURCE, Edge, Join, PipelineGraph
+
+
+def _edges(graph):
+    return [(edge.parent, edge.child) for edge in graph.edges]
+
+
+class TestPipelineGraph:
+    def test_branches_and_topological_order(self):
+        spec = {
+            "camera": ["Undistort"],
+            "Undistort": ["DLC", "Writer", {"to": "Display", "ring policy": "latest"}],
+            "DLC": [{"to": "World", "queue size": 4, "drop policy": "drop_oldest"}],
+        }
+        graph = PipelineGraph.from_config(
+            spec, ["Undistort", "DLC", "World", "Writer", "Display"]
+        )
+        assert graph.nodes[0] == "Undistort"
+        assert graph.nodes.index("DLC") < graph.nodes.index("World")
+        assert graph.is_branch("Undistort") and not graph.is_branch("DLC")
+        (edge,) = graph.children("DLC")
+        assert edge.settings() == {"queue size": 4, "drop policy": "drop_oldest"}
+        assert graph.children("Undistort")[2].ring_policy == "latest"
+        assert "DLC -> World, queue size 4" in graph.describe()
+
+    def test_aliases_and_unmentioned_plugins(self):
+        graph = PipelineGraph.from_config(
+            {"video_writer": ["FrameDisplay"]},
+            ["VideoWriter", "FrameDisplay", "MetadataWriter"],
+            aliases={"video_writer": "VideoWriter"},
+        )
+        assert _edges(graph) == [
+            ("VideoWriter", "FrameDisplay"),
+            (SOURCE, "VideoWriter"),
+            (SOURCE, "MetadataWriter"),
+        ]
+        assert graph.is_branch(SOURCE)
+
+    def test_missing_plugins_are_bypassed(self):
+        graph = PipelineGraph.from_config(
+            {"camera": ["A"], "A": ["B"], "B": ["C", "D"]}, ["A", "C", "D"]
+        )
+        assert sorted(_edges(graph)) == [("A", "C"), ("A", "D"), (SOURCE, "A")]
+
+    def test_join(self):
+        graph = PipelineGraph.from_config(
+            {"camera": ["A", "B"], "A": ["C"], "B": ["C"]}, ["A", "B", "C"]
+        )
+        assert graph.is_join("C")
+        assert graph.nodes[-1] == "C"
+
+    def test_cycle(self):
+        with pytest.raises(ValueError, match="cycle"):
+            PipelineGraph.from_config({"A": ["B"], "B": ["A"]}, ["A", "B"])
+
+    @pytest.mark.parametrize(
+        "child",
+        [
+            {"to": "B", "queue size": -1},
+            {"to": "B", "drop policy": "drop_newest"},
+            {"to": "B", "ring policy": "sometimes"},
+            {"to": "B", "priority": 1},
+            {"queue size": 2},
+        ],
+    )
+    def test_invalid_edges(self, child):
+        with pytest.raises(ValueError):
+            PipelineGraph.from_config({"A": [child]}, ["A", "B"])
+
+    def test_edge_into_source(self):
+        with pytest.raises(ValueError):
+            PipelineGraph([Edge("A", SOURCE)])
+
+
+class TestJoin:
+    @pytest.mark.asyncio
+    async def test_merges_metadata_in_order(self):
+        out_queue = asyncio.Queue()
+        join = Join("C", [asyncio.Queue(), asyncio.Queue()], out_queue)
+        frame = np.zeros((2, 2), np.uint8)
+        await join.add(1, frame.copy(), {"Frame Index": 1, "B": 2, "x": "b"})
+        assert out_queue.empty()
+        await join.add(0, frame, {"Frame Index": 1, "A": 1, "x": "a"})
+        merged_frame, metadata = out_queue.get_nowait()
+        assert merged_frame is frame
+        assert metadata == {"Frame Index": 1, "A": 1, "B": 2, "x": "b"}
+
+    @pytest.mark.asyncio
+    async def test_discards_frames_dropped_on_one_input(self):
+        out_queue = asyncio.Queue()
+        join = Join("C", [asyncio.Queue(), asyncio.Queue()], out_queue)
+        frame = np.zeros((2, 2), np.uint8)
+        for index in (1, 2, 3):
+            await join.add(0, frame, {"Frame Index": index})
+        for index in (1, 3):  # Frame 2 dropped on the second input
+            await join.add(1, frame, {"Frame Index": index})
+        assert [out_queue.get_nowait()[1]["Frame Index"] for _ in range(2)] == [1, 3]
+        assert join.stats() == {"joined": 2, "incomplete": 1}
+
+    @pytest.mark.asyncio
+    async def test_run_reads_inputs(self):
+        inputs = [asyncio.Queue(), asyncio.Queue()]
+        out_queue = asyncio.Queue()
+        task = asyncio.create_task(Join("C", inputs, out_queue).run())
+        frame = np.zeros((2, 2), np.uint8)
+        for queue in inputs:
+            queue.put_nowait((frame, {"Frame Index": 5}))
+        for queue in inputs:
+            await asyncio.wait_for(queue.join(), timeout=1.0)
+        assert out_queue.qsize() == 1
+        task.cancel()
@@ -3,11 +3,16 @@
 import asyncio
 import json
 import logging
+import multiprocessing
+import os
+import time
 
 import numpy as np
 import pytest
 
+from rataGUI.executor_pools import ExecutorPools
 from rataGUI.headless.runner import PipelineRunner
+from rataGUI.pipeline_engine import PipelineEngine
 
 
 def _make_camera_cls(num_cameras=1, num_frames=3):
@@ -98,6 +103,11 @@ class TestPipelineRunnerInit:
         runner = PipelineRunner({"Save Directory": "/old"}, save_dir="/new")
         assert runner._config["Save Directory"] == "/new"
 
+    def test_cpu_affinity_plan(self):
+        core = min(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else 0
+        runner = PipelineRunner({"cpu affinity": {"encoders": [core]}})
+        assert runner._affinity.cores_for_encoders() == {core}
+
 
 class TestPipelineRunnerExcludesFrameDisplay:
     def test_excluded_plugins_set(self):
@@ -129,6 +139,17 @@ class TestPipelineRunnerLifecycle:
             await runner.run()
 
             assert MockPlugin.frames_processed == 5
+            pool_stats = runner.executor_stats()
+            assert pool_stats["acquisition MockCam-1"]["workers"] == 1
+            assert pool_stats["acquisition MockCam-1"]["completed"] >= 5
+            (latency,) = runner.latency_stats().values()
+            assert latency["MockPlugin"]["end-to-end"]["count"] == 5
+
+            session_dir = tmp_path / "session"
+            session_dir.mkdir()
+            runner._dump_timings(str(session_dir))
+            (saved,) = json.loads((session_dir / "latency.json").read_text()).values()
+            assert saved["MockPlugin"]["service"]["count"] == 5
         finally:
             BaseCamera.modules.pop("MockCamera", None)
             BasePlugin.modules.pop("MockPlugin", None)
@@ -165,6 +186,49 @@ class TestPipelineRunnerLifecycle:
             BaseCamera.modules.pop("MockCamera2", None)
             BasePlugin.modules.pop("MockPlugin2", None)
 
+    @pytest.mark.asyncio
+    async def test_pause_resume_and_stop_wake_pipeline(self, tmp_path):
+        """A paused pipeline sleeps until resumed, and stop() wakes it at once."""
+        MockCamera = _make_camera_cls(num_cameras=1, num_frames=999999)
+        MockPlugin = _make_plugin_cls("MockPlugin3")
+
+        from rataGUI.cameras.BaseCamera import BaseCamera
+        from rataGUI.plugins.base_plugin import BasePlugin
+
+        BaseCamera.modules["MockCamera3"] = MockCamera
+        BasePlugin.modules["MockPlugin3"] = MockPlugin
+
+        try:
+            config = {
+                "Enabled Camera Modules": ["MockCamera3"],
+                "Enabled Plugin Modules": ["MockPlugin3"],
+                "Enabled Trigger Modules": [],
+                "Save Directory": str(tmp_path),
+            }
+            runner = PipelineRunner(config)
+
+            async def pause_resume_stop():
+                await asyncio.sleep(0.1)
+                ctx = runner._contexts[0]
+                ctx.active = False
+                await asyncio.sleep(0.05)
+                paused_at = ctx.camera.frames_acquired
+                await asyncio.sleep(0.1)
+                assert ctx.camera.frames_acquired == paused_at
+                ctx.active = True
+                await asyncio.sleep(0.05)
+                assert ctx.camera.frames_acquired > paused_at
+                ctx.active = False
+                await asyncio.sleep(0.05)
+                runner.stop()
+
+            await asyncio.wait_for(
+                asyncio.gather(runner.run(), pause_resume_stop()), timeout=5
+            )
+        finally:
+            BaseCamera.modules.pop("MockCamera3", None)
+            BasePlugin.modules.pop("MockPlugin3", None)
+
     @pytest.mark.asyncio
     async def test_no_cameras_exits_cleanly(self, tmp_path):
         """If no cameras are discovered, run() returns without error."""
@@ -212,11 +276,198 @@ class TestPipelineRunnerLifecycle:
 
             assert PluginA.frames_processed == 3
             assert PluginB.frames_processed == 3
+            (stats,) = runner.dispatch_stats().values()
+            assert stats["PluginA"]["delivered"] == 3
+            assert stats["PluginB"]["max dispatch (ms)"] >= 0
         finally:
             BaseCamera.modules.pop("FanOutCam", None)
             BasePlugin.modules.pop("PluginA", None)
             BasePlugin.modules.pop("PluginB", None)
 
+    @pytest.mark.asyncio
+    async def test_ring_policy_override(self, tmp_path, caplog):
+        """Each ring consumer gets the policy from its plugin config."""
+        MockCamera = _make_camera_cls(num_cameras=1, num_frames=5)
+
+        PluginA = _make_plugin_cls("PluginA", independent=True)
+        PluginB = _make_plugin_cls("PluginB", independent=True)
+
+        from rataGUI.cameras.BaseCamera import BaseCamera
+        from rataGUI.plugins.base_plugin import BasePlugin
+
+        BaseCamera.modules["PolicyCam"] = MockCamera
+        BasePlugin.modules["PluginA"] = PluginA
+        BasePlugin.modules["PluginB"] = PluginB
+
+        try:
+            config = {
+                "Enabled Camera Modules": ["PolicyCam"],
+                "Enabled Plugin Modules": ["PluginA", "PluginB"],
+                "Enabled Trigger Modules": [],
+                "Save Directory": str(tmp_path),
+                "plugins": {
+                    "PluginA": {"ring policy": "latest"},
+                    "PluginB": {"ring policy": "sometimes"},
+                },
+            }
+            runner = PipelineRunner(config)
+            with caplog.at_level(logging.INFO):
+                await runner.run()
+
+            assert 1 <= PluginA.frames_processed <= 5
+            assert PluginB.frames_processed == 5  # Invalid policy: lossless
+            assert "Ring consumer PluginA (latest)" in caplog.text
+            assert "Ring consumer PluginB (lossless): 5 frames delivered" in caplog.text
+        finally:
+            BaseCamera.modules.pop("PolicyCam", None)
+            BasePlugin.modules.pop("PluginA", None)
+            BasePlugin.modules.pop("PluginB", None)
+
+    @pytest.mark.asyncio
+    async def test_latency_budget(self, tmp_path, caplog):
+        """Plugins marked "latency critical" have their frames counted."""
+        MockCamera = _make_camera_cls(num_cameras=1, num_frames=5)
+
+        PluginA = _make_plugin_cls("PluginA")
+        PluginB = _make_plugin_cls("PluginB")
+
+        from rataGUI.cameras.BaseCamera import BaseCamera
+        from rataGUI.plugins.base_plugin import BasePlugin
+
+        BaseCamera.modules["BudgetCam"] = MockCamera
+        BasePlugin.modules["PluginA"] = PluginA
+        BasePlugin.modules["PluginB"] = PluginB
+
+        try:
+            config = {
+                "Enabled Camera Modules": ["BudgetCam"],
+                "Enabled Plugin Modules": ["PluginA", "PluginB"],
+                "Enabled Trigger Modules": [],
+                "Save Directory": str(tmp_path),
+                "latency budget (ms)": {"default": 10000},
+                "plugins": {"PluginA": {"latency critical": True}},
+            }
+            runner = PipelineRunner(config)
+            with caplog.at_level(logging.INFO):
+                await runner.run()
+
+            (stats,) = runner.latency_budget_stats().values()
+            assert stats == {"PluginA": {"processed": 5, "skipped": 0, "late": 0}}
+            assert PluginB.frames_processed == 5
+            assert "Latency budget 10000.0 ms for PluginA" in caplog.text
+        finally:
+            BaseCamera.modules.pop("BudgetCam", None)
+            BasePlugin.modules.pop("PluginA", None)
+            BasePlugin.modules.pop("PluginB", None)
+
+    @pytest.mark.asyncio
+    async def test_pipeline_graph(self, tmp_path, caplog):
+        """Plugins run as the branches and join of a "pipeline graph"."""
+        MockCamera = _make_camera_cls(num_cameras=1, num_frames=4)
+        names = ["Source", "Reader", "Writer", "Joined", "Extra"]
+        plugin_classes = {
+            name: _make_plugin_cls(name, blocking=name == "Writer") for name in names
+        }
+
+        from rataGUI.cameras.BaseCamera import BaseCamera
+        from rataGUI.plugins.base_plugin import BasePlugin
+
+        BaseCamera.modules["GraphCam"] = MockCamera
+        BasePlugin.modules.update(plugin_classes)
+
+        try:
+            config = {
+                "Enabled Camera Modules": ["GraphCam"],
+                "Enabled Plugin Modules": names,
+                "Enabled Trigger Modules": [],
+                "Save Directory": str(tmp_path),
+                "pipeline graph": {
+                    "camera": ["Source"],
+                    "Source": ["Reader", {"to": "Writer", "queue size": 2}],
+                    "Reader": ["Joined"],
+                    "Writer": ["Joined"],
+                },
+            }
+            runner = PipelineRunner(config)
+            with caplog.at_level(logging.INFO):
+                await runner.run()
+
+            for name in names:
+                assert plugin_classes[name].frames_processed == 4, name
+            (stats,) = runner.dispatch_stats().values()
+            assert stats["Reader"]["delivered"] == 4  # Ring consumer
+            assert stats["Writer"]["delivered"] == 4
+            assert stats["Joined (join)"] == {"joined": 4, "incomplete": 0}
+            assert "Ring buffer enabled at branch point Source" in caplog.text
+            assert "Extra is not in pipeline graph" in caplog.text
+        finally:
+            BaseCamera.modules.pop("GraphCam", None)
+            for name in names:
+                BasePlugin.modules.pop(name, None)
+
+    @pytest.mark.asyncio
+    async def test_invalid_pipeline_graph(self, tmp_path, caplog):
+        """A cyclic graph stops the pipeline with an error."""
+        MockCamera = _make_camera_cls(num_cameras=1, num_frames=3)
+        PluginA = _make_plugin_cls("PluginA")
+        PluginB = _make_plugin_cls("PluginB")
+
+        from rataGUI.cameras.BaseCamera import BaseCamera
+        from rataGUI.plugins.base_plugin import BasePlugin
+
+        BaseCamera.modules["CycleCam"] = MockCamera
+        BasePlugin.modules["PluginA"] = PluginA
+        BasePlugin.modules["PluginB"] = PluginB
+
+        try:
+            config = {
+                "Enabled Camera Modules": ["CycleCam"],
+                "Enabled Plugin Modules": ["PluginA", "PluginB"],
+                "Enabled Trigger Modules": [],
+                "Save Directory": str(tmp_path),
+                "pipeline graph": {"PluginA": ["PluginB"], "PluginB": ["PluginA"]},
+            }
+            runner = PipelineRunner(config)
+            await asyncio.wait_for(runner.run(), timeout=10)
+
+            assert PluginA.frames_processed == 0
+            assert "cycle" in caplog.text
+        finally:
+            BaseCamera.modules.pop("CycleCam", None)
+            BasePlugin.modules.pop("PluginA", None)
+            BasePlugin.modules.pop("PluginB", None)
+
+    @pytest.mark.asyncio
+    async def test_frame_memory_config(self, tmp_path, caplog):
+        """The "frame memory" config allocates the fan-out ring."""
+        MockCamera = _make_camera_cls(num_cameras=1, num_frames=5)
+        PluginA = _make_plugin_cls("PluginA", independent=True)
+
+        from rataGUI.cameras.BaseCamera import BaseCamera
+        from rataGUI.plugins.base_plugin import BasePlugin
+
+        BaseCamera.modules["MemoryCam"] = MockCamera
+        BasePlugin.modules["PluginA"] = PluginA
+
+        try:
+            config = {
+                "Enabled Camera Modules": ["MemoryCam"],
+                "Enabled Plugin Modules": ["PluginA"],
+                "Enabled Trigger Modules": [],
+                "Save Directory": str(tmp_path),
+                "frame memory": {"prefault": True},
+            }
+            runner = PipelineRunner(config)
+            with caplog.at_level(logging.INFO):
+                await runner.run()
+
+            assert PluginA.frames_processed == 5
+            assert "Frame memory for" in caplog.text
+            assert "prefaulted" in caplog.text
+        finally:
+            BaseCamera.modules.pop("MemoryCam", None)
+            BasePlugin.modules.pop("PluginA", None)
+
 
 class TestPluginFailureDeactivation:
     @pytest.mark.asyncio
@@ -251,7 +502,7 @@ class TestPluginFailureDeactivation:
             runner = PipelineRunner(config)
 
             # Capture warning logs directly (rataGUI logger has propagate=False)
-            runner_logger = logging.getLogger("rataGUI.headless.runner")
+            runner_logger = logging.getLogger("rataGUI.pipeline_engine")
             captured_warnings = []
             handler = logging.Handler()
             handler.setLevel(logging.WARNING)
@@ -332,3 +583,200 @@ class TestPluginFailureDeactivation:
             BaseCamera.modules.pop("InitFailCam", None)
             BasePlugin.modules.pop("InitFailPlugin", None)
             BasePlugin.modules.pop("OkPlugin", None)
+
+
+def _leased_frame(slot_idx):
+    """Shared frame ring with one published frame claimed through a lease."""
+    import multiprocessing
+    from rataGUI.shared_frame_ring import WRITING, SharedFrameLeases, SharedFrameRing
+
+    ring = SharedFrameRing.create(2, (4, 4, 3), multiprocessing.Condition())
+    ring.slot_state[slot_idx] = WRITING
+    seq = ring.commit(slot_idx)
+    ring.write_record(slot_idx, {"Frame Index": 1}, time.monotonic_ns())
+    leases = SharedFrameLeases(ring)
+    view, metadata = leases.acquire(slot_idx, seq)
+    return ring, leases, view, metadata
+
+
+class TestZeroCopyFrames:
+    @pytest.mark.asyncio
+    async def test_read_only_frame_copied_for_writing_plugin(self, tmp_path):
+        """Plugins that modify frames get a private copy and the shared slot is released."""
+        from unittest.mock import MagicMock
+        from rataGUI.shared_frame_ring import FREE
+
+        MockPlugin = _make_plugin_cls("CowPlugin")
+        received = []
+
+        ring, leases, view, metadata = _leased_frame(0)
+        ctx = MagicMock()
+        ctx._mp_leases = leases
+        plugin = MockPlugin(ctx, MagicMock())
+        plugin.process = lambda frame, metadata: received.append(frame) or (
+            frame,
+            metadata,
+        )
+
+        await plugin.in_queue.put((view, metadata))
+
+        engine = PipelineEngine(ExecutorPools())
+        task = asyncio.create_task(engine.plugin_process(ctx, plugin))
+        await asyncio.wait_for(plugin.in_queue.join(), timeout=2)
+        task.cancel()
+
+        try:
+            assert received[0].flags.writeable
+            assert not np.shares_memory(received[0], ring.frames)
+            assert ring.slot_state[0] == FREE
+        finally:
+            del view, received
+            ring.close()
+
+    @pytest.mark.asyncio
+    async def test_read_only_frame_passed_through_and_released_at_end(self):
+        """Read-only plugins see the shared view; the terminal stage releases it."""
+        from unittest.mock import MagicMock
+        from rataGUI.shared_frame_ring import FREE, HELD
+
+        MockPlugin = _make_plugin_cls("ViewPlugin")
+        received = []
+
+        ring, leases, view, metadata = _leased_frame(1)
+        ctx = MagicMock()
+        ctx._mp_leases = leases
+        plugin = MockPlugin(ctx, MagicMock())
+        plugin.modifies_frame = False
+        plugin.process = lambda frame, metadata: received.append(frame) or (
+            frame,
+            metadata,
+        )
+
+        assert ring.slot_state[1] == HELD
+        await plugin.in_queue.put((view, metadata))
+
+        engine = PipelineEngine(ExecutorPools())
+        task = asyncio.create_task(engine.plugin_process(ctx, plugin))
+        await asyncio.wait_for(plugin.in_queue.join(), timeout=2)
+        task.cancel()
+
+        try:
+            assert np.shares_memory(received[0], ring.frames)
+            assert ring.slot_state[1] == FREE
+        finally:
+            del view, received
+            ring.close()
+
+
+class TestSharedMemorySizing:
+    @pytest.mark.asyncio
+    async def test_resize_ring_fits_reported_geometry(self):
+        """The ring is allocated from the subprocess's geometry report and the budget."""
+        import multiprocessing
+        import queue
+        from unittest.mock import MagicMock
+        from rataGUI.shared_frame_ring import SharedFrameLeases
+
+        ctx = MagicMock()
+        ctx._mp_ring = None
+        ctx._mp_ring_cond = multiprocessing.Condition()
+        ctx._mp_leases = SharedFrameLeases()
+        ctx._mp_control_queue = queue.Queue()
+        ctx.shm_budget_mb = 8
+        ctx.shm_frame_memory = None
+
+        engine = PipelineEngine(ExecutorPools())
+        geometry = {"shape": (480, 640), "dtype": "|u1", "strides": (640, 1)}
+        await engine.resize_ring(ctx, geometry)
+        first = ctx._mp_ring
+        try:
+            assert first.frames.shape[1:] == (480, 640)
+            assert first.num_slots == 8 * 2**20 // (480 * 640)
+            assert ctx._mp_control_queue.get_nowait() == first.control_message()
+
+            geometry = {"shape": (1024, 1024, 3), "dtype": "<u2", "strides": None}
+            await engine.resize_ring(ctx, geometry)
+            assert ctx._mp_ring is not first
+            assert ctx._mp_ring.num_slots == 2
+            assert ctx._mp_leases.ring is ctx._mp_ring
+        finally:
+            ctx._mp_ring.close()
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="mock modules reach the subprocess only when forked",
+)
+class TestOffloadedPipeline:
+    @pytest.mark.asyncio
+    async def test_plugins_run_in_subprocess(self, tmp_path):
+        MockCamera = _make_camera_cls(num_cameras=1, num_frames=5)
+        MockPlugin = _make_plugin_cls("MockPlugin5")
+
+        from rataGUI.cameras.BaseCamera import BaseCamera
+        from rataGUI.plugins.base_plugin import BasePlugin
+
+        MockCamera.__name__ = "MockCamera5"  # Looked up by class name
+        BaseCamera.modules["MockCamera5"] = MockCamera
+        BasePlugin.modules["MockPlugin5"] = MockPlugin
+
+        try:
+            config = {
+                "Enabled Camera Modules": ["MockCamera5"],
+                "Enabled Plugin Modules": ["MockPlugin5"],
+                "Enabled Trigger Modules": [],
+                "Save Directory": str(tmp_path),
+                "multiprocess": "offload",
+                "offload preview width": 64,
+            }
+            runner = PipelineRunner(config)
+            await asyncio.wait_for(runner.run(), timeout=30)
+
+            ctx = runner._contexts[0]
+            assert ctx.plugins == []  # Plugins were built by the subprocess
+            assert MockPlugin.frames_processed == 0
+            assert ctx.offload_status["frames acquired"] == 5
+            assert ctx.offload_status["failed plugins"] == []
+            assert ctx.latest_frame.shape == (48, 64, 3)
+            # The subprocess owns the save directory and removed it (no output)
+            assert not os.path.exists(ctx.save_dir)
+        finally:
+            BaseCamera.modules.pop("MockCamera5", None)
+            BasePlugin.modules.pop("MockPlugin5", None)
+
+    @pytest.mark.asyncio
+    async def test_stop_reaches_subprocess(self, tmp_path):
+        MockCamera = _make_camera_cls(num_cameras=1, num_frames=999999)
+        MockPlugin = _make_plugin_cls("MockPlugin6")
+
+        from rataGUI.cameras.BaseCamera import BaseCamera
+        from rataGUI.plugins.base_plugin import BasePlugin
+
+        MockCamera.__name__ = "MockCamera6"  # Looked up by class name
+        BaseCamera.modules["MockCamera6"] = MockCamera
+        BasePlugin.modules["MockPlugin6"] = MockPlugin
+
+        try:
+            config = {
+                "Enabled Camera Modules": ["MockCamera6"],
+                "Enabled Plugin Modules": ["MockPlugin6"],
+                "Enabled Trigger Modules": [],
+                "Save Directory": str(tmp_path),
+                "multiprocess": "offload",
+            }
+            runner = PipelineRunner(config)
+
+            async def stop_after_delay():
+                await asyncio.sleep(1.5)  # At least one status report
+                assert runner._contexts[0].camera.frames_acquired > 0
+                runner.stop()
+
+            await asyncio.wait_for(
+                asyncio.gather(runner.run(), stop_after_delay()), timeout=30
+            )
+            ctx = runner._contexts[0]
+            assert ctx.offload_status["running"] is False
+            assert not ctx._mp_process.is_alive()
+        finally:
+            BaseCamera.modules.pop("MockCamera6", None)
+            BasePlugin.modules.pop("MockPlugin6", None)
@@ -0,0 +1,51 @@
+import asyncio
+import multiprocessing
+import threading
+
+import pytest
+
+from rataGUI.pipeline_wakeup import PipelineWakeup
+
+
+class TestPipelineWakeup:
+    @pytest.mark.asyncio
+    async def test_notify_from_other_thread(self):
+        wakeup = PipelineWakeup()
+        wakeup.bind()
+        timer = threading.Timer(0.05, wakeup.notify)
+        timer.start()
+        await asyncio.wait_for(wakeup.wait(), timeout=2)
+        timer.join()
+
+    @pytest.mark.asyncio
+    async def test_notify_before_wait_is_remembered(self):
+        wakeup = PipelineWakeup()
+        wakeup.bind()
+        wakeup.notify()
+        await asyncio.sleep(0)  # let the thread-safe callback run
+        await asyncio.wait_for(wakeup.wait(), timeout=1)
+        # Consumed: the next wait sleeps again
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(wakeup.wait(), timeout=0.1)
+
+    @pytest.mark.asyncio
+    async def test_wakes_when_pipe_readable(self):
+        wakeup = PipelineWakeup()
+        wakeup.bind()
+        rx, tx = multiprocessing.Pipe(duplex=False)
+        asyncio.get_running_loop().call_later(0.05, tx.send_bytes, b"\x01")
+        await asyncio.wait_for(wakeup.wait(rx), timeout=2)
+        assert rx.recv_bytes() == b"\x01"
+
+    @pytest.mark.asyncio
+    async def test_wakes_on_pipe_eof(self):
+        wakeup = PipelineWakeup()
+        wakeup.bind()
+        rx, tx = multiprocessing.Pipe(duplex=False)
+        asyncio.get_running_loop().call_later(0.05, tx.close)
+        await asyncio.wait_for(wakeup.wait(rx), timeout=2)
+        with pytest.raises(EOFError):
+            rx.recv_bytes()
+
+    def test_notify_unbound_is_noop(self):
+        PipelineWakeup().notify()
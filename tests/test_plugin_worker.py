@@ -0,0 +1,164 @@
+"""Tests for process-mode plugin execution."""
+
+import multiprocessing
+import os
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from rataGUI.headless.context import HeadlessConfigManager, PipelineContext
+from rataGUI.plugin_worker import ProcessPlugin
+from rataGUI.plugins.base_plugin import BasePlugin
+
+pytestmark = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="test plugins reach the worker only when forked",
+)
+
+
+class InvertPlugin(BasePlugin):
+    def __init__(self, cam_widget, config, queue_size=0):
+        super().__init__(cam_widget, config, queue_size)
+        self.independent = True
+        self.latency_critical = True
+        self.offset = config.get("offset", 0)
+
+    def process(self, frame, metadata):
+        np.subtract(255, frame, out=frame)  # In place, like overlay plugins
+        metadata["Worker PID"] = os.getpid()
+        metadata["Offset Index"] = metadata["Frame Index"] + self.offset
+        return frame, metadata
+
+
+class ResizePlugin(BasePlugin):
+    def process(self, frame, metadata):
+        return frame[::2, ::2].copy(), metadata
+
+
+class FailingPlugin(BasePlugin):
+    def process(self, frame, metadata):
+        raise ValueError("bad frame")
+
+
+class BrokenInitPlugin(BasePlugin):
+    def __init__(self, cam_widget, config, queue_size=0):
+        raise OSError("no device")
+
+    def process(self, frame, metadata):
+        return frame, metadata
+
+
+TEST_PLUGINS = {
+    "invert_plugin": InvertPlugin,
+    "resize_plugin": ResizePlugin,
+    "failing_plugin": FailingPlugin,
+    "broken_init_plugin": BrokenInitPlugin,
+}
+
+
+@pytest.fixture(autouse=True)
+def registered_plugins():
+    BasePlugin.modules.update(TEST_PLUGINS)
+    yield
+    for name in TEST_PLUGINS:
+        BasePlugin.modules.pop(name, None)
+
+
+@pytest.fixture
+def ctx(tmp_path):
+    camera = MagicMock()
+    camera.cameraID = "cam-001"
+    camera.display_name = "TestCam"
+    camera.getDisplayName.return_value = "TestCam"
+    return PipelineContext(
+        camera=camera,
+        camera_config=HeadlessConfigManager({"fps": 30}),
+        save_dir=str(tmp_path / "TestCam"),
+        triggers=[],
+        session_dir=str(tmp_path),
+    )
+
+
+def _start(ctx, name, config=None):
+    plugin_cls = TEST_PLUGINS[name]
+    return ProcessPlugin.wrap(plugin_cls)(ctx, HeadlessConfigManager(config), name)
+
+
+class TestProcessPlugin:
+    def test_frames_processed_in_worker_in_order(self, ctx):
+        plugin = _start(ctx, "invert_plugin", {"offset": 100})
+        try:
+            assert type(plugin).__name__ == "InvertPlugin"
+            assert plugin.blocking is True
+            # Mirrored from the real plugin
+            assert plugin.independent is True
+            assert plugin.latency_critical is True
+            for index in range(5):
+                frame = np.full((4, 6, 3), index, dtype=np.uint8)
+                result, metadata = plugin.process(frame, {"Frame Index": index})
+                assert metadata["Worker PID"] != os.getpid()
+                assert metadata["Offset Index"] == index + 100
+                assert (result == 255 - index).all()
+                assert (frame == index).all()  # Caller's frame is untouched
+        finally:
+            plugin.close()
+        assert not plugin._process.is_alive()
+
+    def test_frame_geometry_changes(self, ctx):
+        plugin = _start(ctx, "resize_plugin")
+        try:
+            assert plugin.latency_critical is False
+            result, _ = plugin.process(np.zeros((8, 8), np.uint16), {})
+            assert result.shape == (4, 4) and result.dtype == np.uint16
+            result, _ = plugin.process(np.zeros((16, 16, 3), np.uint8), {})
+            assert result.shape == (8, 8, 3)
+        finally:
+            plugin.close()
+
+    def test_plugin_errors_are_reraised(self, ctx):
+        plugin = _start(ctx, "failing_plugin")
+        try:
+            with pytest.raises(RuntimeError, match="bad frame"):
+                plugin.process(np.zeros((2, 2), np.uint8), {})
+            # The worker survives and keeps serving frames
+            with pytest.raises(RuntimeError, match="bad frame"):
+                plugin.process(np.zeros((2, 2), np.uint8), {})
+        finally:
+            plugin.close()
+
+    def test_init_failure_raises(self, ctx):
+        with pytest.raises(RuntimeError, match="no device"):
+            _start(ctx, "broken_init_plugin")
+
+    def test_dead_worker_fails_frames(self, ctx):
+        plugin = _start(ctx, "invert_plugin")
+        plugin._process.kill()
+        plugin._process.join()
+        try:
+            with pytest.raises(RuntimeError, match="exited"):
+                plugin.process(np.zeros((2, 2), np.uint8), {"Frame Index": 0})
+        finally:
+            plugin.close()
+
+
+class TestRunnerExecutionMode:
+    def test_execution_key_selects_worker(self, ctx, tmp_path):
+        from rataGUI.headless.runner import PipelineRunner
+
+        runner = PipelineRunner(
+            {
+                "Enabled Plugin Modules": ["invert_plugin"],
+                "plugins": {"invert_plugin": {"execution": "process", "offset": 7}},
+            }
+        )
+        built = runner._build_context(ctx.camera, str(tmp_path), triggers=[])
+        try:
+            plugin = built.plugins[0]
+            assert isinstance(plugin, ProcessPlugin)
+            assert built.plugin_names == ["InvertPlugin"]
+            assert "execution" not in plugin.config
+            assert plugin.config["offset"] == 7
+        finally:
+            for plugin in built.plugins:
+                plugin.close()
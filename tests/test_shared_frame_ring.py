@@ -0,0 +1,310 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from rataGUI.shared_frame_ring import (
+    FREE,
+    HELD,
+    READY,
+    WRITING,
+    SHM_SLOT_KEY,
+    MAX_EXTRA_KEYS,
+    OVERFLOW_BYTES,
+    MAX_SLOTS,
+    MIN_SLOTS,
+    SharedFrameLeases,
+    SharedFrameRing,
+    drain_doorbell,
+    frame_geometry,
+    ring_for_geometry,
+    send_event,
+    slots_for_budget,
+    wait_for_slot,
+)
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create(2, (2, 2, 3), multiprocessing.Condition())
+    yield ring
+    ring.close()
+
+
+def _publish(ring, value):
+    slot_idx = ring.try_acquire()
+    ring.frames[slot_idx] = value
+    return slot_idx, ring.commit(slot_idx)
+
+
+class TestSharedFrameRing:
+    def test_layout_and_attach(self, ring):
+        slot_idx, seq = _publish(ring, 7)
+        other = SharedFrameRing.attach(ring.name, 2, (2, 2, 3), ring.cond)
+        try:
+            assert other.slot_state[slot_idx] == READY
+            assert other.slot_seq[slot_idx] == seq
+            np.testing.assert_array_equal(other.frames[slot_idx], 7)
+        finally:
+            other.close()
+        assert ring.nbytes(2, (2, 2, 3)) <= ring.shm.size
+
+    def test_slot_state_transitions(self, ring):
+        slot_idx = ring.try_acquire()
+        assert ring.slot_state[slot_idx] == WRITING
+        seq = ring.commit(slot_idx)
+        assert seq == 1
+        assert ring.slot_state[slot_idx] == READY
+        assert ring.claim(slot_idx, seq)
+        assert ring.slot_state[slot_idx] == HELD
+        ring.release(slot_idx)
+        assert ring.slot_state[slot_idx] == FREE
+
+    def test_try_acquire_returns_none_when_full(self, ring):
+        _publish(ring, 1)
+        _publish(ring, 2)
+        assert ring.try_acquire() is None
+
+    def test_reclaim_oldest_skips_held_slots(self, ring):
+        first = _publish(ring, 1)
+        second = _publish(ring, 2)
+        assert ring.claim(*first)
+        assert ring.reclaim_oldest() == second[0]
+        assert ring.reclaim_oldest() is None
+
+    def test_reclaim_oldest_picks_lowest_seq(self, ring):
+        first = _publish(ring, 1)
+        _publish(ring, 2)
+        assert ring.reclaim_oldest() == first[0]
+
+    def test_stale_claim_rejected(self, ring):
+        slot_idx, seq = _publish(ring, 1)
+        assert ring.reclaim_oldest() == slot_idx
+        ring.commit(slot_idx)
+        assert not ring.claim(slot_idx, seq)
+        assert ring.stats()["stale_claims"] == 1
+
+
+class TestGeometry:
+    def test_frame_geometry(self):
+        geometry = frame_geometry(np.zeros((4, 6), dtype=np.uint16))
+        assert geometry == {"shape": (4, 6), "dtype": "<u2", "strides": (12, 2)}
+
+    def test_slots_for_budget(self):
+        # 1 MB frames
+        assert slots_for_budget((1024, 1024), np.uint8, 10) == 10
+        assert slots_for_budget((512, 1024), np.uint16, 10) == 10
+        assert slots_for_budget((1024, 1024), np.uint8, 1) == MIN_SLOTS
+        assert slots_for_budget((1024, 1024), np.uint8, 1000) == MAX_SLOTS
+
+    def test_ring_for_geometry(self):
+        geometry = frame_geometry(np.zeros((512, 1024), dtype=np.uint16))
+        ring = ring_for_geometry(geometry, multiprocessing.Condition(), budget_mb=4)
+        try:
+            assert ring.num_slots == 4
+            assert ring.frames.shape == (4, 512, 1024)
+            assert ring.frames.dtype == np.uint16
+            tag, name, num_slots, frame_shape, dtype = ring.control_message()
+            assert (tag, name, num_slots) == ("ring", ring.name, 4)
+            assert frame_shape == (512, 1024) and np.dtype(dtype) == np.uint16
+        finally:
+            ring.close()
+
+
+class TestWaitForSlot:
+    def test_drop_newest(self, ring):
+        _publish(ring, 1)
+        _publish(ring, 2)
+        assert wait_for_slot(ring, "drop_newest", lambda: False) is None
+        assert ring.stats()["dropped_newest"] == 1
+
+    def test_drop_oldest(self, ring):
+        first = _publish(ring, 1)
+        _publish(ring, 2)
+        assert wait_for_slot(ring, "drop_oldest", lambda: False) == first[0]
+        assert ring.stats()["dropped_oldest"] == 1
+
+    def test_drop_oldest_when_all_held(self, ring):
+        for _ in range(2):
+            assert ring.claim(*_publish(ring, 1))
+        assert wait_for_slot(ring, "drop_oldest", lambda: False) is None
+        assert ring.stats()["dropped_newest"] == 1
+
+    def test_block_returns_none_when_stopped(self, ring):
+        _publish(ring, 1)
+        _publish(ring, 2)
+        assert wait_for_slot(ring, "block", lambda: True) is None
+        stats = ring.stats()
+        assert stats["blocked"] == 1
+        assert stats["blocked_ns"] >= 0
+
+
+class TestMetadataRecords:
+    def test_record_round_trip(self, ring):
+        slot_idx = ring.try_acquire()
+        metadata = {"Frame Index": 12, "Camera Index": 10, "Gain": 2.5, "Line": 3}
+        ring.write_record(slot_idx, metadata, 123456789)
+        ring.commit(slot_idx)
+        assert ring.read_record(slot_idx) == (metadata, 123456789)
+
+    def test_record_visible_to_attached_ring(self, ring):
+        slot_idx = ring.try_acquire()
+        ring.write_record(slot_idx, {"Frame Index": 1, "Exposure": 0.01}, 5)
+        other = SharedFrameRing.attach(ring.name, 2, (2, 2, 3), ring.cond)
+        try:
+            metadata, _ = other.read_record(slot_idx)
+            assert metadata == {"Frame Index": 1, "Exposure": 0.01}
+        finally:
+            other.close()
+
+    def test_other_metadata_uses_overflow(self, ring):
+        from datetime import datetime
+
+        slot_idx = ring.try_acquire()
+        metadata = {
+            "Frame Index": 1,
+            "Serial": "abc",
+            "x" * 40: 1,
+            "Chunk": {"Gain": [1.0, 2.0]},
+            "Trigger Time": datetime(2024, 1, 15, 12, 0, 0),
+        }
+        metadata.update({f"Value {n}": n for n in range(MAX_EXTRA_KEYS + 1)})
+        ring.write_record(slot_idx, metadata, 0)
+        ring.commit(slot_idx)
+        other = SharedFrameRing.attach(ring.name, 2, (2, 2, 3), ring.cond)
+        try:
+            decoded, _ = other.read_record(slot_idx)
+        finally:
+            other.close()
+        assert decoded == metadata
+        assert ring.stats()["metadata_dropped"] == 0
+
+    def test_value_changing_type_uses_overflow(self, ring):
+        for value in (3, "three"):
+            slot_idx = ring.try_acquire()
+            ring.write_record(slot_idx, {"Frame Index": 1, "Line": value}, 0)
+            assert ring.read_record(slot_idx)[0]["Line"] == value
+            ring.abort(slot_idx)
+
+    def test_timestamp_not_stored(self, ring):
+        from datetime import datetime
+
+        slot_idx = ring.try_acquire()
+        ring.write_record(slot_idx, {"Frame Index": 1, "Timestamp": datetime.now()}, 0)
+        assert ring.read_record(slot_idx)[0] == {"Frame Index": 1}
+        assert ring.records[slot_idx]["overflow_len"] == 0
+
+    def test_oversized_metadata_is_reported(self, ring, caplog):
+        slot_idx = ring.try_acquire()
+        metadata = {"Frame Index": 1, "Gain": 2.0, "Notes": "x" * OVERFLOW_BYTES}
+        for _ in range(2):
+            ring.write_record(slot_idx, metadata, 0)
+        assert ring.read_record(slot_idx)[0] == {"Frame Index": 1, "Gain": 2.0}
+        assert ring.stats()["metadata_dropped"] == 2
+        assert caplog.text.count("does not fit") == 1
+        assert "Notes" in caplog.text
+
+    def test_ready_after_orders_by_sequence(self, ring):
+        second_slot, _ = _publish(ring, 1)
+        first_slot, _ = _publish(ring, 2)
+        ring.slot_seq[second_slot] = 3  # republished after the other slot
+        assert ring.ready_after(0) == [(first_slot, 2), (second_slot, 3)]
+        assert ring.ready_after(2) == [(second_slot, 3)]
+
+    def test_doorbell_rings_only_when_armed(self, ring):
+        rx, tx = multiprocessing.Pipe(duplex=False)
+        ring.doorbell = tx
+        _publish(ring, 1)
+        assert not rx.poll()
+        assert ring.ready_after(1, arm_doorbell=True) == []
+        _publish(ring, 2)
+        assert rx.recv_bytes() == b"\x01"
+        assert ring.stats()["doorbells"] == 1
+
+    def test_events_share_the_doorbell(self):
+        rx, tx = multiprocessing.Pipe(duplex=False)
+        tx.send_bytes(b"\x01")
+        send_event(tx, ("geometry", {"shape": (2, 3)}))
+        assert drain_doorbell(rx) == [("geometry", {"shape": (2, 3)})]
+        tx.close()
+        with pytest.raises(EOFError):
+            drain_doorbell(rx)
+
+
+class TestSharedFrameLeases:
+    def test_poll_returns_new_frames_once(self, ring):
+        rx, tx = multiprocessing.Pipe(duplex=False)
+        ring.doorbell = tx
+        leases = SharedFrameLeases(ring)
+        slot_idx, seq = _publish(ring, 1)
+        assert leases.poll(rx, timeout=0) == ([(slot_idx, seq)], [])
+        assert leases.poll(rx, timeout=0) == ([], [])
+        # Armed by the empty poll: the next frame rings the doorbell
+        other_slot, other_seq = _publish(ring, 2)
+        assert leases.poll(rx, timeout=1) == ([(other_slot, other_seq)], [])
+
+    def test_poll_returns_frames_before_eof(self, ring):
+        rx, tx = multiprocessing.Pipe(duplex=False)
+        leases = SharedFrameLeases(ring)
+        assert leases.poll(rx, timeout=0) == ([], [])
+        ring.doorbell = tx
+        slot_idx, seq = _publish(ring, 1)
+        tx.close()
+        assert leases.poll(rx, timeout=1) == ([(slot_idx, seq)], [])
+        with pytest.raises(EOFError):
+            leases.poll(rx, timeout=1)
+
+
+    def test_acquire_returns_read_only_view(self, ring):
+        slot_idx, seq = _publish(ring, 3)
+        leases = SharedFrameLeases(ring)
+        view, metadata = leases.acquire(slot_idx, seq)
+        assert metadata[SHM_SLOT_KEY] == slot_idx
+        assert not view.flags.writeable
+        assert np.shares_memory(view, ring.frames)
+        np.testing.assert_array_equal(view, 3)
+        assert leases.outstanding() == 1
+        del view
+
+    def test_acquire_stale_frame_returns_none(self, ring):
+        slot_idx, seq = _publish(ring, 3)
+        ring.reclaim_oldest()
+        ring.commit(slot_idx)
+        leases = SharedFrameLeases(ring)
+        assert leases.acquire(slot_idx, seq) is None
+        assert leases.outstanding() == 0
+
+    def test_release_returns_slot_at_zero(self, ring):
+        slot_idx, seq = _publish(ring, 3)
+        leases = SharedFrameLeases(ring)
+        leases.acquire(slot_idx, seq)
+        leases.retain(slot_idx)
+        leases.release(slot_idx)
+        assert ring.slot_state[slot_idx] == HELD
+        leases.release(slot_idx)
+        assert ring.slot_state[slot_idx] == FREE
+        assert leases.outstanding() == 0
+
+    def test_set_ring_requires_released_frames(self, ring):
+        slot_idx, seq = _publish(ring, 1)
+        leases = SharedFrameLeases()
+        leases.set_ring(ring)
+        leases.acquire(slot_idx, seq)
+        with pytest.raises(RuntimeError):
+            leases.set_ring(ring)
+        leases.release(slot_idx)
+        leases.set_ring(ring)
+
+    def test_release_metadata_is_idempotent(self, ring):
+        _publish(ring, 1)
+        slot_idx, seq = _publish(ring, 2)
+        leases = SharedFrameLeases(ring)
+        _, metadata = leases.acquire(slot_idx, seq)
+        assert metadata[SHM_SLOT_KEY] == slot_idx
+        leases.release_metadata(metadata)
+        # A second release must not free a slot re-acquired in between
+        other_slot, other_seq = _publish(ring, 3)
+        leases.acquire(other_slot, other_seq)
+        leases.release_metadata(metadata)
+        assert SHM_SLOT_KEY not in metadata
+        assert ring.slot_state[other_slot] == HELD
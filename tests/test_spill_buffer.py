@@ -0,0 +1,69 @@
+"""Tests for the encoder write queue's disk overflow."""
+
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from rataGUI.spill_buffer import SpillBuffer, SpillMetrics
+
+
+def _frame(value):
+    return np.full((4, 8), value, dtype=np.uint8)
+
+
+class TestSpillBuffer:
+    def test_fifo_with_wraparound(self, tmp_path):
+        path = str(tmp_path / "cam.spill")
+        spill = SpillBuffer(path, 3 * 32 + 5, 32)
+        assert spill.capacity == 3
+        assert spill.peek() is None
+        assert not os.path.exists(path)  # Created on the first spilled frame
+
+        read = []
+        for value in range(7):
+            spill.push(_frame(value))
+            if len(spill) == 2:
+                read.append(bytes(spill.peek())[0])
+                spill.pop()
+        while len(spill):
+            read.append(bytes(spill.peek())[0])
+            spill.pop()
+        assert read == list(range(7))
+        assert os.path.getsize(path) == 96
+
+        spill.close()
+        assert not os.path.exists(path)
+
+    def test_push_waits_while_full(self, tmp_path):
+        metrics = SpillMetrics()
+        spill = SpillBuffer(str(tmp_path / "cam.spill"), 64, 32, metrics)
+        spill.push(_frame(1))
+        spill.push(_frame(2))
+
+        pushed = threading.Event()
+        pusher = threading.Thread(target=lambda: (spill.push(_frame(3)), pushed.set()))
+        pusher.start()
+        time.sleep(0.05)
+        assert not pushed.is_set()
+        spill.pop()
+        pusher.join(timeout=5)
+        assert pushed.is_set()
+        assert bytes(spill.peek())[0] == 2
+        spill.pop()
+        assert bytes(spill.peek())[0] == 3
+        spill.close()
+
+        stats = metrics.stats()
+        assert stats["spilled"] == 3
+        assert stats["drained"] == 2
+        assert stats["in spill"] == 1  # Lost when closed
+        assert stats["peak frames"] == 2
+        assert stats["peak (MB)"] == 64 / 2**20
+        assert stats["full waits"] == 1
+
+    def test_frame_larger_than_file(self, tmp_path):
+        with pytest.raises(ValueError):
+            SpillBuffer(str(tmp_path / "cam.spill"), 16, 32)
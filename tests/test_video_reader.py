@@ -1,3 +1,4 @@
+import cv2
 import numpy as np
 from unittest.mock import patch, MagicMock
 from rataGUI.cameras.VideoReader import VideoReader
@@ -110,6 +111,28 @@ class TestVideoReaderReadCamera:
         assert vr.frames_acquired == 0
 
 
+class TestVideoReaderFrameFormat:
+    def test_unknown_before_init(self):
+        assert VideoReader("vr1").getFrameFormat() is None
+
+    def test_declared_from_stream(self):
+        vr = VideoReader("vr1")
+        vr._stream = MagicMock()
+        vr._stream.get.side_effect = lambda prop: {
+            cv2.CAP_PROP_FRAME_WIDTH: 640.0,
+            cv2.CAP_PROP_FRAME_HEIGHT: 480.0,
+        }[prop]
+        fmt = vr.getFrameFormat()
+        assert fmt.shape == (480, 640, 3)
+        assert fmt.dtype == np.uint8
+
+    def test_unknown_size(self):
+        vr = VideoReader("vr1")
+        vr._stream = MagicMock()
+        vr._stream.get.return_value = 0.0
+        assert vr.getFrameFormat() is None
+
+
 class TestVideoReaderCloseCamera:
     def test_close(self):
         vr = VideoReader("vr1")
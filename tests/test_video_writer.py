@@ -1,13 +1,20 @@
+import os
+import time
+
+import numpy as np
 import pytest
 from unittest.mock import patch, MagicMock
 import rataGUI.plugins.video_writer as vw_module
 from rataGUI.plugins.video_writer import (
     VideoWriter,
     FFMPEG_Writer,
+    EncoderPool,
     _get_nvidia_driver_version,
     _check_ffmpeg_encoder_available,
     _check_ffmpeg_cuda_available,
     _check_nvenc_new_presets_available,
+    locate_frame,
+    set_pipe_size,
 )
 
 
@@ -461,6 +468,53 @@ class TestFFMPEGWriter:
 
             assert writer.input_dict["-pix_fmt"] == "gray"
 
+    @patch("rataGUI.plugins.video_writer.which")
+    def test_start_process_mono16(self, mock_which, tmp_path):
+        mock_which.return_value = "/usr/bin/ffmpeg"
+        writer = FFMPEG_Writer(
+            str(tmp_path / "test.mp4"), input_dict={}, output_dict={}
+        )
+
+        with patch("rataGUI.plugins.video_writer.sp") as mock_sp:
+            mock_proc = MagicMock()
+            mock_proc.poll.return_value = None  # process still running
+            mock_sp.Popen.return_value = mock_proc
+            mock_sp.PIPE = -1
+            mock_sp.DEVNULL = -2
+            mock_sp.STDOUT = -3
+
+            writer.write_frame(np.zeros((480, 640), dtype=np.uint16))
+
+            assert writer.input_dict["-s"] == "640x480"
+            assert writer.input_dict["-pix_fmt"] == "gray16le"
+            assert writer.frame_format.is_mono
+            writer._write_queue.put(None)
+            writer._write_thread.join(timeout=5)
+            written = mock_proc.stdin.write.call_args[0][0]
+            assert written.nbytes == 480 * 640 * 2
+
+    @patch("rataGUI.plugins.video_writer.which")
+    def test_start_process_pins_encoder(self, mock_which, tmp_path):
+        mock_which.return_value = "/usr/bin/ffmpeg"
+        writer = FFMPEG_Writer(
+            str(tmp_path / "test.mp4"), input_dict={}, output_dict={}, cpu_affinity={2}
+        )
+
+        with patch("rataGUI.plugins.video_writer.sp") as mock_sp, patch(
+            "rataGUI.plugins.video_writer.pin_process"
+        ) as mock_pin:
+            mock_proc = MagicMock()
+            mock_proc.pid = 4321
+            mock_proc.poll.return_value = None
+            mock_sp.Popen.return_value = mock_proc
+            mock_sp.PIPE = -1
+            mock_sp.DEVNULL = -2
+
+            writer.start_process(480, 640, 3)
+            mock_pin.assert_called_once_with(4321, {2}, "ffmpeg encoder")
+            writer._write_queue.put(None)
+            writer._write_thread.join(timeout=5)
+
 
 class TestHwaccelFlags:
     @patch("rataGUI.plugins.video_writer.which")
@@ -750,3 +804,300 @@ class TestConfigureSvtav1:
         with patch("rataGUI.plugins.video_writer.logger") as mock_logger:
             VideoWriter._configure_svtav1(writer, "libsvtav1")
             mock_logger.warning.assert_called()
+
+
+def _make_plugin(widget, make_config, **overrides):
+    """VideoWriter writing small libx264 files into the widget's save_dir."""
+    widget.encoder_cores = None
+    config = {
+        "Save directory": widget.save_dir,
+        "filename suffix": "",
+        "vcodec": "libx264",
+        "framerate": 30,
+        "speed (preset)": "ultrafast",
+        "quality (0-51)": 23,
+        "pixel format": "yuv420p",
+        "Write Frame Index": True,
+        "Buffer Size (frames)": 60,
+    }
+    config.update(overrides)
+    return VideoWriter(widget, make_config(config))
+
+
+def _frame(index):
+    from datetime import datetime, timedelta
+
+    metadata = {
+        "Frame Index": index,
+        "Timestamp": datetime(2024, 1, 15, 12, 0, 0) + timedelta(seconds=index - 1),
+    }
+    return np.full((48, 64, 3), index, dtype=np.uint8), metadata
+
+
+def _count_frames(path):
+    import cv2
+
+    cap = cv2.VideoCapture(path)
+    count = 0
+    while cap.read()[0]:
+        count += 1
+    cap.release()
+    return count
+
+
+@pytest.mark.skipif(vw_module._which("ffmpeg") is None, reason="ffmpeg not found")
+class TestSegmentedRecording:
+    def _record(self, widget, make_config, segment_by, segment_length, indices):
+        plugin = _make_plugin(
+            widget,
+            make_config,
+            **{"Segment by": segment_by, "Segment length": segment_length},
+        )
+        for index in indices:
+            plugin.process(*_frame(index))
+        plugin.close()
+        return plugin
+
+    def _manifest(self, plugin):
+        import csv
+
+        with open(plugin.manifest_path, newline="") as manifest:
+            return list(csv.DictReader(manifest))
+
+    def test_segments_by_frames(self, mock_cam_widget, mock_config_manager):
+        import cv2
+
+        indices = [i for i in range(1, 26) if i != 13]  # Frame 13 dropped upstream
+        plugin = self._record(
+            mock_cam_widget, mock_config_manager, "frames", 10, indices
+        )
+
+        rows = self._manifest(plugin)
+        assert [row["file"] for row in rows] == [
+            f"TestCam_{n:04d}.mp4" for n in range(3)
+        ]
+        assert [int(row["frames"]) for row in rows] == [10, 10, 4]
+        assert [int(row["first frame index"]) for row in rows] == [1, 11, 22]
+        for row in rows:
+            path = os.path.join(plugin.save_dir, row["file"])
+            cap = cv2.VideoCapture(path)
+            assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == int(row["frames"])
+            cap.release()
+            name = row["file"][:-4]
+            frame_indices = np.fromfile(
+                os.path.join(plugin.save_dir, f"frameindex_{name}"), dtype="<u4"
+            )
+            assert len(frame_indices) == int(row["frames"])
+            with open(os.path.join(plugin.save_dir, f"timestamps_{name}.txt")) as f:
+                assert len(f.readlines()) == int(row["frames"])
+
+        path, offset = locate_frame(plugin.manifest_path, 14)
+        assert os.path.basename(path) == "TestCam_0001.mp4"
+        assert offset == 2
+        with pytest.raises(KeyError):
+            locate_frame(plugin.manifest_path, 13)
+
+    def test_segments_by_duration(self, mock_cam_widget, mock_config_manager):
+        # One frame per second
+        plugin = self._record(
+            mock_cam_widget, mock_config_manager, "duration (s)", 5, range(1, 13)
+        )
+        assert [int(row["frames"]) for row in self._manifest(plugin)] == [5, 5, 2]
+
+    def test_unsegmented_file_names(self, mock_cam_widget, mock_config_manager):
+        plugin = self._record(
+            mock_cam_widget, mock_config_manager, "off", 600, range(1, 4)
+        )
+        assert plugin.manifest_path is None
+        assert sorted(os.listdir(plugin.save_dir)) == [
+            "TestCam.mp4",
+            "frameindex_TestCam",
+            "timestamps_TestCam.txt",
+        ]
+
+
+@pytest.mark.skipif(vw_module._which("ffmpeg") is None, reason="ffmpeg not found")
+class TestCrashResilience:
+    @pytest.mark.parametrize(
+        "container, extension, min_frames",
+        [("mp4", ".mp4", 0), ("fragmented mp4", ".mp4", 48), ("mkv", ".mkv", 48)],
+    )
+    def test_frames_recovered_after_encoder_killed(
+        self, mock_cam_widget, mock_config_manager, container, extension, min_frames
+    ):
+        import time
+
+        plugin = _make_plugin(
+            mock_cam_widget,
+            mock_config_manager,
+            **{"Container": container, "Fragment interval (ms)": 200},
+        )
+        assert plugin.file_path.endswith(extension)
+        for index in range(1, 61):
+            plugin.process(*_frame(index))
+        writer = plugin.writer
+        deadline = time.monotonic() + 10
+        while writer._write_queue.qsize() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        time.sleep(1.0)  # Let the encoder catch up
+        writer._proc.kill()  # As if the recording process crashed
+        writer._proc.wait()
+
+        recovered = _count_frames(plugin.file_path)
+        if min_frames:
+            # Only the unfinished fragment (6 frames per 200 ms) and the
+            # encoder's delay are lost
+            assert min_frames <= recovered <= 60
+        else:
+            assert recovered == 0  # No moov atom in an unfinished plain MP4
+        plugin.close()
+
+
+class TestPipeFeed:
+    @pytest.mark.skipif(not hasattr(os, "pipe2"), reason="Linux only")
+    def test_set_pipe_size(self):
+        read_fd, write_fd = os.pipe()
+        try:
+            assert set_pipe_size(write_fd, 256 * 1024) >= 256 * 1024
+            # Capped at pipe-max-size for unprivileged processes
+            assert set_pipe_size(write_fd, 2**30) is not None
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+    @pytest.mark.skipif(vw_module._which("ffmpeg") is None, reason="ffmpeg not found")
+    def test_frames_fed_through_resized_pipe(
+        self, mock_cam_widget, mock_config_manager
+    ):
+        plugin = _make_plugin(
+            mock_cam_widget, mock_config_manager, **{"Pipe size (MB)": 1}
+        )
+        assert plugin.writer.pipe_size == 2**20
+        for index in range(1, 31):
+            plugin.process(*_frame(index))
+        assert not hasattr(plugin.writer._proc.stdin, "raw")  # Unbuffered
+        plugin.close()
+        assert _count_frames(plugin.file_path) == 30
+
+
+@pytest.mark.skipif(vw_module._which("ffmpeg") is None, reason="ffmpeg not found")
+class TestEncoderPool:
+    def test_chunks_stitched_in_order(self, mock_cam_widget, mock_config_manager):
+        import cv2
+
+        plugin = _make_plugin(
+            mock_cam_widget,
+            mock_config_manager,
+            **{"Encoder processes": 3, "Chunk length (frames)": 10},
+        )
+        assert isinstance(plugin.writer, EncoderPool)
+        for index in range(1, 46):
+            plugin.process(*_frame(index))
+        plugin.close()
+
+        assert len(plugin.writer.part_paths) == 5
+        assert sorted(os.listdir(plugin.save_dir)) == [
+            "TestCam.mp4",
+            "frameindex_TestCam",
+            "timestamps_TestCam.txt",
+        ]
+        cap = cv2.VideoCapture(plugin.file_path)
+        levels = []
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            levels.append(round(float(frame.mean())))
+        cap.release()
+        assert len(levels) == 45
+        assert np.allclose(levels, range(1, 46), atol=2)  # Frame i is filled with i
+
+    def test_pool_per_segment(self, mock_cam_widget, mock_config_manager):
+        plugin = _make_plugin(
+            mock_cam_widget,
+            mock_config_manager,
+            **{
+                "Encoder processes": 2,
+                "Chunk length (frames)": 8,
+                "Segment by": "frames",
+                "Segment length": 20,
+            },
+        )
+        for index in range(1, 51):
+            plugin.process(*_frame(index))
+        plugin.close()
+
+        for number, frames in enumerate([20, 20, 10]):
+            path = os.path.join(plugin.save_dir, f"TestCam_{number:04d}.mp4")
+            assert _count_frames(path) == frames
+        assert not [name for name in os.listdir(plugin.save_dir) if ".part" in name]
+
+    def test_rawvideo_uses_one_process(self, mock_cam_widget, mock_config_manager):
+        plugin = _make_plugin(
+            mock_cam_widget,
+            mock_config_manager,
+            **{"vcodec": "rawvideo", "Encoder processes": 4},
+        )
+        assert isinstance(plugin.writer, FFMPEG_Writer)
+        plugin.close()
+
+
+@pytest.mark.skipif(vw_module._which("ffmpeg") is None, reason="ffmpeg not found")
+class TestSpill:
+    def test_stalled_encoder_spills_without_blocking(self, tmp_path):
+        import signal
+        import cv2
+
+        from rataGUI.spill_buffer import SpillMetrics
+
+        metrics = SpillMetrics()
+        writer = FFMPEG_Writer(
+            str(tmp_path / "spill.mp4"),
+            input_dict={"-framerate": "30"},
+            output_dict={"-vcodec": "libx264", "-preset": "ultrafast"},
+            buffer_size=4,
+            spill_size=32 * 2**20,
+            spill_metrics=metrics,
+        )
+        frames = [np.full((240, 320, 3), 4 * i, dtype=np.uint8) for i in range(60)]
+        writer.write_frame(frames[0])
+        os.kill(writer._proc.pid, signal.SIGSTOP)  # Encoder stalls
+        try:
+            t0 = time.monotonic()
+            for frame in frames[1:]:
+                writer.write_frame(frame)
+            assert time.monotonic() - t0 < 5  # Never blocked on the stall
+            assert metrics.stats()["in spill"] > 40
+            assert os.path.exists(writer.spill.path)
+        finally:
+            os.kill(writer._proc.pid, signal.SIGCONT)
+        writer.close()
+
+        stats = metrics.stats()
+        assert stats["spilled"] == stats["drained"] > 40
+        assert stats["in spill"] == 0
+        assert stats["full waits"] == 0
+        assert not os.path.exists(writer.spill.path)
+        cap = cv2.VideoCapture(writer.file_path)
+        levels = []
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            levels.append(float(frame.mean()))
+        cap.release()
+        assert np.allclose(levels, [4 * i for i in range(60)], atol=2)  # In order
+
+    def test_video_writer_spill_config(self, mock_cam_widget, mock_config_manager):
+        plugin = _make_plugin(
+            mock_cam_widget,
+            mock_config_manager,
+            **{"Spill size (MB)": 8, "Spill directory": "/nonexistent"},
+        )
+        assert plugin.writer.spill_size == 8 * 2**20
+        assert plugin.writer.spill_dir is None  # Falls back to the video's
+        for index in range(1, 11):
+            plugin.process(*_frame(index))
+        plugin.close()
+        assert plugin.spill_stats()["in spill"] == 0
+        assert _count_frames(plugin.file_path) == 10